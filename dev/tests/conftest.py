@@ -7,6 +7,9 @@ import asyncio
 import logging
 from datetime import datetime
 import sys
+from unittest.mock import MagicMock
+
+from aiohttp import web
 
 # Add project root to Python path for imports
 PROJECT_ROOT = Path(__file__).parent.parent.parent
@@ -117,3 +120,31 @@ def test_node_state():
 def storage_efficiency():
     """Create a StorageEfficiencyManager instance."""
     return StorageEfficiencyManager()
+
+
+@pytest.fixture
+def local_node_config():
+    """Extra ActiveNode arguments for the local node of ``nodes``."""
+    return {}
+
+
+@pytest.fixture
+async def nodes(aiohttp_server, tmp_path, local_node_config):
+    """A local node and a peer serving its peer endpoints over HTTP.
+
+    Yields (local, peer, peer_state), where peer_state is how the local
+    node reaches the peer. Modules override ``local_node_config`` to
+    configure the local node. Both nodes are deregistered afterwards.
+    """
+    local = ActiveNode(
+        node_id="local", data_dir=str(tmp_path / "local"), **local_node_config
+    )
+    peer = ActiveNode(node_id="peer", data_dir=str(tmp_path / "peer"))
+    app = web.Application()
+    peer.add_routes(app)
+    server = await aiohttp_server(app)
+    peer.membership.local.address = f"{server.host}:{server.port}"
+    peer_state = MagicMock(node_id="peer", address=peer.membership.local.address)
+    yield local, peer, peer_state
+    await local.deregister()
+    await peer.deregister()
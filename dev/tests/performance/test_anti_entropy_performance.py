@@ -0,0 +1,67 @@
+"""Anti-entropy traffic as a function of divergence and dataset size."""
+
+import json
+import logging
+
+import pytest
+
+from src.storage.infrastructure.anti_entropy import (
+    encode_entries,
+    encode_hashes,
+    find_divergent_leaves,
+)
+from src.storage.infrastructure.data.merkle_tree import MerkleTree
+
+logger = logging.getLogger(__name__)
+
+pytestmark = [pytest.mark.performance, pytest.mark.slow]
+
+DEPTH = 12
+CHECKSUM = "ab" * 32
+
+
+def _trees(objects: int, diverged: int):
+    local, remote = MerkleTree(DEPTH), MerkleTree(DEPTH)
+    entries = {}
+    for i in range(objects):
+        data_id = f"block-{i:08d}"
+        entries[data_id] = (1, CHECKSUM)
+        local.update(data_id, None, (1, CHECKSUM))
+        remote.update(data_id, None, (1, CHECKSUM))
+    for i in range(diverged):
+        data_id = f"block-{i * (objects // diverged):08d}"
+        remote.update(data_id, (1, CHECKSUM), (2, CHECKSUM))
+    return local, remote, entries
+
+
+async def _sync_bytes(local: MerkleTree, remote: MerkleTree, entries) -> int:
+    sent = 0
+
+    async def fetch(level, indices):
+        nonlocal sent
+        hashes = remote.hashes(level, indices)
+        sent += len(json.dumps({"level": level, "indices": indices}))
+        sent += len(json.dumps({"hashes": encode_hashes(hashes)}))
+        return hashes
+
+    for leaf in await find_divergent_leaves(local, fetch):
+        listing = {data_id: entries[data_id] for data_id in remote.leaf_ids(leaf)}
+        sent += len(json.dumps(encode_entries(listing)))
+    return sent
+
+
+async def test_sync_traffic_tracks_divergence():
+    results = {}
+    for objects in (50_000, 200_000):
+        for diverged in (0, 1, 10, 100):
+            local, remote, entries = _trees(objects, diverged)
+            results[objects, diverged] = await _sync_bytes(local, remote, entries)
+
+    full_listing = len(json.dumps(encode_entries(entries)))
+    for (objects, diverged), sent in sorted(results.items()):
+        logger.info(f"{objects} objects, {diverged} diverged: {sent} bytes exchanged")
+    logger.info(f"full listing of {len(entries)} objects: {full_listing} bytes")
+
+    assert results[200_000, 0] == results[50_000, 0]
+    assert results[200_000, 1] < results[200_000, 10] < results[200_000, 100]
+    assert results[200_000, 100] < full_listing / 20
@@ -0,0 +1,75 @@
+"""Micro-benchmark of the binary block frame against hex form posts."""
+
+import hashlib
+import logging
+import os
+import time
+from datetime import datetime
+from urllib.parse import parse_qs, urlencode
+
+import pytest
+
+from src.storage.infrastructure.block_protocol import (
+    BlockRecord,
+    decode_frame,
+    encode_frame,
+)
+
+logger = logging.getLogger(__name__)
+
+pytestmark = [pytest.mark.performance, pytest.mark.slow]
+
+
+def _encode_form(record: BlockRecord) -> bytes:
+    """Encode a block the way write_to_node used to post it."""
+    return urlencode(
+        {
+            "data_id": record.data_id,
+            "content": record.content.hex(),
+            "version": record.version,
+            "checksum": record.checksum,
+            "timestamp": record.timestamp.isoformat(),
+        }
+    ).encode()
+
+
+def _decode_form(body: bytes) -> bytes:
+    fields = parse_qs(body.decode())
+    return bytes.fromhex(fields["content"][0])
+
+
+def _time_per_op(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+@pytest.mark.parametrize("size", [4 * 1024, 256 * 1024, 4 * 1024 * 1024])
+def test_wire_size_and_codec_cpu(size):
+    """Compare bytes on the wire and encode+decode CPU per block."""
+    content = os.urandom(size)
+    record = BlockRecord(
+        data_id="bench-block",
+        version=42,
+        checksum=hashlib.sha256(content).hexdigest(),
+        timestamp=datetime.now(),
+        content=content,
+    )
+    iterations = max(3, (8 * 1024 * 1024) // size)
+
+    form_body = _encode_form(record)
+    frame = encode_frame([record])
+    assert _decode_form(form_body) == content
+    assert decode_frame(frame)[1][0].content == content
+
+    form_time = _time_per_op(lambda: _decode_form(_encode_form(record)), iterations)
+    frame_time = _time_per_op(lambda: decode_frame(encode_frame([record])), iterations)
+
+    logger.info(
+        f"{size} byte block: form {len(form_body)} B / {form_time * 1e6:.0f} us, "
+        f"binary {len(frame)} B / {frame_time * 1e6:.0f} us"
+    )
+
+    assert len(frame) < len(form_body) * 0.55
+    assert frame_time < form_time
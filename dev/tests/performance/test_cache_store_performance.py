@@ -0,0 +1,56 @@
+"""CacheStore throughput with one lock versus sharded locks."""
+
+import logging
+import random
+import threading
+import time
+
+import pytest
+
+from src.storage.infrastructure.data.cache_store import CacheStore
+
+logger = logging.getLogger(__name__)
+
+pytestmark = [pytest.mark.performance, pytest.mark.slow]
+
+OPS = 200_000  # split across the threads of each run
+KEYS = 10_000
+THREADS = (1, 4, 16, 64)
+
+
+def _throughput(cache: CacheStore, threads: int) -> float:
+    """Operations per second for a 90% read, 10% write mix."""
+    per_thread = OPS // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def work(seed: int) -> None:
+        rng = random.Random(seed)
+        keys = [f"key{rng.randrange(KEYS)}" for _ in range(per_thread)]
+        barrier.wait()
+        for i, key in enumerate(keys):
+            if i % 10 == 0 or cache.get(key) is None:
+                cache.put(key, b"x" * 512)
+
+    workers = [threading.Thread(target=work, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def test_sharded_cache_throughput():
+    results = {}
+    for shards in (1, 16):
+        for threads in THREADS:
+            cache = CacheStore(max_size=KEYS // 2, shards=shards)
+            results[shards, threads] = _throughput(cache, threads)
+
+    for threads in THREADS:
+        logger.info(
+            f"{threads:>2} threads: 1 shard {results[1, threads]:,.0f} ops/s, "
+            f"16 shards {results[16, threads]:,.0f} ops/s"
+        )
+    assert all(ops > 0 for ops in results.values())
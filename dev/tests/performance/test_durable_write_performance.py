@@ -0,0 +1,58 @@
+"""Throughput of local block writes at each durability level."""
+
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+import pytest
+
+from src.storage.infrastructure.disk_io import DiskIOExecutor
+from src.storage.infrastructure.durability import DurabilityLevel, GroupCommitWriter
+
+logger = logging.getLogger(__name__)
+
+pytestmark = [pytest.mark.performance, pytest.mark.slow]
+
+BLOCK_SIZE = 4 * 1024
+CONCURRENT_WRITERS = 64
+WRITES_PER_WRITER = 8
+
+
+async def _writes_per_second(level: DurabilityLevel, directory: str) -> tuple:
+    disk_io = DiskIOExecutor()
+    writer = GroupCommitWriter(disk_io, level)
+    payload = os.urandom(BLOCK_SIZE)
+
+    async def worker(worker_id: int):
+        for i in range(WRITES_PER_WRITER):
+            await writer.write(os.path.join(directory, f"{worker_id}-{i}"), payload)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(w) for w in range(CONCURRENT_WRITERS)])
+    elapsed = time.perf_counter() - start
+    await disk_io.shutdown()
+
+    total = CONCURRENT_WRITERS * WRITES_PER_WRITER
+    return total / elapsed, writer.get_metrics()
+
+
+async def test_durability_level_throughput():
+    """Group commit should sit between no fsync and fsync per write."""
+    results = {}
+    # Use the working directory so the numbers reflect a real disk, not tmpfs
+    for level in DurabilityLevel:
+        with tempfile.TemporaryDirectory(dir=os.getcwd()) as tmpdir:
+            results[level] = await _writes_per_second(level, tmpdir)
+
+    for level, (rate, metrics) in results.items():
+        logger.info(
+            f"{level.value}: {rate:.0f} writes/s, "
+            f"{metrics['batches']} syncs, avg batch {metrics['avg_batch']:.1f}"
+        )
+
+    assert results[DurabilityLevel.BATCHED][1]["avg_batch"] > 1
+    assert results[DurabilityLevel.PER_WRITE][1]["batches"] == (
+        CONCURRENT_WRITERS * WRITES_PER_WRITER
+    )
@@ -0,0 +1,96 @@
+"""Benchmark of sendfile local reads against buffered reads on the event loop."""
+
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import pytest
+from aiohttp import web
+
+from src.storage.infrastructure.active_node import ActiveNode
+from src.storage.infrastructure.data.consistency_manager import VersionedData
+
+logger = logging.getLogger(__name__)
+
+pytestmark = [pytest.mark.performance, pytest.mark.slow]
+
+BLOCK_SIZE = 16 * 1024 * 1024
+CONCURRENT_READS = 16
+
+
+async def _measure(client, path: str):
+    """Run concurrent reads while sampling event loop lag.
+
+    Returns:
+        Tuple of (MB/s, max loop lag in ms)
+    """
+    loop = asyncio.get_running_loop()
+    max_lag = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal max_lag
+        interval = 0.005
+        while running:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            max_lag = max(max_lag, loop.time() - start - interval)
+
+    async def fetch():
+        response = await client.get(path)
+        total = 0
+        async for chunk in response.content.iter_chunked(1024 * 1024):
+            total += len(chunk)
+        return total
+
+    tick = asyncio.ensure_future(ticker())
+    start = time.perf_counter()
+    sizes = await asyncio.gather(*[fetch() for _ in range(CONCURRENT_READS)])
+    elapsed = time.perf_counter() - start
+    running = False
+    await tick
+
+    assert all(size == BLOCK_SIZE for size in sizes)
+    return sum(sizes) / elapsed / (1024 * 1024), max_lag * 1000.0
+
+
+async def test_sendfile_vs_buffered_reads(aiohttp_client):
+    """Serve the same block both ways and compare throughput and loop lag."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(node_id="bench-node", data_dir=tmpdir)
+        block_path = os.path.join(tmpdir, "block")
+        with open(block_path, "wb") as f:
+            f.write(os.urandom(BLOCK_SIZE))
+        await node.consistency_manager.update_node_version(
+            node.node_id,
+            "block",
+            VersionedData(
+                content=b"",
+                version=1,
+                timestamp=datetime.now(),
+                checksum="",
+                location=block_path,
+            ),
+        )
+
+        async def buffered(request):
+            # What local reads used to do: read the whole block on the loop
+            with open(block_path, "rb") as f:
+                return web.Response(body=f.read())
+
+        app = web.Application()
+        app.router.add_get("/buffered/{data_id}", buffered)
+        app.router.add_get("/storage/data/{data_id}", node.handle_local_read)
+        client = await aiohttp_client(app)
+
+        buffered_mbps, buffered_lag = await _measure(client, "/buffered/block")
+        sendfile_mbps, sendfile_lag = await _measure(client, "/storage/data/block")
+
+        logger.info(
+            f"buffered: {buffered_mbps:.0f} MB/s, max loop lag {buffered_lag:.1f} ms; "
+            f"sendfile: {sendfile_mbps:.0f} MB/s, max loop lag {sendfile_lag:.1f} ms"
+        )
+        assert sendfile_lag <= buffered_lag
@@ -0,0 +1,61 @@
+"""Cost of listing a node's data with the reverse index versus a full scan."""
+
+import logging
+import time
+from datetime import datetime
+
+import pytest
+
+from src.storage.infrastructure.data.consistency_manager import (
+    ConsistencyManager,
+    VersionedData,
+)
+
+logger = logging.getLogger(__name__)
+
+pytestmark = [pytest.mark.performance, pytest.mark.slow]
+
+OBJECTS = 1_000_000
+NODES = 20
+REPLICAS = 3
+
+
+def _scan_node_data(manager: ConsistencyManager, node_id: str):
+    """How get_node_data used to work: scan every object."""
+    return {
+        data_id: data
+        for data_id, holder, data in manager._versions.items()
+        if holder == node_id
+    }
+
+
+async def test_node_failure_inventory():
+    manager = ConsistencyManager()
+    version_data = VersionedData(b"", 1, datetime.now(), "")
+    for i in range(OBJECTS):
+        data_id = f"block-{i}"
+        for r in range(REPLICAS):
+            await manager.update_node_version(
+                f"node-{(i + r) % NODES}", data_id, version_data
+            )
+
+    start = time.perf_counter()
+    scanned = _scan_node_data(manager, "node-7")
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = manager.get_node_data("node-7")
+    index_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    streamed = sum(len(page) for page in manager.iter_node_data("node-7"))
+    page_time = time.perf_counter() - start
+
+    logger.info(
+        f"{OBJECTS} objects on {NODES} nodes: full scan {scan_time * 1000:.0f} ms, "
+        f"indexed {index_time * 1000:.0f} ms, paged {page_time * 1000:.0f} ms "
+        f"for {len(indexed)} items"
+    )
+    assert scanned.keys() == indexed.keys()
+    assert streamed == len(indexed)
+    assert index_time < scan_time
@@ -0,0 +1,53 @@
+"""Recovery time of version state from the log and from a checkpoint."""
+
+import logging
+import tempfile
+import time
+from datetime import datetime
+
+import pytest
+
+from src.storage.infrastructure.data.consistency_manager import (
+    ConsistencyManager,
+    VersionedData,
+)
+
+logger = logging.getLogger(__name__)
+
+pytestmark = [pytest.mark.performance, pytest.mark.slow]
+
+BLOCKS = 200_000
+
+
+async def _populate(manager: ConsistencyManager) -> None:
+    now = datetime.now()
+    for i in range(BLOCKS):
+        await manager.update_node_version(
+            "node1",
+            f"block-{i}",
+            VersionedData(b"", 1, now, "0" * 64, f"/data/block-{i}"),
+        )
+
+
+def _time_recovery(state_dir: str) -> float:
+    start = time.perf_counter()
+    manager = ConsistencyManager(state_dir=state_dir)
+    elapsed = time.perf_counter() - start
+    assert manager.count_node_data("node1") == BLOCKS
+    return elapsed
+
+
+async def test_recovery_time():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = ConsistencyManager(state_dir=tmpdir, checkpoint_interval=10 * BLOCKS)
+        await _populate(manager)
+        replay = _time_recovery(tmpdir)
+
+        await manager.stop()
+        from_checkpoint = _time_recovery(tmpdir)
+
+    logger.info(
+        f"{BLOCKS} versions: full log replay {replay:.2f}s, "
+        f"checkpoint load {from_checkpoint:.2f}s"
+    )
+    assert from_checkpoint < 30
@@ -0,0 +1,72 @@
+"""Metadata memory per replica: dict of VersionedData versus the columnar store."""
+
+import hashlib
+import logging
+import tracemalloc
+from datetime import datetime
+
+import pytest
+
+from src.storage.infrastructure.data.version_store import VersionedData, VersionStore
+
+logger = logging.getLogger(__name__)
+
+pytestmark = [pytest.mark.performance, pytest.mark.slow]
+
+OBJECTS = 200_000
+REPLICAS = 3
+
+
+def _entries():
+    for i in range(OBJECTS):
+        data_id = f"block-{i:08d}"
+        checksum = hashlib.sha256(data_id.encode()).hexdigest()
+        for r in range(REPLICAS):
+            yield data_id, f"node-{(i + r) % 10}", checksum
+
+
+def _measure(build) -> int:
+    data_ids = [f"block-{i:08d}" for i in range(OBJECTS)]  # shared by both layouts
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    holder = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del holder, data_ids
+    return used
+
+
+def test_metadata_bytes_per_replica():
+    now = datetime.now()
+
+    def dict_layout():
+        version_map = {}
+        for data_id, node_id, checksum in _entries():
+            version_map.setdefault(data_id, {})[node_id] = VersionedData(
+                b"",
+                1,
+                now.replace(microsecond=len(version_map) % 1000),
+                checksum,
+                f"/var/lib/dfs/data/{data_id}",
+            )
+        return version_map
+
+    def columnar_layout():
+        store = VersionStore()
+        for data_id, node_id, checksum in _entries():
+            store.put(
+                data_id,
+                node_id,
+                VersionedData(b"", 1, now, checksum, f"/var/lib/dfs/data/{data_id}"),
+            )
+        return store
+
+    replicas = OBJECTS * REPLICAS
+    dict_bytes = _measure(dict_layout) / replicas
+    columnar_bytes = _measure(columnar_layout) / replicas
+
+    logger.info(
+        f"{replicas} replicas: dict of VersionedData {dict_bytes:.0f} B/replica, "
+        f"columnar store {columnar_bytes:.0f} B/replica"
+    )
+    assert columnar_bytes < dict_bytes / 3
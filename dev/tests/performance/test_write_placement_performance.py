@@ -0,0 +1,90 @@
+"""Write placement latency as the cluster grows."""
+
+import logging
+import tempfile
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp import web
+
+from src.storage.infrastructure.active_node import ActiveNode
+
+logger = logging.getLogger(__name__)
+
+pytestmark = [pytest.mark.performance, pytest.mark.slow]
+
+ROUNDS = 50
+METRICS = {"cpu_usage": 30.0, "memory_usage": 40.0, "error_rate": 0.0, "queue_depth": 1}
+
+
+def _states(count, address):
+    return [
+        MagicMock(
+            node_id=f"node-{i}",
+            status="active",
+            last_heartbeat=datetime.now(),
+            available_storage=10**9,
+            total_storage=10**10,
+            network_latency=1.0,
+            write_queue=[],
+            region=None,
+            zone=f"zone-{i % 3}",
+            address=address,
+        )
+        for i in range(count)
+    ]
+
+
+async def _mean_ms(fn):
+    start = time.perf_counter()
+    for i in range(ROUNDS):
+        await fn(i)
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+async def test_placement_latency_stays_flat(aiohttp_server):
+    async def metrics(request):
+        return web.json_response(METRICS)
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    server = await aiohttp_server(app)
+    address = f"{server.host}:{server.port}"
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(node_id="local", data_dir=tmpdir)
+        node.region = None
+        for count in (8, 32, 128, 512):
+            states = _states(count, address)
+            node.get_active_nodes = MagicMock(return_value=states)
+            node._sync_hash_ring()
+            for state in states:
+                node.cluster_metrics.update(state.node_id, METRICS, sent_at=time.time())
+
+            cached = await _mean_ms(lambda i: node.select_write_targets(1024, 3))
+            keyed = await _mean_ms(
+                lambda i: node.select_write_targets(1024, 3, data_id=f"block-{i}")
+            )
+
+            async def scrape(i):
+                # What placement cost when every write polled each node
+                for state in states:
+                    await node.get_node_metrics(state)
+
+            scraped = await _mean_ms(scrape) if count <= 32 else None
+            results[count] = (cached, keyed, scraped)
+
+        await node.peer_transport.close()
+
+    for count, (cached, keyed, scraped) in results.items():
+        logger.info(
+            f"{count} nodes: cached metrics {cached:.3f} ms, ring {keyed:.3f} ms"
+            + (f", per-write scraping {scraped:.3f} ms" if scraped else "")
+        )
+
+    assert results[512][1] < results[8][1] * 5  # ring lookup barely grows
+    assert results[32][0] < results[32][2] / 10  # far cheaper than scraping
+    assert results[512][0] < 20
@@ -3,7 +3,9 @@
 import pytest
 import asyncio
 from unittest.mock import MagicMock, AsyncMock, patch
+import hashlib
 import tempfile
+from datetime import datetime
 from pathlib import Path
 
 from src.storage.infrastructure.active_node import (
@@ -15,9 +17,16 @@ from src.storage.infrastructure.active_node import (
     WriteFailureError,
     NodeUnhealthyError,
 )
+from src.models.models import NodeState
 from src.storage.infrastructure.load_manager import LoadManager
-from src.storage.infrastructure.data.consistency_manager import ConsistencyManager
-from src.storage.infrastructure.data.replication_manager import ReplicationManager
+from src.storage.infrastructure.data.consistency_manager import (
+    ConsistencyManager,
+    VersionedData,
+)
+from src.storage.infrastructure.data.replication_manager import (
+    ReplicationManager,
+    ReplicationResult,
+)
 
 @pytest.fixture
 def mock_load_manager():
@@ -52,7 +61,7 @@ def test_data_dir():
         yield Path(tmpdir)
 
 @pytest.fixture
-def mock_node(test_data_dir, mock_load_manager, mock_consistency_manager, mock_replication_manager):
+async def mock_node(test_data_dir, mock_load_manager, mock_consistency_manager, mock_replication_manager):
     """Create a mock active node."""
     node = ActiveNode(
         node_id="test-node-1",
@@ -63,7 +72,8 @@ def mock_node(test_data_dir, mock_load_manager, mock_consistency_manager, mock_r
     node.load_manager = mock_load_manager
     node.consistency_manager = mock_consistency_manager
     node.replication_manager = mock_replication_manager
-    return node
+    yield node
+    await node.disk_io.shutdown()
 
 def test_node_initialization(mock_node, test_data_dir):
     """Test that a node is initialized with correct default values."""
@@ -149,6 +159,7 @@ async def test_store_data_timeout():
                     data=b"test data",
                     consistency_level=ConsistencyLevel.STRONG
                 )
+        await node.deregister()
 
 @pytest.mark.asyncio
 async def test_insufficient_nodes(mock_node):
@@ -185,5 +196,346 @@ async def test_node_health_check(mock_node):
             consistency_level=ConsistencyLevel.STRONG
         )
 
+class _ChunkedBody:
+    """Minimal stand-in for ``request.content`` yielding fixed-size chunks."""
+
+    def __init__(self, data: bytes):
+        self._data = data
+
+    async def iter_chunked(self, size: int):
+        for i in range(0, len(self._data), size):
+            await asyncio.sleep(0)
+            yield self._data[i:i + size]
+
+
+@pytest.mark.asyncio
+async def test_stream_write_body_fans_out_chunks(test_data_dir):
+    """Streaming writes hash, store and replicate the body chunk by chunk."""
+    node = ActiveNode(
+        node_id="test-node-stream",
+        data_dir=str(test_data_dir),
+        write_chunk_size=4,
+    )
+    node.replication_manager.initialize()
+    received = []
+
+    async def fake_upload(replica, data_id, chunks, version, timestamp):
+        async for chunk in chunks:
+            received.append(chunk)
+        return ReplicationResult(success=True)
+
+    replica = MagicMock(node_id="replica-1")
+    data = b"0123456789abcdef!"
+    with patch.object(
+        node.replication_manager, "replicate_stream_to_node", side_effect=fake_upload
+    ):
+        stream = node.replication_manager.open_replica_stream(
+            replica, "obj", 1, datetime.now()
+        )
+        path = str(test_data_dir / "obj")
+        request = MagicMock(content=_ChunkedBody(data))
+        checksum, size = await node._stream_write_body(request, path, [stream])
+        result = await stream.task
+
+    assert result.success
+    assert size == len(data)
+    assert checksum == hashlib.sha256(data).hexdigest()
+    assert received == [data[i:i + 4] for i in range(0, len(data), 4)]
+    assert Path(path).read_bytes() == data
+    assert not list(test_data_dir.glob("*.part"))
+    await node.deregister()
+
+
+@pytest.mark.asyncio
+async def test_stream_write_drops_stalled_replica(test_data_dir):
+    """A replica that stops reading is dropped without blocking the write."""
+    node = ActiveNode(
+        node_id="test-node-stall",
+        data_dir=str(test_data_dir),
+        write_timeout=0.05,
+        write_chunk_size=2,
+    )
+    node.replication_manager.initialize()
+
+    async def stalled_upload(replica, data_id, chunks, version, timestamp):
+        await asyncio.sleep(10)
+
+    with patch.object(
+        node.replication_manager,
+        "replicate_stream_to_node",
+        side_effect=stalled_upload,
+    ):
+        stream = node.replication_manager.open_replica_stream(
+            MagicMock(node_id="replica-1"), "obj", 1, datetime.now()
+        )
+        path = str(test_data_dir / "obj")
+        request = MagicMock(content=_ChunkedBody(b"abcdefgh"))
+        _, size = await node._stream_write_body(request, path, [stream])
+
+    assert size == 8
+    assert stream.failed
+    assert Path(path).read_bytes() == b"abcdefgh"
+    await node.deregister()
+
+
+@pytest.mark.asyncio
+async def test_overlapping_stream_writes_never_mix_chunks(test_data_dir):
+    """Concurrent writes to one data id each land whole."""
+    node = ActiveNode(
+        node_id="test-node-overlap", data_dir=str(test_data_dir), write_chunk_size=1
+    )
+    path = str(test_data_dir / "obj")
+    bodies = [b"a" * 64, b"b" * 64]
+
+    await asyncio.gather(
+        *[
+            node._stream_write_body(MagicMock(content=_ChunkedBody(body)), path, [])
+            for body in bodies
+        ]
+    )
+
+    assert Path(path).read_bytes() in bodies
+    assert not list(test_data_dir.glob("*.part"))
+    await node.deregister()
+
+
+def add_cluster_node(node, node_id, address=""):
+    """Register an active member in ``node``'s view of the cluster."""
+    node.cluster_nodes[node_id] = NodeState(
+        node_id=node_id,
+        status="active",
+        last_heartbeat=datetime.now(),
+        load=0.0,
+        available_storage=1 << 30,
+        network_latency=0.0,
+        volumes=[],
+        address=address,
+        total_storage=2 << 30,
+    )
+
+
+@pytest.fixture
+def local_node_config():
+    """The local node of ``nodes`` needs one replica to acknowledge writes."""
+    return {"quorum_size": 2, "write_chunk_size": 4}
+
+
+@pytest.mark.asyncio
+async def test_write_streams_to_a_served_replica(nodes):
+    """A quorum write reaches a real peer, which checks in its checksum."""
+    local, peer, peer_state = nodes
+    local.replication_manager.initialize(3)
+    add_cluster_node(local, "local")
+    add_cluster_node(local, "peer", peer_state.address)
+    local._sync_hash_ring()
+    local.load_manager = MagicMock()
+    local.load_manager.can_handle_write.return_value = True
+    data = b"streamed to the replica"
+    request = MagicMock(match_info={"data_id": "obj"}, content=_ChunkedBody(data))
+
+    response = await local.handle_write(request)
+
+    assert response.status == 200, response.text
+    checksum = hashlib.sha256(data).hexdigest()
+    assert response.headers["X-Checksum"] == checksum
+    stored = peer.consistency_manager.get_node_version("peer", "obj")
+    assert (stored.version, stored.checksum) == (
+        int(response.headers["X-Version"]),
+        checksum,
+    )
+    assert Path(stored.location).read_bytes() == data
+
+
+def make_read_nodes(count):
+    """Replica nodes ordered by network latency."""
+    return [MagicMock(node_id=f"node-{i}", network_latency=float(i)) for i in range(count)]
+
+
+def read_result(node, version, checksum, content=None):
+    result = {
+        "status": "success",
+        "node": node,
+        "version": version,
+        "timestamp": datetime(2024, 1, 1),
+        "checksum": checksum,
+    }
+    if content is not None:
+        result["content"] = content
+    return result
+
+
+@pytest.fixture
+def read_node(mock_node):
+    """Active node with a real consistency manager for read-path tests."""
+    mock_node.consistency_manager = ConsistencyManager()
+    mock_node.load_manager.get_node_load.return_value = 0.0
+    return mock_node
+
+
+@pytest.mark.asyncio
+async def test_quorum_read_does_not_wait_for_slow_replica(read_node):
+    """Quorum reads return once a majority answers."""
+    nodes = make_read_nodes(3)
+    delays = {"node-0": 0.01, "node-1": 0.02, "node-2": 5.0}
+
+    async def fake_read(node, data_id):
+        await asyncio.sleep(delays[node.node_id])
+        return read_result(node, 1, "abc", content=b"data")
+
+    async def fake_digest(node, data_id):
+        await asyncio.sleep(delays[node.node_id])
+        return read_result(node, 1, "abc")
+
+    with patch.object(read_node, "read_from_node", side_effect=fake_read), \
+            patch.object(read_node, "read_digest_from_node", side_effect=fake_digest):
+        content = await asyncio.wait_for(
+            read_node.handle_quorum_read("obj", nodes), timeout=1.0
+        )
+
+    assert content == b"data"
+
+
+@pytest.mark.asyncio
+async def test_quorum_read_fails_when_majority_unavailable(read_node):
+    """Quorum reads raise once a majority of replicas have failed."""
+    nodes = make_read_nodes(3)
+
+    async def fake_read(node, data_id):
+        return read_result(node, 1, "abc", content=b"data")
+
+    async def fake_digest(node, data_id):
+        return {"status": "error", "error": "HTTP 500"}
+
+    with patch.object(read_node, "read_from_node", side_effect=fake_read), \
+            patch.object(read_node, "read_digest_from_node", side_effect=fake_digest):
+        with pytest.raises(ConsistencyError):
+            await read_node.handle_quorum_read("obj", nodes)
+
+
+@pytest.mark.asyncio
+async def test_strong_read_fetches_content_once(read_node):
+    """When digests agree only the closest replica sends content."""
+    nodes = make_read_nodes(3)
+    read_from_node = AsyncMock(side_effect=lambda n, d: read_result(n, 2, "abc", b"data"))
+    read_digest = AsyncMock(side_effect=lambda n, d: read_result(n, 2, "abc"))
+
+    with patch.object(read_node, "read_from_node", read_from_node), \
+            patch.object(read_node, "read_digest_from_node", read_digest), \
+            patch.object(read_node, "repair_inconsistency") as repair:
+        content = await read_node.handle_strong_read("obj", nodes)
+
+    assert content == b"data"
+    assert read_from_node.await_count == 1
+    assert read_from_node.await_args.args[0] is nodes[0]
+    assert read_digest.await_count == 2
+    repair.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_strong_read_fetches_newest_on_digest_mismatch(read_node):
+    """A newer digest elsewhere triggers one extra full read and a repair."""
+    nodes = make_read_nodes(3)
+
+    async def fake_read(node, data_id):
+        if node is nodes[0]:
+            return read_result(node, 1, "old", b"stale")
+        return read_result(node, 2, "new", b"fresh")
+
+    async def fake_digest(node, data_id):
+        return read_result(node, 2, "new")
+
+    repair = AsyncMock()
+    with patch.object(read_node, "read_from_node", side_effect=fake_read) as reads, \
+            patch.object(read_node, "read_digest_from_node", side_effect=fake_digest), \
+            patch.object(read_node, "repair_inconsistency", repair):
+        content = await read_node.handle_strong_read("obj", nodes)
+
+    assert content == b"fresh"
+    assert reads.await_count == 2
+    repair.assert_awaited_once()
+    assert repair.await_args.args[2] == b"fresh"
+
+
+@pytest.mark.asyncio
+async def test_repair_writes_only_stale_replicas(read_node):
+    """Repair pushes the newest version to replicas with older digests."""
+    nodes = make_read_nodes(3)
+    results = [
+        read_result(nodes[0], 2, "new", b"fresh"),
+        read_result(nodes[1], 1, "old"),
+        read_result(nodes[2], 2, "new"),
+    ]
+
+    with patch.object(read_node, "write_to_node", new_callable=AsyncMock) as write:
+        await read_node.repair_inconsistency("obj", results, b"fresh")
+
+    write.assert_awaited_once()
+    node, write_op = write.await_args.args
+    assert node is nodes[1]
+    assert write_op.version == 2
+    assert write_op.content == b"fresh"
+
+
+
+@pytest.mark.asyncio
+async def test_migrate_load_ships_block_content_from_disk(nodes):
+    """Load migration reads blocks the version map only knows by location."""
+    local, peer, peer_state = nodes
+    local.replication_manager.initialize(3)
+    content = b"block payload"
+    checksum = hashlib.sha256(content).hexdigest()
+    path = Path(local._block_path("obj"))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    manager = local.consistency_manager
+    for node_id, location in (("local", str(path)), ("degraded", None)):
+        await manager.update_node_version(
+            node_id,
+            "obj",
+            VersionedData(b"", 5, datetime(2024, 1, 1), checksum, location),
+        )
+    add_cluster_node(local, "local")
+    add_cluster_node(local, "peer", peer_state.address)
+
+    await local.migrate_load_from_node(MagicMock(node_id="degraded"), aggressive=True)
+
+    stored = peer.consistency_manager.get_node_version("peer", "obj")
+    assert (stored.version, stored.checksum) == (5, checksum)
+    assert Path(stored.location).read_bytes() == content
+    assert manager.get_node_version("peer", "obj").version == 5
+
+
+
+@pytest.mark.asyncio
+async def test_node_failure_re_replicates_blocks_from_local_copy(nodes):
+    """Blocks held by a failed node are pushed again by one surviving holder."""
+    local, peer, peer_state = nodes
+    local.replication_manager.initialize(3)
+    manager = local.consistency_manager
+    for data_id, holders in (("mine", ["failed"]), ("theirs", ["failed", "a-node"])):
+        content = data_id.encode()
+        path = local._block_path(data_id)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_bytes(content)
+        version_data = VersionedData(
+            b"", 1, datetime(2024, 1, 1), hashlib.sha256(content).hexdigest(), path
+        )
+        await manager.update_node_version("local", data_id, version_data)
+        for node_id in holders:
+            await manager.update_node_version(node_id, data_id, version_data)
+    for node_id in ("local", "failed", "a-node"):
+        add_cluster_node(local, node_id)
+    add_cluster_node(local, "peer", peer_state.address)
+
+    await local.handle_node_failure(local.cluster_nodes["failed"])
+
+    # "a-node" sorts first, so it re-replicates "theirs"
+    stored = peer.consistency_manager.get_node_version("peer", "mine")
+    assert stored.version == 1
+    assert Path(stored.location).read_bytes() == b"mine"
+    assert peer.consistency_manager.get_node_version("peer", "theirs") is None
+    assert manager.get_node_version("peer", "mine").checksum == stored.checksum
+
+
 if __name__ == "__main__":
     pytest.main(["-v", __file__])
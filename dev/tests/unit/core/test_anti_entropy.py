@@ -0,0 +1,124 @@
+"""Unit tests for Merkle-tree anti-entropy between two nodes."""
+
+import hashlib
+import os
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.models.models import NodeState
+from src.storage.infrastructure.data.consistency_manager import VersionedData
+
+
+async def store_block(node, data_id, content, version):
+    path = os.path.join(node.data_dir, data_id)
+    with open(path, "wb") as f:
+        f.write(content)
+    await node.consistency_manager.update_node_version(
+        node.node_id,
+        data_id,
+        VersionedData(
+            content=b"",
+            version=version,
+            timestamp=datetime.now(),
+            checksum=hashlib.sha256(content).hexdigest(),
+            location=path,
+        ),
+    )
+
+
+async def test_in_sync_nodes_only_compare_roots(nodes):
+    local, peer, peer_state = nodes
+    for i in range(50):
+        await store_block(local, f"block-{i}", b"same %d" % i, version=1)
+        await store_block(peer, f"block-{i}", b"same %d" % i, version=1)
+
+    stats = await local.sync_with_peer(peer_state)
+
+    assert stats.round_trips == 1
+    assert stats.differing_leaves == 0
+    assert stats.repaired == []
+    assert stats.listing_bytes == stats.block_bytes == 0
+
+
+async def test_pulls_only_missing_and_newer_blocks(nodes):
+    local, peer, peer_state = nodes
+    for i in range(50):
+        await store_block(local, f"block-{i}", b"same %d" % i, version=1)
+        await store_block(peer, f"block-{i}", b"same %d" % i, version=1)
+    await store_block(peer, "block-3", b"newer", version=2)
+    await store_block(peer, "only-on-peer", b"missing", version=1)
+    await store_block(local, "block-9", b"local is ahead", version=5)
+
+    stats = await local.sync_with_peer(peer_state)
+
+    assert sorted(stats.repaired) == ["block-3", "only-on-peer"]
+    assert stats.block_bytes == len(b"newer") + len(b"missing")
+    assert stats.bytes_exchanged > stats.block_bytes
+    assert local.consistency_manager.get_node_version("local", "block-3").version == 2
+    assert local.consistency_manager.get_node_version("local", "block-9").version == 5
+    with open(os.path.join(local.data_dir, "only-on-peer"), "rb") as f:
+        assert f.read() == b"missing"
+
+    # Only the local-ahead block still differs, and nothing is pulled for it
+    again = await local.sync_with_peer(peer_state)
+    assert again.differing_leaves == 1
+    assert again.repaired == []
+
+
+async def test_depth_mismatch_is_rejected(nodes):
+    local, peer, peer_state = nodes
+    await store_block(peer, "block", b"x", version=1)
+    local.consistency_manager.merkle_tree.depth = 3
+
+    with pytest.raises(Exception, match="depth"):
+        await local.sync_with_peer(peer_state)
+
+
+def ring_state(node_id, address="127.0.0.1:1"):
+    return NodeState(
+        node_id=node_id,
+        status="active",
+        last_heartbeat=datetime.now(),
+        load=0.0,
+        available_storage=10**9,
+        network_latency=0.0,
+        volumes=[],
+        address=address,
+    )
+
+
+async def test_sync_compares_only_blocks_both_nodes_should_hold(nodes):
+    local, peer, peer_state = nodes
+    for node in (local, peer):
+        node.replication_manager.min_replicas = 2
+        node.anti_entropy_config.shared_tree_ttl = 0.0
+        for node_id in ("local", "peer", "other"):
+            address = peer_state.address if node_id == "peer" else "127.0.0.1:1"
+            node.cluster_nodes[node_id] = ring_state(node_id, address)
+        node._sync_hash_ring()
+    shared = []
+    for i in range(200):
+        data_id = f"block-{i}"
+        owners = local.hash_ring.owners(data_id, 2)
+        for node in (local, peer):
+            if node.node_id in owners:
+                await store_block(node, data_id, b"same %d" % i, version=1)
+        if set(owners) == {"local", "peer"}:
+            shared.append(data_id)
+
+    # The nodes hold different ranges, so their full trees differ
+    local_tree = local.consistency_manager.merkle_tree
+    assert local_tree.root != peer.consistency_manager.merkle_tree.root
+    local.metrics_collector = MagicMock()
+    stats = (await local.run_anti_entropy_round())[0]
+    assert stats.peer_id == "peer"
+    assert stats.round_trips == 1
+    assert stats.differing_leaves == 0
+    local.metrics_collector.record_anti_entropy_sync.assert_called_once_with(stats)
+
+    await store_block(peer, shared[0], b"newer", version=2)
+    stats = await local.sync_with_peer(peer_state)
+    assert stats.repaired == [shared[0]]
+    assert stats.differing_leaves == 1
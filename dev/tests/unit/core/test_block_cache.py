@@ -0,0 +1,234 @@
+"""Unit tests for the two-tier block cache and cached replica reads."""
+
+import asyncio
+import hashlib
+import os
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.storage.infrastructure.active_node import ActiveNode
+from src.storage.infrastructure.block_cache import BlockCache, BlockCacheConfig
+from src.storage.infrastructure.data.version_store import VersionedData
+from src.storage.infrastructure.disk_io import DiskIOExecutor
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def checksum(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+@pytest.fixture
+async def executor():
+    executor = DiskIOExecutor()
+    yield executor
+    await executor.shutdown()
+
+
+def make_cache(directory, executor, clock=None, **config):
+    return BlockCache(
+        str(directory),
+        executor,
+        BlockCacheConfig(**config),
+        clock or FakeClock(),
+    )
+
+
+async def test_lookup_requires_a_current_version(tmp_path, executor):
+    cache = make_cache(tmp_path, executor)
+    cache.put("obj", 5, checksum(b"v5"), b"v5")
+
+    assert (await cache.get("obj", 5)).content == b"v5"
+    assert (await cache.get("obj", 3)).version == 5
+    assert await cache.get("obj", 6) is None  # a newer version is known
+
+    cache.put("obj", 6, checksum(b"v6"), b"v6")
+    assert (await cache.get("obj", 6)).content == b"v6"
+    assert cache.get_stats()["memory_hits"] == 3
+
+
+async def test_evicted_blocks_spill_to_disk_and_come_back(tmp_path, executor):
+    cache = make_cache(tmp_path, executor, memory_bytes=250, disk_bytes=250)
+    for i in range(5):
+        cache.put(f"b{i}", i + 1, checksum(bytes([i]) * 100), bytes([i]) * 100)
+    await cache.flush()
+
+    stats = cache.get_stats()
+    assert stats["memory_entries"] == 2
+    assert stats["disk_entries"] == 2  # b0 fell off the disk tier too
+    assert stats["disk_bytes"] == 200
+    assert len(os.listdir(tmp_path)) == 2
+
+    assert await cache.get("b0") is None
+    block = await cache.get("b1", 2)
+    assert block.content == bytes([1]) * 100
+    assert cache.get_stats()["disk_hits"] == 1
+    assert (await cache.get("b1")).content == block.content  # promoted
+
+
+async def test_corrupt_or_expired_spills_are_misses(tmp_path, executor):
+    clock = FakeClock()
+    cache = make_cache(tmp_path, executor, clock, memory_bytes=100, ttl=10)
+    cache.put("a", 1, checksum(b"a" * 100), b"a" * 100)
+    cache.put("b", 1, checksum(b"b" * 100), b"b" * 100)
+    cache.put("c", 1, checksum(b"c" * 100), b"c" * 100)
+    await cache.flush()
+
+    path = cache._disk["a"].path
+    with open(path, "wb") as f:
+        f.write(b"x" * 100)
+    assert await cache.get("a") is None
+    assert "a" not in cache._disk
+
+    clock.now += 11
+    assert await cache.get("b") is None
+    assert await cache.get("c") is None
+    await cache.flush()
+
+
+async def test_new_cache_removes_leftover_spills(tmp_path, executor):
+    cache = make_cache(tmp_path, executor, memory_bytes=100)
+    cache.put("a", 1, "", b"a" * 100)
+    cache.put("b", 1, "", b"b" * 100)
+    await cache.flush()
+    assert len(os.listdir(tmp_path)) == 1
+
+    make_cache(tmp_path, executor)
+    assert os.listdir(tmp_path) == []
+
+
+def read_result(node, version, content=None):
+    result = {
+        "status": "success",
+        "node": node,
+        "version": version,
+        "timestamp": datetime(2024, 1, 1),
+        "checksum": f"sum{version}",
+    }
+    if content is not None:
+        result["content"] = content
+    return result
+
+
+@pytest.fixture
+async def cached_node(tmp_path):
+    node = ActiveNode("local", data_dir=str(tmp_path))
+    node.load_manager = MagicMock()
+    node.load_manager.get_node_load.return_value = 0.0
+    yield node
+    await node.disk_io.shutdown()
+
+
+def replicas(node, count, version):
+    """Record ``count`` replicas of obj at ``version`` and return them."""
+    nodes = [
+        MagicMock(node_id=f"node-{i}", network_latency=float(i)) for i in range(count)
+    ]
+    for replica in nodes:
+        node.consistency_manager._put_version(
+            replica.node_id,
+            "obj",
+            VersionedData(b"", version, datetime(2024, 1, 1), f"sum{version}"),
+        )
+    return nodes
+
+
+async def test_eventual_read_is_served_from_cache(cached_node):
+    nodes = replicas(cached_node, 3, 2)
+    read = AsyncMock(side_effect=lambda n, d: read_result(n, 2, b"data"))
+
+    with patch.object(cached_node, "read_from_node", read):
+        assert await cached_node.handle_eventual_read("obj", nodes) == b"data"
+        assert await cached_node.handle_eventual_read("obj", nodes) == b"data"
+    assert read.await_count == 1
+
+    # A newer version being known makes the cached block stale
+    nodes = replicas(cached_node, 3, 3)
+    read.side_effect = lambda n, d: read_result(n, 3, b"newer")
+    with patch.object(cached_node, "read_from_node", read):
+        assert await cached_node.handle_eventual_read("obj", nodes) == b"newer"
+    assert read.await_count == 2
+
+
+async def test_strong_read_with_cached_block_only_fetches_digests(cached_node):
+    nodes = replicas(cached_node, 3, 2)
+    cached_node.block_cache.put("obj", 2, "sum2", b"data")
+    read = AsyncMock()
+    digest = AsyncMock(side_effect=lambda n, d: read_result(n, 2))
+
+    with patch.object(cached_node, "read_from_node", read), patch.object(
+        cached_node, "read_digest_from_node", digest
+    ):
+        assert await cached_node.handle_strong_read("obj", nodes) == b"data"
+        assert await cached_node.handle_quorum_read("obj", nodes) == b"data"
+
+    read.assert_not_awaited()
+    assert digest.await_count == 6
+
+
+async def test_strong_read_never_returns_a_stale_cached_version(cached_node):
+    nodes = replicas(cached_node, 3, 2)
+    cached_node.block_cache.put("obj", 2, "sum2", b"old")
+    read = AsyncMock(side_effect=lambda n, d: read_result(n, 3, b"new"))
+    # A write this node has not heard of reached one replica
+    digest = AsyncMock(
+        side_effect=lambda n, d: read_result(n, 3 if n is nodes[2] else 2)
+    )
+
+    with patch.object(cached_node, "read_from_node", read), patch.object(
+        cached_node, "read_digest_from_node", digest
+    ), patch.object(cached_node, "repair_inconsistency", AsyncMock()):
+        assert await cached_node.handle_strong_read("obj", nodes) == b"new"
+
+    assert read.await_args.args[0] is nodes[2]
+    assert (await cached_node.block_cache.get("obj", 3)).content == b"new"
+
+
+async def test_spill_queue_is_bounded(tmp_path, executor):
+    cache = make_cache(tmp_path, executor, memory_bytes=100, max_spill_queue_bytes=250)
+    for i in range(6):
+        cache.put(f"b{i}", 1, "", bytes([i]) * 100)
+
+    # Five evictions, but only two fit in the queue before the disk catches up
+    assert cache._to_spill_bytes == 200
+    assert cache.get_stats()["spills_dropped"] == 3
+    await cache.flush()
+    assert cache._to_spill_bytes == 0
+    assert cache.get_stats()["disk_entries"] == 2
+
+
+async def test_spill_replaced_while_writing_is_not_installed(tmp_path, executor):
+    cache = make_cache(tmp_path, executor, memory_bytes=100)
+    cache.put("obj", 1, "", b"1" * 100)
+    cache.put("other", 1, "", b"o" * 100)  # evicts obj v1 to the spill queue
+    flush = cache._flush_task
+    await asyncio.sleep(0)  # the flush starts writing obj v1
+    assert cache._writing is not None and cache._writing.version == 1
+
+    cache.put("obj", 2, "", b"2" * 100)
+    await flush
+    await cache.flush()
+
+    spilled = cache._disk.get("obj")
+    assert spilled is None or spilled.version == 2
+    assert (await cache.get("obj")).content == b"2" * 100
+    cache.memory.delete("obj")
+    block = await cache.get("obj")
+    assert block is None or block.version == 2
+
+
+async def test_close_cancels_pending_spills(tmp_path, executor):
+    cache = make_cache(tmp_path, executor, memory_bytes=100)
+    for i in range(4):
+        cache.put(f"b{i}", 1, "", bytes([i]) * 100)
+    await cache.close()
+    assert cache._flush_task is None
+    assert cache._to_spill == {}
@@ -0,0 +1,155 @@
+"""Unit tests for the binary block-transfer protocol."""
+
+import hashlib
+import tempfile
+from datetime import datetime
+
+import pytest
+from aiohttp import web
+
+from src.storage.infrastructure.active_node import ActiveNode
+from src.storage.infrastructure.block_protocol import (
+    CONTENT_TYPE,
+    ROLLBACK_PATH,
+    WRITE_PATH,
+    BlockOp,
+    BlockProtocolError,
+    BlockRecord,
+    decode_frame,
+    encode_frame,
+)
+
+
+def make_record(data_id: str, content: bytes, version: int = 1) -> BlockRecord:
+    return BlockRecord(
+        data_id=data_id,
+        version=version,
+        checksum=hashlib.sha256(content).hexdigest(),
+        timestamp=datetime(2024, 5, 1, 12, 30, 15, 123456),
+        content=content,
+    )
+
+
+class TestBlockProtocol:
+    def test_round_trip_multiple_blocks(self):
+        """Several blocks survive an encode/decode round trip unchanged."""
+        records = [
+            make_record("block-a", b"\x00\x01binary\xff" * 10, version=3),
+            make_record("blöck-b", b"", version=7),
+            make_record("block-c", b"x" * 4096, version=2**40),
+        ]
+
+        op, decoded = decode_frame(encode_frame(records))
+
+        assert op == BlockOp.WRITE
+        assert decoded == records
+
+    def test_payload_is_not_hex_encoded(self):
+        """Frame overhead is a fixed header, not a multiple of the payload."""
+        content = bytes(range(256)) * 64
+        frame = encode_frame([make_record("block", content)])
+        assert len(frame) < len(content) + 128
+
+    def test_rollback_frame_without_checksum(self):
+        """Rollback records carry no content or checksum."""
+        record = BlockRecord(
+            data_id="block", version=5, checksum="", timestamp=datetime(2024, 1, 1)
+        )
+        op, decoded = decode_frame(encode_frame([record], op=BlockOp.ROLLBACK))
+        assert op == BlockOp.ROLLBACK
+        assert decoded == [record]
+
+    def test_rejects_malformed_frames(self):
+        """Corrupt, truncated or foreign frames raise BlockProtocolError."""
+        frame = encode_frame([make_record("block", b"payload")])
+
+        with pytest.raises(BlockProtocolError):
+            decode_frame(frame[:-1])
+        with pytest.raises(BlockProtocolError):
+            decode_frame(frame + b"extra")
+        with pytest.raises(BlockProtocolError):
+            decode_frame(b"JUNK" + frame[4:])
+        with pytest.raises(BlockProtocolError):
+            encode_frame([BlockRecord("block", 1, "not-hex", datetime.now())])
+
+
+@pytest.fixture
+async def node_client(aiohttp_client):
+    """Serve a node's binary block endpoints."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(node_id="test-node", data_dir=tmpdir)
+        app = web.Application()
+        app.router.add_post(WRITE_PATH, node.handle_binary_write)
+        app.router.add_post(ROLLBACK_PATH, node.handle_binary_rollback)
+        yield node, await aiohttp_client(app)
+        await node.deregister()
+
+
+async def test_binary_write_and_rollback(node_client):
+    """Blocks written in one frame are stored and can be rolled back."""
+    node, client = node_client
+    records = [
+        make_record("a", b"alpha", version=1),
+        make_record("b", b"beta", version=2),
+    ]
+
+    response = await client.post(
+        WRITE_PATH, data=encode_frame(records), headers={"Content-Type": CONTENT_TYPE}
+    )
+    assert response.status == 200
+    assert (await response.json())["blocks"] == ["a", "b"]
+    assert node.consistency_manager.get_node_version("test-node", "b").version == 2
+
+    # Rolling back a stale version leaves the newer block in place
+    rollback = encode_frame(
+        [
+            BlockRecord("a", 1, "", datetime.now()),
+            BlockRecord("b", 1, "", datetime.now()),
+        ],
+        op=BlockOp.ROLLBACK,
+    )
+    response = await client.post(ROLLBACK_PATH, data=rollback)
+    assert (await response.json())["blocks"] == ["a"]
+    assert node.consistency_manager.get_node_version("test-node", "a") is None
+    assert node.consistency_manager.get_node_version("test-node", "b") is not None
+
+
+async def test_binary_write_rejects_bad_checksum(node_client):
+    """A frame containing a corrupt block is rejected as a whole."""
+    node, client = node_client
+    bad = make_record("bad", b"payload")
+    bad.content = b"tampered"
+
+    response = await client.post(
+        WRITE_PATH, data=encode_frame([make_record("good", b"ok"), bad])
+    )
+
+    assert response.status == 422
+    assert node.consistency_manager.get_node_version("test-node", "good") is None
+
+
+@pytest.mark.parametrize(
+    "data_id", ["../escape", "/tmp/abs", ".versions/log", "vol/../../x", ".", ""]
+)
+async def test_binary_write_and_rollback_refuse_unsafe_ids(node_client, data_id):
+    """Ids that would land outside the data dir or in node state are refused."""
+    node, client = node_client
+    frame = encode_frame([make_record("good", b"ok"), make_record(data_id, b"x")])
+
+    response = await client.post(WRITE_PATH, data=frame)
+    assert response.status == 400
+    assert node.consistency_manager.get_node_version("test-node", "good") is None
+
+    rollback = encode_frame(
+        [BlockRecord(data_id, 1, "", datetime.now())], op=BlockOp.ROLLBACK
+    )
+    response = await client.post(ROLLBACK_PATH, data=rollback)
+    assert response.status == 400
+
+
+def test_block_path_allows_nested_volume_ids():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(node_id="test-node", data_dir=tmpdir)
+        assert node._block_path("vol-1/block-2") == f"{tmpdir}/vol-1/block-2"
+        with pytest.raises(ValueError):
+            node._block_path("vol-1/./block")
@@ -0,0 +1,145 @@
+"""Unit tests for gossiped cluster metrics and write placement."""
+
+import asyncio
+import tempfile
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from src.storage.infrastructure.active_node import ActiveNode
+from src.storage.infrastructure.cluster_metrics import (
+    ClusterMetricsCache,
+    ClusterMetricsConfig,
+)
+
+
+def test_cache_bounds_staleness_and_ignores_reordered_reports():
+    now = [0.0]
+    cache = ClusterMetricsCache(max_age=10.0, clock=lambda: now[0])
+
+    assert cache.update("a", {"cpu_usage": 50, "unrelated": "x"}, sent_at=2.0)
+    assert cache.get("a") == {"cpu_usage": 50.0}
+    assert not cache.update("a", {"cpu_usage": 90}, sent_at=1.0)
+    assert cache.get("a") == {"cpu_usage": 50.0}
+
+    now[0] = 10.5
+    assert cache.get("a") is None
+    assert cache.stale(["a", "b"]) == ["a", "b"]
+    assert cache.update("a", {"cpu_usage": 20}, sent_at=3.0)
+    assert cache.get("a") == {"cpu_usage": 20.0}
+
+    cache.retain(["b"])
+    assert len(cache) == 0
+
+
+async def test_gossip_probe_carries_metrics_both_ways(nodes):
+    local, peer, _ = nodes
+    await local.refresh_local_metrics()
+    await peer.refresh_local_metrics()
+
+    assert await local.probe_member(peer.membership.local)
+
+    metrics = local.cluster_metrics.get("peer")
+    assert set(metrics) == {
+        "cpu_usage",
+        "memory_usage",
+        "disk_usage",
+        "error_rate",
+        "queue_depth",
+    }
+    assert peer.cluster_metrics.get("local") is not None
+    assert local.cluster_metrics.get("local") is not None
+
+
+async def test_gossip_relays_a_sample_of_fresh_reports_with_their_age(nodes):
+    local, peer, _ = nodes
+    local.cluster_metrics_config.max_relayed = 2
+    now = [100.0]
+    local.cluster_metrics._clock = lambda: now[0]
+    for i in range(4):
+        local.cluster_metrics.update(f"node-{i}", {"cpu_usage": i}, sent_at=1.0)
+    now[0] += 11.0  # past max_age
+    local.cluster_metrics.update("fresh-a", {"cpu_usage": 1}, sent_at=1.0)
+    local.cluster_metrics.update("fresh-b", {"cpu_usage": 2}, sent_at=1.0, age=4.0)
+    local.cluster_metrics.update("fresh-c", {"cpu_usage": 3}, sent_at=1.0)
+
+    reports = local._metrics_digest()
+    assert len(reports) == 2  # nothing of our own yet, two of three relayed
+    assert {r["node_id"] for r in reports} <= {"fresh-a", "fresh-b", "fresh-c"}
+
+    local.cluster_metrics_config.max_relayed = 16
+    assert await local.probe_member(peer.membership.local)
+    assert peer.cluster_metrics.get("node-0") is None
+    assert peer.cluster_metrics.get("fresh-b") == {"cpu_usage": 2.0}
+    assert 4.0 <= peer.cluster_metrics.age("fresh-b") < 5.0
+
+
+async def test_gossip_ping_rejects_bad_metrics(nodes):
+    _, peer, _ = nodes
+    body = {
+        "from": {"node_id": "x", "address": "a", "incarnation": 1, "status": "alive"},
+        "metrics": [{"node_id": "x", "metrics": {}}],
+    }
+    request = MagicMock(json=AsyncMock(return_value=body))
+    response = await peer.handle_gossip_ping(request)
+    assert response.status == 400
+
+
+def make_state(node_id):
+    return MagicMock(
+        node_id=node_id,
+        status="active",
+        last_heartbeat=datetime.now(),
+        available_storage=10**9,
+        total_storage=10**10,
+        network_latency=1.0,
+        write_queue=[],
+        region=None,
+    )
+
+
+async def test_select_write_targets_reads_cached_metrics_only():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(node_id="local", data_dir=tmpdir)
+        node.region = None
+        node.get_node_metrics = AsyncMock()
+        states = [make_state(f"node-{i}") for i in range(4)]
+        node.get_active_nodes = MagicMock(return_value=states)
+        for i, state in enumerate(states[:3]):
+            node.cluster_metrics.update(
+                state.node_id, {"cpu_usage": 20 * i, "memory_usage": 10}, sent_at=1.0
+            )
+
+        targets = await node.select_write_targets(1024, 2)
+
+        # node-3 never reported; the rest are ordered by load
+        node.get_node_metrics.assert_not_called()
+        assert [t.node_id for t in targets] == ["node-0", "node-1"]
+        await node.deregister()
+
+
+async def test_local_metrics_exports_disk_io_metrics():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        collector = MagicMock()
+        node = ActiveNode(node_id="local", data_dir=tmpdir, metrics_collector=collector)
+
+        await node.local_metrics()
+
+        exported = collector.update_disk_io_metrics.call_args.args[0]
+        assert set(exported) == {"pools", "event_loop_lag"}
+        await node.deregister()
+
+
+async def test_started_node_refreshes_its_own_report(tmp_path, unused_tcp_port):
+    node = ActiveNode(
+        node_id="local",
+        data_dir=str(tmp_path),
+        cluster_metrics_config=ClusterMetricsConfig(interval=0.01),
+    )
+    await node.start("127.0.0.1", unused_tcp_port)
+    for _ in range(100):
+        if node.cluster_metrics.get("local") is not None:
+            break
+        await asyncio.sleep(0.01)
+
+    assert node.cluster_metrics.get("local") is not None
+    await node.deregister()
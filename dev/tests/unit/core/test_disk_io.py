@@ -0,0 +1,105 @@
+"""Unit tests for the disk I/O executor."""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+from src.storage.infrastructure import disk_io
+from src.storage.infrastructure.disk_io import (
+    DiskIOConfig,
+    DiskIOExecutor,
+    EventLoopLagMonitor,
+    IOPool,
+)
+
+
+@pytest.fixture
+async def executor():
+    executor = DiskIOExecutor(
+        DiskIOConfig(
+            read_workers=2, write_workers=1, fsync_workers=1, max_queue_depth=2
+        )
+    )
+    yield executor
+    await executor.shutdown()
+
+
+async def test_file_round_trip(executor):
+    """Reads, writes and fsyncs run on their own pools."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "block")
+        await executor.write(disk_io.write_file, path, b"payload")
+        await executor.fsync(path)
+        await executor.fsync(tmpdir)
+
+        assert await executor.read(disk_io.read_file, path) == b"payload"
+        assert await executor.read(disk_io.list_files, tmpdir) == ["block"]
+        assert await executor.write(disk_io.remove_if_exists, path)
+        assert not await executor.write(disk_io.remove_if_exists, path)
+
+        metrics = executor.get_metrics()["pools"]
+        assert metrics["write"].completed == 3
+        assert metrics["read"].completed == 2
+        assert metrics["fsync"].completed == 2
+
+
+async def test_admission_limit_applies_backpressure(executor):
+    """Callers beyond workers + queue depth wait before submitting."""
+    release = threading.Event()
+    started = []
+
+    def slow_write(i):
+        started.append(i)
+        release.wait(5)
+        return i
+
+    tasks = [asyncio.ensure_future(executor.write(slow_write, i)) for i in range(5)]
+    await asyncio.sleep(0.05)
+
+    metrics = executor.get_metrics()["pools"]["write"]
+    assert metrics.in_flight == 1
+    assert metrics.queued == 2  # one worker + two queue slots admitted
+    assert metrics.blocked == 2
+
+    # A busy write pool does not hold up reads
+    assert await executor.read(lambda: "read") == "read"
+
+    release.set()
+    assert await asyncio.gather(*tasks) == list(range(5))
+    metrics = executor.get_metrics()["pools"]["write"]
+    assert (metrics.in_flight, metrics.queued, metrics.blocked) == (0, 0, 0)
+    assert metrics.max_queue_wait_ms > 0
+
+
+async def test_failures_are_counted_and_raised(executor):
+    with pytest.raises(FileNotFoundError):
+        await executor.read(disk_io.read_file, "/nonexistent/block")
+    assert executor.get_metrics()["pools"]["read"].failed == 1
+
+
+async def test_shutdown_rejects_new_work():
+    executor = DiskIOExecutor()
+    await executor.read(lambda: None)
+    await executor.shutdown()
+
+    assert not executor.lag_monitor.running
+    with pytest.raises(RuntimeError):
+        await executor.run(IOPool.READ, lambda: None)
+
+
+async def test_lag_monitor_detects_blocking():
+    """Blocking the event loop shows up as lag."""
+    monitor = EventLoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.03)
+    time.sleep(0.1)
+    await asyncio.sleep(0.03)
+    await monitor.stop()
+
+    metrics = monitor.get_metrics()
+    assert metrics["samples"] > 0
+    assert metrics["max_ms"] >= 50
@@ -0,0 +1,178 @@
+"""Unit tests for group-commit durable writes."""
+
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from src.storage.infrastructure import durability
+from src.storage.infrastructure.disk_io import DiskIOExecutor
+from src.storage.infrastructure.durability import (
+    DurabilityLevel,
+    GroupCommitConfig,
+    GroupCommitWriter,
+)
+
+
+@pytest.fixture
+async def disk_io():
+    executor = DiskIOExecutor()
+    yield executor
+    await executor.shutdown()
+
+
+@pytest.fixture
+def sync_calls(monkeypatch):
+    """Record the final paths published by every commit batch."""
+    calls = []
+    publish = durability._publish
+
+    def recording_publish(files):
+        calls.append([path or sync_path for sync_path, path in files])
+        return publish(files)
+
+    monkeypatch.setattr(durability, "_publish", recording_publish)
+    return calls
+
+
+async def write_blocks(writer, directory, count, size=4096):
+    paths = [os.path.join(directory, f"block-{i}") for i in range(count)]
+    await asyncio.gather(*[writer.write(path, b"x" * size) for path in paths])
+    return paths
+
+
+async def test_batched_writes_share_one_sync(disk_io, sync_calls):
+    """Concurrent writes inside the window are committed together."""
+    writer = GroupCommitWriter(
+        disk_io, DurabilityLevel.BATCHED, GroupCommitConfig(window=0.05)
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = await write_blocks(writer, tmpdir, 20)
+
+        assert len(sync_calls) == 1
+        assert sorted(sync_calls[0]) == sorted(paths)
+        assert all(os.path.getsize(path) == 4096 for path in paths)
+        assert writer.get_metrics()["max_batch"] == 20
+
+
+async def test_byte_threshold_flushes_early(disk_io, sync_calls):
+    """A batch is committed as soon as it reaches the byte threshold."""
+    writer = GroupCommitWriter(
+        disk_io,
+        DurabilityLevel.BATCHED,
+        GroupCommitConfig(window=10.0, max_batch_bytes=8192),
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        await asyncio.wait_for(write_blocks(writer, tmpdir, 4), timeout=2.0)
+
+    assert [len(batch) for batch in sync_calls] == [2, 2]
+
+
+async def test_per_write_and_none_levels(disk_io, sync_calls):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        await write_blocks(GroupCommitWriter(disk_io, DurabilityLevel.NONE), tmpdir, 3)
+        assert sync_calls == []
+
+        await write_blocks(
+            GroupCommitWriter(disk_io, DurabilityLevel.PER_WRITE), tmpdir, 3
+        )
+        assert len(sync_calls) == 3
+
+
+async def test_sync_failure_fails_only_that_write(disk_io, monkeypatch):
+    datasync_file = durability.datasync_file
+
+    def failing_sync(path):
+        if os.path.basename(path).startswith("a."):
+            raise OSError("disk gone")
+        return datasync_file(path)
+
+    monkeypatch.setattr(durability, "datasync_file", failing_sync)
+    writer = GroupCommitWriter(disk_io, DurabilityLevel.BATCHED)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = await asyncio.gather(
+            writer.write(os.path.join(tmpdir, "a"), b"a"),
+            writer.write(os.path.join(tmpdir, "b"), b"b"),
+            return_exceptions=True,
+        )
+        assert os.listdir(tmpdir) == ["b"]  # no temporary file left behind
+
+    assert isinstance(results[0], OSError)
+    assert results[1] is None
+
+
+async def test_rename_failure_fails_only_that_write(disk_io, monkeypatch):
+    replace = os.replace
+
+    def failing_replace(src, dst):
+        if os.path.basename(dst) == "a":
+            raise OSError("disk gone")
+        return replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", failing_replace)
+    writer = GroupCommitWriter(disk_io, DurabilityLevel.BATCHED)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = await asyncio.gather(
+            writer.write(os.path.join(tmpdir, "a"), b"a"),
+            writer.write(os.path.join(tmpdir, "b"), b"b"),
+            return_exceptions=True,
+        )
+        assert os.listdir(tmpdir) == ["b"]
+
+    assert isinstance(results[0], OSError)
+    assert results[1] is None
+    assert writer.get_metrics()["synced_writes"] == 1
+
+
+async def test_directory_sync_failure_fails_whole_batch(disk_io, monkeypatch):
+    def failing_publish(files):
+        raise OSError("disk gone")
+
+    monkeypatch.setattr(durability, "_publish", failing_publish)
+    writer = GroupCommitWriter(disk_io, DurabilityLevel.BATCHED)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = await asyncio.gather(
+            writer.write(os.path.join(tmpdir, "a"), b"a"),
+            writer.write(os.path.join(tmpdir, "b"), b"b"),
+            return_exceptions=True,
+        )
+        assert os.listdir(tmpdir) == []
+
+    assert all(isinstance(result, OSError) for result in results)
+
+
+async def test_overwrite_replaces_old_version_only_once_synced(disk_io):
+    """Until its commit the new version sits in a temporary file."""
+    writer = GroupCommitWriter(
+        disk_io, DurabilityLevel.BATCHED, GroupCommitConfig(window=10.0)
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "block")
+        with open(path, "wb") as f:
+            f.write(b"old")
+
+        pending = asyncio.ensure_future(writer.write(path, b"new"))
+        await asyncio.sleep(0.05)
+        with open(path, "rb") as f:
+            assert f.read() == b"old"
+        assert len(os.listdir(tmpdir)) == 2
+
+        await writer.close()
+        await pending
+        with open(path, "rb") as f:
+            assert f.read() == b"new"
+        assert os.listdir(tmpdir) == ["block"]
+
+
+async def test_close_commits_pending_writes(disk_io, sync_calls):
+    writer = GroupCommitWriter(
+        disk_io, DurabilityLevel.BATCHED, GroupCommitConfig(window=10.0)
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pending = asyncio.ensure_future(write_blocks(writer, tmpdir, 2))
+        await asyncio.sleep(0.05)
+        await writer.close()
+        await asyncio.wait_for(pending, timeout=1.0)
+
+    assert len(sync_calls) == 1
@@ -0,0 +1,184 @@
+"""Unit tests for gossip membership and failure detection."""
+
+import tempfile
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiohttp import web
+
+from src.storage.infrastructure import gossip
+from src.storage.infrastructure.active_node import ActiveNode
+from src.storage.infrastructure.gossip import (
+    GossipConfig,
+    Member,
+    Membership,
+    MemberStatus,
+)
+
+ALIVE, SUSPECT, DEAD = MemberStatus.ALIVE, MemberStatus.SUSPECT, MemberStatus.DEAD
+
+
+def test_updates_follow_incarnation_precedence():
+    membership = Membership("local", "local:1")
+    assert membership.apply(Member("a", "a:1", 5))
+    assert not membership.apply(Member("a", "a:1", 5))
+
+    assert membership.apply(Member("a", "a:1", 5, SUSPECT))
+    assert not membership.apply(Member("a", "a:1", 5, ALIVE))  # needs a refutation
+    assert membership.apply(Member("a", "a:1", 6, ALIVE))
+    assert not membership.apply(Member("a", "a:1", 5, DEAD))  # older incarnation
+    assert membership.apply(Member("a", "a:1", 6, DEAD))
+    assert not membership.apply(Member("a", "a:1", 6, SUSPECT))
+    assert membership.apply(Member("a", "a:1", 7, ALIVE))  # came back
+
+    assert not membership.apply(Member("b", "b:1", 1, DEAD))
+    assert "b" not in membership
+
+
+def test_suspicion_about_self_is_refuted():
+    membership = Membership("local", "local:1")
+    incarnation = membership.local.incarnation
+
+    membership.apply(Member("local", "local:1", incarnation, SUSPECT))
+
+    assert membership.local.incarnation == incarnation + 1
+    refutation = [u for u in membership.piggyback() if u["node_id"] == "local"]
+    assert refutation == [membership.local.to_wire()]
+
+
+def test_suspect_becomes_dead_only_after_timeout():
+    now = [0.0]
+    membership = Membership("local", "local:1", clock=lambda: now[0])
+    for node_id in ("a", "b"):
+        membership.apply(Member(node_id, f"{node_id}:1", 1))
+
+    assert membership.suspect("a") and membership.suspect("b")
+    membership.apply(Member("b", "b:1", 2))  # b refutes in time
+    now[0] = membership.suspicion_timeout - 0.1
+    assert membership.expire() == []
+
+    now[0] += 0.2
+    assert [m.node_id for m in membership.expire()] == ["a"]
+    assert [m.node_id for m in membership.live_members()] == ["b"]
+
+    now[0] += membership.config.dead_retention + 0.1
+    membership.expire()
+    assert "a" not in membership
+
+
+def test_updates_stop_after_retransmit_limit():
+    membership = Membership("local", "local:1", GossipConfig(retransmit_mult=2))
+    membership.apply(Member("a", "a:1", 1))
+
+    sends = 0
+    while any(u["node_id"] == "a" for u in membership.piggyback()):
+        sends += 1
+    assert sends == membership._retransmit_limit()
+
+
+def test_every_member_is_probed_each_cycle():
+    membership = Membership("local", "local:1")
+    for i in range(10):
+        membership.apply(Member(f"n{i}", f"n{i}:1", 1))
+
+    first = [membership.next_probe_target().node_id for _ in range(10)]
+    second = [membership.next_probe_target().node_id for _ in range(10)]
+    assert sorted(first) == sorted(second) == sorted(membership.members)
+    assert Membership("x", "x:1").next_probe_target() is None
+
+
+def ignore_pings_from_a(node):
+    """Ping handler for ``node`` that turns away direct probes from a."""
+
+    async def handle(request):
+        body = await request.json()
+        if body["from"]["node_id"] == "a":
+            return web.Response(status=503)
+        return await node.handle_gossip_ping(
+            MagicMock(json=AsyncMock(return_value=body))
+        )
+
+    return handle
+
+
+@pytest.fixture
+async def cluster(aiohttp_server):
+    """Three nodes serving gossip; b ignores direct probes from a."""
+    dirs = [tempfile.TemporaryDirectory() for _ in range(3)]
+    config = GossipConfig(ping_timeout=0.2, suspicion_mult=0.0)
+    nodes = {}
+    for name, tmp in zip("abc", dirs):
+        node = ActiveNode(node_id=name, data_dir=tmp.name, gossip_config=config)
+        app = web.Application()
+        app.router.add_post(
+            gossip.PING_PATH,
+            ignore_pings_from_a(node) if name == "b" else node.handle_gossip_ping,
+        )
+        app.router.add_post(gossip.PING_REQ_PATH, node.handle_gossip_ping_req)
+        server = await aiohttp_server(app)
+        node.membership.local.address = f"{server.host}:{server.port}"
+        nodes[name] = node
+    yield nodes
+    for node in nodes.values():
+        await node.deregister()
+    for tmp in dirs:
+        tmp.cleanup()
+
+
+async def test_join_learns_full_membership(cluster):
+    a, b, c = cluster["a"], cluster["b"], cluster["c"]
+    assert await b.join_cluster([a.membership.local.address]) == 1
+
+    assert await c.join_cluster([a.membership.local.address]) == 1
+
+    assert set(c.membership.members) == {"a", "b"}
+    assert {node.node_id for node in c.get_active_nodes()} == {"a", "b"}
+    assert c.cluster_nodes["b"].address == b.membership.local.address
+
+
+async def test_indirect_probe_prevents_false_suspicion(cluster):
+    a, b, c = cluster["a"], cluster["b"], cluster["c"]
+    await b.join_cluster([a.membership.local.address])
+    await c.join_cluster([a.membership.local.address])
+
+    # a cannot reach b directly, but c can on its behalf
+    assert await a.probe_member(a.membership.members["b"])
+    assert a.membership.members["b"].status == ALIVE
+
+
+async def test_unreachable_node_is_suspected_then_failed(cluster):
+    a, c = cluster["a"], cluster["c"]
+    await c.join_cluster([a.membership.local.address])
+    a.membership.apply(Member("gone", "127.0.0.1:1", 1))
+    a._merge_membership()
+    a.get_node_metrics = AsyncMock(return_value=None)
+
+    assert not await a.probe_member(a.membership.members["gone"])
+    assert a.membership.members["gone"].status == SUSPECT
+    report = await a.check_node_health()
+    assert report.failed == []  # suspicion is not failure
+    assert "gone" in report.unreachable
+
+    await a.run_gossip_round()
+    assert a.membership.members["gone"].status == DEAD
+    assert "gone" not in {node.node_id for node in a.get_active_nodes()}
+    report = await a.check_node_health()
+    assert report.failed == [a.cluster_nodes["gone"]]
+
+
+async def test_started_node_serves_peers_until_deregistered(
+    cluster, tmp_path, unused_tcp_port
+):
+    port = unused_tcp_port
+    node = ActiveNode(node_id="d", data_dir=str(tmp_path), address=f"127.0.0.1:{port}")
+    await node.start("127.0.0.1", port, seeds=[cluster["a"].membership.local.address])
+    tasks = list(node._background_tasks)
+
+    assert "a" in node.membership.members
+    assert await cluster["c"].join_cluster([f"127.0.0.1:{port}"]) == 1
+    assert "d" in cluster["c"].membership.members
+    assert not any(task.done() for task in tasks)
+
+    await node.deregister()
+    assert all(task.cancelled() for task in tasks)
+    assert await cluster["c"].join_cluster([f"127.0.0.1:{port}"]) == 0
@@ -0,0 +1,197 @@
+"""Unit tests for consistent-hash replica placement."""
+
+import tempfile
+from collections import Counter
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from src.storage.infrastructure.active_node import ActiveNode
+from src.storage.infrastructure.data.replication_manager import ReplicationManager
+from src.storage.infrastructure.gossip import Member
+from src.storage.infrastructure.hash_ring import (
+    CAPACITY_UNIT,
+    HashRing,
+    RingMember,
+    capacity_unit,
+    capacity_weight,
+)
+
+KEYS = [f"block-{i}" for i in range(5000)]
+
+
+def make_ring(count, **kwargs):
+    ring = HashRing(**kwargs)
+    for i in range(count):
+        ring.add(RingMember(f"node-{i}"))
+    return ring
+
+
+def test_preference_list_is_distinct_and_stable():
+    ring = make_ring(5)
+    owners = ring.owners("block", 3)
+
+    assert len(set(owners)) == 3
+    assert ring.owners("block", 3) == owners
+    assert ring.owners("block", 10) == ring.owners("block", 5)  # capped at size
+    assert HashRing().owners("block", 3) == []
+
+
+def test_adding_a_node_moves_about_one_nth_of_keys():
+    ring = make_ring(10)
+    before = {key: ring.owners(key, 1)[0] for key in KEYS}
+
+    ring.add(RingMember("node-10"))
+    after = {key: ring.owners(key, 1)[0] for key in KEYS}
+
+    moved = [key for key in KEYS if before[key] != after[key]]
+    assert all(after[key] == "node-10" for key in moved)
+    assert len(moved) / len(KEYS) < 2 / 11
+
+    ring.remove("node-10")
+    assert {key: ring.owners(key, 1)[0] for key in KEYS} == before
+
+
+def test_ownership_follows_weight():
+    ring = HashRing()
+    ring.add(RingMember("small", weight=capacity_weight(CAPACITY_UNIT)))
+    ring.add(RingMember("large", weight=capacity_weight(3 * CAPACITY_UNIT)))
+
+    owned = Counter(ring.owners(key, 1)[0] for key in KEYS)
+    assert 2 < owned["large"] / owned["small"] < 4.5
+    assert capacity_weight(None) == 1.0
+
+
+def test_capacity_unit_follows_typical_capacity():
+    gib = 1 << 30
+    unit = capacity_unit([100 * gib, 120 * gib, None, 4000 * gib])
+    assert unit == 128 * gib
+    assert 100 <= round(128 * capacity_weight(120 * gib, unit)) <= 128
+
+    # Small shifts in the median keep the unit, so no member is re-weighted
+    assert capacity_unit([180 * gib, 200 * gib, 220 * gib], unit) == unit
+    assert capacity_unit([400 * gib, 500 * gib, 600 * gib], unit) == 512 * gib
+    assert capacity_unit([None], unit) == unit
+    assert capacity_unit([]) == CAPACITY_UNIT
+
+
+def test_replicas_spread_across_zones():
+    ring = HashRing()
+    for zone in ("a", "b", "c"):
+        for i in range(4):
+            ring.add(RingMember(f"{zone}-{i}", zone=zone))
+
+    for key in KEYS[:500]:
+        members = ring.preference_list(key, 3)
+        assert {member.zone for member in members} == {"a", "b", "c"}
+
+    # With fewer zones than replicas, zones are reused rather than coming up short
+    assert len(ring.preference_list("block", 5)) == 5
+
+
+def test_exclude_and_accept_skip_members():
+    ring = make_ring(6)
+    owners = ring.owners("block", 2)
+
+    members = ring.preference_list("block", 2, exclude={owners[0]})
+    assert owners[0] not in [member.node_id for member in members]
+    assert members[0].node_id == owners[1]
+
+    members = ring.preference_list(
+        "block", 3, accept=lambda member: member.node_id != owners[1]
+    )
+    assert owners[1] not in [member.node_id for member in members]
+
+
+def test_sync_only_moves_changed_members():
+    ring = make_ring(3)
+    points = dict(zip(ring._points, ring._owners))
+
+    added, removed = ring.sync(
+        [RingMember("node-0"), RingMember("node-1", node="state"), RingMember("node-3")]
+    )
+
+    assert (added, removed) == (["node-3"], ["node-2"])
+    assert ring.members["node-1"].node == "state"
+    kept = {p: o for p, o in zip(ring._points, ring._owners) if o != "node-3"}
+    assert kept == {p: o for p, o in points.items() if o != "node-2"}
+    assert ring._points == sorted(ring._points)
+
+    assert ring.sync([RingMember("node-0"), RingMember("node-1", weight=2.0)]) == (
+        ["node-1"],
+        ["node-3"],
+    )
+    assert Counter(ring._owners)["node-1"] == 2 * ring.vnodes
+
+
+def make_state(node_id, available_storage=10**9):
+    return MagicMock(
+        node_id=node_id,
+        status="active",
+        last_heartbeat=datetime.now(),
+        available_storage=available_storage,
+        total_storage=CAPACITY_UNIT,
+        zone=None,
+        region=None,
+    )
+
+
+def test_replication_manager_selects_ring_nodes():
+    ring = make_ring(4)
+    manager = ReplicationManager(ring=ring)
+    owners = ring.owners("block", 3)
+
+    assert manager._select_replica_nodes(2, {owners[0]}, "block") == owners[1:]
+    assert manager._select_replica_nodes(2, set()) == []
+
+
+async def test_select_write_targets_uses_ring_without_metrics():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(node_id="local", data_dir=tmpdir)
+        node.get_node_metrics = AsyncMock()
+        for i in range(5):
+            state = make_state(f"node-{i}", available_storage=0 if i == 0 else 10**9)
+            node.cluster_nodes[state.node_id] = state
+        node._sync_hash_ring()
+
+        targets = await node.select_write_targets(1024, 3, data_id="block")
+
+        node.get_node_metrics.assert_not_called()
+        owners = node.hash_ring.preference_list("block", 3, exclude={"node-0"})
+        assert targets == [member.node for member in owners]
+
+        # A failed node leaves the ring
+        del node.cluster_nodes["node-1"]
+        node._sync_hash_ring()
+        assert "node-1" not in node.hash_ring
+        assert len(node.hash_ring) == 4
+        await node.deregister()
+
+
+async def test_gossiped_zones_spread_replicas():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(node_id="local", data_dir=tmpdir, zone="a", region="r")
+        meta = await node._local_meta()
+        assert (meta["zone"], meta["region"]) == ("a", "r")
+
+        for i in range(6):
+            zone = "abc"[i % 3]
+            node.membership.apply(
+                Member(
+                    f"node-{i}",
+                    f"127.0.0.1:{i + 1}",
+                    1,
+                    meta={"total_storage": 100 << 30, "zone": zone, "region": "r"},
+                )
+            )
+        node._merge_membership()
+        node._sync_hash_ring()
+
+        assert node.cluster_nodes["node-1"].zone == "b"
+        assert node.hash_ring.members["node-2"].zone == "c"
+        # A typical node gets about the base number of points
+        assert node._capacity_unit == 128 << 30
+        assert Counter(node.hash_ring._owners)["node-0"] == 100
+        for key in KEYS[:200]:
+            members = node.hash_ring.preference_list(key, 3)
+            assert {member.zone for member in members} == {"a", "b", "c"}
+        await node.deregister()
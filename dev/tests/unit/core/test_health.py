@@ -0,0 +1,105 @@
+"""Unit tests for bounded, concurrent health checking."""
+
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.models.models import NodeState
+from src.storage.infrastructure.active_node import ActiveNode
+from src.storage.infrastructure.health import HealthCheckConfig
+
+
+def _state(node_id: str, heartbeat_age: float = 0.0) -> NodeState:
+    return NodeState(
+        node_id=node_id,
+        status="active",
+        last_heartbeat=datetime.now() - timedelta(seconds=heartbeat_age),
+        load=0.0,
+        available_storage=0,
+        network_latency=0.0,
+        volumes=[],
+        address=f"{node_id}:1",
+    )
+
+
+@pytest.fixture
+async def node():
+    with tempfile.TemporaryDirectory() as data_dir:
+        node = ActiveNode(
+            node_id="local",
+            data_dir=data_dir,
+            health_check_config=HealthCheckConfig(
+                max_probes=32, concurrency=4, cycle_deadline=0.3
+            ),
+        )
+        node.handle_node_failure = AsyncMock()
+        node.handle_node_degradation = AsyncMock()
+        node.rebalance_cluster = AsyncMock()
+        yield node
+        await node.deregister()
+
+
+async def test_cycle_is_bounded_by_deadline(node):
+    in_flight, peak = [0], [0]
+
+    async def metrics(state):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        try:
+            if state.node_id.startswith("slow"):
+                await asyncio.sleep(10)
+            await asyncio.sleep(0.01)
+            return {"cpu_usage": 95 if state.node_id == "busy" else 10}
+        finally:
+            in_flight[0] -= 1
+
+    node.get_node_metrics = metrics
+    for node_id in ["busy", "ok"] + [f"slow{i}" for i in range(20)]:
+        node.cluster_nodes[node_id] = _state(node_id)
+
+    report = await node.check_node_health()
+
+    assert report.duration < 1.0
+    assert peak[0] <= 4
+    assert [state.node_id for state, _ in report.degraded] == ["busy"]
+    assert len(report.unreachable) == 20
+    node.handle_node_degradation.assert_not_called()  # left to the worker
+
+
+async def test_worker_handles_each_node_once(node):
+    node.get_node_metrics = AsyncMock(return_value=None)
+    node.cluster_nodes["gone"] = _state("gone", heartbeat_age=60)
+
+    first = await node.check_node_health()
+    assert [state.node_id for state in first.failed] == ["gone"]
+    second = await node.check_node_health()
+    assert second.failed == []  # already queued
+
+    worker = asyncio.create_task(node.run_health_worker())
+    await node.health_reports.join()
+    worker.cancel()
+
+    node.handle_node_failure.assert_awaited_once_with(first.failed[0])
+    node.rebalance_cluster.assert_awaited_once_with(first.failed, [])
+    assert (await node.check_node_health()).failed == first.failed
+
+
+async def test_gossiped_metrics_replace_probes(node):
+    node.get_node_metrics = AsyncMock(return_value={"cpu_usage": 10})
+    node.health_check_config.max_probes = 3
+    for node_id in ["busy", "ok"] + [f"silent{i}" for i in range(5)]:
+        node.cluster_nodes[node_id] = _state(node_id)
+    node.cluster_metrics.update("busy", {"cpu_usage": 95}, sent_at=1.0)
+    node.cluster_metrics.update("ok", {"cpu_usage": 10}, sent_at=1.0)
+
+    report = await node.check_node_health()
+
+    assert [state.node_id for state, _ in report.degraded] == ["busy"]
+    # Only nodes without a report are probed, at most max_probes of them
+    probed = {call.args[0].node_id for call in node.get_node_metrics.await_args_list}
+    assert len(probed) == report.probed == 3
+    assert all(node_id.startswith("silent") for node_id in probed)
+    assert report.unchecked == 2
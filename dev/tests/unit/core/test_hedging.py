@@ -0,0 +1,136 @@
+"""Unit tests for hedged replica requests."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.storage.infrastructure.hedging import (
+    HedgingConfig,
+    LatencyHistogram,
+    RequestHedger,
+)
+
+
+def make_request(delays, calls, failing=()):
+    async def request(peer):
+        calls.append(peer)
+        await asyncio.sleep(delays[peer])
+        if peer in failing:
+            raise ConnectionError(peer)
+        return peer
+
+    return request
+
+
+class TestLatencyHistogram:
+    def test_percentiles_track_window(self):
+        """Percentiles reflect only the samples inside the window."""
+        histogram = LatencyHistogram(window_size=100)
+        for _ in range(95):
+            histogram.record(0.001)
+        for _ in range(5):
+            histogram.record(0.5)
+
+        assert histogram.percentile(0.5) == pytest.approx(0.001, rel=0.15)
+        assert histogram.percentile(0.99) == pytest.approx(0.5, rel=0.15)
+
+        # Slow samples age out of the window
+        for _ in range(100):
+            histogram.record(0.001)
+        assert histogram.count == 100
+        assert histogram.percentile(0.99) == pytest.approx(0.001, rel=0.15)
+
+
+class TestRequestHedger:
+    async def test_hedge_beats_slow_primary(self):
+        """A backup request wins when the primary hangs."""
+        hedger = RequestHedger(HedgingConfig(default_delay=0.02, max_extra_load=1.0))
+        calls = []
+        start = time.monotonic()
+
+        result = await hedger.run(
+            ["slow", "fast"], make_request({"slow": 5.0, "fast": 0.01}, calls)
+        )
+
+        assert result == "fast"
+        assert calls == ["slow", "fast"]
+        assert time.monotonic() - start < 1.0
+        assert hedger.hedges_sent == 1
+        assert hedger.hedges_won == 1
+
+    async def test_no_hedge_when_primary_is_fast(self):
+        """Fast primaries never trigger a backup request."""
+        hedger = RequestHedger(HedgingConfig(default_delay=0.1, max_extra_load=1.0))
+        calls = []
+
+        result = await hedger.run(
+            ["a", "b"], make_request({"a": 0.01, "b": 0.01}, calls)
+        )
+
+        assert result == "a"
+        assert calls == ["a"]
+        assert hedger.hedges_sent == 0
+
+    async def test_budget_limits_extra_load(self):
+        """Hedges are capped by the extra-load budget."""
+        hedger = RequestHedger(HedgingConfig(default_delay=0.005, max_extra_load=0.25))
+        delays = {"slow": 0.03, "fast": 0.0}
+
+        for _ in range(8):
+            await hedger.run(["slow", "fast"], make_request(delays, []))
+
+        assert hedger.hedges_sent == 2
+
+    async def test_failover_on_error(self):
+        """A replica that fails outright is skipped without waiting."""
+        hedger = RequestHedger(HedgingConfig(enabled=False))
+        calls = []
+
+        result = await hedger.run(
+            ["down", "up"],
+            make_request({"down": 0.0, "up": 0.0}, calls, failing={"down"}),
+        )
+
+        assert result == "up"
+        assert calls == ["down", "up"]
+
+    async def test_delay_follows_peer_p95(self):
+        """The hedge delay adapts to each peer's observed latency."""
+        hedger = RequestHedger(HedgingConfig(min_samples=10, default_delay=0.05))
+        assert hedger.hedge_delay("peer") == 0.05
+
+        for _ in range(50):
+            hedger.record("peer", 0.2)
+
+        assert hedger.hedge_delay("peer") == pytest.approx(0.2, rel=0.15)
+        assert hedger.get_metrics()["peers"]["peer"]["samples"] == 50
+
+    async def test_losers_are_censored_and_failures_not_recorded(self):
+        """Cancelled losers count as slow; failures are not latency samples."""
+        hedger = RequestHedger(HedgingConfig(default_delay=0.02, max_extra_load=1.0))
+        await hedger.run(
+            ["slow", "fast"], make_request({"slow": 5.0, "fast": 0.01}, [])
+        )
+        await hedger.run(
+            ["down", "up"],
+            make_request({"down": 0.0, "up": 0.0}, [], failing={"down"}),
+        )
+
+        peers = hedger.get_metrics()["peers"]
+        assert peers["slow"]["samples"] == 1
+        assert peers["slow"]["p50"] >= 0.02  # at least the hedge delay
+        assert peers["fast"]["samples"] == 1
+        assert "down" not in peers
+
+    async def test_digest_latencies_are_kept_apart(self):
+        """Digest requests do not lower the delay used for full reads."""
+        hedger = RequestHedger(HedgingConfig(min_samples=10, default_delay=0.05))
+        for _ in range(50):
+            hedger.record("peer", 0.01, kind="digest")
+
+        assert hedger.hedge_delay("peer") == 0.05
+        assert hedger.hedge_delay("peer", kind="digest") == pytest.approx(
+            0.01, rel=0.15
+        )
+        assert hedger.get_metrics()["digest_peers"]["peer"]["samples"] == 50
@@ -0,0 +1,281 @@
+"""Unit tests for hinted handoff of writes to unreachable replicas."""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.storage.infrastructure.active_node import ActiveNode, ConsistencyLevel
+from src.storage.infrastructure.block_protocol import BlockRecord, encode_frame
+from src.storage.infrastructure.gossip import Member, MemberStatus
+from src.storage.infrastructure.hinted_handoff import HintedHandoffConfig, HintLog
+from src.storage.infrastructure.rate_limit import TokenBucket
+
+
+def make_record(data_id, content, version=1):
+    return BlockRecord(
+        data_id=data_id,
+        version=version,
+        checksum=hashlib.sha256(content).hexdigest(),
+        timestamp=datetime(2024, 5, 1, 12, 0),
+        content=content,
+    )
+
+
+def test_hint_log_survives_restart_and_drops_delivered_segments():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        log = HintLog(tmpdir, segment_bytes=150)
+        for i in range(6):
+            log.append(make_record(f"block-{i}", b"x" * 100))
+        assert log.pending_hints == 6
+        assert len(os.listdir(tmpdir)) == 6  # one hint fills a segment
+        log.close()
+
+        # A torn append is cut off on restart
+        last = sorted(os.listdir(tmpdir))[-1]
+        with open(os.path.join(tmpdir, last), "ab") as f:
+            f.write(b"\x00\x00\x01")
+        log = HintLog(tmpdir, segment_bytes=150)
+        assert log.pending_hints == 6
+
+        batch = log.read_batch(max_hints=4, max_bytes=1 << 20)
+        assert [r.data_id for r in batch.records] == [f"block-{i}" for i in range(4)]
+        assert log.read_batch(4, 1 << 20).records == batch.records  # not consumed yet
+
+        log.ack(batch)
+        assert log.pending_hints == 2
+        assert len(os.listdir(tmpdir)) == 2
+        rest = log.read_batch(10, 1 << 20)
+        assert [r.data_id for r in rest.records] == ["block-4", "block-5"]
+
+        log.ack(rest)
+        assert log.pending_bytes == 0
+        assert os.listdir(tmpdir) == []
+        log.append(make_record("later", b"y"))
+        assert [r.data_id for r in log.read_batch(10, 1 << 20).records] == ["later"]
+        log.close()
+
+
+def test_token_bucket_paces_to_rate():
+    now = [0.0]
+    bucket = TokenBucket(rate=100, burst=50, clock=lambda: now[0])
+
+    assert bucket.delay_for(50) == 0
+    assert bucket.delay_for(100) == pytest.approx(1.0)
+    now[0] += 1.0
+    assert bucket.delay_for(10) == pytest.approx(0.1)
+    assert TokenBucket(rate=None).delay_for(10**9) == 0
+
+
+@pytest.fixture
+def local_node_config():
+    """The local node of ``nodes`` replays hints two at a time."""
+    return {"hinted_handoff_config": HintedHandoffConfig(replay_batch_hints=2)}
+
+
+async def test_hints_are_replayed_when_node_returns(nodes):
+    local, peer, peer_state = nodes
+    handoff = local.hinted_handoff
+    for i in range(5):
+        assert await handoff.store("peer", make_record(f"block-{i}", b"data %d" % i))
+    assert handoff.is_unreachable("peer")
+
+    local.get_active_nodes = MagicMock(return_value=[peer_state])
+    local.replay_hints()
+    assert await handoff._replays["peer"] == 5
+
+    for i in range(5):
+        assert (
+            peer.consistency_manager.get_node_version("peer", f"block-{i}").version == 1
+        )
+    assert handoff.pending("peer") == 0
+    assert not handoff.is_unreachable("peer")
+    assert handoff.get_metrics()["replayed"] == 5
+
+
+async def test_replay_never_overwrites_newer_block(nodes):
+    local, peer, peer_state = nodes
+    await peer.handle_binary_write(
+        MagicMock(
+            read=AsyncMock(return_value=encode_frame([make_record("block", b"new", 2)]))
+        )
+    )
+    await local.hinted_handoff.store("peer", make_record("block", b"old", 1))
+
+    assert await local.hinted_handoff.replay(peer_state) == 1
+    assert peer.consistency_manager.get_node_version("peer", "block").version == 2
+    with open(os.path.join(peer.data_dir, "block"), "rb") as f:
+        assert f.read() == b"new"
+
+
+async def test_hints_are_kept_while_node_is_down(nodes):
+    local, _, peer_state = nodes
+    down = MagicMock(node_id="peer", address="127.0.0.1:1")
+    await local.hinted_handoff.store("peer", make_record("block", b"data"))
+
+    assert await local.hinted_handoff.replay(down) == 0
+    assert local.hinted_handoff.pending("peer") > 0
+    assert await local.hinted_handoff.replay(peer_state) == 1
+
+
+async def test_hint_limit_drops_excess():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(
+            node_id="local",
+            data_dir=tmpdir,
+            hinted_handoff_config=HintedHandoffConfig(max_pending_bytes=150),
+        )
+        assert await node.hinted_handoff.store("peer", make_record("a", b"x" * 100))
+        assert not await node.hinted_handoff.store("peer", make_record("b", b"x" * 100))
+        assert node.hinted_handoff.get_metrics()["dropped"] == 1
+        await node.deregister()
+
+
+async def test_quorum_write_hints_replicas_it_did_not_wait_for():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(node_id="local", data_dir=tmpdir, quorum_size=2)
+        node.load_manager = MagicMock()
+        fast, slow = MagicMock(node_id="fast"), MagicMock(node_id="slow")
+        checksum = hashlib.sha256(b"payload").hexdigest()
+        acked = asyncio.get_running_loop().create_future()
+        acked.set_result(MagicMock(success=True, checksum=checksum))
+        uploads = {"fast": acked, "slow": asyncio.get_running_loop().create_future()}
+
+        async def stream_body(request, path, streams):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(b"payload")
+            return checksum, 7
+
+        request = MagicMock(match_info={"data_id": "volume/block"})
+        with patch.object(
+            node.replication_manager,
+            "_select_replica_nodes",
+            return_value=[fast, slow],
+        ), patch.object(
+            node.replication_manager,
+            "open_replica_stream",
+            side_effect=lambda n, *_: MagicMock(task=uploads[n.node_id]),
+        ), patch.object(
+            node, "_stream_write_body", stream_body
+        ), patch.object(
+            node, "publish_invalidation"
+        ), patch.object(
+            node.hinted_handoff, "schedule_replay"
+        ) as replay:
+            response = await node.handle_write(request)
+
+        assert response.status == 200
+        assert uploads["slow"].cancelled()
+        batch = node.hinted_handoff._logs["slow"].read_batch(10, 1 << 20)
+        assert [r.data_id for r in batch.records] == ["volume/block"]
+        assert batch.records[0].content == b"payload"
+        assert batch.records[0].checksum == checksum
+        # Losing the race does not make a replica unreachable
+        assert not node.hinted_handoff.is_unreachable("slow")
+        replay.assert_called_once_with(slow)
+        await node.deregister()
+
+
+async def test_store_data_hints_unreachable_replica():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(node_id="local", data_dir=tmpdir, quorum_size=2)
+        up, down = AsyncMock(node_id="up"), AsyncMock(node_id="down")
+        up.store_data.return_value = MagicMock(success=True)
+        await node.hinted_handoff.store("down", make_record("earlier", b"x"))
+
+        with patch.object(node, "_get_replica_nodes", return_value=[up, down]):
+            result = await node.store_data(
+                "volume", "block", b"payload", ConsistencyLevel.QUORUM
+            )
+
+        assert result.success
+        down.store_data.assert_not_called()
+        batch = node.hinted_handoff._logs["down"].read_batch(10, 1 << 20)
+        assert [r.data_id for r in batch.records] == ["earlier", "volume/block"]
+        assert batch.records[1].content == b"payload"
+        await node.deregister()
+
+
+async def test_store_data_hints_only_replicas_that_fail():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(node_id="local", data_dir=tmpdir, quorum_size=2)
+        fast, slow, broken = (AsyncMock(node_id=n) for n in ("fast", "slow", "broken"))
+
+        def store(delay, success):
+            async def store_data(**kwargs):
+                await asyncio.sleep(delay)
+                return MagicMock(success=success)
+
+            return store_data
+
+        fast.store_data.side_effect = store(0, True)
+        slow.store_data.side_effect = store(0.05, True)
+        broken.store_data.side_effect = store(0.05, False)
+
+        with patch.object(
+            node, "_get_replica_nodes", return_value=[fast, slow, broken]
+        ):
+            result = await node.store_data(
+                "volume", "block", b"payload", ConsistencyLevel.QUORUM
+            )
+        assert result.success
+        await asyncio.gather(*node._background_writes)
+
+        # The slow replica got the write; losing the race is not a failure
+        assert not node.hinted_handoff.is_unreachable("slow")
+        assert node.hinted_handoff.pending("slow") == 0
+        assert node.hinted_handoff.is_unreachable("broken")
+        batch = node.hinted_handoff._logs["broken"].read_batch(10, 1 << 20)
+        assert [r.data_id for r in batch.records] == ["volume/block"]
+        await node.deregister()
+
+
+async def test_async_replication_hints_from_one_reachability_snapshot():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(node_id="local", data_dir=tmpdir)
+        down, broken, up, late = (
+            MagicMock(node_id=n) for n in ("down", "broken", "up", "late")
+        )
+        await node.hinted_handoff.store("down", make_record("earlier", b"x"))
+        record = make_record("block", b"payload", version=42)
+
+        async def write_to_replica(replica, block_id, data):
+            if replica is broken:
+                # Another write hints "late" while this one is in flight
+                await node.hinted_handoff.store("late", make_record("other", b"y"))
+                return False
+            return True
+
+        with patch.object(
+            node, "_get_replica_nodes", return_value=[down, broken, up, late]
+        ), patch.object(node, "_write_to_replica", side_effect=write_to_replica):
+            await node._async_replicate(record)
+
+        def hinted(node_id):
+            batch = node.hinted_handoff._logs[node_id].read_batch(10, 1 << 20)
+            return [(r.data_id, r.version) for r in batch.records]
+
+        assert hinted("down") == [("earlier", 1), ("block", 42)]
+        assert hinted("broken") == [("block", 42)]
+        # "late" got the write; only the other write's hint is queued for it
+        assert hinted("late") == [("other", 1)]
+        assert node.hinted_handoff.pending("up") == 0
+        await node.deregister()
+
+
+async def test_gossip_alive_member_gets_its_hints_replayed():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(node_id="local", data_dir=tmpdir)
+        await node.hinted_handoff.store("peer", make_record("a", b"x"))
+        node.membership.apply(Member("peer", "127.0.0.1:1", 1, MemberStatus.ALIVE))
+
+        with patch.object(node.hinted_handoff, "schedule_replay") as replay:
+            node._merge_membership()
+
+        replay.assert_called_once_with(node.cluster_nodes["peer"])
+        await node.deregister()
@@ -0,0 +1,101 @@
+"""Unit tests for batched cache invalidation after writes."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.storage.infrastructure.active_node import ActiveNode
+from src.storage.infrastructure.block_cache import BlockCache, BlockCacheConfig
+from src.storage.infrastructure.disk_io import DiskIOExecutor
+from src.storage.infrastructure.invalidation import (
+    InvalidationBatcher,
+    InvalidationConfig,
+)
+
+
+def test_batcher_keeps_newest_version_and_drains_in_batches():
+    batcher = InvalidationBatcher()
+    batcher.add("a", 2)
+    batcher.add("b", 1)
+    batcher.add("a", 5)
+    batcher.add("a", 3)  # an older announcement arriving late
+    batcher.add("c", 1)
+
+    assert batcher.drain(2) == [("a", 5), ("b", 1)]
+    assert len(batcher) == 1
+    assert batcher.drain(2) == [("c", 1)]
+    assert batcher.drain(2) == []
+
+
+async def test_invalidated_versions_are_not_served_or_cached_again(tmp_path):
+    executor = DiskIOExecutor()
+    cache = BlockCache(str(tmp_path), executor, BlockCacheConfig(memory_bytes=10))
+    cache.put("spilled", 1, "", b"x" * 10)
+    cache.put("hot", 1, "", b"y" * 10)  # evicts "spilled" to disk
+    await cache.flush()
+    assert cache.get_stats()["disk_entries"] == 1
+
+    cache.invalidate("spilled", 2)
+    cache.invalidate("hot", 2)
+    cache.invalidate("hot", 1)  # older announcements change nothing
+    await cache.flush()
+
+    assert await cache.get("hot") is None
+    assert await cache.get("spilled") is None
+    assert cache.get_stats()["disk_entries"] == 0
+    assert list(tmp_path.iterdir()) == []
+
+    cache.put("hot", 1, "", b"y" * 10)  # a read from a stale replica
+    assert await cache.get("hot") is None
+    cache.put("hot", 2, "", b"z" * 10)
+    assert (await cache.get("hot")).content == b"z" * 10
+    assert cache.get_stats()["invalidations"] == 2
+    await executor.shutdown()
+
+
+@pytest.fixture
+def local_node_config():
+    """The local node of ``nodes`` sends small batches on a short tick."""
+    return {"invalidation_config": InvalidationConfig(tick=0.01, max_batch=2)}
+
+
+async def test_writes_are_announced_to_peers_in_coalesced_batches(nodes):
+    local, peer, peer_state = nodes
+    down = MagicMock(node_id="down", address="127.0.0.1:1")
+    local.get_active_nodes = MagicMock(return_value=[peer_state, down])
+    for data_id in ("a", "b", "c"):
+        peer.block_cache.put(data_id, 1, "", b"old")
+    local.publish_invalidation("a", 2)
+    local.publish_invalidation("a", 3)
+    local.publish_invalidation("b", 2)
+    local.publish_invalidation("c", 2)
+    await asyncio.wait_for(local._invalidation_task, timeout=5.0)
+
+    assert await peer.block_cache.get("a") is None
+    assert await peer.block_cache.get("b") is None
+    assert await peer.block_cache.get("c") is None
+    assert peer.block_cache._floors == {"a": 3, "b": 2, "c": 2}
+    assert len(local.invalidations) == 0
+
+
+async def test_handle_cache_invalidation_rejects_bad_payload(nodes):
+    _, peer, _ = nodes
+    request = MagicMock(json=AsyncMock(return_value={"invalidations": [["a"]]}))
+    response = await peer.handle_cache_invalidation(request)
+    assert response.status == 400
+
+
+async def test_deregister_stops_pending_invalidations(tmp_path):
+    node = ActiveNode(
+        node_id="local",
+        data_dir=str(tmp_path),
+        invalidation_config=InvalidationConfig(tick=10.0),
+    )
+    node.publish_invalidation("a", 1)
+    task = node._invalidation_task
+
+    await node.deregister()
+
+    assert task.cancelled()
+    assert node._invalidation_task is None
@@ -0,0 +1,137 @@
+"""Unit tests for zero-copy local block reads."""
+
+import hashlib
+import os
+import tempfile
+from datetime import datetime
+
+import pytest
+from aiohttp import web
+
+from src.storage.infrastructure.active_node import REPLICA_READ_HEADER, ActiveNode
+from src.storage.infrastructure.data.consistency_manager import VersionedData
+
+PAYLOAD = bytes(range(256)) * 64
+
+
+async def store_block(node, data_id, content, version=1):
+    """Write a block to disk and register it as the node's local copy."""
+    path = os.path.join(node.data_dir, data_id)
+    with open(path, "wb") as f:
+        f.write(content)
+    await node.consistency_manager.update_node_version(
+        node.node_id,
+        data_id,
+        VersionedData(
+            content=b"",
+            version=version,
+            timestamp=datetime.now(),
+            checksum=hashlib.sha256(content).hexdigest(),
+            location=path,
+        ),
+    )
+    return path
+
+
+@pytest.fixture
+async def node_client(aiohttp_client):
+    """Serve a node's local read endpoint."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(node_id="test-node", data_dir=tmpdir)
+        app = web.Application()
+        app.router.add_get("/storage/data/{data_id}", node.handle_local_read)
+        yield node, await aiohttp_client(app)
+        await node.deregister()
+
+
+async def test_local_read_serves_whole_block(node_client):
+    """The full block is returned with its version headers."""
+    node, client = node_client
+    await store_block(node, "block", PAYLOAD, version=3)
+
+    response = await client.get("/storage/data/block")
+
+    assert response.status == 200
+    assert await response.read() == PAYLOAD
+    assert response.headers["X-Version"] == "3"
+    assert response.headers["X-Checksum"] == hashlib.sha256(PAYLOAD).hexdigest()
+    assert response.headers["Content-Type"] == "application/octet-stream"
+
+
+async def test_local_read_serves_byte_range(node_client):
+    """Range requests return only the requested bytes."""
+    node, client = node_client
+    await store_block(node, "block", PAYLOAD)
+
+    response = await client.get(
+        "/storage/data/block", headers={"Range": "bytes=1000-1999"}
+    )
+
+    assert response.status == 206
+    assert await response.read() == PAYLOAD[1000:2000]
+
+
+async def test_local_read_missing_block(node_client):
+    """Unknown blocks and blocks missing on disk are reported as 404."""
+    node, client = node_client
+    path = await store_block(node, "gone", b"data")
+    os.remove(path)
+
+    assert (await client.get("/storage/data/unknown")).status == 404
+    assert (await client.get("/storage/data/gone")).status == 404
+
+
+@pytest.mark.parametrize("data_id", ["../escape", ".versions/log", "vol/../../x"])
+async def test_local_read_refuses_unsafe_ids(node_client, data_id):
+    """Ids that resolve outside the data dir or into node state are refused."""
+    node, _ = node_client
+    await node.consistency_manager.update_node_version(
+        node.node_id,
+        data_id,
+        VersionedData(b"", 1, datetime.now(), ""),
+    )
+
+    class Request:
+        match_info = {"data_id": data_id}
+
+    response = await node.handle_local_read(Request())
+
+    assert response.status == 400
+
+
+async def test_replica_read_header_skips_coordination(node_client):
+    """Peer reads are answered from the local copy without a quorum."""
+    node, _ = node_client
+    await store_block(node, "block", b"local")
+
+    class Request:
+        match_info = {"data_id": "block"}
+        headers = {REPLICA_READ_HEADER: "1"}
+        query = {}
+
+    response = await node.handle_read(Request())
+
+    assert isinstance(response, web.FileResponse)
+
+
+async def test_read_local_range_maps_slice():
+    """Ranged reads return a view of the requested bytes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(node_id="test-node", data_dir=tmpdir)
+        path = os.path.join(tmpdir, "block")
+        with open(path, "wb") as f:
+            f.write(PAYLOAD)
+
+        view = await node.read_local_range(path, 4096, 100)
+        assert isinstance(view, memoryview)
+        assert view == PAYLOAD[4096:4196]
+
+        assert (
+            await node.read_local_range(path, len(PAYLOAD) - 10, 100) == PAYLOAD[-10:]
+        )
+        assert len(await node.read_local_range(path, len(PAYLOAD), 100)) == 0
+
+        empty = os.path.join(tmpdir, "empty")
+        open(empty, "wb").close()
+        assert len(await node.read_local_range(empty, 0, 10)) == 0
+        await node.deregister()
@@ -0,0 +1,98 @@
+"""Unit tests for the pooled peer transport."""
+
+import asyncio
+import tempfile
+
+import pytest
+from aiohttp import web
+
+from src.storage.infrastructure.active_node import ActiveNode
+from src.storage.infrastructure.peer_transport import PeerTransport, PeerTransportConfig
+
+
+@pytest.fixture
+async def peer_server(aiohttp_server):
+    """Start a peer that tracks how many requests it serves concurrently."""
+    state = {"active": 0, "max_active": 0}
+
+    async def handle_metrics(request):
+        return web.json_response({"cpu_usage": 10.0})
+
+    async def handle_slow(request):
+        state["active"] += 1
+        state["max_active"] = max(state["max_active"], state["active"])
+        await asyncio.sleep(0.05)
+        state["active"] -= 1
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    app.router.add_get("/slow", handle_slow)
+    server = await aiohttp_server(app)
+    return f"{server.host}:{server.port}", state
+
+
+async def test_connections_are_reused(peer_server):
+    """Sequential requests to one peer share a keep-alive connection."""
+    address, _ = peer_server
+    transport = PeerTransport()
+    try:
+        for _ in range(5):
+            async with transport.request(address, "GET", "/metrics") as response:
+                assert response.status == 200
+                assert (await response.json())["cpu_usage"] == 10.0
+
+        metrics = transport.get_pool_metrics()[address]
+        assert metrics.connections_created == 1
+        assert metrics.connections_reused == 4
+        assert metrics.reuse_ratio == pytest.approx(0.8)
+        assert metrics.open_connections == 1
+        assert metrics.in_flight == 0
+    finally:
+        await transport.close()
+
+
+async def test_per_peer_concurrency_limit(peer_server):
+    """Requests beyond the per-peer limit queue instead of running."""
+    address, state = peer_server
+    transport = PeerTransport(PeerTransportConfig(max_concurrent_requests_per_peer=2))
+
+    async def fetch():
+        async with transport.request(address, "GET", "/slow") as response:
+            return await response.text()
+
+    try:
+        results = await asyncio.gather(*[fetch() for _ in range(6)])
+        assert results == ["ok"] * 6
+        assert state["max_active"] <= 2
+
+        metrics = transport.get_pool_metrics()[address]
+        assert metrics.max_queue_wait_ms > 0
+        assert metrics.queued == 0
+    finally:
+        await transport.close()
+
+
+async def test_closed_transport_rejects_requests(peer_server):
+    """A closed transport refuses new requests."""
+    address, _ = peer_server
+    transport = PeerTransport()
+    await transport.close()
+
+    with pytest.raises(RuntimeError):
+        async with transport.request(address, "GET", "/metrics"):
+            pass
+
+
+async def test_deregister_closes_transport():
+    """Deregistering a node shuts down its peer transport."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        node = ActiveNode(node_id="test-node", data_dir=tmpdir)
+        node.cluster_nodes = {}
+        assert node.replication_manager.transport is node.peer_transport
+
+        await node.deregister()
+
+        with pytest.raises(RuntimeError):
+            async with node.peer_transport.request("127.0.0.1:1", "GET", "/"):
+                pass
@@ -0,0 +1,76 @@
+"""Unit tests for the quorum gather primitive."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.storage.infrastructure.quorum import quorum_gather
+
+
+async def reply(delay: float, value=True, error: Exception = None):
+    await asyncio.sleep(delay)
+    if error:
+        raise error
+    return value
+
+
+async def test_returns_at_kth_fastest_replica():
+    """Quorum resolves after the k-th fastest reply and cancels stragglers."""
+    slow = asyncio.ensure_future(reply(5.0))
+    start = time.monotonic()
+
+    result = await quorum_gather(
+        [reply(0.01), reply(0.02), slow], required=2, keys=["a", "b", "c"]
+    )
+
+    assert result.achieved
+    assert time.monotonic() - start < 1.0
+    assert [o.key for o in result.successes] == ["a", "b"]
+    assert result.cancelled == ["c"]
+    await asyncio.sleep(0)
+    assert slow.cancelled()
+
+
+async def test_fails_fast_when_quorum_impossible():
+    """Enough failures to rule out quorum end the wait immediately."""
+    start = time.monotonic()
+
+    result = await quorum_gather(
+        [
+            reply(0.01, error=ConnectionError("down")),
+            reply(0.02, value=False),
+            reply(5.0),
+        ],
+        required=2,
+        is_success=bool,
+    )
+
+    assert not result.achieved
+    assert not result.timed_out
+    assert len(result.failures) == 2
+    assert time.monotonic() - start < 1.0
+
+
+async def test_timeout_reports_partial_result():
+    """The deadline bounds the wait and is reported separately."""
+    result = await quorum_gather(
+        [reply(0.01), reply(5.0), reply(5.0)], required=2, timeout=0.1
+    )
+
+    assert result.timed_out
+    assert not result.achieved
+    assert len(result.successes) == 1
+    assert len(result.cancelled) == 2
+
+
+async def test_records_per_replica_latency():
+    """Latency is recorded from start to completion for each replica."""
+    result = await quorum_gather(
+        [reply(0.05), reply(0.01)], required=2, keys=["slow", "fast"]
+    )
+
+    latencies = result.latencies
+    assert latencies["fast"] < latencies["slow"]
+    assert latencies["slow"] == pytest.approx(0.05, abs=0.04)
+    assert result.results == [True, True]
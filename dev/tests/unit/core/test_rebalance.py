@@ -0,0 +1,277 @@
+"""Unit tests for planned, paced and resumable rebalancing."""
+
+import os
+import tempfile
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.models.models import NodeState
+from src.storage.infrastructure import rebalance
+from src.storage.infrastructure.active_node import ActiveNode
+from src.storage.infrastructure.data.version_store import VersionedData
+from src.storage.infrastructure.rebalance import (
+    Move,
+    RebalanceCheckpoint,
+    RebalanceConfig,
+    deciding_nodes,
+    plan_moves,
+    surplus,
+)
+
+
+def _version(version: int = 1) -> VersionedData:
+    return VersionedData(b"", version, datetime.now(), "ab" * 32)
+
+
+def test_plan_only_moves_to_owners_missing_the_block():
+    orders = {"x": ["a", "b", "c"], "y": ["a", "b", "d"], "z": ["b", "a", "c"]}
+    held = {"x": {"a", "b", "c"}, "y": {"a", "b"}, "z": {"a", "c"}}
+
+    moves = plan_moves(
+        "a",
+        [(data_id, _version()) for data_id in orders],
+        orders.__getitem__,
+        3,
+        lambda data_id, _: held[data_id],
+        live={"a", "b", "c", "d"},
+    )
+
+    # z's first holder by preference is a, since b lacks it
+    assert [(m.data_id, m.target) for m in moves] == [("y", "d"), ("z", "b")]
+
+
+def test_plan_elects_one_pusher_per_block():
+    # Neither owner holds x yet; a comes before b in its preference order
+    order = ["c", "d", "a", "e", "b"]
+    held = {"a", "b"}
+
+    def plan(local_id, live={"a", "b", "c", "d", "e"}):
+        return plan_moves(
+            local_id,
+            [("x", _version())],
+            lambda _: order,
+            2,
+            lambda *_: held,
+            live,
+        )
+
+    assert [m.target for m in plan("a")] == ["c", "d"]
+    assert plan("b") == []
+    # Dead targets are left for a later plan, dead holders do not push
+    assert plan("a", {"a", "c"}) == [Move("x", 1, "ab" * 32, "c")]
+    assert [m.target for m in plan("b", {"b", "c", "d"})] == ["c", "d"]
+
+
+def test_deciding_nodes_and_surplus():
+    order = ["c", "d", "a", "e", "b"]
+    assert deciding_nodes("b", order, 2) == ["c", "d", "a", "e"]
+    assert deciding_nodes("c", order, 2) == ["d"]
+
+    def drops(held, live={"a", "b", "c", "d", "e"}):
+        return surplus(
+            "a", [("x", _version())], lambda _: order, 2, lambda *_: held, live
+        )
+
+    assert drops({"c", "d"}) == ["x"]
+    assert drops({"c"}) == []
+    assert drops({"c", "d"}, {"a", "c"}) == []  # an owner may be gone for good
+    assert (
+        surplus("c", [("x", _version())], lambda _: order, 2, lambda *_: {"d"}, {"c"})
+        == []
+    )
+
+
+def test_checkpoint_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = RebalanceCheckpoint(f"{tmp}/rebalance/plan.json")
+        assert checkpoint.load() is None
+
+        moves = [Move("x", 3, "cd", "b")]
+        checkpoint.save("ring", "k7", moves)
+        assert checkpoint.load() == ("ring", "k7", moves)
+        checkpoint.save("ring", None, moves)
+        assert checkpoint.load() == ("ring", None, moves)
+
+        with open(checkpoint.path, "w") as f:
+            f.write("{")
+        assert checkpoint.load() is None
+        checkpoint.clear()
+        checkpoint.clear()
+
+
+@pytest.fixture
+async def node():
+    with tempfile.TemporaryDirectory() as data_dir:
+        node = ActiveNode(
+            node_id="a",
+            data_dir=data_dir,
+            rebalance_config=RebalanceConfig(checkpoint_every=2, throttle_pause=0.01),
+        )
+        for node_id in "abc":
+            node.cluster_nodes[node_id] = NodeState(
+                node_id=node_id,
+                status="active",
+                last_heartbeat=datetime.now(),
+                load=0.0,
+                available_storage=0,
+                network_latency=0.0,
+                volumes=[],
+            )
+        node.load_manager.get_current_load = MagicMock(return_value=0.1)
+        yield node
+        await node.deregister()
+
+
+async def hold(node, data_id, version=1):
+    """Store a local copy of ``data_id`` on ``node``."""
+    path = node._block_path(data_id)
+    with open(path, "wb") as f:
+        f.write(b"data")
+    version_data = _version(version)
+    version_data.location = path
+    await node.consistency_manager.update_node_version(
+        node.node_id, data_id, version_data
+    )
+    return path
+
+
+async def test_rebalance_resumes_checkpoint_on_same_ring(node):
+    node._sync_hash_ring()
+    moves = [Move(f"k{i}", 1, "ab" * 32, "b") for i in range(5)]
+    node.rebalance_checkpoint.save(
+        rebalance.ring_fingerprint(node.hash_ring), None, moves
+    )
+    node._plan_page = AsyncMock(return_value=[])
+    node._make_move = AsyncMock(side_effect=[10, None, 10, 0, 10])
+
+    stats = await node.rebalance_cluster([], [])
+
+    node._plan_page.assert_not_called()
+    assert stats.resumed and stats.planned == 5
+    assert (stats.moved, stats.failed, stats.skipped, stats.bytes_moved) == (
+        3,
+        1,
+        1,
+        30,
+    )
+    # Only the failed move is kept for the next run
+    assert node.rebalance_checkpoint.load()[2] == [moves[1]]
+
+
+async def test_rebalance_plans_page_by_page_from_the_cursor(node):
+    for data_id in ("k0", "k1", "k2", "k3", "k4"):
+        await hold(node, data_id)
+    node._sync_hash_ring()
+    fingerprint = rebalance.ring_fingerprint(node.hash_ring)
+    node.rebalance_checkpoint.save(fingerprint, "k0", [])
+    saved = []
+    node.rebalance_checkpoint.save = MagicMock(
+        side_effect=lambda *args: saved.append(args[1])
+    )
+    node._plan_page = AsyncMock(return_value=[])
+
+    await node.rebalance_cluster([], [])
+
+    pages = [list(call.args[0]) for call in node._plan_page.await_args_list]
+    assert pages == [["k1", "k2"], ["k3", "k4"]]
+    assert saved == ["k2", "k4"]
+
+
+async def test_rebalance_replans_when_ring_changed(node):
+    await hold(node, "new")
+    node.rebalance_checkpoint.save("stale", None, [Move("old", 1, "ab" * 32, "b")])
+    node._plan_page = AsyncMock(return_value=[Move("new", 1, "ab" * 32, "c")])
+    node._make_move = AsyncMock(return_value=10)
+
+    stats = await node.rebalance_cluster([], [])
+
+    assert not stats.resumed
+    node._make_move.assert_awaited_once()
+    assert node._make_move.await_args.args[0].data_id == "new"
+    assert node.rebalance_checkpoint.load() is None
+
+
+async def test_one_holder_pushes_and_former_owners_drop_copies(node):
+    for node_id in "de":
+        node.cluster_nodes[node_id] = NodeState(
+            node_id=node_id,
+            status="active",
+            last_heartbeat=datetime.now(),
+            load=0.0,
+            available_storage=0,
+            network_latency=0.0,
+            volumes=[],
+        )
+    node._sync_hash_ring()
+    # Blocks "a" no longer owns, each with a different state elsewhere
+    data_ids = [f"k{i}" for i in range(100) if "a" not in node._preference(f"k{i}")[:3]]
+    drop, defer, push = data_ids[:3]
+    owners = {data_id: node._preference(data_id)[:3] for data_id in data_ids[:3]}
+    held = {
+        drop: set(owners[drop]),  # every owner has it already
+        defer: {node._preference(defer)[0]},  # a node ahead of "a" pushes it
+        push: set(),  # "a" is the only holder
+    }
+    paths = {data_id: await hold(node, data_id) for data_id in held}
+
+    async def digest(state, data_id):
+        if state.node_id in held[data_id]:
+            return {
+                "status": "success",
+                "version": 1,
+                "timestamp": datetime.now(),
+                "checksum": "ab" * 32,
+            }
+        return {"status": "error", "error": "HTTP 404"}
+
+    async def move(move, *_):
+        await node.consistency_manager.update_node_version(
+            move.target, move.data_id, _version()
+        )
+        return 10
+
+    node.read_digest_from_node = AsyncMock(side_effect=digest)
+    node._make_move = AsyncMock(side_effect=move)
+
+    stats = await node.rebalance_cluster([], [])
+
+    assert sorted(
+        (m.args[0].data_id, m.args[0].target) for m in node._make_move.await_args_list
+    ) == sorted((push, target) for target in owners[push])
+    assert (stats.moved, stats.dropped) == (3, 2)
+    assert node.consistency_manager.get_node_version("a", drop) is None
+    assert node.consistency_manager.get_node_version("a", push) is None
+    assert node.consistency_manager.get_node_version("a", defer) is not None
+    assert not os.path.exists(paths[drop])
+    assert os.path.exists(paths[defer])
+
+
+async def test_moves_pause_while_local_load_is_high(node):
+    node.load_manager.get_current_load = MagicMock(side_effect=[0.9, 0.9, 0.1])
+    node._sync_hash_ring()
+    node._plan_page = AsyncMock(return_value=[])
+    node.rebalance_checkpoint.save(
+        rebalance.ring_fingerprint(node.hash_ring), None, [Move("x", 1, "ab" * 32, "b")]
+    )
+    node._make_move = AsyncMock(return_value=10)
+
+    stats = await node.rebalance_cluster([], [])
+
+    assert stats.moved == 1
+    assert stats.throttled >= 0.02
+
+
+async def test_concurrent_moves_share_one_load_reading(node):
+    moves = [Move(f"k{i}", 1, "ab" * 32, "b") for i in range(20)]
+    node._sync_hash_ring()
+    node.rebalance_checkpoint.save(
+        rebalance.ring_fingerprint(node.hash_ring), None, moves
+    )
+    node._make_move = AsyncMock(return_value=10)
+
+    stats = await node.rebalance_cluster([], [])
+
+    assert stats.moved == 20
+    node.load_manager.get_current_load.assert_called_once()
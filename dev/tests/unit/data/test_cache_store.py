@@ -0,0 +1,215 @@
+"""Unit tests for CacheStore budgets, eviction policies, sharding and expiry."""
+
+import threading
+
+import pytest
+
+from src.config.infrastructure_config import CacheConfig
+from src.storage.infrastructure.data.cache_policy import make_policy
+from src.storage.infrastructure.data.cache_store import CacheStore
+from src.storage.infrastructure.data.timer_wheel import TimerWheel
+
+
+def test_lru_evicts_least_recently_used():
+    cache = CacheStore(max_size=3, shards=1)
+    for key in "abc":
+        cache.put(key, key)
+    cache.get("a")
+
+    cache.put("d", "d")
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["a", "c", "d"]
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_budget_is_counted_in_bytes():
+    cache = CacheStore(max_size=None, max_bytes=100, shards=1)
+    cache.put("a", b"x" * 40)
+    cache.put("b", b"x" * 40)
+    cache.put("a", b"x" * 10)  # replacing frees the old size
+    cache.put("c", b"x" * 50)
+    assert cache.get_stats()["bytes"] == 100
+
+    cache.put("d", b"x" * 30)  # evicts b, the oldest
+    assert cache.get("b") is None
+    assert cache.get_stats()["bytes"] == 90
+
+    assert not cache.put("huge", b"x" * 101)
+    assert cache.get_stats()["rejections"] == 1
+
+
+def test_slru_survives_a_scan():
+    cache = CacheStore(max_size=10, eviction_policy="slru", shards=1)
+    for key in "abc":
+        cache.put(key, key)
+        cache.get(key)  # second touch protects it
+
+    for i in range(50):
+        cache.put(f"scan{i}", i)
+
+    assert [cache.get(key) for key in "abc"] == ["a", "b", "c"]
+
+
+def test_tinylfu_rejects_keys_rarer_than_the_victim():
+    cache = CacheStore(max_size=2, eviction_policy="tinylfu", shards=1)
+    for key in "ab":
+        cache.put(key, key)
+        for _ in range(3):
+            cache.get(key)
+
+    assert not cache.put("once", 1)
+    assert cache.get("a") == "a" and cache.get("b") == "b"
+
+    for _ in range(10):
+        cache.get("popular")
+    assert cache.put("popular", 2)
+    assert cache.get("popular") == 2
+
+
+def test_stats_report_hit_ratio():
+    cache = CacheStore()
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["hit_ratio"] == pytest.approx(2 / 3)
+
+
+def test_from_config_uses_megabyte_budget_and_policy():
+    cache = CacheStore.from_config(
+        CacheConfig(enabled=True, max_size_mb=2, ttl_seconds=60, eviction_policy="SLRU")
+    )
+    stats = cache.get_stats()
+    assert stats["max_bytes"] == 2 * 1024 * 1024
+    assert stats["max_size"] is None
+    assert stats["eviction_policy"] == "slru"
+
+    with pytest.raises(ValueError):
+        make_policy("fifo", 10)
+
+
+def test_shards_share_the_budget():
+    cache = CacheStore(max_size=None, max_bytes=16 * 1024, shards=8)
+    for i in range(1000):
+        cache.put(f"key{i}", b"x" * 100)
+
+    stats = cache.get_stats()
+    assert stats["shards"] == 8
+    assert 14 * 1024 < stats["bytes"] <= 16 * 1024
+    assert stats["evictions"] == 1000 - stats["size"]
+
+
+def test_dirty_entries_are_gathered_from_every_shard():
+    cache = CacheStore(shards=4)
+    for i in range(20):
+        cache.put(f"key{i}", i)
+        if i % 2:
+            cache.mark_dirty(f"key{i}")
+    cache.mark_clean("key1")
+
+    dirty = cache.get_dirty_entries()
+    assert sorted(dirty) == sorted(f"key{i}" for i in range(3, 20, 2))
+    assert cache.get_dirty_keys() == set(dirty)
+    assert cache.get_stats()["dirty_entries"] == 9
+
+
+def test_concurrent_access_keeps_accounting_consistent():
+    cache = CacheStore(max_size=200, shards=4)
+
+    def work(worker):
+        for i in range(2000):
+            key = f"key{(worker * 7 + i) % 500}"
+            if cache.get(key) is None:
+                cache.put(key, i)
+            if i % 50 == 0:
+                cache.delete(key)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.get_stats()
+    assert stats["size"] <= 200
+    assert stats["hits"] + stats["misses"] == 8 * 2000
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_put_honours_per_entry_ttl():
+    clock = FakeClock()
+    cache = CacheStore(ttl_seconds=60, shards=1, clock=clock)
+    cache.put("short", 1, ttl=5)
+    cache.put("default", 2)
+
+    clock.now += 6
+    assert cache.get("short") is None
+    assert cache.get("default") == 2
+
+    clock.now += 60
+    assert cache.get("default") is None
+    assert cache.get_stats()["expirations"] == 2
+
+
+def test_expire_frees_entries_nobody_reads():
+    clock = FakeClock()
+    cache = CacheStore(max_size=None, shards=4, clock=clock)
+    for i in range(100):
+        cache.put(f"key{i}", b"x" * 10, ttl=10 if i % 2 else 1000)
+    cache.mark_dirty("key1")
+    cache.delete("key3")
+
+    clock.now += 11
+    assert cache.expire() == 49
+
+    stats = cache.get_stats()
+    assert (stats["size"], stats["bytes"]) == (50, 500)
+    assert stats["expirations"] == 49
+    assert stats["dirty_entries"] == 0
+    assert cache.expire() == 0
+
+
+def test_timer_wheel_cascades_and_cancels():
+    wheel = TimerWheel(now=0, tick=1, slots=4, levels=3)
+    for deadline in (0.5, 3, 7, 20, 45, 500):
+        wheel.schedule(f"k{deadline}", deadline)
+    wheel.schedule("cancelled", 5)
+    wheel.cancel("cancelled")
+    wheel.schedule("moved", 2)
+    wheel.schedule("moved", 30)
+
+    expired = {}
+    for now in range(0, 501):
+        for key in wheel.advance(now):
+            expired[key] = now
+    assert expired == {
+        "k0.5": 1,
+        "k3": 3,
+        "k7": 7,
+        "k20": 20,
+        "moved": 30,
+        "k45": 45,
+        "k500": 500,
+    }
+    assert len(wheel) == 0
+
+
+def test_timer_wheel_catches_up_after_idle_gap():
+    wheel = TimerWheel(now=0, tick=1, slots=4, levels=2)
+    wheel.schedule("early", 3)
+    wheel.schedule("late", 1000)
+
+    assert wheel.advance(100) == ["early"]
+    assert wheel.advance(999) == []
+    assert wheel.advance(1000) == ["late"]
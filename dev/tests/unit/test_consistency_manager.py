@@ -23,15 +23,23 @@ def consistency_manager():
 @pytest.mark.asyncio
 async def test_get_next_version(consistency_manager):
     """Test getting next version number."""
-    # First version should be 1
-    assert await consistency_manager.get_next_version("test_data") == 1
+    # Versions are clock stamps, increasing across data ids
+    first = await consistency_manager.get_next_version("test_data")
+    assert first > 0
+    assert await consistency_manager.get_next_version("other_data") > first
 
     # Add a version and check next
     version_data = VersionedData(
         content=b"test", version=1, timestamp=datetime.now(), checksum="abc123"
     )
     await consistency_manager.update_node_version("node1", "test_data", version_data)
-    assert await consistency_manager.get_next_version("test_data") == 2
+    assert await consistency_manager.get_next_version("test_data") > 1
+
+    # A version from another coordinator far in the future is overtaken
+    future = (first >> 16) + 10**9 << 16
+    version_data.version = future
+    await consistency_manager.update_node_version("node2", "test_data", version_data)
+    assert await consistency_manager.get_next_version("test_data") > future
 
 
 @pytest.mark.asyncio
@@ -222,3 +230,77 @@ async def test_write_operation_concurrent_updates(consistency_manager):
     assert latest is not None
     assert latest.version == 2
     assert latest.content == b"test2"
+
+
+def test_verify_consistency(consistency_manager):
+    """Replica digests agree only when versions and checksums match."""
+    same = [
+        {"version": 2, "checksum": "abc"},
+        {"version": 2, "checksum": "abc"},
+        {"version": 2, "checksum": ""},
+    ]
+    assert consistency_manager.verify_consistency(same)
+
+    assert not consistency_manager.verify_consistency(
+        same + [{"version": 1, "checksum": "abc"}]
+    )
+    assert not consistency_manager.verify_consistency(
+        same + [{"version": 2, "checksum": "def"}]
+    )
+
+
+@pytest.mark.asyncio
+async def test_node_index_and_paging(consistency_manager):
+    """The reverse node index follows updates, removals and completed writes."""
+    for i in range(5):
+        version_data = VersionedData(
+            content=b"", version=1, timestamp=datetime.now(), checksum=f"c{i}"
+        )
+        await consistency_manager.update_node_version("node1", f"d{i}", version_data)
+    await consistency_manager.update_node_version("node2", "d0", version_data)
+    await consistency_manager.remove_version("node1", "d4")
+
+    await consistency_manager.start_write(
+        WriteOperation("d9", b"x", 1, "c9", datetime.now(), "eventual")
+    )
+    assert await consistency_manager.complete_write("d9", {"node2"})
+
+    assert set(consistency_manager.get_node_data("node1")) == {"d0", "d1", "d2", "d3"}
+    assert set(consistency_manager.get_node_data("node2")) == {"d0", "d9"}
+    assert consistency_manager.count_node_data("node1") == 4
+
+    pages = list(consistency_manager.iter_node_data("node1", page_size=3))
+    assert [len(page) for page in pages] == [3, 1]
+    assert set().union(*pages) == {"d0", "d1", "d2", "d3"}
+
+    # Resuming after a data id visits the rest in sorted order
+    pages = list(consistency_manager.iter_node_data("node1", page_size=2, after="d1"))
+    assert [list(page) for page in pages] == [["d2", "d3"]]
+
+    # Items removed while iterating are skipped
+    pages = consistency_manager.iter_node_data("node1", page_size=2)
+    first = next(pages)
+    for data_id in list(consistency_manager.get_node_data("node1")):
+        if data_id not in first:
+            await consistency_manager.remove_version("node1", data_id)
+    assert list(pages) == []
+
+    await consistency_manager.remove_version("node2", "d0")
+    await consistency_manager.remove_version("node2", "d9")
+    assert consistency_manager.get_node_data("node2") == {}
+    assert list(consistency_manager.iter_node_data("node2")) == []
+
+
+def test_resolve_conflicts_uses_version_then_checksum(consistency_manager):
+    """Conflicts resolve by version stamp, ties by checksum, never by wall clock."""
+    stamp = consistency_manager.generate_version()
+    versions = {
+        "node1": {"version": stamp, "checksum": "aaa", "timestamp": "2030-01-01"},
+        "node2": {"version": stamp, "checksum": "bbb", "timestamp": "2020-01-01"},
+        "node3": {"version": stamp - 1, "checksum": "zzz", "timestamp": "2031-01-01"},
+    }
+    assert consistency_manager.resolve_conflicts(versions)["checksum"] == "bbb"
+
+    ahead = stamp + (1000 << 16)
+    consistency_manager.resolve_conflicts({"node4": {"version": ahead}})
+    assert consistency_manager.generate_version() > ahead
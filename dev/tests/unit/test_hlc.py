@@ -0,0 +1,71 @@
+"""Unit tests for hybrid logical clock versions."""
+
+from src.storage.infrastructure.data import hlc
+from src.storage.infrastructure.data.hlc import HybridLogicalClock
+
+
+class FakeClock:
+    def __init__(self, seconds: float = 1_700_000_000.0):
+        self.seconds = seconds
+
+    def __call__(self) -> float:
+        return self.seconds
+
+
+def test_now_is_monotonic_when_wall_clock_stalls_or_steps_back():
+    wall = FakeClock()
+    clock = HybridLogicalClock("node1", clock=wall)
+
+    first = clock.now()
+    second = clock.now()
+    wall.seconds -= 5  # NTP step backwards
+    third = clock.now()
+
+    assert first < second < third
+    assert hlc.unpack(third)[0] == hlc.unpack(first)[0]
+    assert hlc.unpack(third)[1] == 2
+
+
+def test_update_moves_past_remote_stamp():
+    wall = FakeClock()
+    clock = HybridLogicalClock("node1", clock=wall)
+    remote = hlc.pack(hlc.unpack(clock.now())[0] + 60_000, 3, 255)
+
+    stamp = clock.update(remote)
+
+    assert stamp > remote
+    assert clock.now() > stamp
+
+
+def test_observe_without_issuing():
+    clock = HybridLogicalClock("node1", clock=FakeClock())
+    remote = hlc.pack(hlc.unpack(clock.now())[0] + 1000, 7, 0)
+
+    clock.observe(remote)
+    clock.observe(1)  # older stamps are ignored
+
+    assert clock.now() > remote
+
+
+def test_nodes_issue_distinct_stamps_in_same_millisecond():
+    wall = FakeClock()
+    a = HybridLogicalClock("node1", clock=wall)
+    b = HybridLogicalClock("node2", clock=wall)
+
+    assert a.tag != b.tag
+    assert a.now() != b.now()
+
+
+def test_logical_overflow_borrows_next_millisecond():
+    clock = HybridLogicalClock("node1", clock=FakeClock())
+    start = hlc.unpack(clock.now())[0]
+
+    stamps = [clock.now() for _ in range(300)]
+
+    assert stamps == sorted(set(stamps))
+    assert hlc.unpack(stamps[-1])[0] == start + 1
+
+
+def test_legacy_counter_versions_sort_below_stamps():
+    clock = HybridLogicalClock()
+    assert clock.now() > 1_000_000
@@ -0,0 +1,96 @@
+"""Unit tests for the incremental Merkle tree."""
+
+from datetime import datetime
+
+import pytest
+
+from src.storage.infrastructure.anti_entropy import find_divergent_leaves, newer_on_peer
+from src.storage.infrastructure.data.consistency_manager import (
+    ConsistencyManager,
+    VersionedData,
+)
+from src.storage.infrastructure.data.merkle_tree import MAX_DEPTH, MerkleTree
+
+
+def build(entries, depth=6):
+    tree = MerkleTree(depth)
+    for data_id, entry in entries.items():
+        tree.update(data_id, None, entry)
+    return tree
+
+
+def test_root_is_order_independent_and_updates_incrementally():
+    entries = {f"block-{i}": (i, "%064x" % i) for i in range(200)}
+    forward = build(entries)
+    backward = build(dict(reversed(list(entries.items()))))
+    assert forward.root == backward.root != 0
+
+    forward.update("block-7", entries["block-7"], (99, "f" * 64))
+    assert forward.root != backward.root
+    forward.update("block-7", (99, "f" * 64), entries["block-7"])
+    assert forward.root == backward.root
+
+    for data_id, entry in entries.items():
+        forward.update(data_id, entry, None)
+    assert forward.root == 0
+    assert all(not forward.leaf_ids(leaf) for leaf in range(1 << forward.depth))
+
+
+def test_invalid_depth_and_level():
+    with pytest.raises(ValueError):
+        MerkleTree(depth=MAX_DEPTH + 1)
+    with pytest.raises(ValueError):
+        MerkleTree(depth=4).hashes(5, [0])
+
+
+async def test_divergent_leaves_cost_follows_divergence():
+    entries = {f"block-{i}": (1, "a" * 64) for i in range(1000)}
+    local = build(entries, depth=8)
+    remote = build(entries, depth=8)
+    requests = []
+
+    async def fetch(level, indices):
+        requests.append(len(indices))
+        return remote.hashes(level, indices)
+
+    assert await find_divergent_leaves(local, fetch) == []
+    assert requests == [1]
+
+    remote.update("block-42", (1, "a" * 64), (2, "b" * 64))
+    requests.clear()
+    assert await find_divergent_leaves(local, fetch) == [local.leaf_of("block-42")]
+    # Root, then two children per differing node on every level below it
+    assert requests == [1] + [2] * local.depth
+
+
+def test_newer_on_peer():
+    local = {"same": (2, "x"), "stale": (1, "x"), "ahead": (5, "x"), "tie": (3, "a")}
+    remote = {
+        "same": (2, "x"),
+        "stale": (2, "x"),
+        "ahead": (4, "x"),
+        "tie": (3, "b"),
+        "missing": (1, "x"),
+    }
+    assert sorted(data_id for data_id, _ in newer_on_peer(local, remote)) == [
+        "missing",
+        "stale",
+        "tie",
+    ]
+
+
+async def test_consistency_manager_tracks_own_versions_only():
+    manager = ConsistencyManager(node_id="node1", merkle_depth=4)
+    data = VersionedData(b"", 1, datetime.now(), "ab" * 32)
+
+    await manager.update_node_version("node2", "block", data)
+    assert manager.merkle_tree.root == 0
+
+    await manager.update_node_version("node1", "block", data)
+    leaf = manager.merkle_tree.leaf_of("block")
+    assert manager.get_leaf_entries(leaf) == {"block": (1, "ab" * 32)}
+    assert manager.merkle_tree.root != 0
+
+    await manager.remove_version("node1", "block")
+    assert manager.merkle_tree.root == 0
+    assert manager.get_leaf_entries(leaf) == {}
@@ -0,0 +1,99 @@
+"""Unit tests for the columnar version store."""
+
+import hashlib
+from datetime import datetime, timezone
+
+from src.storage.infrastructure.data.version_store import VersionedData, VersionStore
+
+
+def versioned(version, checksum=None, location=None, timestamp=None, content=b""):
+    return VersionedData(
+        content=content,
+        version=version,
+        timestamp=timestamp or datetime(2024, 5, 1, 8, 30, 15, 123456),
+        checksum=checksum
+        if checksum is not None
+        else hashlib.sha256(b"%d" % version).hexdigest(),
+        location=location,
+    )
+
+
+def test_round_trip_fields():
+    """Stored rows rebuild the same version metadata."""
+    store = VersionStore()
+    aware = datetime(2024, 5, 1, 8, 30, tzinfo=timezone.utc)
+    rows = {
+        ("a", "n1"): versioned(1, location="/data/a"),
+        ("a", "n2"): versioned(2, location="/data/a.part", timestamp=aware),
+        ("b", "n1"): versioned(3, checksum="not-a-digest"),
+        ("c", "n1"): versioned(4, checksum=""),
+    }
+    for (data_id, node_id), data in rows.items():
+        store.put(data_id, node_id, data)
+
+    for (data_id, node_id), data in rows.items():
+        assert store.get(data_id, node_id) == data
+    assert store.get("a", "n3") is None
+    assert store.get("missing", "n1") is None
+    assert len(store) == 3
+    assert store.replica_count == 4
+
+
+def test_content_is_only_kept_when_asked():
+    data = versioned(1, content=b"payload")
+
+    lean = VersionStore()
+    lean.put("a", "n1", data)
+    assert lean.get("a", "n1").content == b""
+
+    full = VersionStore(keep_content=True)
+    full.put("a", "n1", data)
+    assert full.get("a", "n1").content == b"payload"
+
+
+def test_replicas_and_node_index():
+    store = VersionStore()
+    for node in ("n1", "n2", "n3"):
+        store.put("a", node, versioned(1))
+    store.put("b", "n1", versioned(5))
+    store.put("a", "n2", versioned(7))  # replace in place
+
+    assert sorted(store.replicas("a")) == ["n1", "n2", "n3"]
+    assert store.max_version("a") == 7
+    assert store.max_version("missing") is None
+    assert sorted(store.node_data_ids("n1")) == ["a", "b"]
+    assert store.node_count("n2") == 1
+    assert store.replica_count == 4
+
+
+def test_remove_relinks_chains_and_reuses_rows():
+    store = VersionStore()
+    for node in ("n1", "n2", "n3"):
+        store.put("a", node, versioned(1))
+    store.put("b", "n2", versioned(1))
+
+    assert store.remove("a", "n2")  # middle of the chain
+    assert not store.remove("a", "n2")
+    assert sorted(store.replica_nodes("a")) == ["n1", "n3"]
+    assert store.node_data_ids("n2") == ["b"]
+
+    assert store.remove("a", "n3")
+    assert store.remove("a", "n1")
+    assert "a" not in store
+    assert store.node_count("n1") == 0
+
+    rows_before = len(store._versions)
+    store.put("c", "n1", versioned(9))
+    assert len(store._versions) == rows_before
+    assert store.get("c", "n1").version == 9
+
+
+def test_copy_is_independent():
+    store = VersionStore()
+    store.put("a", "n1", versioned(1))
+    clone = store.copy()
+    store.put("a", "n1", versioned(2))
+    store.put("b", "n1", versioned(1))
+
+    assert clone.get("a", "n1").version == 1
+    assert list(clone.items()) == [("a", "n1", versioned(1))]
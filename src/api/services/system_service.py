@@ -1,6 +1,7 @@
 """System service for managing DFS infrastructure components."""
 
 import logging
+import os
 import uuid
 from pathlib import Path
 from typing import Optional, Dict, Any
@@ -12,6 +13,7 @@ from src.storage.infrastructure.data.replication_manager import ReplicationManag
 from src.storage.infrastructure.data.consistency_manager import ConsistencyManager
 from src.storage.infrastructure.load_manager import LoadManager
 from src.storage.infrastructure.active_node import ActiveNode
+from src.storage.metrics import UnifiedMetricsCollector
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +23,9 @@ DEFAULT_CONFIG = {
     "backup_retention_days": 30,
     "snapshot_retention_days": 7,
     "auto_backup_enabled": True,
+    # Where the peer endpoints listen; override with PEER_HOST/PEER_PORT
+    "peer_host": "0.0.0.0",
+    "peer_port": 8002,
 }
 
 
@@ -31,9 +36,6 @@ class SystemService:
         """Initialize the system service."""
         self.storage_root = Path(storage_root)
 
-        # Initialize storage components first
-        self.hybrid_storage = HybridStorageManager(str(self.storage_root))
-
         # Initialize cluster management
         self.cluster_manager = StorageClusterManager()
         node_id = str(uuid.uuid4())
@@ -41,6 +43,13 @@ class SystemService:
             node_id=node_id,
             data_dir=str(self.storage_root),
             quorum_size=DEFAULT_CONFIG["replication_factor"],
+            address=os.getenv("NODE_ADDRESS"),  # host:port peers dial
+            metrics_collector=UnifiedMetricsCollector(node_id),
+        )
+
+        # Storage shares the node's disk I/O pools
+        self.hybrid_storage = HybridStorageManager(
+            str(self.storage_root), disk_io_executor=self.active_node.disk_io
         )
 
         # Initialize data management components
@@ -80,6 +89,11 @@ class SystemService:
                 replication_factor=DEFAULT_CONFIG["replication_factor"]
             ):
                 raise RuntimeError("Failed to initialize replication manager")
+            # The node re-replicates blocks itself when a peer fails
+            if not self.active_node.replication_manager.initialize(
+                replication_factor=DEFAULT_CONFIG["replication_factor"]
+            ):
+                raise RuntimeError("Failed to initialize node replication manager")
 
             # Initialize data protection with default settings
             if not self.data_protection.initialize(
@@ -135,6 +149,19 @@ class SystemService:
             logger.error(f"Failed to handle request {operation}: {str(e)}")
             raise
 
+    async def start(self):
+        """Serve the node's peer endpoints and start its background tasks.
+
+        Seeds to join the cluster through are read from CLUSTER_SEEDS, a
+        comma-separated list of host:port addresses.
+        """
+        seeds = [seed for seed in os.getenv("CLUSTER_SEEDS", "").split(",") if seed]
+        await self.active_node.start(
+            os.getenv("PEER_HOST", DEFAULT_CONFIG["peer_host"]),
+            int(os.getenv("PEER_PORT", DEFAULT_CONFIG["peer_port"])),
+            seeds,
+        )
+
     async def shutdown(self):
         """Gracefully shutdown the system."""
         try:
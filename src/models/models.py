@@ -317,3 +317,8 @@ class NodeState:
     available_storage: int  # bytes
     network_latency: float  # milliseconds
     volumes: List[str]  # list of volume IDs
+    address: str = ""  # host:port peers reach the node at
+    total_storage: int = 0  # bytes
+    zone: Optional[str] = None
+    region: Optional[str] = None
+    write_queue: List[Any] = field(default_factory=list)  # writes in flight to it
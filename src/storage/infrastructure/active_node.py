@@ -1,21 +1,106 @@
 """Active node management for the distributed file system."""
 
 import asyncio
+import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Set, Any, Union, BinaryIO
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Set,
+    Any,
+    Union,
+    BinaryIO,
+)
 import os
 from dataclasses import dataclass
 from enum import Enum
 import hashlib
-import aiohttp
+import mmap
+import random
+import shutil
+import time
+from functools import partial
 from aiohttp import web
 from pathlib import Path
 
 from src.storage.infrastructure.interfaces import StorageInterface, MetricsCollector
+from src.storage.metrics import UnifiedMetricsCollector
 from src.storage.infrastructure.load_manager import LoadManager
-from src.storage.infrastructure.data.consistency_manager import ConsistencyManager
-from src.storage.infrastructure.data.replication_manager import ReplicationManager
+from src.storage.infrastructure.data.merkle_tree import MerkleTree
+from src.storage.infrastructure.data.consistency_manager import (
+    ConsistencyManager,
+    VersionedData,
+)
+from src.storage.infrastructure.data.replication_manager import (
+    ReplicationManager,
+    ReplicaStream,
+)
+from src.storage.infrastructure.peer_transport import PeerTransport, PeerTransportConfig
+from src.storage.infrastructure.quorum import QuorumResult, quorum_gather
+from src.storage.infrastructure.hedging import HedgingConfig, RequestHedger
+from src.storage.infrastructure import disk_io
+from src.storage.infrastructure.block_cache import (
+    BlockCache,
+    BlockCacheConfig,
+    CachedBlock,
+)
+from src.storage.infrastructure.disk_io import DiskIOConfig, DiskIOExecutor, IOPool
+from src.storage.infrastructure.durability import (
+    DurabilityLevel,
+    GroupCommitConfig,
+    GroupCommitWriter,
+)
+from src.storage.infrastructure import anti_entropy
+from src.storage.infrastructure.anti_entropy import AntiEntropyConfig, SyncStats
+from src.storage.infrastructure.hinted_handoff import HintedHandoff, HintedHandoffConfig
+from src.storage.infrastructure.hash_ring import (
+    HashRing,
+    RingMember,
+    capacity_unit,
+    capacity_weight,
+)
+from src.storage.infrastructure import gossip
+from src.storage.infrastructure.gossip import (
+    GossipConfig,
+    Member,
+    MemberStatus,
+    Membership,
+)
+from src.storage.infrastructure.health import HealthCheckConfig, HealthReport
+from src.storage.infrastructure import rebalance
+from src.storage.infrastructure.rebalance import (
+    Move,
+    RebalanceCheckpoint,
+    RebalanceConfig,
+    RebalanceStats,
+)
+from src.storage.infrastructure.invalidation import (
+    INVALIDATE_PATH,
+    InvalidationBatcher,
+    InvalidationConfig,
+)
+from src.storage.infrastructure.rate_limit import TokenBucket
+from src.storage.infrastructure.cluster_metrics import (
+    ClusterMetricsCache,
+    ClusterMetricsConfig,
+)
+from src.storage.infrastructure.block_protocol import (
+    CONTENT_TYPE as BLOCK_FRAME_CONTENT_TYPE,
+    ROLLBACK_PATH,
+    STREAM_PATH,
+    WRITE_PATH,
+    BlockOp,
+    BlockProtocolError,
+    BlockRecord,
+    decode_frame,
+    encode_frame,
+)
 from src.models.models import (
     Volume,
     NodeState,
@@ -31,6 +116,35 @@ from src.models.models import (
 )
 
 
+# Marks replica-to-replica reads that must be served from the local copy
+REPLICA_READ_HEADER = "X-Replica-Read"
+
+
+def _map_file_range(path: str, offset: int, length: int) -> memoryview:
+    """Map ``length`` bytes of a file starting at ``offset`` without copying.
+
+    The returned view keeps the mapping alive; pages are faulted in from
+    the page cache only when the caller touches them.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if offset >= size or length <= 0:
+            return memoryview(b"")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped)[offset:offset + min(length, size - offset)]
+
+
+def _block_sizes(paths: Dict[str, str]) -> Dict[str, int]:
+    """Size of each file in ``paths``; 0 for files that are gone."""
+    sizes = {}
+    for key, path in paths.items():
+        try:
+            sizes[key] = os.path.getsize(path)
+        except OSError:
+            sizes[key] = 0
+    return sizes
+
+
 class ConsistencyLevel(Enum):
     """Consistency levels for read/write operations."""
     EVENTUAL = "eventual"
@@ -59,13 +173,36 @@ class ActiveNode(StorageInterface):
         tiering_policy: Optional[CloudTieringPolicy] = None,
         max_cpu_threshold: float = 80.0,
         max_memory_threshold: float = 80.0,
-        max_requests_per_second: float = 1000.0
+        max_requests_per_second: float = 1000.0,
+        peer_transport_config: Optional[PeerTransportConfig] = None,
+        write_chunk_size: int = 1024 * 1024,
+        hedging_config: Optional[HedgingConfig] = None,
+        disk_io_config: Optional[DiskIOConfig] = None,
+        durability: DurabilityLevel = DurabilityLevel.BATCHED,
+        group_commit_config: Optional[GroupCommitConfig] = None,
+        anti_entropy_config: Optional[AntiEntropyConfig] = None,
+        hinted_handoff_config: Optional[HintedHandoffConfig] = None,
+        ring_vnodes: int = 128,
+        cluster_metrics_config: Optional[ClusterMetricsConfig] = None,
+        address: Optional[str] = None,
+        gossip_config: Optional[GossipConfig] = None,
+        health_check_config: Optional[HealthCheckConfig] = None,
+        rebalance_config: Optional[RebalanceConfig] = None,
+        block_cache_config: Optional[BlockCacheConfig] = None,
+        invalidation_config: Optional[InvalidationConfig] = None,
+        metrics_collector: Optional[UnifiedMetricsCollector] = None,
+        zone: Optional[str] = None,
+        region: Optional[str] = None
     ):
         """Initialize active node."""
         self.node_id = node_id
+        # Failure domain; replicas are spread across zones and regions
+        self.zone = zone
+        self.region = region
         self.data_dir = data_dir or os.path.join(os.getcwd(), "data")
         self.quorum_size = quorum_size
         self.write_timeout = write_timeout
+        self.write_chunk_size = write_chunk_size
         
         # Initialize state tracking with proper model
         self.node_state = NodeState(
@@ -75,7 +212,9 @@ class ActiveNode(StorageInterface):
             load=0.0,
             available_storage=0,
             network_latency=0.0,
-            volumes=[]
+            volumes=[],
+            zone=zone,
+            region=region
         )
         
         # Initialize policies
@@ -88,8 +227,82 @@ class ActiveNode(StorageInterface):
             max_memory_threshold=max_memory_threshold,
             max_requests_per_second=max_requests_per_second
         )
-        self.consistency_manager = ConsistencyManager(quorum_size)
-        self.replication_manager = ReplicationManager()
+        # Version state survives restarts through a log under the data dir;
+        # payloads stay on disk and are referenced by location
+        self.consistency_manager = ConsistencyManager(
+            quorum_size,
+            state_dir=os.path.join(self.data_dir, ".versions"),
+            keep_content=False,
+            node_id=node_id,
+        )
+        # Shared keep-alive transport for all inter-node traffic
+        self.peer_transport = PeerTransport(peer_transport_config)
+        # Replica placement; rebuilt incrementally as cluster_nodes changes
+        self.cluster_nodes: Dict[str, NodeState] = {}
+        self.hash_ring = HashRing(vnodes=ring_vnodes)
+        self._capacity_unit: Optional[float] = None  # see capacity_unit
+        self.replication_manager = ReplicationManager(
+            transport=self.peer_transport, ring=self.hash_ring
+        )
+        # Per-peer read latency tracking and backup requests for slow replicas
+        self.read_hedger = RequestHedger(hedging_config)
+        # All blocking file I/O runs on these pools, never on the event loop
+        self.disk_io = DiskIOExecutor(disk_io_config)
+        # Exported node metrics (disk I/O queues, event loop lag), if any
+        self.metrics_collector = metrics_collector
+        # Local block writes are acknowledged once durable at this level
+        self.block_writer = GroupCommitWriter(
+            self.disk_io, durability, group_commit_config
+        )
+        # Background Merkle-tree repair against peers; last round per peer
+        self.anti_entropy_config = anti_entropy_config or AntiEntropyConfig()
+        self.anti_entropy_stats: Dict[str, SyncStats] = {}
+        # Trees over the blocks shared with each peer, and when they were built
+        self._shared_trees: Dict[str, anti_entropy.SharedTree] = {}
+        self._shared_entries: Dict[str, Dict[str, Tuple[int, str]]] = {}
+        self._shared_trees_at: Optional[float] = None
+        # Writes for unreachable replicas, replayed when they come back
+        self.hinted_handoff = HintedHandoff(
+            os.path.join(self.data_dir, ".hints"),
+            self.disk_io,
+            self.peer_transport,
+            hinted_handoff_config,
+        )
+        # Replica writes a quorum write returned without (see store_data)
+        self._background_writes: Set[asyncio.Task] = set()
+        # Peer endpoint server and periodic loops, both set up by start()
+        self._runner: Optional[web.AppRunner] = None
+        self._background_tasks: List[asyncio.Task] = []
+        # Other nodes' load as carried by gossip; read by write placement
+        self.cluster_metrics_config = cluster_metrics_config or ClusterMetricsConfig()
+        self.cluster_metrics = ClusterMetricsCache(self.cluster_metrics_config.max_age)
+        self._disk_op_totals = (0, 0)  # (done, failed) at the last report
+        # Who is in the cluster and who has failed, agreed by gossip
+        self.membership = Membership(node_id, address or "", gossip_config)
+        # Health cycles only probe; failures found are handled by a worker
+        self.health_check_config = health_check_config or HealthCheckConfig()
+        self.health_reports: asyncio.Queue = asyncio.Queue(
+            self.health_check_config.max_pending_reports
+        )
+        self._health_pending: Set[str] = set()  # nodes queued or being handled
+        # Replica moves after placement changes; progress survives restarts
+        self.rebalance_config = rebalance_config or RebalanceConfig()
+        self.rebalance_checkpoint = RebalanceCheckpoint(
+            os.path.join(self.data_dir, ".rebalance", "plan.json")
+        )
+        self._rebalance_lock = asyncio.Lock()
+        # (monotonic time, value) of the last load reading taken for moves
+        self._rebalance_load = (float("-inf"), 0.0)
+        # Blocks fetched from replicas, reused while their version is current
+        self.block_cache = BlockCache(
+            os.path.join(self.data_dir, ".block_cache"),
+            self.disk_io,
+            block_cache_config,
+        )
+        # New versions written here, announced to peers' caches each tick
+        self.invalidation_config = invalidation_config or InvalidationConfig()
+        self.invalidations = InvalidationBatcher()
+        self._invalidation_task: Optional[asyncio.Task] = None
         self.logger = logging.getLogger(__name__)
         
         # Create data directory
@@ -113,6 +326,33 @@ class ActiveNode(StorageInterface):
         """Get list of available replica nodes."""
         return self._replica_nodes
 
+    def _block_path(self, data_id: str) -> str:
+        """Local path of a data id, checked to lie inside the data directory
+
+        Ids come from clients and peers. Absolute paths, ``.``/``..``
+        segments and ids under a top-level ``.`` directory (``.versions``,
+        ``.hints``, ``.block_cache``, ``.rebalance``) are refused, so an id
+        can neither escape the data directory nor overwrite node state.
+
+        Raises:
+            ValueError: If the id is not a safe relative path
+        """
+        parts = data_id.split(os.sep)
+        if (
+            not data_id
+            or "\0" in data_id
+            or os.path.isabs(data_id)
+            or (os.altsep is not None and os.altsep in data_id)
+            or any(part in ("", ".", "..") for part in parts)
+            or parts[0].startswith(".")
+        ):
+            raise ValueError(f"Invalid data id {data_id!r}")
+        root = os.path.normpath(self.data_dir)
+        path = os.path.normpath(os.path.join(root, data_id))
+        if path == root or os.path.commonpath([root, path]) != root:
+            raise ValueError(f"Invalid data id {data_id!r}")
+        return os.path.join(self.data_dir, data_id)
+
     def _get_block_path(self, volume_id: str, block_id: str) -> str:
         """Get the filesystem path for a block."""
         volume_dir = os.path.join(self.data_dir, volume_id)
@@ -133,8 +373,7 @@ class ActiveNode(StorageInterface):
         # Store locally
         block_path = self._get_block_path(volume_id, block_id)
         try:
-            with open(block_path, 'wb') as f:
-                f.write(data)
+            await self.block_writer.write(block_path, data)
         except Exception as e:
             self.logger.error(f"Failed to write data locally: {str(e)}")
             raise WriteFailureError("Failed to write data locally")
@@ -150,12 +389,23 @@ class ActiveNode(StorageInterface):
         if consistency_level == ConsistencyLevel.STRONG and len(replica_nodes) < self.quorum_size - 1:
             # Rollback local write
             try:
-                os.remove(block_path)
+                await self.disk_io.write(disk_io.remove_if_exists, block_path)
             except:
                 pass
             raise InsufficientNodesError(f"Need {self.quorum_size} nodes for strong consistency")
 
+        # Replicas known to be down get a hint straight away instead of
+        # costing another timeout; strong writes still need every replica
+        hinted = []
+        if consistency_level != ConsistencyLevel.STRONG:
+            hinted = [
+                node for node in replica_nodes
+                if self.hinted_handoff.is_unreachable(node.node_id)
+            ]
+            replica_nodes = [node for node in replica_nodes if node not in hinted]
+
         # Replicate to other nodes
+        stragglers: Dict[asyncio.Task, Any] = {}
         if replica_nodes:
             replication_tasks = []
             for node in replica_nodes:
@@ -169,32 +419,48 @@ class ActiveNode(StorageInterface):
                 )
                 replication_tasks.append(task)
 
+            if consistency_level == ConsistencyLevel.STRONG:
+                return_when = asyncio.ALL_COMPLETED
+            else:
+                return_when = asyncio.FIRST_COMPLETED
+            started = asyncio.get_running_loop().time()
             try:
                 done, pending = await asyncio.wait(
                     replication_tasks,
                     timeout=self.write_timeout,
-                    return_when=asyncio.ALL_COMPLETED if consistency_level == ConsistencyLevel.STRONG else asyncio.FIRST_COMPLETED
+                    return_when=return_when
                 )
 
-                # Cancel pending tasks
-                for task in pending:
-                    task.cancel()
-
-                if consistency_level == ConsistencyLevel.STRONG and len(done) < len(replica_nodes):
+                if consistency_level == ConsistencyLevel.STRONG and pending:
+                    for task in pending:
+                        task.cancel()
                     # Rollback local write for strong consistency
                     try:
-                        os.remove(block_path)
+                        await self.disk_io.write(
+                            disk_io.remove_if_exists, block_path
+                        )
                     except:
                         pass
                     raise WriteTimeoutError("Failed to achieve required replication level")
 
+                if not done:
+                    # No replica answered in time; all of them get a hint
+                    for task in pending:
+                        task.cancel()
+                    hinted.extend(replica_nodes)
+                    pending = set()
+
                 # Check results
                 for task in done:
                     result = await task
                     if not result.success:
+                        for straggler in pending:
+                            straggler.cancel()
                         # Rollback local write
                         try:
-                            os.remove(block_path)
+                            await self.disk_io.write(
+                                disk_io.remove_if_exists, block_path
+                            )
                         except:
                             pass
                         raise WriteFailureError(f"Replication failed: {result.error}")
@@ -202,22 +468,77 @@ class ActiveNode(StorageInterface):
             except asyncio.TimeoutError:
                 # Rollback local write
                 try:
-                    os.remove(block_path)
+                    await self.disk_io.write(disk_io.remove_if_exists, block_path)
                 except:
                     pass
                 raise WriteTimeoutError("Write operation timed out")
 
+            # Replicas slower than the first one keep writing in the
+            # background; only those that then fail or time out get a hint
+            stragglers = {
+                task: node
+                for node, task in zip(replica_nodes, replication_tasks)
+                if task in pending
+            }
+
+        if hinted or stragglers:
+            record = BlockRecord(
+                data_id=f"{volume_id}/{block_id}",
+                version=self.consistency_manager.generate_version(),
+                checksum=hashlib.sha256(data).hexdigest(),
+                timestamp=datetime.now(),
+                content=data,
+            )
+            for node in hinted:
+                await self._hint_write(node, record)
+            if stragglers:
+                remaining = self.write_timeout - (
+                    asyncio.get_running_loop().time() - started
+                )
+                task = asyncio.create_task(
+                    self._finish_replication(stragglers, record, remaining)
+                )
+                self._background_writes.add(task)
+                task.add_done_callback(self._background_writes.discard)
+
         return WriteResult(success=True, block_id=block_id)
 
-    async def read_data(self, volume_id: str, block_id: str) -> bytes:
-        """Read data from a block."""
+    async def _finish_replication(
+        self, stragglers: Dict[asyncio.Task, Any], record: BlockRecord, timeout: float
+    ) -> None:
+        """Wait for replica writes a quorum write returned without.
+
+        Replicas whose write fails or is still running after ``timeout``
+        seconds get a hint; the others already have the block.
+        """
+        done, pending = await asyncio.wait(stragglers, timeout=max(timeout, 0.0))
+        for task in pending:
+            task.cancel()
+        for task, node in stragglers.items():
+            if task in done and task.exception() is None and task.result().success:
+                continue
+            await self._hint_write(node, record)
+
+    async def read_data(
+        self,
+        volume_id: str,
+        block_id: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+    ) -> Union[bytes, memoryview]:
+        """Read data from a block.
+
+        Ranged reads (``length`` given) return a memory-mapped view of the
+        requested slice instead of copying it into Python memory.
+        """
         if not self.is_healthy():
             raise NodeUnhealthyError("Node is not healthy")
 
         block_path = self._get_block_path(volume_id, block_id)
         try:
-            with open(block_path, 'rb') as f:
-                return f.read()
+            if length is not None:
+                return await self.read_local_range(block_path, offset, length)
+            return await self.disk_io.read(disk_io.read_file, block_path)
         except FileNotFoundError:
             raise KeyError(f"Block {block_id} not found")
         except Exception as e:
@@ -226,55 +547,135 @@ class ActiveNode(StorageInterface):
 
     async def start_health_monitor(self) -> None:
         """Start monitoring node health"""
-        while True:
-            try:
-                await self.check_node_health()
-                await asyncio.sleep(5)  # Check every 5 seconds
-            except Exception as e:
-                self.logger.error(f"Health monitor error: {str(e)}")
-                await asyncio.sleep(1)  # Brief pause on error
-
-    async def check_node_health(self) -> None:
-        """Check health of all nodes and handle failures"""
+        worker = asyncio.create_task(self.run_health_worker())
         try:
-            now = datetime.now()
-            failed_nodes = []
-            degraded_nodes = []
-
-            for node_id, state in self.cluster_nodes.items():
-                if node_id == self.node_id:
-                    continue
-
-                # Check heartbeat age
-                heartbeat_age = (now - state.last_heartbeat).total_seconds()
-
-                # Check node metrics
-                node_metrics = await self.get_node_metrics(state)
-
-                if heartbeat_age > 30 or not node_metrics:
-                    # Node appears to be down
-                    failed_nodes.append(state)
-                    await self.handle_node_failure(state)
+            while True:
+                try:
+                    await self.check_node_health()
+                except Exception as e:
+                    self.logger.error(f"Health monitor error: {str(e)}")
+                await asyncio.sleep(self.health_check_config.interval)
+        finally:
+            worker.cancel()
+
+    async def check_node_health(self) -> HealthReport:
+        """Check all nodes and queue what needs handling
+
+        Failure is taken from gossip and load from the metrics gossip
+        spreads, so a cycle sends no requests for nodes that report in.
+        Only nodes without a fresh report are asked for /metrics, a
+        sample of at most ``max_probes`` per cycle. Probes run at most
+        ``concurrency`` at a time, and any still running at the cycle
+        deadline are abandoned, so a cycle takes no longer than the
+        deadline however many nodes are down. Nodes with a report still
+        queued or being handled are skipped.
+        """
+        config = self.health_check_config
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        now = datetime.now()
+        report = HealthReport()
+
+        to_probe = []
+        for node_id, state in list(self.cluster_nodes.items()):
+            if node_id == self.node_id or node_id in self._health_pending:
+                continue
+
+            # Failure is decided by gossip, which only declares a node
+            # dead after probes through other members fail as well;
+            # nodes gossip does not know about fall back to heartbeat age
+            member = self.membership.members.get(node_id)
+            if member is not None:
+                failed = member.status == MemberStatus.DEAD
+            else:
+                failed = (now - state.last_heartbeat).total_seconds() > 30
+            if failed:
+                report.failed.append(state)
+                continue
+
+            node_metrics = self.cluster_metrics.get(node_id)
+            if node_metrics is None:
+                to_probe.append(state)
+            elif self._is_node_degraded(node_metrics):
+                # Node is up but performing poorly
+                report.degraded.append((state, node_metrics))
+
+        if len(to_probe) > config.max_probes:
+            report.unchecked = len(to_probe) - config.max_probes
+            to_probe = random.sample(to_probe, config.max_probes)
+
+        semaphore = asyncio.Semaphore(config.concurrency)
+
+        async def probe(state: NodeState) -> Optional[Dict[str, float]]:
+            async with semaphore:
+                return await self.get_node_metrics(state)
+
+        probes = {asyncio.ensure_future(probe(state)): state for state in to_probe}
+        if probes:
+            done, pending = await asyncio.wait(
+                probes,
+                timeout=max(0.0, config.cycle_deadline - (loop.time() - started)),
+            )
+            for task in pending:
+                task.cancel()
+            for task, state in probes.items():
+                node_metrics = task.result() if task in done else None
+                if not node_metrics:
+                    # A missed scrape alone is not a failure
+                    report.unreachable.append(state.node_id)
                 elif self._is_node_degraded(node_metrics):
                     # Node is up but performing poorly
-                    degraded_nodes.append(state)
-                    await self.handle_node_degradation(state, node_metrics)
+                    report.degraded.append((state, node_metrics))
+        report.probed = len(probes)
+        report.duration = loop.time() - started
 
-            if failed_nodes or degraded_nodes:
-                await self.rebalance_cluster(failed_nodes, degraded_nodes)
+        if report.needs_action:
+            try:
+                self.health_reports.put_nowait(report)
+                self._health_pending.update(report.node_ids())
+            except asyncio.QueueFull:
+                # The nodes are found again next cycle
+                self.logger.warning("Health worker is behind, dropping report")
+        return report
+
+    async def handle_health_report(self, report: HealthReport) -> None:
+        """Handle the failed and degraded nodes of one health cycle"""
+        try:
+            await asyncio.gather(
+                *[self.handle_node_failure(state) for state in report.failed],
+                *[
+                    self.handle_node_degradation(state, node_metrics)
+                    for state, node_metrics in report.degraded
+                ],
+            )
+            await self.rebalance_cluster(
+                report.failed, [state for state, _ in report.degraded]
+            )
+        finally:
+            self._health_pending.difference_update(report.node_ids())
 
-        except Exception as e:
-            self.logger.error(f"Health check failed: {str(e)}")
+    async def run_health_worker(self) -> None:
+        """Handle queued health reports one at a time"""
+        while True:
+            report = await self.health_reports.get()
+            try:
+                await self.handle_health_report(report)
+            except Exception as e:
+                self.logger.error(f"Health handling failed: {str(e)}")
+            finally:
+                self.health_reports.task_done()
 
     async def get_node_metrics(self, node: NodeState) -> Optional[Dict[str, float]]:
         """Get current metrics from a node"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"http://{node.address}/metrics", timeout=2.0
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
+            async with self.peer_transport.request(
+                node.address,
+                "GET",
+                "/metrics",
+                timeout=self.health_check_config.probe_timeout,
+            ) as response:
+                if response.status == 200:
+                    return await response.json()
             return None
         except Exception as e:
             self.logger.warning(
@@ -298,32 +699,83 @@ class ActiveNode(StorageInterface):
 
             # Remove from active nodes
             self.cluster_nodes.pop(failed_node.node_id, None)
+            self._sync_hash_ring()
+
+            # Ensure replication factor for the failed node's data, one page
+            # at a time so a large inventory is never materialised at once
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + 30.0
+            for page in self.consistency_manager.iter_node_data(failed_node.node_id):
+                replication_tasks = [
+                    asyncio.ensure_future(
+                        self._restore_replication(data_id, failed_node.node_id)
+                    )
+                    for data_id in page
+                ]
 
-            # Get all data that was on the failed node
-            affected_data = self.consistency_manager.get_node_data(failed_node.node_id)
-
-            # Ensure replication factor for all affected data
-            replication_tasks = []
-            for data_id, version_data in affected_data.items():
-                task = self.ensure_replication_level(
-                    data_id, version_data, exclude_nodes={failed_node.node_id}
-                )
-                replication_tasks.append(task)
-
-            # Wait for critical replications with timeout
-            try:
-                await asyncio.wait(
-                    replication_tasks, timeout=30.0, return_when=asyncio.ALL_COMPLETED
+                # Wait for critical replications with timeout
+                _, pending = await asyncio.wait(
+                    replication_tasks,
+                    timeout=max(0.0, deadline - loop.time()),
+                    return_when=asyncio.ALL_COMPLETED,
                 )
-            except asyncio.TimeoutError:
-                self.logger.error("Timeout waiting for failure recovery replication")
-
-            # Update cluster state
-            await self.update_cluster_state()
+                if pending:
+                    for task in pending:
+                        task.cancel()
+                    self.logger.error(
+                        "Timeout waiting for failure recovery replication"
+                    )
+                    break
 
         except Exception as e:
             self.logger.error(f"Failed to handle node failure: {str(e)}")
 
+    async def _restore_replication(self, data_id: str, failed_node_id: str) -> None:
+        """Bring a block that lost its copy on a failed node back to full
+        replication, from this node's copy.
+
+        Of the surviving holders only the one with the lowest node id
+        pushes, so the block is not sent once per holder.
+        """
+        manager = self.consistency_manager
+        local = manager.get_node_version(self.node_id, data_id)
+        if local is None:
+            return
+        active = {node.node_id for node in self.get_active_nodes()}
+        holders = {
+            node_id
+            for node_id in manager.get_replica_nodes(data_id)
+            if node_id == self.node_id
+            or (node_id != failed_node_id and node_id in active)
+        }
+        if min(holders) != self.node_id:
+            return
+        try:
+            content = await self._read_block(data_id, local)
+        except OSError as e:
+            self.logger.error(f"Failed to read {data_id} for re-replication: {str(e)}")
+            return
+        record = BlockRecord(
+            data_id=data_id,
+            version=local.version,
+            checksum=local.checksum,
+            timestamp=local.timestamp,
+            content=bytes(content),
+        )
+        for node in await self.replication_manager.ensure_replication_level(
+            record, holders
+        ):
+            await manager.update_node_version(
+                node.node_id,
+                data_id,
+                VersionedData(
+                    content=b"",
+                    version=local.version,
+                    timestamp=local.timestamp,
+                    checksum=local.checksum,
+                ),
+            )
+
     async def handle_node_degradation(
         self, node: NodeState, metrics: Dict[str, float]
     ) -> None:
@@ -351,72 +803,115 @@ class ActiveNode(StorageInterface):
     ) -> None:
         """Migrate load away from a node"""
         try:
-            # Get data hosted on the degraded node
-            node_data = self.consistency_manager.get_node_data(node.node_id)
-
-            # Sort data by access frequency and size
+            # Blocks hosted on the degraded node that this node can ship
+            # from its own up-to-date copy
+            local_data = {}
+            for data_id, version_data in self.consistency_manager.get_node_data(
+                node.node_id
+            ).items():
+                local = self.consistency_manager.get_node_version(
+                    self.node_id, data_id
+                )
+                if local is not None and local.version >= version_data.version:
+                    local_data[data_id] = local
+
+            # Largest blocks first; per-block access counts are not kept
+            sizes = await self.disk_io.read(
+                _block_sizes,
+                {
+                    data_id: version_data.location or self._block_path(data_id)
+                    for data_id, version_data in local_data.items()
+                },
+            )
             sorted_data = sorted(
-                node_data.items(),
-                key=lambda x: (
-                    self.load_manager.get_data_access_frequency(x[0]),
-                    len(x[1].content),
-                ),
-                reverse=True,
+                local_data.items(), key=lambda x: sizes[x[0]], reverse=True
             )
 
             # Determine how much data to migrate
             migration_limit = len(sorted_data) if aggressive else len(sorted_data) // 2
 
-            # Migrate most frequently accessed data first
             migration_tasks = []
             for data_id, version_data in sorted_data[:migration_limit]:
-                task = self.migrate_data(
-                    data_id, version_data, exclude_nodes={node.node_id}
+                task = asyncio.ensure_future(
+                    self.migrate_data(
+                        data_id,
+                        version_data,
+                        exclude_nodes={node.node_id, self.node_id},
+                    )
                 )
                 migration_tasks.append(task)
+            if not migration_tasks:
+                return
 
             # Wait for migrations with timeout
-            try:
-                await asyncio.wait(
-                    migration_tasks,
-                    timeout=60.0 if aggressive else 300.0,
-                    return_when=asyncio.ALL_COMPLETED,
-                )
-            except asyncio.TimeoutError:
+            _, pending = await asyncio.wait(
+                migration_tasks,
+                timeout=60.0 if aggressive else 300.0,
+                return_when=asyncio.ALL_COMPLETED,
+            )
+            if pending:
                 self.logger.warning("Timeout waiting for load migration")
 
         except Exception as e:
             self.logger.error(f"Failed to migrate load: {str(e)}")
 
     async def migrate_data(
-        self, data_id: str, version_data: Volume, exclude_nodes: Set[str]
+        self, data_id: str, version_data: VersionedData, exclude_nodes: Set[str]
     ) -> None:
-        """Migrate a single piece of data to a new node"""
+        """Migrate a single piece of data to a new node
+
+        ``version_data`` describes this node's copy, which is read from disk
+        and shipped.
+        """
         try:
+            content = await self._read_block(data_id, version_data)
+
             # Find best target node
             target_node = await self.find_migration_target(
-                data_id, len(version_data.content), exclude_nodes
+                data_id, len(content), exclude_nodes
             )
             if not target_node:
                 raise ValueError("No suitable migration target found")
 
             # Replicate to new node
+            record = BlockRecord(
+                data_id=data_id,
+                version=version_data.version,
+                checksum=version_data.checksum,
+                timestamp=version_data.timestamp,
+                content=bytes(content),
+            )
             result = await self.replication_manager.replicate_to_node(
-                target_node, data_id, version_data.content, version_data.checksum
+                target_node, record
             )
 
-            if result.get("status") != "success":
-                raise RuntimeError(f"Migration failed: {result.get('error')}")
+            if not result.success:
+                raise RuntimeError(f"Migration failed: {result.error}")
 
             # Update version map
             await self.consistency_manager.update_node_version(
-                target_node.node_id, data_id, version_data
+                target_node.node_id,
+                data_id,
+                VersionedData(
+                    content=b"",
+                    version=version_data.version,
+                    timestamp=version_data.timestamp,
+                    checksum=version_data.checksum,
+                ),
             )
 
         except Exception as e:
             self.logger.error(f"Failed to migrate data {data_id}: {str(e)}")
             raise
 
+    async def _read_block(self, data_id: str, version_data: VersionedData) -> bytes:
+        """Content of a local block, from memory if held there, else from disk"""
+        if version_data.content:
+            return version_data.content
+        return await self.read_local(
+            version_data.location or self._block_path(data_id)
+        )
+
     async def find_migration_target(
         self, data_id: str, data_size: int, exclude_nodes: Set[str]
     ) -> Optional[NodeState]:
@@ -457,56 +952,290 @@ class ActiveNode(StorageInterface):
 
     async def rebalance_cluster(
         self, failed_nodes: List[NodeState], degraded_nodes: List[NodeState]
-    ) -> None:
-        """Rebalance cluster after node failures or degradation"""
-        try:
-            self.logger.info("Starting cluster rebalance")
+    ) -> RebalanceStats:
+        """Move blocks held here to the owners the current placement gives them
+
+        Local holdings are planned and moved ``checkpoint_every`` blocks at
+        a time in data id order, and each page is checkpointed. A run
+        interrupted on the same ring layout retries its failed moves and
+        resumes after the last page done; otherwise planning starts over.
+        Moves are paced by a global and a per-target byte budget and pause
+        while this node's load is above ``load_threshold``. Copies this node
+        no longer owns are deleted once every owner holds them.
+        """
+        async with self._rebalance_lock:
+            self._sync_hash_ring()
+            fingerprint = rebalance.ring_fingerprint(self.hash_ring)
+            config = self.rebalance_config
+            stats = RebalanceStats()
+            limiter = TokenBucket(config.max_rate)
+            node_limiters: Dict[str, TokenBucket] = {}
+            semaphore = asyncio.Semaphore(config.concurrency)
+
+            cursor: Optional[str] = ""
+            pending: List[Move] = []
+            saved = await self.disk_io.read(self.rebalance_checkpoint.load)
+            if saved is not None and saved[0] == fingerprint:
+                _, cursor, pending = saved
+                stats.resumed = True
+            if self.node_id not in self.hash_ring:
+                cursor = None  # no placement to plan against
+            self.logger.info(
+                f"Starting cluster rebalance"
+                f"{' (resumed)' if stats.resumed else ''}: "
+                f"{len(failed_nodes)} failed and {len(degraded_nodes)} degraded nodes"
+            )
 
-            # Get current data distribution
-            distribution = await self.get_data_distribution()
+            stats.planned = len(pending)
+            failed = await self._run_moves(
+                pending, stats, limiter, node_limiters, semaphore
+            )
+            await self._drop_surplus({move.data_id for move in pending}, stats)
+            if cursor is not None:
+                pages = self.consistency_manager.iter_node_data(
+                    self.node_id, config.checkpoint_every, after=cursor
+                )
+                for page in pages:
+                    moves = await self._plan_page(page, semaphore)
+                    stats.planned += len(moves)
+                    failed.extend(
+                        await self._run_moves(
+                            moves, stats, limiter, node_limiters, semaphore
+                        )
+                    )
+                    await self._drop_surplus(page, stats)
+                    # Pages come in data id order; failed moves are kept so a
+                    # restart still retries them
+                    cursor = max(page)
+                    await self.disk_io.write(
+                        self.rebalance_checkpoint.save, fingerprint, cursor, failed
+                    )
 
-            # Calculate ideal distribution
-            ideal_distribution = self.calculate_ideal_distribution(distribution)
+            if failed:
+                await self.disk_io.write(
+                    self.rebalance_checkpoint.save, fingerprint, None, failed
+                )
+            else:
+                await self.disk_io.write(self.rebalance_checkpoint.clear)
 
-            # Generate migration plan
-            migration_plan = self.generate_migration_plan(
-                distribution, ideal_distribution, failed_nodes, degraded_nodes
+            self.logger.info(
+                f"Cluster rebalance finished: {stats.planned} planned, "
+                f"{stats.moved} moved, {stats.failed} failed, "
+                f"{stats.skipped} skipped, {stats.dropped} dropped, "
+                f"{stats.bytes_moved} bytes, {stats.throttled:.1f}s throttled"
             )
+            return stats
+
+    def _preference(self, data_id: str) -> List[str]:
+        return rebalance.preference(
+            self.hash_ring,
+            data_id,
+            self.replication_manager.min_replicas,
+            self.node_id,
+        )
 
-            # Execute migrations in parallel with rate limiting
-            async with asyncio.Semaphore(5) as semaphore:  # Limit concurrent migrations
-                migration_tasks = []
-                for source, target, data_id in migration_plan:
-                    task = self.execute_migration(source, target, data_id, semaphore)
-                    migration_tasks.append(task)
-
-                await asyncio.gather(*migration_tasks)
+    def _holders(self, data_id: str, version_data: VersionedData) -> Set[str]:
+        """Nodes known to hold ``data_id`` at ``version_data`` or newer"""
+        manager = self.consistency_manager
+        nodes = set()
+        for node_id in manager.get_replica_nodes(data_id):
+            held = manager.get_node_version(node_id, data_id)
+            if held is not None and held.version >= version_data.version:
+                nodes.add(node_id)
+        return nodes
+
+    async def _plan_page(
+        self, page: Dict[str, VersionedData], semaphore: asyncio.Semaphore
+    ) -> List[Move]:
+        """Moves this node owes for one page of its holdings
+
+        This node's view mostly knows of its own copies, so the nodes that
+        decide each block's pusher are asked for their digest first.
+        """
+        count = self.replication_manager.min_replicas
+        live = {node.node_id for node in self.get_active_nodes()} | {self.node_id}
+        orders = {data_id: self._preference(data_id) for data_id in page}
+
+        async def confirm(data_id: str, version_data: VersionedData) -> None:
+            known = self._holders(data_id, version_data)
+            for node_id in rebalance.deciding_nodes(
+                self.node_id, orders[data_id], count
+            ):
+                node = self.cluster_nodes.get(node_id)
+                if node_id in known or node_id not in live or node is None:
+                    continue
+                async with semaphore:
+                    result = await self.read_digest_from_node(node, data_id)
+                if result["status"] != "success":
+                    continue
+                await self.consistency_manager.update_node_version(
+                    node_id,
+                    data_id,
+                    VersionedData(
+                        content=b"",
+                        version=result["version"],
+                        timestamp=result["timestamp"],
+                        checksum=result["checksum"],
+                    ),
+                )
 
-            self.logger.info("Cluster rebalance completed")
+        await asyncio.gather(
+            *[confirm(data_id, version_data) for data_id, version_data in page.items()]
+        )
+        return rebalance.plan_moves(
+            self.node_id, page.items(), orders.__getitem__, count, self._holders, live
+        )
 
-        except Exception as e:
-            self.logger.error(f"Cluster rebalance failed: {str(e)}")
+    async def _drop_surplus(
+        self, data_ids: Iterable[str], stats: RebalanceStats
+    ) -> None:
+        """Delete local copies of blocks that every owner already holds"""
+        if self.node_id not in self.hash_ring:
+            return
+        holdings = []
+        for data_id in data_ids:
+            version_data = self.consistency_manager.get_node_version(
+                self.node_id, data_id
+            )
+            if version_data is not None:
+                holdings.append((data_id, version_data))
+        live = {node.node_id for node in self.get_active_nodes()} | {self.node_id}
+        drops = rebalance.surplus(
+            self.node_id,
+            holdings,
+            self._preference,
+            self.replication_manager.min_replicas,
+            self._holders,
+            live,
+        )
+        held = dict(holdings)
+        for data_id in drops:
+            path = held[data_id].location or self._block_path(data_id)
+            async with self.consistency_manager.get_write_lock(path):
+                current = self.consistency_manager.get_node_version(
+                    self.node_id, data_id
+                )
+                if current is None or current.version != held[data_id].version:
+                    continue  # rewritten since planning
+                await self.disk_io.write(disk_io.remove_if_exists, path)
+                await self.consistency_manager.remove_version(self.node_id, data_id)
+            stats.dropped += 1
 
-    async def execute_migration(
+    async def _run_moves(
         self,
-        source: NodeState,
-        target: NodeState,
-        data_id: str,
+        moves: List[Move],
+        stats: RebalanceStats,
+        limiter: TokenBucket,
+        node_limiters: Dict[str, TokenBucket],
         semaphore: asyncio.Semaphore,
-    ) -> None:
-        """Execute a single migration in the rebalance plan"""
-        async with semaphore:
-            try:
-                version_data = await self.get_version_data(source, data_id)
-                if version_data:
-                    await self.migrate_data(
-                        data_id, version_data, exclude_nodes={source.node_id}
+    ) -> List[Move]:
+        """Make moves concurrently; returns those that failed"""
+        failed: List[Move] = []
+
+        async def run(move: Move) -> None:
+            async with semaphore:
+                await self._wait_for_headroom(stats)
+                try:
+                    outcome = await self._make_move(move, limiter, node_limiters)
+                except Exception as e:
+                    self.logger.warning(
+                        f"Moving {move.data_id} to node {move.target} failed: {str(e)}"
                     )
-            except Exception as e:
-                self.logger.error(
-                    f"Failed to migrate {data_id} from {source.node_id} "
-                    f"to {target.node_id}: {str(e)}"
+                    outcome = None
+                if outcome is None:
+                    stats.failed += 1
+                    failed.append(move)
+                elif outcome:
+                    stats.moved += 1
+                    stats.bytes_moved += outcome
+                else:
+                    stats.skipped += 1
+
+        await asyncio.gather(*[run(move) for move in moves])
+        return failed
+
+    def _sampled_load(self) -> float:
+        """Local load, read at most once per ``throttle_pause``
+
+        Each reading resets the I/O rate counters that request admission
+        also uses, so moves share one reading instead of taking their own.
+        """
+        sampled_at, load = self._rebalance_load
+        now = time.monotonic()
+        if now - sampled_at >= self.rebalance_config.throttle_pause:
+            load = self.load_manager.get_current_load()
+            self._rebalance_load = (now, load)
+        return load
+
+    async def _wait_for_headroom(self, stats: RebalanceStats) -> None:
+        """Hold a move back while foreground load on this node is high"""
+        config = self.rebalance_config
+        while self._sampled_load() > config.load_threshold:
+            stats.throttled += config.throttle_pause
+            await asyncio.sleep(config.throttle_pause)
+
+    async def _make_move(
+        self,
+        move: Move,
+        limiter: TokenBucket,
+        node_limiters: Dict[str, TokenBucket],
+    ) -> Optional[int]:
+        """Copy one block to its new owner
+
+        Returns:
+            Bytes sent; 0 if the move no longer applies; None if it failed
+        """
+        target = self.cluster_nodes.get(move.target)
+        version_data = self.consistency_manager.get_node_version(
+            self.node_id, move.data_id
+        )
+        if (
+            target is None
+            or target.status != "active"
+            or version_data is None
+            or version_data.version != move.version
+        ):
+            return 0
+
+        content = await self._read_block(move.data_id, version_data)
+        node_limiter = node_limiters.setdefault(
+            move.target, TokenBucket(self.rebalance_config.per_node_rate)
+        )
+        await limiter.acquire(len(content))
+        await node_limiter.acquire(len(content))
+
+        record = BlockRecord(
+            data_id=move.data_id,
+            version=version_data.version,
+            checksum=version_data.checksum,
+            timestamp=version_data.timestamp,
+            content=bytes(content),
+        )
+        async with self.peer_transport.request(
+            target.address,
+            "POST",
+            WRITE_PATH,
+            data=encode_frame([record]),
+            headers={"Content-Type": BLOCK_FRAME_CONTENT_TYPE},
+            timeout=self.rebalance_config.request_timeout,
+        ) as response:
+            if response.status != 200:
+                self.logger.warning(
+                    f"Node {move.target} refused {move.data_id}: HTTP {response.status}"
                 )
+                return None
+
+        await self.consistency_manager.update_node_version(
+            move.target,
+            move.data_id,
+            VersionedData(
+                content=b"",
+                version=version_data.version,
+                timestamp=version_data.timestamp,
+                checksum=version_data.checksum,
+            ),
+        )
+        return len(content)
 
     async def handle_request(self, request) -> web.Response:
         """Handle incoming requests with load balancing"""
@@ -517,35 +1246,39 @@ class ActiveNode(StorageInterface):
 
         if request.method == "GET":
             return await self.handle_read(request)
+        elif request.method == "HEAD":
+            return await self.handle_digest_read(request)
         elif request.method in ["PUT", "POST"]:
             return await self.handle_write(request)
         elif request.method == "DELETE":
             return await self.handle_delete(request)
 
     async def handle_write(self, request) -> web.Response:
-        """Handle write requests with parallel replication and load balancing"""
+        """Handle write requests by streaming the body to disk and replicas.
+
+        The body is consumed in ``write_chunk_size`` chunks. Each chunk feeds
+        an incremental checksum, is appended to the local block file and is
+        fanned out to every replica upload as it arrives, so peak memory is
+        bounded by the chunk size times the number of replicas.
+        """
         try:
             data_id = request.match_info["data_id"]
-            content = await request.read()
-            checksum = hashlib.sha256(content).hexdigest()
+            try:
+                local_path = self._block_path(data_id)
+            except ValueError as e:
+                return web.Response(status=400, text=str(e))
 
-            # Check if we should handle this write
+            # Check if we should handle this write before consuming the body
             if not self.load_manager.can_handle_write():
                 alternate_node = self.find_least_loaded_node()
                 if alternate_node:
                     return await self.forward_request(request, alternate_node)
 
-            # Create versioned data
-            version_data = Volume(
-                content=content,
-                version=await self.consistency_manager.get_next_version(data_id),
-                timestamp=datetime.now(),
-                checksum=checksum,
-            )
-
-            # Get target nodes for replication
+            # Get target nodes for replication: every replica of the block,
+            # of which a quorum has to acknowledge the write
+            replicas = max(self.replication_manager.min_replicas, self.quorum_size)
             target_nodes = self.replication_manager._select_replica_nodes(
-                self.quorum_size - 1, {self.node_id}  # Exclude self
+                replicas - 1, {self.node_id}, data_id  # Exclude self
             )
 
             if len(target_nodes) < self.quorum_size - 1:
@@ -554,76 +1287,211 @@ class ActiveNode(StorageInterface):
                     text=f"Not enough nodes available for quorum (need {self.quorum_size})",
                 )
 
-            # Start parallel writes
-            write_futures = []
+            version = await self.consistency_manager.get_next_version(data_id)
+            timestamp = datetime.now()
 
-            # Local write first to ensure durability
+            # Open one bounded stream per replica and pipe the body through
+            streams = [
+                self.replication_manager.open_replica_stream(
+                    node, data_id, version, timestamp
+                )
+                for node in target_nodes
+            ]
             try:
-                local_path = os.path.join(self.data_dir, data_id)
-                await self.write_local(local_path, content)
+                checksum, size = await self._stream_write_body(
+                    request, local_path, streams
+                )
                 await self.consistency_manager.update_node_version(
-                    self.node_id, data_id, version_data
+                    self.node_id,
+                    data_id,
+                    VersionedData(
+                        content=b"",
+                        version=version,
+                        timestamp=timestamp,
+                        checksum=checksum,
+                        location=local_path,
+                    ),
                 )
+                await self._sync_version_log()
             except Exception as e:
+                for stream in streams:
+                    stream.abort()
                 self.logger.error(f"Local write failed: {str(e)}")
                 return web.Response(status=500, text=f"Local write failed: {str(e)}")
 
-            # Parallel remote writes
-            for node in target_nodes:
-                future = self.replication_manager.replicate_to_node(
-                    node, data_id, content, checksum
-                )
-                write_futures.append(future)
+            # Wait for the fastest quorum of replicas, cancelling stragglers.
+            # Replicas must have received exactly what we stored.
+            quorum = await quorum_gather(
+                [stream.task for stream in streams],
+                self.quorum_size - 1,
+                timeout=self.write_timeout,
+                is_success=lambda r: r.success and r.checksum == checksum,
+                keys=[node.node_id for node in target_nodes],
+            )
+            successful_writes = len(quorum.successes)
 
-            # Wait for quorum with timeout
-            try:
-                done, pending = await asyncio.wait(
-                    write_futures,
-                    timeout=5.0,  # 5 second timeout
-                    return_when=asyncio.FIRST_N_COMPLETED(self.quorum_size - 1),
+            if not quorum.achieved:
+                # Rollback if quorum not achieved
+                await self.rollback_replicated_write(data_id)
+                if quorum.timed_out:
+                    return web.Response(
+                        status=503, text="Write timeout waiting for quorum"
+                    )
+                return web.Response(
+                    status=503,
+                    text=(
+                        f"Write quorum not achieved "
+                        f"({successful_writes + 1}/{self.quorum_size})"
+                    ),
                 )
 
-                # Cancel pending operations if quorum achieved
-                for task in pending:
-                    task.cancel()
+            # Replicas that failed or were cut off get the block by hint
+            await self._hint_stragglers(
+                target_nodes, quorum, data_id, version, checksum, local_path
+            )
 
-                # Check results
-                successful_writes = sum(
-                    1 for task in done if task.result().get("status") == "success"
-                )
+            # Update load metrics
+            self.load_manager.record_write(size)
+            self.publish_invalidation(data_id, version)
 
-                if successful_writes < self.quorum_size - 1:
-                    # Rollback if quorum not achieved
-                    await self.rollback_write(data_id)
-                    return web.Response(
-                        status=503,
-                        text=f"Write quorum not achieved ({successful_writes + 1}/{self.quorum_size})",
+            return web.Response(
+                status=200,
+                text=f"Write successful, replicated to {successful_writes + 1} nodes",
+                headers={"X-Checksum": checksum, "X-Version": str(version)},
+            )
+
+        except Exception as e:
+            self.logger.error(f"Write failed: {str(e)}")
+            return web.Response(status=500, text=str(e))
+
+    async def _hint_stragglers(
+        self,
+        target_nodes: List[Any],
+        quorum: QuorumResult,
+        data_id: str,
+        version: int,
+        checksum: str,
+        local_path: str,
+    ) -> None:
+        """Hint a quorum write to the replicas that did not acknowledge it.
+
+        Failed replicas are marked unreachable. Replicas still uploading when
+        the quorum answered were cancelled but are not marked unreachable;
+        their hint is replayed straight away.
+        """
+        failed = {outcome.key for outcome in quorum.failures}
+        cancelled = set(quorum.cancelled)
+        stragglers = [
+            node for node in target_nodes if node.node_id in failed | cancelled
+        ]
+        if not stragglers:
+            return
+        try:
+            content = await self.disk_io.read(disk_io.read_file, local_path)
+        except OSError as e:
+            self.logger.error(f"Failed to read {data_id} for hints: {str(e)}")
+            return
+        record = BlockRecord(
+            data_id=data_id,
+            version=version,
+            checksum=checksum,
+            timestamp=datetime.now(),
+            content=content,
+        )
+        for node in stragglers:
+            await self._hint_write(
+                node, record, unreachable=node.node_id not in cancelled
+            )
+
+    async def _stream_write_body(
+        self, request, path: str, streams: List[ReplicaStream]
+    ) -> Tuple[str, int]:
+        """Stream a request body to ``path`` and to every replica stream.
+
+        The block is written to a temporary file of its own and renamed into
+        place once complete and durable, so readers never see a partially
+        written block and overlapping writes never mix their chunks.
+
+        Returns:
+            Tuple of (sha256 hex digest, number of bytes written)
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        f, part_path = await self.disk_io.write(disk_io.open_temp_file, path)
+        try:
+            try:
+                async for chunk in request.content.iter_chunked(self.write_chunk_size):
+                    hasher.update(chunk)
+                    size += len(chunk)
+                    await asyncio.gather(
+                        self.disk_io.write(f.write, chunk),
+                        *[stream.push(chunk, self.write_timeout) for stream in streams],
                     )
+            finally:
+                await self.disk_io.write(f.close)
+            # Renamed into place once durable
+            await self.block_writer.commit(path, size, temp_path=part_path)
+        except BaseException:
+            await asyncio.shield(
+                self.disk_io.write(disk_io.remove_if_exists, part_path)
+            )
+            raise
 
-                # Update load metrics
-                self.load_manager.record_write(len(content))
+        await asyncio.gather(*[stream.close(self.write_timeout) for stream in streams])
+        return hasher.hexdigest(), size
 
-                return web.Response(
-                    status=200,
-                    text=f"Write successful, replicated to {successful_writes + 1} nodes",
-                )
+    async def handle_replica_stream(self, request: web.Request) -> web.Response:
+        """Store a block the coordinator of a write streams to this replica.
 
-            except asyncio.TimeoutError:
-                # Rollback on timeout
-                await self.rollback_write(data_id)
-                return web.Response(status=503, text="Write timeout waiting for quorum")
+        The body is hashed and written as it arrives, like the coordinator's
+        own copy. The checksum is returned in ``X-Checksum`` so the
+        coordinator can check the replica stored what it sent.
+        """
+        data_id = request.match_info["data_id"]
+        try:
+            path = self._block_path(data_id)
+            version = int(request.headers["X-Version"])
+            timestamp = datetime.fromisoformat(request.headers["X-Timestamp"])
+        except (KeyError, ValueError) as e:
+            return web.Response(status=400, text=f"Bad replica stream: {str(e)}")
+
+        # A late or retried upload must never roll a block back
+        current = self.consistency_manager.get_node_version(self.node_id, data_id)
+        if current is not None and current.version > version:
+            return web.Response(
+                status=409, text=f"Holding newer version {current.version}"
+            )
 
+        try:
+            if os.sep in data_id:  # volume/block ids from store_data
+                await self.disk_io.write(
+                    partial(os.makedirs, os.path.dirname(path), exist_ok=True)
+                )
+            checksum, _ = await self._stream_write_body(request, path, [])
+            await self.consistency_manager.update_node_version(
+                self.node_id,
+                data_id,
+                VersionedData(
+                    content=b"",
+                    version=version,
+                    timestamp=timestamp,
+                    checksum=checksum,
+                    location=path,
+                ),
+            )
+            await self._sync_version_log()
         except Exception as e:
-            self.logger.error(f"Write failed: {str(e)}")
+            self.logger.error(f"Replica stream of {data_id} failed: {str(e)}")
             return web.Response(status=500, text=str(e))
 
-    async def rollback_write(self, data_id: str) -> None:
+        return web.Response(status=200, headers={"X-Checksum": checksum})
+
+    async def rollback_replicated_write(self, data_id: str) -> None:
         """Rollback a failed write operation"""
         try:
             # Delete local copy
-            local_path = os.path.join(self.data_dir, data_id)
-            if os.path.exists(local_path):
-                os.remove(local_path)
+            local_path = self._block_path(data_id)
+            await self.disk_io.write(disk_io.remove_if_exists, local_path)
 
             # Remove version from consistency manager
             await self.consistency_manager.remove_version(self.node_id, data_id)
@@ -646,16 +1514,17 @@ class ActiveNode(StorageInterface):
     async def notify_rollback(self, node: NodeState, data_id: str) -> None:
         """Notify a node to rollback a write"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.delete(
-                    f"http://{node.address}/storage/data/{data_id}",
-                    headers={"X-Operation": "rollback"},
-                ) as response:
-                    if response.status != 200:
-                        self.logger.warning(
-                            f"Rollback notification failed for node {node.node_id}: "
-                            f"HTTP {response.status}"
-                        )
+            async with self.peer_transport.request(
+                node.address,
+                "DELETE",
+                f"/storage/data/{data_id}",
+                headers={"X-Operation": "rollback"},
+            ) as response:
+                if response.status != 200:
+                    self.logger.warning(
+                        f"Rollback notification failed for node {node.node_id}: "
+                        f"HTTP {response.status}"
+                    )
         except Exception as e:
             self.logger.error(
                 f"Failed to notify rollback to node {node.node_id}: {str(e)}"
@@ -675,6 +1544,9 @@ class ActiveNode(StorageInterface):
         """Handle read requests with load balancing and consistency guarantees"""
         try:
             data_id = request.match_info["data_id"]
+            if request.headers.get(REPLICA_READ_HEADER):
+                return await self.handle_local_read(request)
+
             consistency = request.query.get(
                 "consistency", ConsistencyLevel.QUORUM.value
             )
@@ -711,16 +1583,112 @@ class ActiveNode(StorageInterface):
             self.logger.error(f"Read failed: {str(e)}")
             return web.Response(status=500, text=str(e))
 
+    def _rank_read_nodes(self, nodes: List[NodeState]) -> List[NodeState]:
+        """Order replicas for reading, closest/least loaded first"""
+        return sorted(
+            nodes,
+            key=lambda n: (
+                self.load_manager.get_node_load(n.node_id),
+                n.network_latency,
+            ),
+        )
+
+    @staticmethod
+    def _same_digest(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+        """Check whether two read results describe the same version"""
+        if a["version"] != b["version"]:
+            return False
+        if not (a.get("checksum") and b.get("checksum")):
+            return True
+        return a["checksum"] == b["checksum"]
+
+    def _digest_read_requests(
+        self, data_id: str, ranked_nodes: List[NodeState], cached: bool = False
+    ) -> List[Awaitable[Dict[str, Any]]]:
+        """Full read from the first (best) replica, digest-only reads from the rest
+
+        With ``cached`` content is expected from the block cache, so every
+        replica only sends its digest.
+        """
+        if cached:
+            return [self.read_digest_from_node(node, data_id) for node in ranked_nodes]
+        data_node, *digest_nodes = ranked_nodes
+        return [self.read_from_node(data_node, data_id)] + [
+            self.read_digest_from_node(node, data_id) for node in digest_nodes
+        ]
+
+    async def _cached_block(self, data_id: str) -> Optional[CachedBlock]:
+        """Cached content at least as new as any version known locally"""
+        return await self.block_cache.get(
+            data_id, self.consistency_manager.latest_known_version(data_id)
+        )
+
+    async def _resolve_digest_read(
+        self,
+        data_id: str,
+        responses: List[Dict[str, Any]],
+        background_repair: bool,
+        cached: Optional[CachedBlock] = None,
+    ) -> bytes:
+        """Pick the newest version from a digest read and repair stale replicas.
+
+        Content is taken from the full read or the cached block when it
+        matches the newest digest; otherwise it is fetched from the replica
+        that reported the newest digest.
+        """
+        latest = max(responses, key=ConsistencyManager.version_order)
+        self.consistency_manager.observe_version(latest["version"])
+        source = next(
+            (r for r in responses if "content" in r and self._same_digest(r, latest)),
+            None,
+        )
+        if source is None and cached is not None:
+            digest = {"version": cached.version, "checksum": cached.checksum}
+            if self._same_digest(digest, latest):
+                source = {**digest, "content": cached.content}
+        if source is None:
+            # Digests disagree with the data replica: fetch the newest version
+            source = await self.read_from_node(latest["node"], data_id)
+            if source.get("status") != "success" or not self._same_digest(
+                source, latest
+            ):
+                raise ConsistencyError(
+                    f"Failed to fetch latest version {latest['version']} of {data_id}"
+                )
+
+        if not self.consistency_manager.verify_consistency(responses):
+            repair = self.repair_inconsistency(data_id, responses, source["content"])
+            if background_repair:
+                asyncio.create_task(repair)
+            else:
+                await repair
+
+        self.block_cache.put(
+            data_id, latest["version"], latest.get("checksum") or "", source["content"]
+        )
+        return source["content"]
+
     async def handle_strong_read(
         self, data_id: str, nodes: List[NodeState]
     ) -> Optional[bytes]:
-        """Handle read with strong consistency - read from all nodes"""
+        """Handle read with strong consistency - check every replica
+
+        Content is downloaded from the closest replica only; the others
+        return just their (version, timestamp, checksum) digest. When the
+        block cache holds the newest known version every replica sends
+        only its digest, and cached content is returned only if it matches
+        the newest digest. Stale replicas are repaired before the newest
+        version is returned.
+        """
         try:
+            cached = await self._cached_block(data_id)
             # Read from all nodes in parallel
-            read_futures = []
-            for node in nodes:
-                future = self.read_from_node(node, data_id)
-                read_futures.append(future)
+            read_futures = [
+                asyncio.ensure_future(request)
+                for request in self._digest_read_requests(
+                    data_id, self._rank_read_nodes(nodes), cached is not None
+                )
+            ]
 
             # Wait for all reads with timeout
             done, pending = await asyncio.wait(
@@ -744,17 +1712,9 @@ class ActiveNode(StorageInterface):
             if not read_results:
                 return None
 
-            # Check consistency
-            if not self.consistency_manager.verify_consistency(read_results):
-                # Trigger repair if inconsistent
-                await self.repair_inconsistency(data_id, read_results)
-                raise ConsistencyError("Inconsistent data detected, repair initiated")
-
-            # Return the most recent version
-            latest_result = max(
-                read_results, key=lambda r: (r["version"], r["timestamp"])
+            return await self._resolve_digest_read(
+                data_id, read_results, background_repair=False, cached=cached
             )
-            return latest_result["content"]
 
         except Exception as e:
             self.logger.error(f"Strong read failed: {str(e)}")
@@ -763,54 +1723,53 @@ class ActiveNode(StorageInterface):
     async def handle_quorum_read(
         self, data_id: str, nodes: List[NodeState]
     ) -> Optional[bytes]:
-        """Handle read with quorum consistency"""
+        """Handle read with quorum consistency
+
+        Like strong reads, only the closest replica returns content, or none
+        does when the block cache holds it, and the rest of the quorum
+        answers with digests.
+        """
         try:
             # Calculate required quorum size
             required_reads = (len(nodes) // 2) + 1
 
-            # Read from nodes in parallel
-            read_futures = []
-            for node in nodes:
-                future = self.read_from_node(node, data_id)
-                read_futures.append(future)
-
-            # Wait for quorum with timeout
-            done, pending = await asyncio.wait(
-                read_futures,
+            # Read from nodes in parallel, returning once a quorum answers
+            cached = await self._cached_block(data_id)
+            ranked_nodes = self._rank_read_nodes(nodes)
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            quorum = await quorum_gather(
+                self._digest_read_requests(data_id, ranked_nodes, cached is not None),
+                required_reads,
                 timeout=3.0,
-                return_when=asyncio.FIRST_N_COMPLETED(required_reads),
+                is_success=lambda r: bool(r) and r.get("status") == "success",
+                keys=[node.node_id for node in ranked_nodes],
             )
+            # Only the best replica sent content unless the block was cached.
+            # Replicas cut off by the quorum took at least as long as it did.
+            data_node = None if cached is not None else ranked_nodes[0].node_id
+            elapsed = loop.time() - started
+            samples = [(o.key, o.latency) for o in quorum.successes]
+            samples += [(node_id, elapsed) for node_id in quorum.cancelled]
+            for node_id, latency in samples:
+                kind = "read" if node_id == data_node else "digest"
+                self.read_hedger.record(node_id, latency, kind)
+            for failure in quorum.failures:
+                self.logger.error(
+                    f"Read from node {failure.key} failed: {str(failure.error)}"
+                )
 
-            # Cancel pending reads
-            for task in pending:
-                task.cancel()
-
-            # Collect successful results
-            read_results = []
-            for task in done:
-                try:
-                    result = task.result()
-                    if result and result.get("status") == "success":
-                        read_results.append(result)
-                except Exception as e:
-                    self.logger.error(f"Read task failed: {str(e)}")
-
-            if len(read_results) < required_reads:
+            read_results = quorum.results
+            if not quorum.achieved:
                 raise ConsistencyError(
                     f"Failed to achieve read quorum ({len(read_results)}/{required_reads})"
                 )
 
-            # Return the most recent version from quorum
-            latest_result = max(
-                read_results, key=lambda r: (r["version"], r["timestamp"])
+            # Return the most recent version from quorum, repairing in background
+            return await self._resolve_digest_read(
+                data_id, read_results, background_repair=True, cached=cached
             )
 
-            # Schedule async repair if versions differ
-            if not all(r["version"] == latest_result["version"] for r in read_results):
-                asyncio.create_task(self.repair_inconsistency(data_id, read_results))
-
-            return latest_result["content"]
-
         except Exception as e:
             self.logger.error(f"Quorum read failed: {str(e)}")
             raise
@@ -818,63 +1777,392 @@ class ActiveNode(StorageInterface):
     async def handle_eventual_read(
         self, data_id: str, nodes: List[NodeState]
     ) -> Optional[bytes]:
-        """Handle read with eventual consistency - read from closest/least loaded node"""
-        try:
-            # Sort nodes by load and latency
-            sorted_nodes = sorted(
-                nodes,
-                key=lambda n: (
-                    self.load_manager.get_node_load(n.node_id),
-                    n.network_latency,
-                ),
+        """Handle read with eventual consistency - read from closest/least loaded node
+
+        A cached block at least as new as any version known here is
+        returned without contacting a replica. Otherwise the best replica
+        is tried first; if it has not answered within its recent p95
+        latency a hedged request goes to the next one and the first
+        success wins.
+        """
+        try:
+            cached = await self._cached_block(data_id)
+            if cached is not None:
+                return cached.content
+
+            result = await self.read_hedger.run(
+                self._rank_read_nodes(nodes),
+                lambda node: self.read_from_node(node, data_id),
+                is_success=lambda r: bool(r) and r.get("status") == "success",
+                key=lambda node: node.node_id,
             )
-
-            # Try nodes in order until successful
-            for node in sorted_nodes:
-                try:
-                    result = await self.read_from_node(node, data_id)
-                    if result and result.get("status") == "success":
-                        return result["content"]
-                except Exception as e:
-                    self.logger.warning(
-                        f"Failed to read from node {node.node_id}: {str(e)}"
-                    )
-                    continue
-
-            return None
+            if not result:
+                return None
+            self.block_cache.put(
+                data_id, result["version"], result["checksum"], result["content"]
+            )
+            return result["content"]
 
         except Exception as e:
             self.logger.error(f"Eventual read failed: {str(e)}")
             raise
 
+    async def repair_inconsistency(
+        self, data_id: str, read_results: List[Dict[str, Any]], content: bytes
+    ) -> None:
+        """Bring replicas that returned a stale digest up to the newest version"""
+        try:
+            latest = max(read_results, key=ConsistencyManager.version_order)
+            write_op = Volume(
+                data_id=data_id,
+                content=content,
+                version=latest["version"],
+                checksum=latest.get("checksum") or hashlib.sha256(content).hexdigest(),
+                timestamp=latest["timestamp"],
+            )
+            stale_nodes = [
+                r["node"] for r in read_results if not self._same_digest(r, latest)
+            ]
+            results = await asyncio.gather(
+                *[self.write_to_node(node, write_op) for node in stale_nodes],
+                return_exceptions=True,
+            )
+            for node, result in zip(stale_nodes, results):
+                if isinstance(result, Exception):
+                    self.logger.error(
+                        f"Failed to repair {data_id} on node {node.node_id}: "
+                        f"{str(result)}"
+                    )
+
+        except Exception as e:
+            self.logger.error(f"Repair of {data_id} failed: {str(e)}")
+
+    async def start_anti_entropy(self) -> None:
+        """Periodically repair divergence from peers"""
+        while True:
+            await asyncio.sleep(self.anti_entropy_config.interval)
+            try:
+                await self.run_anti_entropy_round()
+            except Exception as e:
+                self.logger.error(f"Anti-entropy round failed: {str(e)}")
+
+    async def run_anti_entropy_round(self) -> List[SyncStats]:
+        """Sync with every active peer once, one peer at a time"""
+        rounds = []
+        for node in self.get_active_nodes():
+            if node.node_id == self.node_id:
+                continue
+            try:
+                stats = await self.sync_with_peer(node)
+            except Exception as e:
+                self.logger.warning(
+                    f"Anti-entropy sync with node {node.node_id} failed: {str(e)}"
+                )
+                continue
+            self.anti_entropy_stats[node.node_id] = stats
+            if self.metrics_collector is not None:
+                self.metrics_collector.record_anti_entropy_sync(stats)
+            rounds.append(stats)
+            self.logger.info(
+                f"Anti-entropy with {node.node_id}: {stats.differing_leaves} "
+                f"differing leaves, {len(stats.repaired)} blocks repaired, "
+                f"{stats.bytes_exchanged} bytes exchanged"
+            )
+        return rounds
+
+    async def sync_with_peer(self, node: NodeState) -> SyncStats:
+        """Pull the blocks a peer holds newer copies of, guided by Merkle trees"""
+        config = self.anti_entropy_config
+        tree, leaf_entries = self._merkle_view(node.node_id)
+        stats = SyncStats(peer_id=node.node_id)
+
+        async def exchange(
+            path: str, body: Dict[str, Any]
+        ) -> Tuple[Dict[str, Any], int]:
+            payload = json.dumps(body).encode("utf-8")
+            async with self.peer_transport.request(
+                node.address,
+                "POST",
+                path,
+                data=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=config.request_timeout,
+            ) as response:
+                raw = await response.read()
+                if response.status != 200:
+                    raise ConsistencyError(
+                        f"Anti-entropy request to {node.node_id} failed: "
+                        f"HTTP {response.status}: {raw.decode('utf-8', 'replace')}"
+                    )
+            stats.round_trips += 1
+            return json.loads(raw), len(payload) + len(raw)
+
+        async def fetch_hashes(level: int, indices: List[int]) -> List[int]:
+            reply, size = await exchange(
+                anti_entropy.HASHES_PATH,
+                {
+                    "node_id": self.node_id,
+                    "depth": tree.depth,
+                    "level": level,
+                    "indices": indices,
+                },
+            )
+            stats.hash_bytes += size
+            return anti_entropy.decode_hashes(reply["hashes"])
+
+        leaves = await anti_entropy.find_divergent_leaves(tree, fetch_hashes)
+        stats.differing_leaves = len(leaves)
+
+        wanted = []
+        for start in range(0, len(leaves), config.leaves_per_request):
+            batch = leaves[start:start + config.leaves_per_request]
+            reply, size = await exchange(
+                anti_entropy.LEAVES_PATH,
+                {"node_id": self.node_id, "depth": tree.depth, "leaves": batch},
+            )
+            stats.listing_bytes += size
+            for leaf in batch:
+                remote = anti_entropy.decode_entries(reply["leaves"].get(str(leaf), []))
+                local = leaf_entries(leaf)
+                # Keys we lack are only pulled if placement puts them here
+                wanted.extend(
+                    (data_id, entry)
+                    for data_id, entry in anti_entropy.newer_on_peer(local, remote)
+                    if data_id in local or self._should_hold(data_id)
+                )
+            if len(wanted) >= config.max_repairs_per_peer:
+                break
+
+        semaphore = asyncio.Semaphore(config.repair_concurrency)
+
+        async def pull(data_id: str) -> None:
+            async with semaphore:
+                if await self._pull_block_from(node, data_id, stats):
+                    stats.repaired.append(data_id)
+                else:
+                    stats.failed.append(data_id)
+
+        await asyncio.gather(
+            *[pull(data_id) for data_id, _ in wanted[:config.max_repairs_per_peer]]
+        )
+        return stats
+
+    async def _pull_block_from(
+        self, node: NodeState, data_id: str, stats: SyncStats
+    ) -> bool:
+        """Copy a peer's block locally if it is newer than ours"""
+        try:
+            self._block_path(data_id)
+        except ValueError as e:
+            self.logger.error(f"Not pulling from node {node.node_id}: {str(e)}")
+            return False
+        result = await self.read_from_node(node, data_id)
+        if result.get("status") != "success":
+            return False
+        content = result["content"]
+        stats.block_bytes += len(content)
+        if hashlib.sha256(content).hexdigest() != result["checksum"]:
+            self.logger.error(
+                f"Checksum mismatch pulling {data_id} from node {node.node_id}"
+            )
+            return False
+
+        # A write may have landed while the block was in flight
+        current = self.consistency_manager.get_node_version(self.node_id, data_id)
+        if current is not None and ConsistencyManager.version_order(
+            {"version": current.version, "checksum": current.checksum}
+        ) >= ConsistencyManager.version_order(result):
+            return True
+
+        await self._store_replica_block(
+            BlockRecord(
+                data_id=data_id,
+                version=result["version"],
+                checksum=result["checksum"],
+                timestamp=result["timestamp"],
+                content=content,
+            )
+        )
+        return True
+
+    def _merkle_view(
+        self, peer_id: Optional[str]
+    ) -> Tuple[MerkleTree, Callable[[int], Dict[str, Tuple[int, str]]]]:
+        """Merkle tree to compare with a peer, and its leaf listings
+
+        With both nodes on the placement ring this covers only the blocks
+        placement gives to both of them; otherwise it is the node's own
+        tree over everything it holds.
+        """
+        if (
+            peer_id is None
+            or self.node_id not in self.hash_ring
+            or peer_id not in self.hash_ring
+        ):
+            return (
+                self.consistency_manager.merkle_tree,
+                self.consistency_manager.get_leaf_entries,
+            )
+
+        now = time.monotonic()
+        ttl = self.anti_entropy_config.shared_tree_ttl
+        if self._shared_trees_at is None or now - self._shared_trees_at > ttl:
+            self._shared_entries = self._scan_shared_entries()
+            self._shared_trees = {}
+            self._shared_trees_at = now
+        shared = self._shared_trees.get(peer_id)
+        if shared is None:
+            shared = anti_entropy.SharedTree(
+                self._shared_entries.get(peer_id, {}),
+                self.consistency_manager.merkle_tree.depth,
+            )
+            self._shared_trees[peer_id] = shared
+        return shared.tree, shared.leaf_entries
+
+    def _scan_shared_entries(self) -> Dict[str, Dict[str, Tuple[int, str]]]:
+        """Blocks held here by the other nodes placement also puts them on"""
+        copies = self.replication_manager.min_replicas
+        shared: Dict[str, Dict[str, Tuple[int, str]]] = {}
+        for data_id, entry in self.consistency_manager.get_local_entries().items():
+            owners = self.hash_ring.owners(data_id, copies)
+            if self.node_id not in owners:
+                continue  # a leftover copy; rebalancing removes it
+            for owner in owners:
+                if owner != self.node_id:
+                    shared.setdefault(owner, {})[data_id] = entry
+        return shared
+
+    async def handle_merkle_hashes(self, request) -> web.Response:
+        """Serve hashes of the Merkle tree shared with the caller for one level"""
+        try:
+            body = await request.json()
+            tree, _ = self._merkle_view(body.get("node_id"))
+            if body["depth"] != tree.depth:
+                return web.Response(
+                    status=409, text=f"Merkle tree depth is {tree.depth}"
+                )
+            hashes = tree.hashes(body["level"], body["indices"])
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            return web.Response(status=400, text=str(e))
+        return web.json_response({"hashes": anti_entropy.encode_hashes(hashes)})
+
+    async def handle_merkle_leaves(self, request) -> web.Response:
+        """Serve (data_id, version, checksum) listings of Merkle leaves"""
+        try:
+            body = await request.json()
+            tree, leaf_entries = self._merkle_view(body.get("node_id"))
+            if body["depth"] != tree.depth:
+                return web.Response(
+                    status=409, text=f"Merkle tree depth is {tree.depth}"
+                )
+            leaves = {
+                str(leaf): anti_entropy.encode_entries(leaf_entries(leaf))
+                for leaf in body["leaves"]
+            }
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            return web.Response(status=400, text=str(e))
+        return web.json_response({"leaves": leaves})
+
+    @staticmethod
+    def _parse_version_headers(node: NodeState, headers) -> Dict[str, Any]:
+        """Build a successful read result from version headers"""
+        return {
+            "status": "success",
+            "node": node,
+            "version": int(headers.get("X-Version", "0")),
+            "timestamp": datetime.fromisoformat(
+                headers.get("X-Timestamp", datetime.min.isoformat())
+            ),
+            "checksum": headers.get("X-Checksum", ""),
+        }
+
     async def read_from_node(self, node: NodeState, data_id: str) -> Dict[str, Any]:
         """Read data from a specific node"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"http://{node.address}/storage/data/{data_id}"
-                ) as response:
-                    if response.status == 200:
-                        return {
-                            "status": "success",
-                            "content": await response.read(),
-                            "version": int(response.headers.get("X-Version", "0")),
-                            "timestamp": datetime.fromisoformat(
-                                response.headers.get(
-                                    "X-Timestamp", datetime.min.isoformat()
-                                )
-                            ),
-                        }
-                    else:
-                        return {
-                            "status": "error",
-                            "error": f"HTTP {response.status}: {await response.text()}",
-                        }
+            async with self.peer_transport.request(
+                node.address,
+                "GET",
+                f"/storage/data/{data_id}",
+                headers={REPLICA_READ_HEADER: "1"},
+            ) as response:
+                if response.status == 200:
+                    result = self._parse_version_headers(node, response.headers)
+                    result["content"] = await response.read()
+                    return result
+                else:
+                    return {
+                        "status": "error",
+                        "error": f"HTTP {response.status}: {await response.text()}",
+                    }
 
         except Exception as e:
             self.logger.error(f"Failed to read from node {node.node_id}: {str(e)}")
             return {"status": "error", "error": str(e)}
 
+    async def read_digest_from_node(
+        self, node: NodeState, data_id: str
+    ) -> Dict[str, Any]:
+        """Read only the version digest of data from a specific node"""
+        try:
+            async with self.peer_transport.request(
+                node.address, "HEAD", f"/storage/data/{data_id}"
+            ) as response:
+                if response.status == 200:
+                    return self._parse_version_headers(node, response.headers)
+                return {"status": "error", "error": f"HTTP {response.status}"}
+
+        except Exception as e:
+            self.logger.error(
+                f"Failed to read digest from node {node.node_id}: {str(e)}"
+            )
+            return {"status": "error", "error": str(e)}
+
+    async def handle_local_read(self, request) -> web.StreamResponse:
+        """Serve this node's copy of a block straight from disk
+
+        Whole-file and Range requests are both answered with FileResponse,
+        which hands the file to the kernel via sendfile, so the payload is
+        never read on the event loop or copied into Python memory.
+        """
+        data_id = request.match_info["data_id"]
+        try:
+            block_path = self._block_path(data_id)
+        except ValueError as e:
+            return web.Response(status=400, text=str(e))
+        version_data = self.consistency_manager.get_node_version(self.node_id, data_id)
+        if version_data is None:
+            return web.Response(status=404, text="Data not found")
+
+        path = version_data.location or block_path
+        if not await self.disk_io.read(os.path.isfile, path):
+            return web.Response(status=404, text="Data not found")
+
+        return web.FileResponse(
+            path,
+            chunk_size=self.write_chunk_size,
+            headers={
+                "Content-Type": "application/octet-stream",
+                "X-Version": str(version_data.version),
+                "X-Timestamp": version_data.timestamp.isoformat(),
+                "X-Checksum": version_data.checksum,
+            },
+        )
+
+    async def handle_digest_read(self, request) -> web.Response:
+        """Serve the version digest of locally held data without its content"""
+        data_id = request.match_info["data_id"]
+        version_data = self.consistency_manager.get_node_version(self.node_id, data_id)
+        if version_data is None:
+            return web.Response(status=404)
+        return web.Response(
+            status=200,
+            headers={
+                "X-Version": str(version_data.version),
+                "X-Timestamp": version_data.timestamp.isoformat(),
+                "X-Checksum": version_data.checksum,
+            },
+        )
+
     async def find_nodes_with_data(self, data_id: str) -> List[NodeState]:
         """Find all nodes that have a copy of the data"""
         try:
@@ -882,9 +2170,7 @@ class ActiveNode(StorageInterface):
             active_nodes = self.get_active_nodes()
 
             # Check version map first for efficiency
-            nodes_in_map = set(
-                self.consistency_manager.version_map.get(data_id, {}).keys()
-            )
+            nodes_in_map = set(self.consistency_manager.get_replica_nodes(data_id))
 
             # Filter active nodes that have the data
             return [node for node in active_nodes if node.node_id in nodes_in_map]
@@ -896,14 +2182,17 @@ class ActiveNode(StorageInterface):
     async def write_local(self, path: str, content: bytes) -> None:
         """Write data locally with proper locking"""
         async with self.consistency_manager.get_write_lock(path):
-            with open(path, "wb") as f:
-                f.write(content)
+            await self.block_writer.write(path, content)
 
     async def read_local(self, path: str) -> bytes:
         """Read data locally with proper locking"""
         async with self.consistency_manager.get_read_lock(path):
-            with open(path, "rb") as f:
-                return f.read()
+            return await self.disk_io.read(disk_io.read_file, path)
+
+    async def read_local_range(self, path: str, offset: int, length: int) -> memoryview:
+        """Read part of a local block as a memory-mapped slice"""
+        async with self.consistency_manager.get_read_lock(path):
+            return await self.disk_io.read(_map_file_range, path, offset, length)
 
     def get_active_nodes(self) -> List[NodeState]:
         """Get list of active nodes in the cluster"""
@@ -920,28 +2209,415 @@ class ActiveNode(StorageInterface):
         while True:
             try:
                 # Update local node state
+                meta = await self._local_meta()
                 self.cluster_nodes[self.node_id] = NodeState(
                     node_id=self.node_id,
                     status="active",
-                    load=self.load_manager.get_current_load(),
-                    capacity=self.load_manager.get_capacity(),
                     last_heartbeat=datetime.now(),
-                    address="",
-                    available_storage=0.0,
+                    load=self.load_manager.get_current_load(),
+                    available_storage=meta["available_storage"],
+                    network_latency=0.0,
+                    volumes=[],
+                    address=self.membership.local.address,
+                    total_storage=meta["total_storage"],
+                    zone=self.zone,
+                    region=self.region,
                 )
+                self.membership.update_local_meta(meta)
 
-                # Get states from other nodes
-                node_states = await self.fetch_node_states()
-                self.cluster_nodes.update(node_states)
+                # Get states of other nodes from gossip
+                self._merge_membership()
 
                 # Clean up inactive nodes
                 self.remove_inactive_nodes()
+                self._sync_hash_ring()
+
+                # Nodes whose heartbeat is back get the writes they missed
+                self.replay_hints()
 
             except Exception as e:
                 self.logger.error(f"Failed to update cluster state: {str(e)}")
 
             await asyncio.sleep(5)  # Update every 5 seconds
 
+    async def _local_meta(self) -> Dict[str, Any]:
+        """Placement metadata gossiped with this node's membership"""
+        usage = await self.disk_io.read(shutil.disk_usage, self.data_dir)
+        # Rounded so ordinary writes do not trigger a new announcement
+        return {
+            "available_storage": usage.free - usage.free % (1 << 30),
+            "total_storage": usage.total,
+            "zone": self.zone,
+            "region": self.region,
+        }
+
+    def _merge_membership(self) -> None:
+        """Fold the gossip view of other nodes into cluster_nodes"""
+        now = datetime.now()
+        for member in self.membership.members.values():
+            state = self.cluster_nodes.get(member.node_id)
+            if state is None:
+                if member.status == MemberStatus.DEAD:
+                    continue
+                state = NodeState(
+                    node_id=member.node_id,
+                    status="active",
+                    last_heartbeat=now,
+                    load=0.0,
+                    available_storage=0,
+                    network_latency=0.0,
+                    volumes=[],
+                )
+                self.cluster_nodes[member.node_id] = state
+            state.address = member.address
+            state.available_storage = member.meta.get(
+                "available_storage", state.available_storage
+            )
+            state.total_storage = member.meta.get("total_storage", state.total_storage)
+            state.zone = member.meta.get("zone", state.zone)
+            state.region = member.meta.get("region", state.region)
+            if member.status == MemberStatus.DEAD:
+                state.status = "inactive"
+            else:
+                # Suspects stay active until gossip gives up on them
+                state.status = "active"
+                state.last_heartbeat = now
+            if member.status == MemberStatus.ALIVE and (
+                self.hinted_handoff.is_unreachable(member.node_id)
+            ):
+                # Gossip reaches the node again: deliver the writes it missed
+                self.hinted_handoff.schedule_replay(state)
+
+    def _gossip_message(self) -> Dict[str, Any]:
+        return {
+            "from": self.membership.local.to_wire(),
+            "updates": self.membership.piggyback(),
+            "metrics": self._metrics_digest(),
+        }
+
+    def _receive_gossip(self, body: Dict[str, Any]) -> None:
+        self.membership.apply(Member.from_wire(body["from"]))
+        for update in body.get("updates", []) + body.get("members", []):
+            self.membership.apply(Member.from_wire(update))
+        for report in body.get("metrics", []):
+            if report["node_id"] != self.node_id:
+                self.cluster_metrics.merge_wire(report)
+
+    async def _gossip_exchange(
+        self, address: str, path: str, body: Dict[str, Any], timeout: float
+    ) -> Optional[Dict[str, Any]]:
+        """Send a gossip message and merge the reply; None if there was none"""
+        payload = json.dumps(dict(body, **self._gossip_message())).encode("utf-8")
+        try:
+            async with self.peer_transport.request(
+                address,
+                "POST",
+                path,
+                data=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=timeout,
+            ) as response:
+                if response.status != 200:
+                    return None
+                reply = await response.json()
+            self._receive_gossip(reply)
+            return reply
+        except Exception as e:
+            self.logger.debug(f"Gossip to {address} failed: {str(e)}")
+            return None
+
+    async def handle_gossip_ping(self, request: web.Request) -> web.Response:
+        """Answer a probe, exchanging membership updates"""
+        try:
+            body = await request.json()
+            self._receive_gossip(body)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            return web.Response(status=400, text=f"Invalid gossip message: {str(e)}")
+        reply = self._gossip_message()
+        if body.get("sync"):
+            # A joining node gets the full member list in one go
+            reply["members"] = [
+                member.to_wire() for member in self.membership.members.values()
+            ]
+        return web.json_response(reply)
+
+    async def handle_gossip_ping_req(self, request: web.Request) -> web.Response:
+        """Probe a member on behalf of a node that could not reach it"""
+        try:
+            body = await request.json()
+            self._receive_gossip(body)
+            target = Member.from_wire(body["target"])
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            return web.Response(status=400, text=f"Invalid gossip message: {str(e)}")
+        reply = await self._gossip_exchange(
+            target.address, gossip.PING_PATH, {}, self.membership.config.ping_timeout
+        )
+        return web.json_response(dict(self._gossip_message(), ack=reply is not None))
+
+    async def probe_member(self, member: Member) -> bool:
+        """Probe a member directly, then through others; suspect it if all fail"""
+        config = self.membership.config
+        if await self._gossip_exchange(
+            member.address, gossip.PING_PATH, {}, config.ping_timeout
+        ) is not None:
+            return True
+
+        helpers = self.membership.indirect_helpers(member.node_id)
+        if helpers:
+            timeout = max(
+                config.protocol_period - config.ping_timeout, config.ping_timeout
+            )
+            probes = [
+                asyncio.ensure_future(
+                    self._gossip_exchange(
+                        helper.address,
+                        gossip.PING_REQ_PATH,
+                        {"target": member.to_wire()},
+                        timeout,
+                    )
+                )
+                for helper in helpers
+            ]
+            try:
+                for probe in asyncio.as_completed(probes):
+                    reply = await probe
+                    if reply is not None and reply.get("ack"):
+                        return True
+            finally:
+                for probe in probes:
+                    probe.cancel()
+
+        if self.membership.suspect(member.node_id):
+            self.logger.warning(
+                f"Node {member.node_id} missed its probes, suspecting it"
+            )
+        return False
+
+    async def run_gossip_round(self) -> None:
+        """Probe one member and apply suspicion timeouts"""
+        target = self.membership.next_probe_target()
+        if target is not None:
+            await self.probe_member(target)
+        for member in self.membership.expire():
+            self.logger.warning(f"Node {member.node_id} declared dead by gossip")
+        self._merge_membership()
+
+    async def start_gossip(self) -> None:
+        """Run the membership protocol, one probe per protocol period"""
+        loop = asyncio.get_running_loop()
+        period = self.membership.config.protocol_period
+        while True:
+            started = loop.time()
+            try:
+                await self.run_gossip_round()
+            except Exception as e:
+                self.logger.error(f"Gossip round failed: {str(e)}")
+            await asyncio.sleep(max(0.0, period - (loop.time() - started)))
+
+    async def join_cluster(self, seeds: List[str]) -> int:
+        """Introduce this node to the cluster through seed addresses
+
+        Returns:
+            Number of seeds that answered
+        """
+        replies = await asyncio.gather(
+            *[
+                self._gossip_exchange(
+                    address,
+                    gossip.PING_PATH,
+                    {"sync": True},
+                    self.membership.config.ping_timeout * 4,
+                )
+                for address in seeds
+            ]
+        )
+        self._merge_membership()
+        return sum(reply is not None for reply in replies)
+
+    def _sync_hash_ring(self) -> None:
+        """Bring the placement ring in line with the active nodes.
+
+        Only members that joined, left or changed capacity or zone have
+        their virtual nodes moved, so about 1/N of the keys change owner
+        per membership change. All members move only when the typical
+        capacity doubles or halves (see ``capacity_unit``).
+        """
+        nodes = self.get_active_nodes()
+        self._capacity_unit = capacity_unit(
+            [getattr(node, "total_storage", None) for node in nodes],
+            self._capacity_unit,
+        )
+        members = [
+            RingMember(
+                node_id=node.node_id,
+                weight=capacity_weight(
+                    getattr(node, "total_storage", None), self._capacity_unit
+                ),
+                zone=getattr(node, "zone", None),
+                region=getattr(node, "region", None),
+                node=node,
+            )
+            for node in nodes
+        ]
+        added, removed = self.hash_ring.sync(members)
+        if added or removed:
+            self.logger.info(
+                f"Hash ring updated: {len(added)} placed, {len(removed)} removed, "
+                f"{len(self.hash_ring)} members"
+            )
+
+    def _should_hold(self, data_id: str) -> bool:
+        """Whether placement puts a copy of ``data_id`` on this node"""
+        if self.node_id not in self.hash_ring:
+            return True  # no placement information; keep everything
+        return self.node_id in self.hash_ring.owners(
+            data_id, self.replication_manager.min_replicas
+        )
+
+    async def local_metrics(self) -> Dict[str, float]:
+        """Load metrics this node reports through gossip"""
+        load = self.load_manager.get_current_metrics()
+        usage = await self.disk_io.read(shutil.disk_usage, self.data_dir)
+
+        # Share of disk operations that failed since the previous report
+        disk_metrics = self.disk_io.get_metrics()
+        if self.metrics_collector is not None:
+            self.metrics_collector.update_disk_io_metrics(disk_metrics)
+        pools = disk_metrics["pools"]
+        done = sum(pool.completed + pool.failed for pool in pools.values())
+        failed = sum(pool.failed for pool in pools.values())
+        last_done, last_failed = self._disk_op_totals
+        self._disk_op_totals = (done, failed)
+        ops = done - last_done
+
+        write_pool = pools[IOPool.WRITE.value]
+        return {
+            "cpu_usage": load.cpu_usage,
+            "memory_usage": load.memory_usage,
+            "disk_usage": usage.used / usage.total * 100 if usage.total else 0.0,
+            "error_rate": (failed - last_failed) / ops if ops else 0.0,
+            "queue_depth": write_pool.queued + write_pool.blocked,
+        }
+
+    async def refresh_local_metrics(self) -> None:
+        """Record this node's load; gossip carries it to the other nodes"""
+        self.cluster_metrics.update(
+            self.node_id, await self.local_metrics(), time.time()
+        )
+        self.cluster_metrics.retain(
+            [self.node_id] + [node.node_id for node in self.get_active_nodes()]
+        )
+
+    async def start_metrics_reports(self) -> None:
+        """Periodically refresh the load report this node gossips"""
+        while True:
+            try:
+                await self.refresh_local_metrics()
+            except Exception as e:
+                self.logger.error(f"Failed to refresh local metrics: {str(e)}")
+            await asyncio.sleep(self.cluster_metrics_config.interval)
+
+    def _metrics_digest(self) -> List[Dict[str, Any]]:
+        """Load reports for a gossip message: ours and a sample of others'"""
+        others = [
+            node_id
+            for node_id in self.cluster_metrics.fresh()
+            if node_id != self.node_id
+        ]
+        limit = self.cluster_metrics_config.max_relayed
+        if len(others) > limit:
+            others = random.sample(others, limit)
+        reports = [self.cluster_metrics.to_wire(n) for n in [self.node_id] + others]
+        return [report for report in reports if report is not None]
+
+    def publish_invalidation(self, data_id: str, version: int) -> None:
+        """Announce a newly written version to every peer's block cache
+
+        Announcements are coalesced and sent once per tick; see
+        ``invalidation``.
+        """
+        self.invalidations.add(data_id, version)
+        if self._invalidation_task is None or self._invalidation_task.done():
+            self._invalidation_task = asyncio.create_task(self.send_invalidations())
+
+    async def send_invalidations(self) -> None:
+        """Send pending invalidations to every active peer, a batch per tick"""
+        config = self.invalidation_config
+        while len(self.invalidations):
+            # Writes made during the tick join the same batch
+            await asyncio.sleep(config.tick)
+            batch = self.invalidations.drain(config.max_batch)
+            payload = json.dumps(
+                {"node_id": self.node_id, "invalidations": batch}
+            ).encode("utf-8")
+            peers = [
+                node for node in self.get_active_nodes() if node.node_id != self.node_id
+            ]
+            semaphore = asyncio.Semaphore(config.concurrency)
+
+            async def send(node: NodeState) -> None:
+                async with semaphore:
+                    try:
+                        async with self.peer_transport.request(
+                            node.address,
+                            "POST",
+                            INVALIDATE_PATH,
+                            data=payload,
+                            headers={"Content-Type": "application/json"},
+                            timeout=config.request_timeout,
+                        ) as response:
+                            if response.status != 200:
+                                self.logger.debug(
+                                    f"Invalidation to node {node.node_id} failed: "
+                                    f"HTTP {response.status}"
+                                )
+                    except Exception as e:
+                        # Best effort; the peer's version checks and TTL cover it
+                        self.logger.debug(
+                            f"Invalidation to node {node.node_id} failed: {str(e)}"
+                        )
+
+            await asyncio.gather(*[send(node) for node in peers])
+
+    async def handle_cache_invalidation(self, request: web.Request) -> web.Response:
+        """Drop cached blocks older than versions written on another node"""
+        try:
+            body = await request.json()
+            invalidations = [
+                (str(data_id), int(version))
+                for data_id, version in body["invalidations"]
+            ]
+        except (ValueError, KeyError, TypeError) as e:
+            return web.Response(status=400, text=f"Invalid invalidation: {str(e)}")
+
+        for data_id, version in invalidations:
+            self.block_cache.invalidate(data_id, version)
+            self.consistency_manager.observe_version(version)
+        return web.json_response({"applied": len(invalidations)})
+
+    def replay_hints(self) -> None:
+        """Start replaying hinted writes to every active node that has some"""
+        for node in self.get_active_nodes():
+            if node.node_id != self.node_id:
+                self.hinted_handoff.schedule_replay(node)
+
+    async def _hint_write(
+        self, node: Any, record: BlockRecord, unreachable: bool = True
+    ) -> None:
+        """Keep a write for a replica that did not get it, for later replay.
+
+        A replica that is still reachable (it was only cut off once a quorum
+        answered) gets its hints replayed right away.
+        """
+        try:
+            await self.hinted_handoff.store(node.node_id, record, unreachable)
+            if not unreachable:
+                self.hinted_handoff.schedule_replay(node)
+        except Exception as e:
+            self.logger.error(
+                f"Failed to store hint for node {node.node_id}: {str(e)}"
+            )
+
     def remove_inactive_nodes(self) -> None:
         """Remove nodes that haven't sent heartbeat recently"""
         now = datetime.now()
@@ -964,7 +2640,7 @@ class ActiveNode(StorageInterface):
 
             # Select target nodes based on load and health
             target_nodes = await self.select_write_targets(
-                data_size=len(content), min_nodes=self.quorum_size
+                data_size=len(content), min_nodes=self.quorum_size, data_id=data_id
             )
 
             if len(target_nodes) < self.quorum_size:
@@ -981,8 +2657,18 @@ class ActiveNode(StorageInterface):
                 timestamp=datetime.now(),
             )
 
-            # Execute parallel writes with load-aware routing
-            results = await self.execute_parallel_write(write_op, target_nodes)
+            # Execute parallel writes with load-aware routing; replicas known
+            # to be down are not tried again and count as failed
+            reachable = [
+                node for node in target_nodes
+                if not self.hinted_handoff.is_unreachable(node.node_id)
+            ]
+            results = await self.execute_parallel_write(write_op, reachable)
+            results.extend(
+                {"node_id": node.node_id, "status": "unreachable"}
+                for node in target_nodes
+                if node not in reachable
+            )
 
             # Validate results based on consistency level
             success = await self.validate_write_results(results, consistency_level)
@@ -991,8 +2677,22 @@ class ActiveNode(StorageInterface):
                 await self.rollback_write(write_op, target_nodes)
                 raise WriteFailureError("Failed to achieve required write consistency")
 
+            # Replicas that missed the write get it when they return
+            succeeded = {r["node_id"] for r in results if r.get("status") == "success"}
+            record = BlockRecord(
+                data_id=data_id,
+                version=version,
+                checksum=checksum,
+                timestamp=write_op.timestamp,
+                content=content,
+            )
+            for node in target_nodes:
+                if node.node_id not in succeeded:
+                    await self._hint_write(node, record)
+
             # Update metadata and return success
             await self.update_write_metadata(write_op, results)
+            self.publish_invalidation(data_id, version)
             return {
                 "status": "success",
                 "version": version,
@@ -1005,10 +2705,35 @@ class ActiveNode(StorageInterface):
             raise
 
     async def select_write_targets(
-        self, data_size: int, min_nodes: int
+        self, data_size: int, min_nodes: int, data_id: Optional[str] = None
     ) -> List[NodeState]:
-        """Select optimal nodes for write operation based on load and health"""
+        """Select optimal nodes for write operation based on load and health
+
+        With a ``data_id`` the targets come from the key's preference list
+        on the hash ring, skipping nodes without room for the data; this
+        is a local lookup with no requests to other nodes.
+        """
         try:
+            if data_id is not None and len(self.hash_ring):
+                members = self.hash_ring.preference_list(
+                    data_id,
+                    min_nodes,
+                    accept=lambda member: (
+                        member.node is not None
+                        and member.node.status == "active"
+                        and member.node.available_storage >= data_size * 1.5
+                        and not self._is_node_degraded(
+                            self.cluster_metrics.get(member.node_id) or {}
+                        )
+                    ),
+                )
+                if len(members) < min_nodes:
+                    raise InsufficientNodesError(
+                        f"Not enough healthy nodes. "
+                        f"Need {min_nodes}, got {len(members)}"
+                    )
+                return [member.node for member in members]
+
             # Get all healthy nodes
             healthy_nodes = [
                 node
@@ -1021,14 +2746,15 @@ class ActiveNode(StorageInterface):
 
             if len(healthy_nodes) < min_nodes:
                 raise InsufficientNodesError(
-                    f"Not enough healthy nodes. Need {min_nodes}, got {len(healthy_nodes)}"
+                    f"Not enough healthy nodes. "
+                    f"Need {min_nodes}, got {len(healthy_nodes)}"
                 )
 
             # Score nodes based on multiple factors
             scored_nodes = []
             for node in healthy_nodes:
-                # Get real-time metrics
-                metrics = await self.get_node_metrics(node)
+                # Metrics as of the node's last report; stale ones are unknown
+                metrics = self.cluster_metrics.get(node.node_id)
                 if not metrics:
                     continue
 
@@ -1068,8 +2794,10 @@ class ActiveNode(StorageInterface):
             # Recent error rate (0-1, inverse of error rate)
             error_score = 1 - min(1.0, metrics.get("error_rate", 0) * 20)
 
-            # Write queue length score (0-1, inverse of queue length)
-            queue_score = 1 - min(1.0, len(node.write_queue) / 100)
+            # Write queue length score (0-1, inverse of queue length); the
+            # node's own disk queue counts as well as our writes to it
+            queue_depth = max(len(node.write_queue), metrics.get("queue_depth", 0))
+            queue_score = 1 - min(1.0, queue_depth / 100)
 
             # Weight factors
             weights = {
@@ -1109,8 +2837,10 @@ class ActiveNode(StorageInterface):
             # Prepare write tasks
             write_tasks = []
             for node in target_nodes:
-                task = self.write_to_node(node, write_op)
+                task = asyncio.ensure_future(self.write_to_node(node, write_op))
                 write_tasks.append(task)
+            if not write_tasks:
+                return []
 
             # Execute writes in parallel with timeout
             results = []
@@ -1125,8 +2855,16 @@ class ActiveNode(StorageInterface):
                 for task in pending:
                     task.cancel()
 
-                # Collect results
-                results = [task.result() for task in done]
+                # Collect results; a failed node is reported, not raised
+                for node, task in zip(target_nodes, write_tasks):
+                    if task in done and task.exception() is None:
+                        results.append(task.result())
+                    else:
+                        error = task.exception() if task in done else "timed out"
+                        self.logger.warning(
+                            f"Write to node {node.node_id} failed: {error}"
+                        )
+                        results.append({"node_id": node.node_id, "status": "failed"})
 
             except asyncio.TimeoutError:
                 self.logger.error("Parallel write operation timed out")
@@ -1157,30 +2895,37 @@ class ActiveNode(StorageInterface):
 
                 try:
                     # Perform write operation
-                    async with aiohttp.ClientSession() as session:
-                        async with session.post(
-                            f"http://{node.address}/write",
-                            data={
-                                "data_id": write_op.data_id,
-                                "content": write_op.content.hex(),
+                    frame = encode_frame(
+                        [
+                            BlockRecord(
+                                data_id=write_op.data_id,
+                                version=write_op.version,
+                                checksum=write_op.checksum,
+                                timestamp=write_op.timestamp,
+                                content=write_op.content,
+                            )
+                        ]
+                    )
+                    async with self.peer_transport.request(
+                        node.address,
+                        "POST",
+                        WRITE_PATH,
+                        data=frame,
+                        headers={"Content-Type": BLOCK_FRAME_CONTENT_TYPE},
+                        timeout=10.0,
+                    ) as response:
+                        if response.status == 200:
+                            return {
+                                "node_id": node.node_id,
+                                "status": "success",
                                 "version": write_op.version,
-                                "checksum": write_op.checksum,
                                 "timestamp": write_op.timestamp.isoformat(),
-                            },
-                            timeout=10.0,
-                        ) as response:
-                            if response.status == 200:
-                                result = await response.json()
-                                return {
-                                    "node_id": node.node_id,
-                                    "status": "success",
-                                    "version": write_op.version,
-                                    "timestamp": write_op.timestamp.isoformat(),
-                                }
-                            else:
-                                raise WriteFailureError(
-                                    f"Write to node {node.node_id} failed with status {response.status}"
-                                )
+                            }
+                        else:
+                            raise WriteFailureError(
+                                f"Write to node {node.node_id} failed "
+                                f"with status {response.status}"
+                            )
 
                 finally:
                     # Remove from write queue
@@ -1239,22 +2984,140 @@ class ActiveNode(StorageInterface):
     async def rollback_node_write(self, node: NodeState, write_op: Volume) -> None:
         """Rollback write on a single node"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"http://{node.address}/rollback",
-                    data={"data_id": write_op.data_id, "version": write_op.version},
-                    timeout=5.0,
-                ) as response:
-                    if response.status != 200:
-                        self.logger.error(
-                            f"Failed to rollback write on node {node.node_id}"
-                        )
+            frame = encode_frame(
+                [
+                    BlockRecord(
+                        data_id=write_op.data_id,
+                        version=write_op.version,
+                        checksum="",
+                        timestamp=write_op.timestamp,
+                    )
+                ],
+                op=BlockOp.ROLLBACK,
+            )
+            async with self.peer_transport.request(
+                node.address,
+                "POST",
+                ROLLBACK_PATH,
+                data=frame,
+                headers={"Content-Type": BLOCK_FRAME_CONTENT_TYPE},
+                timeout=5.0,
+            ) as response:
+                if response.status != 200:
+                    self.logger.error(
+                        f"Failed to rollback write on node {node.node_id}"
+                    )
 
         except Exception as e:
             self.logger.error(
                 f"Error during write rollback on node {node.node_id}: {str(e)}"
             )
 
+    async def handle_binary_write(self, request) -> web.Response:
+        """Apply a frame of block writes sent by a peer."""
+        try:
+            op, records = decode_frame(await request.read())
+        except BlockProtocolError as e:
+            return web.Response(status=400, text=str(e))
+        if op != BlockOp.WRITE:
+            return web.Response(status=400, text=f"Expected write frame, got {op.name}")
+
+        # Reject the whole frame before touching disk if any block is corrupt
+        # or would be stored outside the data directory
+        for record in records:
+            try:
+                self._block_path(record.data_id)
+            except ValueError as e:
+                return web.Response(status=400, text=str(e))
+            if hashlib.sha256(record.content).hexdigest() != record.checksum:
+                return web.Response(
+                    status=422, text=f"Checksum mismatch for block {record.data_id}"
+                )
+
+        stored, stale = [], []
+        try:
+            for record in records:
+                # A replayed hint or a late retry must never roll a block back
+                current = self.consistency_manager.get_node_version(
+                    self.node_id, record.data_id
+                )
+                if current is not None and (current.version, current.checksum) > (
+                    record.version,
+                    record.checksum,
+                ):
+                    stale.append(record.data_id)
+                    continue
+                await self._store_replica_block(record)
+                stored.append(record.data_id)
+            await self._sync_version_log()
+        except Exception as e:
+            self.logger.error(f"Binary write failed: {str(e)}")
+            return web.Response(status=500, text=str(e))
+
+        return web.json_response(
+            {"status": "success", "blocks": stored, "stale": stale}
+        )
+
+    async def _sync_version_log(self) -> None:
+        """Make logged version records as durable as the blocks they describe"""
+        if self.block_writer.level != DurabilityLevel.NONE:
+            await self.consistency_manager.sync_log()
+
+    async def _store_replica_block(self, record: BlockRecord) -> None:
+        """Write a block received from a peer and record its version"""
+        path = self._block_path(record.data_id)
+        if os.sep in record.data_id:  # volume/block ids from store_data
+            await self.disk_io.write(
+                partial(os.makedirs, os.path.dirname(path), exist_ok=True)
+            )
+        await self.write_local(path, record.content)
+        await self.consistency_manager.update_node_version(
+            self.node_id,
+            record.data_id,
+            VersionedData(
+                content=b"",
+                version=record.version,
+                timestamp=record.timestamp,
+                checksum=record.checksum,
+                location=path,
+            ),
+        )
+
+    async def handle_binary_rollback(self, request) -> web.Response:
+        """Roll back block writes listed in a frame sent by a peer.
+
+        A block is only removed while this node still holds the version
+        being rolled back, so a newer write is never undone.
+        """
+        try:
+            op, records = decode_frame(await request.read())
+        except BlockProtocolError as e:
+            return web.Response(status=400, text=str(e))
+        if op != BlockOp.ROLLBACK:
+            return web.Response(
+                status=400, text=f"Expected rollback frame, got {op.name}"
+            )
+
+        paths = []
+        for record in records:
+            try:
+                paths.append(self._block_path(record.data_id))
+            except ValueError as e:
+                return web.Response(status=400, text=str(e))
+
+        rolled_back = []
+        for record, path in zip(records, paths):
+            current = self.consistency_manager.get_node_version(
+                self.node_id, record.data_id
+            )
+            if current is None or current.version != record.version:
+                continue
+            await self.disk_io.write(disk_io.remove_if_exists, path)
+            await self.consistency_manager.remove_version(self.node_id, record.data_id)
+            rolled_back.append(record.data_id)
+
+        return web.json_response({"status": "success", "blocks": rolled_back})
+
     async def update_write_metadata(
         self, write_op: Volume, results: List[Dict[str, Any]]
     ) -> None:
@@ -1304,15 +3167,82 @@ class ActiveNode(StorageInterface):
             self.logger.error(f"Error checking node health: {e}")
             return False
 
+    def add_routes(self, app: web.Application) -> None:
+        """Register the endpoints other nodes call on this one."""
+        app.router.add_post(WRITE_PATH, self.handle_binary_write)
+        app.router.add_post(ROLLBACK_PATH, self.handle_binary_rollback)
+        app.router.add_put(f"{STREAM_PATH}/{{data_id:.+}}", self.handle_replica_stream)
+        app.router.add_get(
+            "/storage/data/{data_id}", self.handle_local_read, allow_head=False
+        )
+        app.router.add_head("/storage/data/{data_id}", self.handle_digest_read)
+        app.router.add_post(anti_entropy.HASHES_PATH, self.handle_merkle_hashes)
+        app.router.add_post(anti_entropy.LEAVES_PATH, self.handle_merkle_leaves)
+        app.router.add_post(gossip.PING_PATH, self.handle_gossip_ping)
+        app.router.add_post(gossip.PING_REQ_PATH, self.handle_gossip_ping_req)
+        app.router.add_post(INVALIDATE_PATH, self.handle_cache_invalidation)
+
+    async def start(
+        self, host: str, port: int, seeds: Optional[List[str]] = None
+    ) -> None:
+        """Serve the peer endpoints and start the periodic background tasks.
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on; peers reach it through ``address``
+            seeds: Addresses of cluster members to join through
+        """
+        app = web.Application()
+        self.add_routes(app)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+        if seeds:
+            joined = await self.join_cluster(seeds)
+            self.logger.info(f"Joined cluster through {joined}/{len(seeds)} seeds")
+        self._background_tasks = [
+            asyncio.create_task(loop())
+            for loop in (
+                self.update_cluster_state,
+                self.start_metrics_reports,
+                self.start_gossip,
+                self.start_health_monitor,
+                self.start_anti_entropy,
+            )
+        ]
+        self.logger.info(f"Node {self.node_id} serving peers on {host}:{port}")
+
     async def deregister(self) -> None:
         """Deregister this node from the cluster."""
         try:
             self.logger.info(f"Deregistering node {self.node_id} from cluster")
+            for task in self._background_tasks:
+                task.cancel()
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+            self._background_tasks = []
+            if self._runner is not None:
+                await self._runner.cleanup()
+                self._runner = None
             # Remove node from cluster nodes
             if self.node_id in self.cluster_nodes:
                 del self.cluster_nodes[self.node_id]
             # Clean up any resources
             await self.replication_manager.stop()
+            # Pending invalidations are best effort; stop before the
+            # transport they are sent on closes
+            if self._invalidation_task is not None:
+                self._invalidation_task.cancel()
+                await asyncio.gather(self._invalidation_task, return_exceptions=True)
+                self._invalidation_task = None
+            for task in self._background_writes:
+                task.cancel()
+            await asyncio.gather(*self._background_writes, return_exceptions=True)
+            await self.hinted_handoff.close()
+            await self.peer_transport.close()
+            await self.block_writer.close()
+            await self.block_cache.close()
+            await self.disk_io.shutdown()
             await self.consistency_manager.stop()
             self.load_manager.stop_monitoring()
         except Exception as e:
@@ -1321,13 +3251,12 @@ class ActiveNode(StorageInterface):
     async def write_file(self, path: str, content: Union[bytes, BinaryIO]) -> bool:
         """Write content to a file at the specified path."""
         try:
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            mode = 'wb' if isinstance(content, bytes) else 'wb+'
-            with open(path, mode) as f:
-                if isinstance(content, bytes):
-                    f.write(content)
-                else:
-                    f.write(content.read())
+            await self.disk_io.write(
+                partial(os.makedirs, exist_ok=True), os.path.dirname(path)
+            )
+            if not isinstance(content, bytes):
+                content = await self.disk_io.read(content.read)
+            await self.disk_io.write(disk_io.write_file, path, content)
             return True
         except Exception as e:
             self.logger.error(f"Failed to write file {path}: {str(e)}")
@@ -1336,8 +3265,7 @@ class ActiveNode(StorageInterface):
     async def read_file(self, path: str) -> Optional[bytes]:
         """Read content from a file at the specified path."""
         try:
-            with open(path, 'rb') as f:
-                return f.read()
+            return await self.disk_io.read(disk_io.read_file, path)
         except Exception as e:
             self.logger.error(f"Failed to read file {path}: {str(e)}")
             return None
@@ -1345,7 +3273,7 @@ class ActiveNode(StorageInterface):
     async def delete_file(self, path: str) -> bool:
         """Delete a file at the specified path."""
         try:
-            os.remove(path)
+            await self.disk_io.write(os.remove, path)
             return True
         except Exception as e:
             self.logger.error(f"Failed to delete file {path}: {str(e)}")
@@ -1354,14 +3282,14 @@ class ActiveNode(StorageInterface):
     async def list_files(self, path: str) -> List[str]:
         """List all files in the specified path."""
         try:
-            return [f for f in os.listdir(path) if os.path.isfile(os.path.join(path, f))]
+            return await self.disk_io.read(disk_io.list_files, path)
         except Exception as e:
             self.logger.error(f"Failed to list files in {path}: {str(e)}")
             return []
 
     async def exists(self, path: str) -> bool:
         """Check if a file exists at the specified path."""
-        return os.path.exists(path)
+        return await self.disk_io.read(os.path.exists, path)
 
     def add_volume(self, volume: Volume) -> bool:
         """Add a volume to the node."""
@@ -1492,7 +3420,14 @@ class ActiveNode(StorageInterface):
             if consistency_level == ConsistencyLevel.EVENTUAL:
                 # Write locally and trigger async replication
                 success = await self.write_file(os.path.join(self.data_dir, block_id), data)
-                asyncio.create_task(self._async_replicate(block_id, data))
+                record = BlockRecord(
+                    data_id=block_id,
+                    version=self.consistency_manager.generate_version(),
+                    checksum=block_id,
+                    timestamp=datetime.now(),
+                    content=data,
+                )
+                asyncio.create_task(self._async_replicate(record))
                 return WriteResult(success=success, block_id=block_id)
                 
             elif consistency_level == ConsistencyLevel.STRONG:
@@ -1536,8 +3471,12 @@ class ActiveNode(StorageInterface):
         except Exception as e:
             return WriteResult(success=False, block_id="", error=str(e))
 
-    async def _async_replicate(self, block_id: str, data: bytes) -> None:
-        """Asynchronously replicate data to other nodes."""
+    async def _async_replicate(self, record: BlockRecord) -> None:
+        """Asynchronously replicate a block to other nodes.
+
+        Replicas that are unreachable or whose write fails get ``record``
+        as a hint, stamped with the version of the write.
+        """
         try:
             replicas = await self._get_replica_nodes()
             required_copies = min(len(replicas), self.replication_policy.max_copies)
@@ -1546,9 +3485,23 @@ class ActiveNode(StorageInterface):
                 # Implement bandwidth limiting logic
                 pass
                 
-            await asyncio.gather(
-                *[self._write_to_replica(replica, block_id, data) for replica in replicas[:required_copies]]
+            replicas = replicas[:required_copies]
+            # Reachability can change while the writes run; decide once
+            targets = [
+                replica
+                for replica in replicas
+                if not self.hinted_handoff.is_unreachable(replica.node_id)
+            ]
+            results = await asyncio.gather(
+                *[
+                    self._write_to_replica(replica, record.data_id, record.content)
+                    for replica in targets
+                ]
             )
+            missed = [replica for replica in replicas if replica not in targets]
+            missed += [replica for replica, ok in zip(targets, results) if not ok]
+            for replica in missed:
+                await self._hint_write(replica, record)
         except Exception as e:
             self.logger.error(f"Async replication failed: {str(e)}")
 
@@ -1574,13 +3527,14 @@ class ActiveNode(StorageInterface):
     async def _write_to_replica(self, replica: Any, block_id: str, data: bytes) -> bool:
         """Write data to a replica node."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.put(
-                    f"http://{replica.address}/write/{block_id}",
-                    data=data,
-                    timeout=self.write_timeout
-                ) as response:
-                    return response.status == 200
+            async with self.peer_transport.request(
+                replica.address,
+                "PUT",
+                f"/write/{block_id}",
+                data=data,
+                timeout=self.write_timeout
+            ) as response:
+                return response.status == 200
         except Exception as e:
             self.logger.error(f"Failed to write to replica {replica.node_id}: {str(e)}")
             return False
@@ -1588,12 +3542,13 @@ class ActiveNode(StorageInterface):
     async def _verify_replica_data(self, replica: Any, block_id: str) -> bool:
         """Verify data exists on a replica node."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"http://{replica.address}/verify/{block_id}",
-                    timeout=self.write_timeout
-                ) as response:
-                    return response.status == 200
+            async with self.peer_transport.request(
+                replica.address,
+                "GET",
+                f"/verify/{block_id}",
+                timeout=self.write_timeout
+            ) as response:
+                return response.status == 200
         except Exception as e:
             self.logger.error(f"Failed to verify replica {replica.node_id}: {str(e)}")
             return False
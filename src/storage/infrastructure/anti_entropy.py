@@ -0,0 +1,139 @@
+"""Merkle-tree anti-entropy between replicas.
+
+Each node keeps a Merkle tree over the (data_id, version, checksum) of the
+blocks it holds. A sync round with a peer walks both trees from the root,
+one level per round trip, and asks only for the children of nodes whose
+hashes differ. The leaves that still differ at the bottom are exchanged
+as (data_id, version, checksum) listings, and only the blocks where the
+peer holds something newer are pulled. Traffic therefore scales with the
+amount of divergence rather than with the number of blocks held.
+
+With placement on a hash ring two nodes hold different key ranges, and
+trees over everything each holds would differ wherever the ranges do.
+The trees compared then cover only the blocks placement gives to both
+nodes (see ``SharedTree``).
+"""
+
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Sequence, Tuple
+
+from src.storage.infrastructure.data.merkle_tree import Entry, MerkleTree
+
+# Peer endpoints serving tree hashes and leaf listings
+HASHES_PATH = "/anti-entropy/hashes"
+LEAVES_PATH = "/anti-entropy/leaves"
+
+
+@dataclass
+class AntiEntropyConfig:
+    """Settings for the background anti-entropy job."""
+
+    interval: float = 60.0  # seconds between sync rounds
+    request_timeout: float = 10.0
+    leaves_per_request: int = 256  # leaf listings fetched per round trip
+    max_repairs_per_peer: int = 1000  # blocks pulled from one peer per round
+    repair_concurrency: int = 8
+    # Seconds trees over the blocks shared with each peer are reused; the
+    # requests of one sync must all see the same tree
+    shared_tree_ttl: float = 30.0
+
+
+@dataclass
+class SyncStats:
+    """Work done by one sync round with one peer."""
+
+    peer_id: str
+    round_trips: int = 0
+    hash_bytes: int = 0  # tree hashes exchanged
+    listing_bytes: int = 0  # leaf listings exchanged
+    block_bytes: int = 0  # block content pulled
+    differing_leaves: int = 0
+    repaired: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+
+    @property
+    def bytes_exchanged(self) -> int:
+        return self.hash_bytes + self.listing_bytes + self.block_bytes
+
+
+class SharedTree:
+    """Merkle tree over a fixed set of entries.
+
+    Used for the blocks two nodes should both hold. Unlike a node's own
+    tree it is not kept up to date; it is built from a snapshot.
+
+    Args:
+        entries: (version, checksum) by data id
+        depth: Depth of the tree; must match the peer's
+    """
+
+    def __init__(self, entries: Dict[str, Entry], depth: int):
+        self.entries = entries
+        self.tree = MerkleTree(depth)
+        for data_id, entry in entries.items():
+            self.tree.update(data_id, None, entry)
+
+    def leaf_entries(self, leaf: int) -> Dict[str, Entry]:
+        """Entries covered by one leaf."""
+        return {data_id: self.entries[data_id] for data_id in self.tree.leaf_ids(leaf)}
+
+
+def encode_hashes(hashes: Sequence[int]) -> List[str]:
+    return [format(value, "x") for value in hashes]
+
+
+def decode_hashes(hashes: Sequence[str]) -> List[int]:
+    return [int(value, 16) for value in hashes]
+
+
+def encode_entries(entries: Dict[str, Entry]) -> List[list]:
+    return [
+        [data_id, version, checksum] for data_id, (version, checksum) in entries.items()
+    ]
+
+
+def decode_entries(entries: Sequence[list]) -> Dict[str, Entry]:
+    return {data_id: (version, checksum) for data_id, version, checksum in entries}
+
+
+async def find_divergent_leaves(
+    tree: MerkleTree,
+    fetch_hashes: Callable[[int, List[int]], Awaitable[List[int]]],
+) -> List[int]:
+    """Walk the local and a remote tree down to the leaves that differ.
+
+    Args:
+        tree: Local tree
+        fetch_hashes: Returns the remote hashes for (level, indices)
+
+    Returns:
+        Indices of the leaves whose hashes differ
+    """
+    level, indices = 0, [0]
+    while True:
+        remote = await fetch_hashes(level, indices)
+        local = tree.hashes(level, indices)
+        differing = [
+            index
+            for index, mine, theirs in zip(indices, local, remote)
+            if mine != theirs
+        ]
+        if not differing or level == tree.depth:
+            return differing
+        level += 1
+        indices = [child for index in differing for child in (2 * index, 2 * index + 1)]
+
+
+def newer_on_peer(
+    local: Dict[str, Entry], remote: Dict[str, Entry]
+) -> List[Tuple[str, Entry]]:
+    """Entries the peer holds that are missing or older locally.
+
+    Entries are ordered like replica read results: by version, then by
+    checksum, so both sides agree on which copy wins.
+    """
+    return [
+        (data_id, entry)
+        for data_id, entry in remote.items()
+        if data_id not in local or entry > local[data_id]
+    ]
@@ -0,0 +1,358 @@
+"""Read-through cache of replica blocks in memory and on local disk.
+
+A coordinator keeps the blocks it fetches from replicas. The memory tier
+is a CacheStore. Blocks it evicts spill to files in a bounded directory
+on local disk, and a hit there promotes the block back to memory.
+
+Each cached block carries the version and checksum it was read at, and
+lookups name the oldest version they accept. Once ConsistencyManager
+knows of a newer version, the cached block stops matching. Writes
+therefore never have to find and delete cache entries. Versions written
+through other coordinators arrive as invalidations (see
+``invalidation``). They raise a per-block floor below which nothing is
+served or cached again.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from src.storage.infrastructure import disk_io
+from src.storage.infrastructure.data.cache_store import CacheStore
+from src.storage.infrastructure.disk_io import DiskIOExecutor
+
+_SPILL_SUFFIX = ".blk"
+
+
+@dataclass
+class BlockCacheConfig:
+    """Sizes of the block cache tiers."""
+
+    memory_bytes: int = 256 * 1024 * 1024
+    disk_bytes: int = 4 * 1024 * 1024 * 1024  # 0 disables the spill tier
+    max_block_bytes: int = 16 * 1024 * 1024  # larger blocks are not cached
+    # Evicted blocks waiting to be written to the disk tier; evictions
+    # beyond this while the disk lags are dropped instead of spilled
+    max_spill_queue_bytes: int = 64 * 1024 * 1024
+    eviction_policy: str = "slru"
+    # How long EVENTUAL reads may be served without asking a replica.
+    # Writers announce new versions, so this only bounds staleness when
+    # an announcement is lost.
+    ttl: float = 600.0
+    max_floors: int = 65536  # invalidated data ids remembered, newest kept
+
+
+@dataclass
+class CachedBlock:
+    """Content of a block as read at one version."""
+
+    data_id: str
+    version: int
+    checksum: str
+    content: bytes
+    expires_at: float  # on the cache's monotonic clock
+
+
+@dataclass
+class _SpilledBlock:
+    """A block held by the disk tier; its content is in ``path``."""
+
+    path: str
+    version: int
+    checksum: str
+    size: int
+    expires_at: float
+
+
+def _read_spilled(path: str, checksum: str) -> Optional[bytes]:
+    """Read a spilled block, or None if it no longer matches its checksum."""
+    content = disk_io.read_file(path)
+    if checksum and hashlib.sha256(content).hexdigest() != checksum:
+        return None
+    return content
+
+
+class BlockCache:
+    """Two-tier cache of block content keyed by data id and version.
+
+    Memory lookups never wait. Disk reads and spill writes run on the
+    node's disk I/O pools. Spilled files are indexed only in memory, so
+    files left over from an earlier run are deleted at startup. The cache
+    is used from a single event loop and is not thread-safe.
+
+    Args:
+        directory: Directory for the disk tier
+        executor: Executor for spill reads and writes
+        config: Tier sizes and TTL
+        clock: Monotonic clock, injectable for tests
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        executor: DiskIOExecutor,
+        config: Optional[BlockCacheConfig] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.config = config or BlockCacheConfig()
+        self.directory = directory
+        self.disk_io = executor
+        self.logger = logging.getLogger(__name__)
+        self._clock = clock
+        # One event loop serves every lookup, so one shard is enough
+        self.memory = CacheStore(
+            max_size=None,
+            ttl_seconds=self.config.ttl,
+            max_bytes=self.config.memory_bytes,
+            eviction_policy=self.config.eviction_policy,
+            shards=1,
+            clock=clock,
+            on_evict=self._spill,
+        )
+        self._disk: "OrderedDict[str, _SpilledBlock]" = OrderedDict()  # LRU first
+        self.disk_bytes = 0
+        self._to_spill: Dict[str, CachedBlock] = {}
+        self._to_spill_bytes = 0
+        self._to_remove: List[str] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        # Block being spilled and whether put() replaced it meanwhile
+        self._writing: Optional[CachedBlock] = None
+        self._writing_superseded = False
+        # data_id -> newest version announced by a writer
+        self._floors: "OrderedDict[str, int]" = OrderedDict()
+        self.counters = dict.fromkeys(
+            (
+                "memory_hits",
+                "disk_hits",
+                "misses",
+                "spills",
+                "spills_dropped",
+                "invalidations",
+            ),
+            0,
+        )
+
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.endswith(_SPILL_SUFFIX):
+                disk_io.remove_if_exists(os.path.join(directory, name))
+
+    async def get(self, data_id: str, min_version: int = 0) -> Optional[CachedBlock]:
+        """Cached block for ``data_id`` at ``min_version`` or newer, if any."""
+        min_version = max(min_version, self._floors.get(data_id, 0))
+        block = self.memory.get(data_id)
+        if block is not None and block.version < min_version:
+            self.memory.delete(data_id)  # superseded; free it now
+            block = None
+        if block is None:
+            block = self._to_spill.get(data_id)
+        if block is not None and block.version >= min_version:
+            if block.expires_at > self._clock():
+                self.counters["memory_hits"] += 1
+                return block
+
+        spilled = self._disk.get(data_id)
+        if (
+            spilled is None
+            or spilled.version < min_version
+            or spilled.expires_at <= self._clock()
+        ):
+            self.counters["misses"] += 1
+            return None
+
+        self._disk.move_to_end(data_id)
+        try:
+            content = await self.disk_io.read(
+                _read_spilled, spilled.path, spilled.checksum
+            )
+        except OSError as e:
+            self.logger.warning(f"Failed to read cached block {data_id}: {str(e)}")
+            content = None
+        if self._disk.get(data_id) is not spilled:
+            # Replaced by a newer version while reading
+            self.counters["misses"] += 1
+            return None
+        if content is None:
+            self._drop_spilled(data_id)
+            self.counters["misses"] += 1
+            return None
+
+        self.counters["disk_hits"] += 1
+        block = CachedBlock(
+            data_id, spilled.version, spilled.checksum, content, spilled.expires_at
+        )
+        self.memory.put(
+            data_id, block, ttl=block.expires_at - self._clock(), size=len(content)
+        )
+        return block
+
+    def put(self, data_id: str, version: int, checksum: str, content: bytes) -> None:
+        """Cache content read at ``version``, replacing any other version.
+
+        Content older than an announced version is not cached.
+        """
+        if len(content) > self.config.max_block_bytes or version < self._floors.get(
+            data_id, 0
+        ):
+            return
+        block = CachedBlock(
+            data_id,
+            version,
+            checksum,
+            bytes(content),
+            self._clock() + self.config.ttl,
+        )
+        self._unqueue_spill(data_id)
+        writing = self._writing
+        if writing is not None and writing.data_id == data_id:
+            if writing.version != version:
+                self._writing_superseded = True
+        spilled = self._disk.get(data_id)
+        if spilled is not None and spilled.version != version:
+            self._drop_spilled(data_id)
+        self.memory.put(data_id, block, size=len(block.content))
+
+    def invalidate(self, data_id: str, version: int) -> None:
+        """Note that ``version`` of ``data_id`` was written elsewhere.
+
+        Older cached versions are no longer served or cached. The memory
+        tier frees them on the next lookup or eviction, and the disk tier
+        deletes them right away.
+        """
+        if version <= self._floors.get(data_id, 0):
+            return
+        self._floors[data_id] = version
+        self._floors.move_to_end(data_id)
+        while len(self._floors) > self.config.max_floors:
+            self._floors.popitem(last=False)
+        self.counters["invalidations"] += 1
+
+        block = self._to_spill.get(data_id)
+        if block is not None and block.version < version:
+            self._unqueue_spill(data_id)
+        spilled = self._disk.get(data_id)
+        if spilled is not None and spilled.version < version:
+            self._drop_spilled(data_id)
+
+    def _spill(self, data_id: str, block: CachedBlock) -> None:
+        """Eviction hook of the memory tier: queue the block for disk."""
+        if (
+            self.config.disk_bytes <= 0
+            or block.expires_at <= self._clock()
+            or block.version < self._floors.get(data_id, 0)
+        ):
+            return
+        spilled = self._disk.get(data_id)
+        if spilled is not None and spilled.version == block.version:
+            return  # still on disk from an earlier spill
+        size = len(block.content)
+        if self._to_spill_bytes + size > self.config.max_spill_queue_bytes:
+            # The disk is not keeping up; holding more evicted blocks
+            # would exceed the memory budget
+            self.counters["spills_dropped"] += 1
+            return
+        self._unqueue_spill(data_id)
+        self._to_spill[data_id] = block
+        self._to_spill_bytes += size
+        self._start_flush()
+
+    def _unqueue_spill(self, data_id: str) -> Optional[CachedBlock]:
+        block = self._to_spill.pop(data_id, None)
+        if block is not None:
+            self._to_spill_bytes -= len(block.content)
+        return block
+
+    def _drop_spilled(self, data_id: str) -> None:
+        spilled = self._disk.pop(data_id, None)
+        if spilled is not None:
+            self.disk_bytes -= spilled.size
+            self._to_remove.append(spilled.path)
+            self._start_flush()
+
+    def _spill_path(self, data_id: str, version: int) -> str:
+        name = hashlib.sha256(data_id.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, f"{name}-{version}{_SPILL_SUFFIX}")
+
+    def _start_flush(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # picked up by the next flush started on the loop
+        self._flush_task = loop.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        """Delete dropped files and write queued spills, oldest first."""
+        while self._to_remove or self._to_spill:
+            while self._to_remove:
+                path = self._to_remove.pop()
+                try:
+                    await self.disk_io.write(disk_io.remove_if_exists, path)
+                except OSError as e:
+                    self.logger.warning(f"Failed to remove {path}: {str(e)}")
+
+            if not self._to_spill:
+                break
+            data_id = next(iter(self._to_spill))
+            block = self._unqueue_spill(data_id)
+            path = self._spill_path(data_id, block.version)
+            self._writing, self._writing_superseded = block, False
+            try:
+                await self.disk_io.write(disk_io.write_file, path, block.content)
+            except OSError as e:
+                self.logger.warning(f"Failed to spill block {data_id}: {str(e)}")
+                continue
+            finally:
+                self._writing = None
+            if self._writing_superseded or block.version < self._floors.get(data_id, 0):
+                self._to_remove.append(path)  # replaced or invalidated meanwhile
+                continue
+
+            self._drop_spilled(data_id)
+            self._disk[data_id] = _SpilledBlock(
+                path,
+                block.version,
+                block.checksum,
+                len(block.content),
+                block.expires_at,
+            )
+            self.disk_bytes += len(block.content)
+            self.counters["spills"] += 1
+            while self.disk_bytes > self.config.disk_bytes:
+                self._drop_spilled(next(iter(self._disk)))
+
+    async def flush(self) -> None:
+        """Wait until queued spills and removals have reached the disk."""
+        while self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+
+    async def close(self) -> None:
+        """Stop spilling; queued blocks are dropped.
+
+        Spill files do not outlive the process, so there is nothing to
+        finish writing.
+        """
+        self._to_spill.clear()
+        self._to_spill_bytes = 0
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Occupancy of both tiers and hit counters."""
+        memory = self.memory.get_stats()
+        return {
+            "memory_entries": memory["size"],
+            "memory_bytes": memory["bytes"],
+            "disk_entries": len(self._disk),
+            "disk_bytes": self.disk_bytes,
+            "evictions": memory["evictions"],
+            **self.counters,
+        }
@@ -0,0 +1,163 @@
+"""Framed binary wire format for node-to-node block transfer.
+
+A frame starts with a fixed frame header followed by one or more block
+records. Each record is a fixed-size header, the UTF-8 data id and the
+raw block bytes, so payloads travel without any text encoding::
+
+    frame header : magic(4) format(1) op(1) block_count(2)
+    block header : id_len(2) version(8) checksum(32) timestamp_us(8) length(8)
+    block body   : data_id(id_len) payload(length)
+
+All integers are big-endian. The checksum is the raw SHA-256 digest.
+"""
+
+import struct
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from enum import IntEnum
+from typing import List, Sequence, Tuple
+
+CONTENT_TYPE = "application/x-dfs-block-frame"
+
+# Binary equivalents of the form-encoded /write and /rollback endpoints
+WRITE_PATH = "/blocks/write"
+ROLLBACK_PATH = "/blocks/rollback"
+# Raw body of one block, streamed by the coordinator of a write to a replica
+STREAM_PATH = "/blocks/stream"
+
+FRAME_MAGIC = b"DFSB"
+FORMAT_VERSION = 1
+
+_FRAME_HEADER = struct.Struct(">4sBBH")
+_BLOCK_HEADER = struct.Struct(">HQ32sqQ")
+_EMPTY_CHECKSUM = bytes(32)
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+MAX_BLOCKS_PER_FRAME = 0xFFFF
+
+
+class BlockOp(IntEnum):
+    """Operation carried by a frame."""
+
+    WRITE = 1
+    ROLLBACK = 2
+
+
+class BlockProtocolError(Exception):
+    """Raised when a frame cannot be encoded or decoded"""
+
+    pass
+
+
+@dataclass
+class BlockRecord:
+    """A single block carried in a frame."""
+
+    data_id: str
+    version: int
+    checksum: str
+    timestamp: datetime
+    content: bytes = b""
+
+
+def _to_micros(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    delta = timestamp - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(micros: int) -> datetime:
+    return _EPOCH.replace(tzinfo=None) + timedelta(microseconds=micros)
+
+
+def encode_frame(records: Sequence[BlockRecord], op: BlockOp = BlockOp.WRITE) -> bytes:
+    """Encode block records into a single frame.
+
+    Args:
+        records: Blocks to send; rollback records normally carry no content
+        op: Operation the receiver should apply to every record
+
+    Returns:
+        Encoded frame
+    """
+    if len(records) > MAX_BLOCKS_PER_FRAME:
+        raise BlockProtocolError(
+            f"Too many blocks for one frame ({len(records)} > {MAX_BLOCKS_PER_FRAME})"
+        )
+
+    parts = [_FRAME_HEADER.pack(FRAME_MAGIC, FORMAT_VERSION, op, len(records))]
+    for record in records:
+        data_id = record.data_id.encode("utf-8")
+        try:
+            checksum = (
+                bytes.fromhex(record.checksum) if record.checksum else _EMPTY_CHECKSUM
+            )
+        except ValueError:
+            raise BlockProtocolError(f"Invalid checksum for block {record.data_id}")
+        if len(checksum) != 32:
+            raise BlockProtocolError(
+                f"Checksum for block {record.data_id} is not SHA-256"
+            )
+
+        parts.append(
+            _BLOCK_HEADER.pack(
+                len(data_id),
+                record.version,
+                checksum,
+                _to_micros(record.timestamp),
+                len(record.content),
+            )
+        )
+        parts.append(data_id)
+        parts.append(record.content)
+    return b"".join(parts)
+
+
+def decode_frame(frame: bytes) -> Tuple[BlockOp, List[BlockRecord]]:
+    """Decode a frame produced by ``encode_frame``.
+
+    Returns:
+        Tuple of (operation, block records)
+    """
+    view = memoryview(frame)
+    if len(view) < _FRAME_HEADER.size:
+        raise BlockProtocolError("Truncated frame header")
+
+    magic, fmt, op, count = _FRAME_HEADER.unpack_from(view, 0)
+    if magic != FRAME_MAGIC:
+        raise BlockProtocolError("Not a block frame")
+    if fmt != FORMAT_VERSION:
+        raise BlockProtocolError(f"Unsupported frame format {fmt}")
+    try:
+        op = BlockOp(op)
+    except ValueError:
+        raise BlockProtocolError(f"Unknown frame operation {op}")
+
+    offset = _FRAME_HEADER.size
+    records = []
+    for _ in range(count):
+        if len(view) < offset + _BLOCK_HEADER.size:
+            raise BlockProtocolError("Truncated block header")
+        id_len, version, checksum, micros, length = _BLOCK_HEADER.unpack_from(
+            view, offset
+        )
+        offset += _BLOCK_HEADER.size
+        end = offset + id_len + length
+        if len(view) < end:
+            raise BlockProtocolError("Truncated block body")
+
+        records.append(
+            BlockRecord(
+                data_id=str(view[offset : offset + id_len], "utf-8"),
+                version=version,
+                checksum="" if checksum == _EMPTY_CHECKSUM else checksum.hex(),
+                timestamp=_from_micros(micros),
+                content=view[offset + id_len : end].tobytes(),
+            )
+        )
+        offset = end
+
+    if offset != len(view):
+        raise BlockProtocolError("Trailing bytes after last block")
+    return op, records
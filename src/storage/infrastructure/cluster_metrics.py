@@ -0,0 +1,119 @@
+"""Cached load metrics of other nodes, spread by gossip."""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Keys a node reports about itself in every report
+METRIC_KEYS = ("cpu_usage", "memory_usage", "disk_usage", "error_rate", "queue_depth")
+
+
+@dataclass
+class ClusterMetricsConfig:
+    """Settings for the gossiped metrics exchange."""
+
+    interval: float = 2.0  # seconds between refreshes of this node's report
+    max_age: float = 10.0  # metrics older than this are not used for placement
+    # Reports of other nodes relayed on each gossip message, besides our own
+    max_relayed: int = 16
+
+
+@dataclass
+class NodeMetrics:
+    """Latest metrics reported by one node."""
+
+    values: Dict[str, float]
+    sent_at: float  # sender's wall clock, orders reports from one node
+    received_at: float  # our monotonic clock, bounds staleness
+
+
+class ClusterMetricsCache:
+    """Per-node metrics as last reported, with a staleness bound.
+
+    Entries are written when a gossip message carrying a report arrives
+    and read by write placement, which therefore never waits on the
+    network. Each message carries the sender's own report and a few it
+    relays, so the cost per node stays constant as the cluster grows.
+    A report older than one already held for the node is ignored, so
+    reports delivered out of order cannot roll metrics back. Relayed
+    reports keep their age, and entries older than ``max_age`` read as
+    missing.
+
+    Args:
+        max_age: Seconds after which a node's metrics are treated as unknown
+        clock: Monotonic clock, injectable for tests
+    """
+
+    def __init__(
+        self, max_age: float = 10.0, clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_age = max_age
+        self._clock = clock
+        self._entries: Dict[str, NodeMetrics] = {}
+
+    def update(
+        self, node_id: str, values: Dict[str, Any], sent_at: float, age: float = 0.0
+    ) -> bool:
+        """Record a report from ``node_id``; False if it was out of date.
+
+        ``age`` is how long the report had already been held elsewhere.
+        """
+        current = self._entries.get(node_id)
+        if current is not None and sent_at <= current.sent_at:
+            return False
+        self._entries[node_id] = NodeMetrics(
+            values={key: float(values[key]) for key in METRIC_KEYS if key in values},
+            sent_at=sent_at,
+            received_at=self._clock() - max(0.0, age),
+        )
+        return True
+
+    def to_wire(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """A fresh report as carried by gossip, or None."""
+        values = self.get(node_id)
+        if values is None:
+            return None
+        entry = self._entries[node_id]
+        return {
+            "node_id": node_id,
+            "sent_at": entry.sent_at,
+            "age": self._clock() - entry.received_at,
+            "metrics": values,
+        }
+
+    def merge_wire(self, report: Dict[str, Any]) -> bool:
+        """Record a report received through gossip."""
+        return self.update(
+            str(report["node_id"]),
+            report["metrics"],
+            float(report["sent_at"]),
+            float(report.get("age", 0.0)),
+        )
+
+    def fresh(self) -> List[str]:
+        """Nodes with fresh metrics."""
+        return [node_id for node_id in self._entries if self.get(node_id) is not None]
+
+    def get(self, node_id: str) -> Optional[Dict[str, float]]:
+        """Fresh metrics for a node, or None if missing or stale."""
+        entry = self._entries.get(node_id)
+        if entry is None or self._clock() - entry.received_at > self.max_age:
+            return None
+        return entry.values
+
+    def age(self, node_id: str) -> Optional[float]:
+        entry = self._entries.get(node_id)
+        return None if entry is None else self._clock() - entry.received_at
+
+    def stale(self, node_ids: Iterable[str]) -> List[str]:
+        """The given nodes without fresh metrics."""
+        return [node_id for node_id in node_ids if self.get(node_id) is None]
+
+    def retain(self, node_ids: Iterable[str]) -> None:
+        """Forget nodes that are no longer members."""
+        keep = set(node_ids)
+        for node_id in [n for n in self._entries if n not in keep]:
+            del self._entries[node_id]
+
+    def __len__(self) -> int:
+        return len(self._entries)
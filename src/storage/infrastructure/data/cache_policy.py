@@ -0,0 +1,158 @@
+"""Eviction and admission policies for CacheStore.
+
+Every policy keeps its own ordering of the cached keys and does O(1) work
+per operation, so choosing a victim never scans the cache. Policies are
+not thread-safe; CacheStore calls them under its own lock.
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+from .sketch import CountMinSketch
+
+
+class EvictionPolicy(ABC):
+    """Order in which cached keys are given up.
+
+    Args:
+        capacity: Byte budget of the cache the policy serves
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+
+    @abstractmethod
+    def insert(self, key: str, size: int) -> None:
+        """Track a newly cached key."""
+
+    @abstractmethod
+    def access(self, key: str) -> None:
+        """Note a hit on a cached key."""
+
+    @abstractmethod
+    def remove(self, key: str) -> None:
+        """Stop tracking a key; unknown keys are ignored."""
+
+    @abstractmethod
+    def victim(self) -> Optional[str]:
+        """Key to evict next, without removing it."""
+
+    def record(self, key: str) -> None:
+        """Note a lookup, hit or miss, for frequency-based admission."""
+
+    def admit(self, candidate: str, victim: str) -> bool:
+        """Whether caching ``candidate`` is worth evicting ``victim``."""
+        return True
+
+
+class LRUPolicy(EvictionPolicy):
+    """Evict the least recently used key."""
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+
+    def insert(self, key: str, size: int) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def access(self, key: str) -> None:
+        if key in self._order:
+            self._order.move_to_end(key)
+
+    def remove(self, key: str) -> None:
+        self._order.pop(key, None)
+
+    def victim(self) -> Optional[str]:
+        return next(iter(self._order), None)
+
+
+class SLRUPolicy(EvictionPolicy):
+    """Segmented LRU.
+
+    New keys enter a probation segment and move to a protected segment on
+    their second hit, so a scan of one-off keys only churns probation.
+    The protected segment holds up to ``protected_ratio`` of the budget;
+    keys pushed out of it drop back to probation rather than out of the
+    cache.
+    """
+
+    def __init__(self, capacity: int, protected_ratio: float = 0.8):
+        super().__init__(capacity)
+        self._protected_limit = int(capacity * protected_ratio)
+        self._probation: "OrderedDict[str, int]" = OrderedDict()
+        self._protected: "OrderedDict[str, int]" = OrderedDict()
+        self._protected_bytes = 0
+
+    def insert(self, key: str, size: int) -> None:
+        self.remove(key)
+        self._probation[key] = size
+
+    def access(self, key: str) -> None:
+        if key in self._protected:
+            self._protected.move_to_end(key)
+            return
+        size = self._probation.pop(key, None)
+        if size is None:
+            return
+        self._protected[key] = size
+        self._protected_bytes += size
+        while (
+            self._protected_bytes > self._protected_limit and len(self._protected) > 1
+        ):
+            demoted, demoted_size = self._protected.popitem(last=False)
+            self._protected_bytes -= demoted_size
+            self._probation[demoted] = demoted_size
+
+    def remove(self, key: str) -> None:
+        if self._probation.pop(key, None) is None:
+            size = self._protected.pop(key, None)
+            if size is not None:
+                self._protected_bytes -= size
+
+    def victim(self) -> Optional[str]:
+        if self._probation:
+            return next(iter(self._probation))
+        return next(iter(self._protected), None)
+
+
+class TinyLFUPolicy(SLRUPolicy):
+    """Segmented LRU behind a TinyLFU admission filter.
+
+    Lookups are counted in a count-min sketch that is halved periodically,
+    so counts follow recent popularity. A new key is only cached if it has
+    been asked for more often than the key it would evict, which keeps
+    one-hit wonders from flushing a hot working set.
+
+    Args:
+        capacity: Byte budget of the cache
+        sample_size: Lookups counted between halvings
+    """
+
+    def __init__(self, capacity: int, sample_size: int = 100_000):
+        super().__init__(capacity)
+        self.sketch = CountMinSketch(sample_size)
+
+    def record(self, key: str) -> None:
+        self.sketch.add(key)
+
+    def admit(self, candidate: str, victim: str) -> bool:
+        return self.sketch.estimate(candidate) > self.sketch.estimate(victim)
+
+
+POLICIES = {
+    "lru": LRUPolicy,
+    "slru": SLRUPolicy,
+    "tinylfu": TinyLFUPolicy,
+}
+
+
+def make_policy(name: str, capacity: int) -> EvictionPolicy:
+    """Build the policy named by ``CACHE_EVICTION_POLICY``."""
+    try:
+        return POLICIES[name.lower()](capacity)
+    except KeyError:
+        raise ValueError(
+            f"Unknown cache eviction policy {name!r}; expected one of {sorted(POLICIES)}"
+        )
@@ -1,11 +1,20 @@
 """Module for advanced caching in the distributed file system."""
 
-from typing import Any, Dict, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from datetime import datetime
+import itertools
+import logging
+import math
+import sys
 import threading
+import time
 from enum import Enum
 from dataclasses import dataclass
 from ..interfaces import CacheInterface
+from .cache_policy import make_policy
+from .timer_wheel import TimerWheel
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -16,6 +25,8 @@ class CacheEntry:
     version: int
     timestamp: datetime
     session_id: Optional[str] = None
+    size: int = 0  # bytes, as estimated by sizeof
+    expires_at: float = math.inf  # on the cache's monotonic clock
 
 
 class ConsistencyLevel(Enum):
@@ -26,26 +37,266 @@ class ConsistencyLevel(Enum):
     WEAK = "weak"
 
 
+# Counters each shard keeps; CacheStore.get_stats sums them
+_COUNTERS = ("hits", "misses", "evictions", "rejections", "expirations")
+
+
+def sizeof(value: Any) -> int:
+    """Bytes a cached value is charged against the budget."""
+    if isinstance(value, memoryview):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class CacheShard:
+    """One independently locked partition of a CacheStore.
+
+    The shard enforces its share of the budget by itself. When an insert
+    goes over budget the eviction policy names the victims, in O(1) per
+    victim. A policy with admission (TinyLFU) may also turn the insert
+    away if the new key is less popular than what it would displace.
+
+    Lookups compare an entry's deadline with the monotonic clock. Entries
+    nobody reads again are found through a timing wheel by ``expire``.
+    Evicted entries are passed to ``on_evict``, if given, while the shard
+    lock is held.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int],
+        max_bytes: Optional[int],
+        eviction_policy: str,
+        clock: Callable[[], float],
+        expiry_tick: float,
+        on_evict: Optional[Callable[[str, Any], None]] = None,
+    ):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self._policy_name = eviction_policy
+        self._policy = self._new_policy()
+        self._clock = clock
+        self._expiry_tick = expiry_tick
+        self._wheel = TimerWheel(clock(), expiry_tick)
+        self._on_evict = on_evict
+
+        self._cache: Dict[str, CacheEntry] = {}
+        self._dirty_keys: Set[str] = set()
+        self.bytes = 0
+        self.counters = dict.fromkeys(_COUNTERS, 0)
+
+        # Lookups reorder the policy, so reads and writes share one lock
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _new_policy(self):
+        # Policies weigh entries in bytes when there is a byte budget
+        capacity = self.max_bytes if self.max_bytes is not None else self.max_size
+        return make_policy(self._policy_name, capacity or sys.maxsize)
+
+    def _weight(self, entry: CacheEntry) -> int:
+        return entry.size if self.max_bytes is not None else 1
+
+    def _over_budget(self, extra_entries: int, extra_bytes: int) -> bool:
+        """Whether adding entries and bytes would exceed either limit."""
+        return (
+            self.max_size is not None
+            and len(self._cache) + extra_entries > self.max_size
+        ) or (self.max_bytes is not None and self.bytes + extra_bytes > self.max_bytes)
+
+    def _remove(self, key: str) -> Optional[CacheEntry]:
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+            self._policy.remove(key)
+            self._wheel.cancel(key)
+            self._dirty_keys.discard(key)
+        return entry
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            self._policy.record(key)
+            entry = self._cache.get(key)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+
+            if entry.expires_at <= self._clock():
+                self._remove(key)
+                self.counters["expirations"] += 1
+                self.counters["misses"] += 1
+                return None
+
+            self._policy.access(key)
+            self.counters["hits"] += 1
+            return entry.value
+
+    def put(self, key: str, value: Any, size: int, version: int, ttl: float) -> bool:
+        with self.lock:
+            if self.max_bytes is not None and size > self.max_bytes:
+                self.counters["rejections"] += 1
+                return False
+
+            # A replaced value keeps its dirty mark but not its budget
+            current = self._cache.pop(key, None)
+            if current is not None:
+                self.bytes -= current.size
+                self._policy.remove(key)
+                self._wheel.cancel(key)
+            elif self._over_budget(1, size):
+                victim = self._policy.victim()
+                if victim is not None and not self._policy.admit(key, victim):
+                    self.counters["rejections"] += 1
+                    return False
+
+            while self._over_budget(1, size):
+                victim = self._policy.victim()
+                if victim is None:
+                    break
+                evicted = self._remove(victim)
+                self.counters["evictions"] += 1
+                if self._on_evict is not None:
+                    self._on_evict(victim, evicted.value)
+
+            entry = CacheEntry(
+                value=value,
+                version=version,
+                timestamp=datetime.now(),
+                size=size,
+                expires_at=self._clock() + ttl,
+            )
+            self._cache[key] = entry
+            self.bytes += size
+            self._policy.insert(key, self._weight(entry))
+            if entry.expires_at < math.inf:
+                self._wheel.schedule(key, entry.expires_at)
+            return True
+
+    def delete(self, key: str) -> bool:
+        with self.lock:
+            return self._remove(key) is not None
+
+    def clear(self) -> None:
+        with self.lock:
+            self._cache.clear()
+            self._dirty_keys.clear()
+            self.bytes = 0
+            self._policy = self._new_policy()
+            self._wheel = TimerWheel(self._clock(), self._expiry_tick)
+
+    def expire(self) -> int:
+        """Drop entries whose deadline has passed; returns how many."""
+        with self.lock:
+            expired = self._wheel.advance(self._clock())
+            for key in expired:
+                entry = self._cache.pop(key)
+                self.bytes -= entry.size
+                self._policy.remove(key)
+                self._dirty_keys.discard(key)
+            self.counters["expirations"] += len(expired)
+            return len(expired)
+
+    def mark_dirty(self, key: str) -> None:
+        with self.lock:
+            if key in self._cache:
+                self._dirty_keys.add(key)
+
+    def mark_clean(self, key: str) -> None:
+        with self.lock:
+            self._dirty_keys.discard(key)
+
+    def dirty_keys(self) -> Set[str]:
+        with self.lock:
+            return self._dirty_keys.copy()
+
+    def dirty_entries(self) -> Dict[str, CacheEntry]:
+        with self.lock:
+            return {
+                key: self._cache[key] for key in self._dirty_keys if key in self._cache
+            }
+
+
 class CacheStore(CacheInterface):
-    """Thread-safe cache store with consistency levels."""
+    """Thread-safe cache store with consistency levels.
+
+    Keys are spread over ``shards`` partitions, each with its own lock,
+    eviction policy and an equal share of the budget, so threads working
+    on different keys rarely wait for each other. The budget is enforced
+    per shard and therefore holds only approximately for the whole cache.
+    Operations that cover every key, like get_dirty_entries, lock one
+    shard at a time and never stop all writers at once.
 
-    def __init__(self, max_size: int = 1000, ttl_seconds: float = 3600):
+    Expired entries read as missing as soon as their TTL passes. The
+    reaper started by start_reaper frees the ones nobody reads again,
+    doing only the work due in each tick.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = 1000,
+        ttl_seconds: float = 3600,
+        max_bytes: Optional[int] = None,
+        eviction_policy: str = "lru",
+        shards: int = 16,
+        expiry_tick: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        on_evict: Optional[Callable[[str, Any], None]] = None,
+    ):
         """Initialize cache store.
 
         Args:
-            max_size: Maximum number of entries
-            ttl_seconds: Time-to-live in seconds
+            max_size: Maximum number of entries; None for no limit
+            ttl_seconds: Default time-to-live in seconds
+            max_bytes: Maximum total size of cached values; None for no limit
+            eviction_policy: "lru", "slru" or "tinylfu"
+            shards: Number of independently locked partitions
+            expiry_tick: Seconds between reaper passes; expiry granularity
+            clock: Monotonic clock, injectable for tests
+            on_evict: Called with the key and value of every entry evicted
+                to stay within budget, under the shard's lock
         """
+        if shards < 1:
+            raise ValueError("A cache needs at least one shard")
         self._max_size = max_size
+        self._max_bytes = max_bytes
         self._ttl_seconds = ttl_seconds
+        self._policy_name = eviction_policy.lower()
+        # Small caches get fewer shards so each can still hold an entry
+        if max_size is not None:
+            shards = max(1, min(shards, max_size))
+        self._shards: List[CacheShard] = [
+            CacheShard(
+                math.ceil(max_size / shards) if max_size is not None else None,
+                math.ceil(max_bytes / shards) if max_bytes is not None else None,
+                self._policy_name,
+                clock,
+                expiry_tick,
+                on_evict,
+            )
+            for _ in range(shards)
+        ]
+        self._versions = itertools.count(1)
+        self._expiry_tick = expiry_tick
+        self._stop_event = threading.Event()
+        self._reaper_thread: Optional[threading.Thread] = None
 
-        self._cache: Dict[str, CacheEntry] = {}
-        self._dirty_keys: Set[str] = set()
-        self._version = 0
+    @classmethod
+    def from_config(cls, config: Any, shards: int = 16) -> "CacheStore":
+        """Build a cache from a CacheConfig (CACHE_MAX_SIZE_MB and friends)."""
+        return cls(
+            max_size=None,
+            ttl_seconds=config.ttl_seconds,
+            max_bytes=config.max_size_mb * 1024 * 1024,
+            eviction_policy=config.eviction_policy,
+            shards=shards,
+        )
 
-        # Use RLock to allow recursive locking
-        self._lock = threading.RLock()
-        self._write_lock = threading.RLock()
+    def _shard(self, key: str) -> CacheShard:
+        return self._shards[hash(key) % len(self._shards)]
 
     def get(self, key: str, consistency_level: Optional[str] = None) -> Optional[Any]:
         """Get value from cache.
@@ -57,48 +308,33 @@ class CacheStore(CacheInterface):
         Returns:
             Value if found, None if not found
         """
-        with (
-            self._write_lock
-            if consistency_level == ConsistencyLevel.STRONG.value
-            else self._lock
-        ):
-            entry = self._cache.get(key)
-            if entry is None:
-                return None
+        return self._shard(key).get(key)
 
-            # Check TTL
-            if (datetime.now() - entry.timestamp).total_seconds() > self._ttl_seconds:
-                del self._cache[key]
-                if key in self._dirty_keys:
-                    self._dirty_keys.remove(key)
-                return None
-
-            return entry.value
-
-    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+    def put(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        size: Optional[int] = None,
+    ) -> bool:
         """Put value in cache.
 
         Args:
             key: Cache key
             value: Value to cache
-            ttl: Time-to-live in seconds
+            ttl: Time-to-live in seconds; the cache default when None
+            size: Bytes charged against the budget; sizeof(value) when None
 
         Returns:
-            True if entry was added
+            True if entry was added, False if it was too large or not admitted
         """
-        with self._write_lock:
-            if len(self._cache) >= self._max_size:
-                # Evict oldest entry
-                oldest_key = min(self._cache.items(), key=lambda x: x[1].timestamp)[0]
-                del self._cache[oldest_key]
-                if oldest_key in self._dirty_keys:
-                    self._dirty_keys.remove(oldest_key)
-
-            self._version += 1
-            self._cache[key] = CacheEntry(
-                value=value, version=self._version, timestamp=datetime.now()
-            )
-            return True
+        return self._shard(key).put(
+            key,
+            value,
+            sizeof(value) if size is None else size,
+            next(self._versions),
+            self._ttl_seconds if ttl is None else ttl,
+        )
 
     def delete(self, key: str) -> bool:
         """Delete cache entry.
@@ -109,43 +345,100 @@ class CacheStore(CacheInterface):
         Returns:
             True if entry was found and deleted
         """
-        with self._write_lock:
-            if key in self._cache:
-                del self._cache[key]
-                if key in self._dirty_keys:
-                    self._dirty_keys.remove(key)
-                return True
-            return False
+        return self._shard(key).delete(key)
 
     def clear(self) -> None:
         """Clear all cache entries."""
-        with self._write_lock:
-            self._cache.clear()
-            self._dirty_keys.clear()
-            self._version = 0
+        for shard in self._shards:
+            shard.clear()
+        self._versions = itertools.count(1)
+
+    def expire(self) -> int:
+        """Drop entries past their TTL, one shard at a time.
+
+        Returns:
+            Number of entries dropped
+        """
+        return sum(shard.expire() for shard in self._shards)
+
+    def start_reaper(self) -> None:
+        """Start dropping expired entries in the background."""
+        if self._reaper_thread is not None:
+            return
+
+        self._stop_event.clear()
+        self._reaper_thread = threading.Thread(target=self._reap_loop)
+        self._reaper_thread.daemon = True
+        self._reaper_thread.start()
+
+    def stop_reaper(self) -> None:
+        """Stop the background reaper."""
+        if self._reaper_thread is None:
+            return
+
+        self._stop_event.set()
+        self._reaper_thread.join()
+        self._reaper_thread = None
+
+    def _reap_loop(self) -> None:
+        while not self._stop_event.wait(self._expiry_tick):
+            try:
+                self.expire()
+            except Exception as e:
+                logger.error(f"Error expiring cache entries: {e}")
 
     def get_dirty_keys(self) -> Set[str]:
         """Get keys that have been modified but not synced."""
-        return self._dirty_keys.copy()
+        keys: Set[str] = set()
+        for shard in self._shards:
+            keys |= shard.dirty_keys()
+        return keys
 
     def mark_dirty(self, key: str) -> None:
         """Mark a key as dirty (needs syncing)."""
-        with self._lock:
-            if key in self._cache:
-                self._dirty_keys.add(key)
+        self._shard(key).mark_dirty(key)
 
     def mark_clean(self, key: str) -> None:
         """Mark a key as clean (synced)."""
-        with self._lock:
-            self._dirty_keys.discard(key)
+        self._shard(key).mark_clean(key)
 
     def get_dirty_entries(self) -> Dict[str, CacheEntry]:
         """Get all dirty cache entries that need to be synced.
 
+        Shards are visited one at a time, so the result is not a snapshot
+        of a single instant.
+
         Returns:
             Dict mapping keys to cache entries that are marked as dirty
         """
-        with self._lock:
-            return {
-                key: self._cache[key] for key in self._dirty_keys if key in self._cache
-            }
+        entries: Dict[str, CacheEntry] = {}
+        for shard in self._shards:
+            entries.update(shard.dirty_entries())
+        return entries
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Occupancy and hit, eviction and admission counters.
+
+        Counters only grow; rates are their change over an interval.
+        """
+        totals = dict.fromkeys(_COUNTERS, 0)
+        size = total_bytes = dirty = 0
+        for shard in self._shards:
+            with shard.lock:
+                for name in _COUNTERS:
+                    totals[name] += shard.counters[name]
+                size += len(shard)
+                total_bytes += shard.bytes
+                dirty += len(shard._dirty_keys)
+        lookups = totals["hits"] + totals["misses"]
+        return {
+            "size": size,
+            "max_size": self._max_size,
+            "bytes": total_bytes,
+            "max_bytes": self._max_bytes,
+            "eviction_policy": self._policy_name,
+            "shards": len(self._shards),
+            **totals,
+            "hit_ratio": totals["hits"] / lookups if lookups else 0.0,
+            "dirty_entries": dirty,
+        }
@@ -2,19 +2,14 @@
 
 import asyncio
 import logging
-from typing import Dict, Set, Optional, Any
+from typing import Dict, Iterator, List, Set, Optional, Any, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
-
-@dataclass
-class VersionedData:
-    """Data with version information."""
-
-    content: bytes
-    version: int
-    timestamp: datetime
-    checksum: str
+from src.storage.infrastructure.data.hlc import HybridLogicalClock
+from src.storage.infrastructure.data.merkle_tree import MerkleTree
+from src.storage.infrastructure.data.version_log import VersionLog
+from src.storage.infrastructure.data.version_store import VersionedData, VersionStore
 
 
 @dataclass
@@ -32,50 +27,314 @@ class WriteOperation:
 class ConsistencyManager:
     """Manages data consistency across storage nodes."""
 
-    def __init__(self, quorum_size: int = 2):
+    def __init__(
+        self,
+        quorum_size: int = 2,
+        state_dir: Optional[str] = None,
+        checkpoint_interval: int = 100_000,
+        keep_content: bool = True,
+        node_id: str = "",
+        merkle_depth: int = 12,
+    ):
+        """Initialize the consistency manager.
+
+        Args:
+            quorum_size: Number of nodes needed for a quorum
+            state_dir: Directory for the version log; state is kept in memory
+                only when not given
+            checkpoint_interval: Log records between checkpoints
+            keep_content: Hold ``VersionedData.content`` in memory; nodes that
+                reference payloads by ``location`` turn this off
+            node_id: Node issuing versions, used to tag its clock stamps
+            merkle_depth: Depth of the Merkle tree over this node's own
+                versions; peers must use the same depth to compare trees
+        """
         self.quorum_size = quorum_size
         self.logger = logging.getLogger(__name__)
-        self._version_map: Dict[str, Dict[str, VersionedData]] = (
-            {}
-        )  # data_id -> {node_id -> version}
+        # data_id -> {node_id -> version}, indexed by node as well
+        self._versions = VersionStore(keep_content=keep_content)
         self._pending_writes: Dict[str, WriteOperation] = {}
         self._write_locks: Dict[str, asyncio.Lock] = {}
-        self._active_nodes: Dict[str, Set[str]] = {}  # data_id -> set of node_ids
-        self._current_version = 0
+        # Versions are hybrid logical clock stamps, so coordinators can
+        # issue them concurrently without agreeing on a counter
+        self.clock = HybridLogicalClock(node_id)
+        self._current_version = 0  # highest version issued or seen
+        self.node_id = node_id
+        # Hash tree over the versions held by this node, for anti-entropy
+        self.merkle_tree = MerkleTree(merkle_depth)
+        self.checkpoint_interval = checkpoint_interval
+        self._checkpoint_task: Optional[asyncio.Task] = None
+        self._log: Optional[VersionLog] = None
+        # Records appended / known to be on stable storage, for sync_log
+        self._log_appended = 0
+        self._log_synced = 0
+        self._log_sync_task: Optional[asyncio.Task] = None
+        self._log_sync_lock = asyncio.Lock()  # held while the log is fsync'd
+        if state_dir is not None:
+            self._log = VersionLog(state_dir)
+            for record in self._log.recover():
+                self._apply(record)
+            self.clock.observe(self._current_version)
+
+    # Version log records. Content is not logged: blocks live on disk and
+    # are found through ``location``.
+
+    def _apply(self, record: list) -> None:
+        """Apply a recovered log or checkpoint record to the in-memory state."""
+        op = record[0]
+        if op == "put":
+            self._apply_put(record[1:])
+        elif op == "puts":
+            for put in record[1]:
+                self._apply_put(put)
+        elif op == "del":
+            self._drop_version(record[2], record[1])
+        elif op == "begin":
+            _, data_id, version, checksum, timestamp, level = record
+            self._pending_writes[data_id] = WriteOperation(
+                data_id=data_id,
+                content=b"",
+                version=version,
+                checksum=checksum,
+                timestamp=datetime.fromisoformat(timestamp),
+                consistency_level=level,
+            )
+        elif op == "end":
+            self._pending_writes.pop(record[1], None)
+        elif op == "counter":
+            self._current_version = max(self._current_version, record[1])
+        else:
+            self.logger.warning(f"Skipping unknown version log record {op!r}")
+
+    def _apply_put(self, put: list) -> None:
+        data_id, node_id, version, timestamp, checksum, location = put
+        self._put_version(
+            node_id,
+            data_id,
+            VersionedData(
+                content=b"",
+                version=version,
+                timestamp=datetime.fromisoformat(timestamp),
+                checksum=checksum,
+                location=location,
+            ),
+        )
+
+    def _log_record(self, record: list) -> None:
+        if self._log is None:
+            return
+        self._log.append(record)
+        self._log_appended += 1
+        if (
+            self._log.records_since_checkpoint >= self.checkpoint_interval
+            and (self._checkpoint_task is None or self._checkpoint_task.done())
+        ):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return  # picked up by the next update made on the loop
+            self._checkpoint_task = loop.create_task(self.checkpoint())
+
+    @staticmethod
+    def _put_record(node_id: str, data_id: str, data: VersionedData) -> list:
+        return [
+            "put",
+            data_id,
+            node_id,
+            data.version,
+            data.timestamp.isoformat(),
+            data.checksum,
+            data.location,
+        ]
+
+    def _snapshot_records(self) -> Iterator[list]:
+        """Records that rebuild the current state from scratch."""
+        versions = self._versions.copy()
+        pending = list(self._pending_writes.values())
+        counter = self._current_version
+
+        def records():
+            yield ["counter", counter]
+            # Versions are grouped so recovery decodes one record per batch
+            batch = []
+            for data_id, node_id, data in versions.items():
+                batch.append(self._put_record(node_id, data_id, data)[1:])
+                if len(batch) >= 1024:
+                    yield ["puts", batch]
+                    batch = []
+            if batch:
+                yield ["puts", batch]
+            for op in pending:
+                yield [
+                    "begin",
+                    op.data_id,
+                    op.version,
+                    op.checksum,
+                    op.timestamp.isoformat(),
+                    op.consistency_level,
+                ]
+
+        return records()
+
+    async def checkpoint(self) -> None:
+        """Write a compacted checkpoint and drop the log it supersedes.
+
+        The state is copied on the event loop so it is consistent with the
+        log position; serialising and syncing it runs in a thread.
+        """
+        if self._log is None:
+            return
+        # Rotating closes the segment a running sync may be using
+        async with self._log_sync_lock:
+            segment_id = self._log.rotate()
+        records = self._snapshot_records()
+        await asyncio.to_thread(self._log.write_checkpoint, records, segment_id)
+
+    async def sync_log(self) -> None:
+        """Wait until every record logged so far is on stable storage.
+
+        Callers that arrive while a sync is running wait for the next one,
+        so concurrent writers share fsyncs of the log.
+        """
+        target = self._log_appended
+        while self._log is not None and self._log_synced < target:
+            if self._log_sync_task is None or self._log_sync_task.done():
+                self._log_sync_task = asyncio.ensure_future(self._sync_log())
+            await asyncio.shield(self._log_sync_task)
+
+    async def _sync_log(self) -> None:
+        async with self._log_sync_lock:
+            appended = self._log_appended
+            if self._log is not None:
+                await asyncio.to_thread(self._log.sync)
+            self._log_synced = max(self._log_synced, appended)
+
+    async def stop(self) -> None:
+        """Checkpoint and close the version log."""
+        if self._log is None:
+            return
+        if self._checkpoint_task is not None:
+            await asyncio.gather(self._checkpoint_task, return_exceptions=True)
+        await self.checkpoint()
+        async with self._log_sync_lock:
+            self._log.close()
+            self._log = None
 
     async def get_next_version(self, data_id: str) -> int:
         """Get next version number for data."""
-        if data_id not in self._version_map:
-            return 1
-
-        max_version = max(data.version for data in self._version_map[data_id].values())
-        return max_version + 1
+        max_version = self._versions.max_version(data_id)
+        if max_version is None:
+            version = self.clock.now()
+        else:
+            version = self.clock.update(max_version)
+        self._current_version = max(self._current_version, version)
+        return version
 
     async def update_node_version(
         self, node_id: str, data_id: str, version_data: VersionedData
     ) -> None:
         """Update version information for a node."""
-        # Initialize version map for data_id if it doesn't exist
-        if data_id not in self._version_map:
-            self._version_map[data_id] = {}
+        self._put_version(node_id, data_id, version_data)
+        self._log_record(self._put_record(node_id, data_id, version_data))
 
-        # Initialize active nodes set for data_id if it doesn't exist
-        if data_id not in self._active_nodes:
-            self._active_nodes[data_id] = set()
-
-        # Update version information
-        self._version_map[data_id][node_id] = version_data
-
-        # Add node to active nodes
-        self._active_nodes[data_id].add(node_id)
+    def _put_version(
+        self, node_id: str, data_id: str, version_data: VersionedData
+    ) -> None:
+        if node_id == self.node_id:
+            old = self._versions.digest(data_id, node_id)
+            self._versions.put(data_id, node_id, version_data)
+            self.merkle_tree.update(data_id, old, self._versions.digest(data_id, node_id))
+        else:
+            self._versions.put(data_id, node_id, version_data)
+        self.observe_version(version_data.version)
+
+    def observe_version(self, version: int) -> None:
+        """Note a version seen elsewhere so later versions sort after it."""
+        if version > self._current_version:
+            self._current_version = version
+            self.clock.observe(version)
+
+    def get_node_version(self, node_id: str, data_id: str) -> Optional[VersionedData]:
+        """Get the version of data held by a node, if any."""
+        return self._versions.get(data_id, node_id)
+
+    def latest_known_version(self, data_id: str) -> int:
+        """Highest version of data known on any node; 0 if none is."""
+        return self._versions.max_version(data_id) or 0
+
+    def get_replica_nodes(self, data_id: str) -> List[str]:
+        """Get the ids of nodes holding a version of the data."""
+        return self._versions.replica_nodes(data_id)
+
+    async def remove_version(self, node_id: str, data_id: str) -> None:
+        """Forget the version of data held by a node."""
+        self._drop_version(node_id, data_id)
+        self._log_record(["del", data_id, node_id])
+
+    def _drop_version(self, node_id: str, data_id: str) -> None:
+        if node_id == self.node_id:
+            old = self._versions.digest(data_id, node_id)
+            if self._versions.remove(data_id, node_id):
+                self.merkle_tree.update(data_id, old, None)
+        else:
+            self._versions.remove(data_id, node_id)
+
+    def get_leaf_entries(self, leaf: int) -> Dict[str, Tuple[int, str]]:
+        """(version, checksum) of this node's data ids in a Merkle leaf."""
+        entries = {}
+        for data_id in self.merkle_tree.leaf_ids(leaf):
+            entry = self._versions.digest(data_id, self.node_id)
+            if entry is not None:
+                entries[data_id] = entry
+        return entries
+
+    def get_local_entries(self) -> Dict[str, Tuple[int, str]]:
+        """(version, checksum) of every data id this node holds."""
+        entries = {}
+        for leaf in range(1 << self.merkle_tree.depth):
+            entries.update(self.get_leaf_entries(leaf))
+        return entries
+
+    def get_write_lock(self, key: str) -> asyncio.Lock:
+        """Get the lock serialising local access to a key."""
+        if key not in self._write_locks:
+            self._write_locks[key] = asyncio.Lock()
+        return self._write_locks[key]
+
+    def get_read_lock(self, key: str) -> asyncio.Lock:
+        """Get the lock for reading a key; shared with writers."""
+        return self.get_write_lock(key)
 
     def get_node_data(self, node_id: str) -> Dict[str, VersionedData]:
         """Get all data versions for a node."""
-        result = {}
-        for data_id, node_versions in self._version_map.items():
-            if node_id in node_versions:
-                result[data_id] = node_versions[node_id]
-        return result
+        return dict(self._versions.node_items(node_id))
+
+    def count_node_data(self, node_id: str) -> int:
+        """Number of data items held by a node."""
+        return self._versions.node_count(node_id)
+
+    def iter_node_data(
+        self, node_id: str, page_size: int = 1000, after: Optional[str] = None
+    ) -> Iterator[Dict[str, VersionedData]]:
+        """Iterate over a node's data versions in pages of ``page_size``.
+
+        The node's data ids are captured when iteration starts; items
+        removed from the node before their page is built are skipped, so
+        the caller can apply changes between pages. Given ``after``, data
+        ids are visited in sorted order starting after it, so an
+        iteration can be resumed from the last id it reached.
+        """
+        data_ids = self._versions.node_data_ids(node_id)
+        if after is not None:
+            data_ids = sorted(data_id for data_id in data_ids if data_id > after)
+        for start in range(0, len(data_ids), page_size):
+            page = {}
+            for data_id in data_ids[start:start + page_size]:
+                version_data = self._versions.get(data_id, node_id)
+                if version_data is not None:
+                    page[data_id] = version_data
+            if page:
+                yield page
 
     async def start_write(self, write_op: WriteOperation) -> None:
         """Start a write operation."""
@@ -83,6 +342,16 @@ class ConsistencyManager:
             self._write_locks[write_op.data_id] = asyncio.Lock()
 
         self._pending_writes[write_op.data_id] = write_op
+        self._log_record(
+            [
+                "begin",
+                write_op.data_id,
+                write_op.version,
+                write_op.checksum,
+                write_op.timestamp.isoformat(),
+                write_op.consistency_level,
+            ]
+        )
 
     async def complete_write(self, data_id: str, successful_nodes: Set[str]) -> bool:
         """Complete a write operation."""
@@ -95,7 +364,7 @@ class ConsistencyManager:
 
         try:
             # Get total active nodes for this data
-            total_nodes = len(self._active_nodes.get(data_id, set()))
+            total_nodes = len(self._versions.replica_nodes(data_id))
             self.logger.info(f"Total active nodes for {data_id}: {total_nodes}")
             self.logger.info(f"Successful nodes: {successful_nodes}")
 
@@ -135,6 +404,7 @@ class ConsistencyManager:
             # Only clean up on success
             if data_id in self._pending_writes:
                 del self._pending_writes[data_id]
+                self._log_record(["end", data_id])
 
             return True
 
@@ -146,10 +416,7 @@ class ConsistencyManager:
         self, data_id: str, consistency_level: str = "eventual"
     ) -> Optional[VersionedData]:
         """Get latest version of data based on consistency level."""
-        if data_id not in self._version_map:
-            return None
-
-        node_versions = self._version_map[data_id]
+        node_versions = self._versions.replicas(data_id)
         if not node_versions:
             return None
 
@@ -160,27 +427,43 @@ class ConsistencyManager:
                 return None
 
         # Return newest version
-        return max(node_versions.values(), key=lambda x: (x.version, x.timestamp))
+        return max(node_versions.values(), key=lambda x: (x.version, x.checksum))
 
     def generate_version(self) -> int:
-        """Generate a new version number for data updates."""
-        self._current_version += 1
-        return self._current_version
+        """Generate a new version stamp for data updates."""
+        version = self.clock.now()
+        self._current_version = max(self._current_version, version)
+        self._log_record(["counter", version])
+        return version
 
     def validate_version(self, version: int, timestamp: datetime) -> bool:
         """Validate if a version is current and consistent."""
         return version > 0 and version <= self._current_version
 
+    def verify_consistency(self, read_results: List[Dict[str, Any]]) -> bool:
+        """Check that replica read results all carry the same version."""
+        digests = {
+            (r.get("version"), r.get("checksum") or None) for r in read_results
+        }
+        versions = {version for version, _ in digests}
+        checksums = {checksum for _, checksum in digests if checksum}
+        return len(versions) <= 1 and len(checksums) <= 1
+
+    @staticmethod
+    def version_order(result: Dict[str, Any]) -> tuple:
+        """Sort key for replica results; the largest is the winner.
+
+        Versions are HLC stamps, so they already order writes across
+        coordinators. The checksum only breaks exact ties deterministically,
+        so every node picks the same winner without consulting wall clocks.
+        """
+        return (result.get("version", 0), result.get("checksum") or "")
+
     def resolve_conflicts(self, versions: Dict[str, Any]) -> Dict[str, Any]:
-        """Resolve version conflicts using timestamp and version number."""
+        """Resolve version conflicts by comparing version stamps."""
         if not versions:
             return None
 
-        # Sort by version number (descending) and timestamp
-        sorted_versions = sorted(
-            versions.values(),
-            key=lambda x: (x.get("version", 0), x.get("timestamp", datetime.min)),
-            reverse=True,
-        )
-
-        return sorted_versions[0]
+        winner = max(versions.values(), key=self.version_order)
+        self.observe_version(winner.get("version", 0))
+        return winner
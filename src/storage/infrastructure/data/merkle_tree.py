@@ -0,0 +1,94 @@
+"""Incrementally maintained Merkle tree over a node's block versions.
+
+The tree has a fixed shape of ``2 ** depth`` leaves. A data id always
+falls in the same leaf, chosen from a hash of the id, so trees built by
+different nodes with the same depth line up bucket for bucket.
+
+A leaf's hash is the XOR of the digests of its (data_id, version,
+checksum) entries and every inner node is the XOR of its two children.
+A write therefore changes one leaf and its ``depth`` ancestors by the
+same delta, in O(depth), without rehashing anything else. Two trees are
+compared top-down, descending only into subtrees whose hashes differ.
+"""
+
+import hashlib
+import zlib
+from typing import List, Optional, Sequence, Set, Tuple
+
+Entry = Tuple[int, str]  # (version, checksum)
+
+MAX_DEPTH = 24
+
+
+def entry_digest(data_id: str, version: int, checksum: str) -> int:
+    """128-bit digest of one (data_id, version, checksum) entry."""
+    digest = hashlib.blake2b(
+        b"%s\0%d\0%s" % (data_id.encode("utf-8"), version, checksum.encode("utf-8")),
+        digest_size=16,
+    ).digest()
+    return int.from_bytes(digest, "big")
+
+
+class MerkleTree:
+    """Fixed-shape XOR hash tree over versioned entries.
+
+    Args:
+        depth: Number of levels below the root; the tree has
+            ``2 ** depth`` leaves
+    """
+
+    def __init__(self, depth: int = 12):
+        if not 0 <= depth <= MAX_DEPTH:
+            raise ValueError(f"Merkle tree depth must be between 0 and {MAX_DEPTH}")
+        self.depth = depth
+        # _levels[level][index]; level 0 is the root, level ``depth`` the leaves
+        self._levels: List[List[int]] = [
+            [0] * (1 << level) for level in range(depth + 1)
+        ]
+        self._leaf_ids: List[Set[str]] = [set() for _ in range(1 << depth)]
+
+    @property
+    def root(self) -> int:
+        return self._levels[0][0]
+
+    def leaf_of(self, data_id: str) -> int:
+        """Index of the leaf covering a data id."""
+        return zlib.crc32(data_id.encode("utf-8")) >> (32 - self.depth)
+
+    def update(self, data_id: str, old: Optional[Entry], new: Optional[Entry]) -> None:
+        """Replace the entry for a data id.
+
+        Args:
+            data_id: Data id being changed
+            old: (version, checksum) previously recorded, None if absent
+            new: (version, checksum) now held, None if removed
+        """
+        leaf = self.leaf_of(data_id)
+        if new is None:
+            self._leaf_ids[leaf].discard(data_id)
+        else:
+            self._leaf_ids[leaf].add(data_id)
+
+        delta = 0
+        if old is not None:
+            delta ^= entry_digest(data_id, *old)
+        if new is not None:
+            delta ^= entry_digest(data_id, *new)
+        if not delta:
+            return
+
+        index = leaf
+        for level in range(self.depth, -1, -1):
+            self._levels[level][index] ^= delta
+            index >>= 1
+
+    def hashes(self, level: int, indices: Sequence[int]) -> List[int]:
+        """Hashes of the nodes at ``indices`` on one level."""
+        if not 0 <= level <= self.depth:
+            raise ValueError(f"No level {level} in a tree of depth {self.depth}")
+        row = self._levels[level]
+        return [row[index] for index in indices]
+
+    def leaf_ids(self, leaf: int) -> List[str]:
+        """Data ids currently covered by a leaf."""
+        return list(self._leaf_ids[leaf])
@@ -2,12 +2,22 @@
 
 import asyncio
 import logging
-from typing import Dict, List, Set, Optional, Any
+from typing import AsyncIterator, Dict, List, Set, Optional, Any
 import hashlib
 from datetime import datetime
 import aiohttp
 from dataclasses import dataclass
 
+from src.storage.infrastructure.block_protocol import (
+    CONTENT_TYPE as BLOCK_FRAME_CONTENT_TYPE,
+    STREAM_PATH,
+    WRITE_PATH,
+    BlockRecord,
+    encode_frame,
+)
+from src.storage.infrastructure.hash_ring import HashRing
+from src.storage.infrastructure.peer_transport import PeerTransport
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,13 +28,82 @@ class ReplicationResult:
     success: bool
     error: Optional[str] = None
     timestamp: datetime = datetime.now()
+    checksum: Optional[str] = None
+
+
+class ReplicaStream:
+    """Bounded chunk channel feeding a streaming upload to one replica.
+
+    The producer blocks once ``max_buffered_chunks`` chunks are waiting, so
+    a stream never holds more than that many chunks in memory. If the
+    upload finishes early (for example because the replica rejected it)
+    the stream is marked failed and further pushes are dropped.
+    """
+
+    def __init__(self, node: Any, max_buffered_chunks: int = 1):
+        self.node = node
+        self.failed = False
+        self.task: Optional[asyncio.Task] = None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered_chunks)
+
+    def attach(self, task: asyncio.Task) -> None:
+        """Attach the upload task consuming this stream."""
+        self.task = task
+        task.add_done_callback(self._on_upload_done)
+
+    def _on_upload_done(self, task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() or not task.result().success:
+            self.failed = True
+        # Unblock a producer waiting on a stream nobody reads any more
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    async def push(self, chunk: bytes, timeout: float) -> bool:
+        """Queue a chunk for the replica, giving up on it after ``timeout``."""
+        if self.failed:
+            return False
+        try:
+            await asyncio.wait_for(self._queue.put(chunk), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Replica {self.node.node_id} stalled, dropping stream")
+            self.abort()
+            return False
+
+    async def close(self, timeout: float) -> None:
+        """Signal the end of the stream to the upload."""
+        await self.push(None, timeout)
+
+    def abort(self) -> None:
+        """Cancel the upload and discard anything still buffered."""
+        self.failed = True
+        if self.task and not self.task.done():
+            self.task.cancel()
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """Yield queued chunks until the stream is closed."""
+        while True:
+            chunk = await self._queue.get()
+            if chunk is None:
+                return
+            yield chunk
 
 
 class ReplicationManager:
     """Manages data replication across storage nodes."""
 
-    def __init__(self, min_replicas: int = 3):
+    def __init__(
+        self,
+        min_replicas: int = 3,
+        transport: Optional[PeerTransport] = None,
+        ring: Optional[HashRing] = None,
+    ):
         self.min_replicas = min_replicas
+        # Placement ring, kept in step with cluster membership by the owner
+        self.ring = ring if ring is not None else HashRing()
+        # Reuse the owning node's transport when given, otherwise keep our own
+        self._owns_transport = transport is None
+        self.transport = transport or PeerTransport()
         self._replication_tasks: Dict[str, asyncio.Task] = {}
         self._data_locations: Dict[str, Set[str]] = {}  # data_id -> set of node_ids
         self._initialized = False
@@ -50,81 +129,177 @@ class ReplicationManager:
             return False
 
     async def replicate_to_node(
-        self, node: Any, data_id: str, content: bytes, checksum: str
+        self,
+        node: Any,
+        record: BlockRecord,
+        verify_checksum: bool = True,
     ) -> ReplicationResult:
-        """Replicate data to a specific node."""
+        """Replicate a block to a specific node.
+
+        The block is sent to the node's ``WRITE_PATH`` endpoint as a binary
+        frame. Callers that computed the record's checksum from its content
+        themselves can pass ``verify_checksum=False`` to skip hashing the
+        payload again.
+        """
         if not self._initialized:
             return ReplicationResult(
                 success=False, error="Replication manager not initialized"
             )
 
+        data_id = record.data_id
         try:
             # Verify data integrity
-            if hashlib.sha256(content).hexdigest() != checksum:
+            if (
+                verify_checksum
+                and hashlib.sha256(record.content).hexdigest() != record.checksum
+            ):
                 return ReplicationResult(
                     success=False, error="Data integrity check failed"
                 )
 
             # Send data to node
-            async with aiohttp.ClientSession() as session:
-                async with session.put(
-                    f"http://{node.pod_ip}:8080/data/{data_id}",
-                    data=content,
-                    headers={
-                        "Content-Type": "application/octet-stream",
-                        "X-Checksum": checksum,
-                    },
-                    timeout=30.0,
-                ) as response:
-                    if response.status == 200:
-                        # Update data locations
-                        if data_id not in self._data_locations:
-                            self._data_locations[data_id] = set()
-                        self._data_locations[data_id].add(node.node_id)
-                        logger.info(
-                            f"Successfully replicated {data_id} to node {node.node_id}"
-                        )
-                        return ReplicationResult(success=True)
-                    else:
-                        error = f"Failed to replicate to node: HTTP {response.status}"
-                        logger.error(error)
-                        return ReplicationResult(success=False, error=error)
+            async with self.transport.request(
+                node.address,
+                "POST",
+                WRITE_PATH,
+                data=encode_frame([record]),
+                headers={"Content-Type": BLOCK_FRAME_CONTENT_TYPE},
+                timeout=30.0,
+            ) as response:
+                if response.status == 200:
+                    # Update data locations
+                    if data_id not in self._data_locations:
+                        self._data_locations[data_id] = set()
+                    self._data_locations[data_id].add(node.node_id)
+                    logger.info(
+                        f"Successfully replicated {data_id} to node {node.node_id}"
+                    )
+                    return ReplicationResult(success=True, checksum=record.checksum)
+                else:
+                    error = f"Failed to replicate to node: HTTP {response.status}"
+                    logger.error(error)
+                    return ReplicationResult(success=False, error=error)
 
         except Exception as e:
             error = f"Replication error: {str(e)}"
             logger.error(error)
             return ReplicationResult(success=False, error=error)
 
-    def _select_replica_nodes(self, count: int, exclude_nodes: Set[str]) -> List[Any]:
-        """Select nodes for replication based on availability and load."""
-        # This is a placeholder - in practice, you would:
-        # 1. Get list of all available nodes
-        # 2. Filter out excluded nodes
-        # 3. Sort by capacity and load
-        # 4. Return top 'count' nodes
-        return []
+    def open_replica_stream(
+        self, node: Any, data_id: str, version: int, timestamp: datetime
+    ) -> ReplicaStream:
+        """Start a streaming upload to ``node`` and return its chunk channel."""
+        stream = ReplicaStream(node)
+        stream.attach(
+            asyncio.create_task(
+                self.replicate_stream_to_node(
+                    node, data_id, stream.chunks(), version, timestamp
+                )
+            )
+        )
+        return stream
+
+    async def replicate_stream_to_node(
+        self,
+        node: Any,
+        data_id: str,
+        chunks: AsyncIterator[bytes],
+        version: int,
+        timestamp: datetime,
+    ) -> ReplicationResult:
+        """Replicate data to a node from a chunk stream.
+
+        The body is sent to the node's ``STREAM_PATH`` endpoint with chunked
+        transfer encoding as chunks arrive. The replica reports the checksum
+        it computed in ``X-Checksum`` so the caller can verify it against
+        its own.
+        """
+        if not self._initialized:
+            return ReplicationResult(
+                success=False, error="Replication manager not initialized"
+            )
+
+        try:
+            async with self.transport.request(
+                node.address,
+                "PUT",
+                f"{STREAM_PATH}/{data_id}",
+                data=chunks,
+                headers={
+                    "Content-Type": "application/octet-stream",
+                    "X-Version": str(version),
+                    "X-Timestamp": timestamp.isoformat(),
+                },
+                # Large objects can take a while; only bound stalls
+                timeout=aiohttp.ClientTimeout(total=None, sock_read=30.0),
+            ) as response:
+                if response.status == 200:
+                    if data_id not in self._data_locations:
+                        self._data_locations[data_id] = set()
+                    self._data_locations[data_id].add(node.node_id)
+                    return ReplicationResult(
+                        success=True, checksum=response.headers.get("X-Checksum")
+                    )
+                error = f"Failed to stream to node: HTTP {response.status}"
+                logger.error(error)
+                return ReplicationResult(success=False, error=error)
+
+        except Exception as e:
+            error = f"Streaming replication error: {str(e)}"
+            logger.error(error)
+            return ReplicationResult(success=False, error=error)
+
+    async def stop(self) -> None:
+        """Cancel outstanding replication tasks and release the transport."""
+        for task in self._replication_tasks.values():
+            task.cancel()
+        self._replication_tasks.clear()
+        if self._owns_transport:
+            await self.transport.close()
+
+    def _select_replica_nodes(
+        self, count: int, exclude_nodes: Set[str], data_id: Optional[str] = None
+    ) -> List[Any]:
+        """Select nodes for replication from the hash ring.
+
+        Args:
+            count: Number of nodes wanted
+            exclude_nodes: Node ids that must not be chosen
+            data_id: Key being placed; nodes are taken from its preference list
+
+        Returns:
+            Up to ``count`` nodes, in placement order
+        """
+        if data_id is None:
+            return []
+        members = self.ring.preference_list(data_id, count, exclude=exclude_nodes)
+        return [member.node or member.node_id for member in members]
 
     async def ensure_replication_level(
-        self, data_id: str, content: bytes, current_nodes: Set[str]
-    ) -> None:
-        """Ensure data has minimum number of replicas."""
+        self, record: BlockRecord, current_nodes: Set[str]
+    ) -> List[Any]:
+        """Ensure a block has minimum number of replicas.
+
+        Returns:
+            The nodes that accepted a new copy of the block
+        """
         if not self._initialized:
             logger.error("Replication manager not initialized")
-            return
+            return []
 
         if len(current_nodes) >= self.min_replicas:
-            return
+            return []
 
         needed_replicas = self.min_replicas - len(current_nodes)
-        target_nodes = self._select_replica_nodes(needed_replicas, current_nodes)
+        target_nodes = self._select_replica_nodes(
+            needed_replicas, current_nodes, record.data_id
+        )
 
         # Start parallel replication to target nodes
         replication_tasks = []
-        checksum = hashlib.sha256(content).hexdigest()
-
         for node in target_nodes:
             task = asyncio.create_task(
-                self.replicate_to_node(node, data_id, content, checksum)
+                self.replicate_to_node(node, record, verify_checksum=False)
             )
             replication_tasks.append(task)
 
@@ -132,6 +307,7 @@ class ReplicationManager:
         results = await asyncio.gather(*replication_tasks, return_exceptions=True)
 
         # Log any failures
+        replicated = []
         for node, result in zip(target_nodes, results):
             if isinstance(result, Exception):
                 logger.error(
@@ -141,6 +317,9 @@ class ReplicationManager:
                 logger.error(
                     f"Replication to node {node.node_id} failed: {result.error}"
                 )
+            else:
+                replicated.append(node)
+        return replicated
 
     async def handle_node_failure(self, failed_node_id: str) -> None:
         """Handle node failure by re-replicating affected data."""
@@ -164,14 +343,14 @@ class ReplicationManager:
             if len(current_nodes) < self.min_replicas:
                 # Note: In practice, you would need to retrieve the data content
                 # from one of the surviving replicas
-                content = await self._get_data_from_replicas(data_id, current_nodes)
-                if content:
-                    await self.ensure_replication_level(data_id, content, current_nodes)
+                record = await self._get_data_from_replicas(data_id, current_nodes)
+                if record:
+                    await self.ensure_replication_level(record, current_nodes)
 
     async def _get_data_from_replicas(
         self, data_id: str, replica_nodes: Set[str]
-    ) -> Optional[bytes]:
-        """Retrieve data from any available replica."""
+    ) -> Optional[BlockRecord]:
+        """Retrieve a block from any available replica."""
         if not self._initialized:
             logger.error("Replication manager not initialized")
             return None
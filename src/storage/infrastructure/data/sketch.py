@@ -0,0 +1,58 @@
+"""Approximate frequency counting for cache admission."""
+
+import hashlib
+from typing import List
+
+_HALVED = bytes(count >> 1 for count in range(256))
+
+
+class CountMinSketch:
+    """Count-min sketch of small counters that ages by halving.
+
+    Counters saturate at 15, and every ``sample_size`` additions all of
+    them are halved, so estimates reflect recent popularity rather than
+    all-time totals. The table is sized from the sample, which keeps
+    memory fixed however many distinct keys are seen.
+
+    Args:
+        sample_size: Additions between halvings
+        depth: Number of hash rows
+    """
+
+    MAX_COUNT = 15
+
+    def __init__(self, sample_size: int = 100_000, depth: int = 4):
+        width = 1
+        while width < max(16, sample_size // 4):
+            width <<= 1
+        self.width = width
+        self.depth = depth
+        self.sample_size = sample_size
+        self._mask = width - 1
+        self._rows: List[bytearray] = [bytearray(width) for _ in range(depth)]
+        self._additions = 0
+
+    def _indexes(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(
+            key.encode("utf-8"), digest_size=8 * self.depth
+        ).digest()
+        return [
+            int.from_bytes(digest[8 * row : 8 * row + 8], "little") & self._mask
+            for row in range(self.depth)
+        ]
+
+    def add(self, key: str) -> None:
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._halve()
+
+    def estimate(self, key: str) -> int:
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def _halve(self) -> None:
+        for row in self._rows:
+            row[:] = row.translate(_HALVED)
+        self._additions //= 2
@@ -0,0 +1,116 @@
+"""Hierarchical timing wheel for expiring cache entries."""
+
+from typing import Dict, List, Set, Tuple
+
+
+class TimerWheel:
+    """Deadlines of keys, bucketed so expiry never scans every key.
+
+    Level 0 has ``slots`` buckets of ``tick`` seconds each. Every level
+    above covers ``slots`` times the span of the one below. A key goes
+    into the coarsest level that still tells its deadline apart. When a
+    coarse bucket comes due its keys cascade to finer levels, and keys
+    in a due level-0 bucket expire. Scheduling and cancelling are O(1).
+    Advancing costs O(1) per elapsed tick plus the keys actually moved
+    or expired. Deadlines past the top level's span wait in its last
+    bucket and are placed again when it comes due.
+
+    Not thread-safe; callers hold their own lock.
+
+    Args:
+        now: Current time on the caller's monotonic clock
+        tick: Seconds per level-0 bucket
+        slots: Buckets per level
+        levels: Number of levels
+    """
+
+    def __init__(self, now: float, tick: float = 1.0, slots: int = 64, levels: int = 4):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self._wheels: List[List[Set[str]]] = [
+            [set() for _ in range(slots)] for _ in range(levels)
+        ]
+        self._deadlines: Dict[str, float] = {}
+        self._placed: Dict[str, Tuple[int, int]] = {}  # key -> (level, bucket)
+        self._current = int(now // tick)  # last tick processed
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def _place(self, key: str, deadline: float) -> None:
+        due = max(int(deadline // self.tick), self._current + 1)
+        delta = due - self._current
+        span = 1
+        for level in range(self.levels):
+            if delta < span * self.slots or level == self.levels - 1:
+                if delta >= span * self.slots:
+                    # Too far out: park in the last bucket to come due
+                    due = (self._current // span + self.slots - 1) * span
+                bucket = (due // span) % self.slots
+                self._wheels[level][bucket].add(key)
+                self._placed[key] = (level, bucket)
+                return
+            span *= self.slots
+
+    def schedule(self, key: str, deadline: float) -> None:
+        """Expire ``key`` at ``deadline``, replacing any earlier deadline."""
+        self.cancel(key)
+        self._deadlines[key] = deadline
+        self._place(key, deadline)
+
+    def cancel(self, key: str) -> None:
+        placed = self._placed.pop(key, None)
+        if placed is not None:
+            level, bucket = placed
+            self._wheels[level][bucket].discard(key)
+            del self._deadlines[key]
+
+    def _take(self, level: int, bucket: int) -> Set[str]:
+        keys = self._wheels[level][bucket]
+        self._wheels[level][bucket] = set()
+        for key in keys:
+            del self._placed[key]
+        return keys
+
+    def advance(self, now: float) -> List[str]:
+        """Move the wheel to ``now``; returns the keys that expired."""
+        target = int(now // self.tick)
+        expired: List[str] = []
+        if target - self._current >= self.slots**self.levels:
+            # Idle for longer than the wheel spans: sort every key again
+            keys = list(self._placed)
+            self._wheels = [
+                [set() for _ in range(self.slots)] for _ in range(self.levels)
+            ]
+            self._placed.clear()
+            self._current = target
+            for key in keys:
+                self._settle(key, now, expired)
+            return expired
+
+        while self._current < target:
+            self._current += 1
+            tick = self._current
+            due = []
+            span = self.slots
+            for level in range(1, self.levels):
+                if tick % span:
+                    break
+                due.append((level, (tick // span) % self.slots))
+                span *= self.slots
+            # Coarsest first, so cascaded keys land in buckets not yet taken
+            for level, bucket in reversed(due):
+                for key in self._take(level, bucket):
+                    self._settle(key, now, expired)
+            for key in self._take(0, tick % self.slots):
+                self._settle(key, now, expired)
+        return expired
+
+    def _settle(self, key: str, now: float, expired: List[str]) -> None:
+        deadline = self._deadlines[key]
+        if deadline <= now:
+            del self._deadlines[key]
+            expired.append(key)
+        else:
+            self._place(key, deadline)
@@ -0,0 +1,204 @@
+"""Write-ahead log and checkpoints for version metadata.
+
+The log is a sequence of numbered segment files holding framed records::
+
+    record : length(4) crc32(4) payload(length)
+
+where the payload is a compact JSON array. A checkpoint uses the same
+framing, holds the full state as records and ends with an ``end`` record,
+so an incomplete checkpoint is never mistaken for a complete one. A
+checkpoint named ``checkpoint-N`` covers every segment below ``N``; on
+recovery it is loaded and only segments ``N`` and above are replayed.
+"""
+
+import json
+import logging
+import os
+import struct
+import zlib
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+_FRAME = struct.Struct(">II")
+_SEGMENT_PREFIX = "wal-"
+_SEGMENT_SUFFIX = ".log"
+_CHECKPOINT_PREFIX = "checkpoint-"
+_CHECKPOINT_SUFFIX = ".ckpt"
+_END = "end"
+
+
+def encode_record(record: list) -> bytes:
+    payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _read_records(f: BinaryIO) -> Iterator[Tuple[list, int]]:
+    """Yield (record, end offset) until EOF or the first damaged record."""
+    offset = 0
+    while True:
+        header = f.read(_FRAME.size)
+        if len(header) < _FRAME.size:
+            return
+        length, crc = _FRAME.unpack(header)
+        payload = f.read(length)
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            return
+        offset += _FRAME.size + length
+        yield json.loads(payload), offset
+
+
+def _fsync_dir(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class VersionLog:
+    """Append-only, checksummed log of version updates with checkpoints."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.logger = logging.getLogger(__name__)
+        self.records_since_checkpoint = 0
+        self._segment_id = 0
+        self._segment: Optional[BinaryIO] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _segment_path(self, segment_id: int) -> str:
+        return os.path.join(
+            self.directory, f"{_SEGMENT_PREFIX}{segment_id:012d}{_SEGMENT_SUFFIX}"
+        )
+
+    def _checkpoint_path(self, segment_id: int) -> str:
+        return os.path.join(
+            self.directory, f"{_CHECKPOINT_PREFIX}{segment_id:012d}{_CHECKPOINT_SUFFIX}"
+        )
+
+    def _list(self, prefix: str, suffix: str) -> List[int]:
+        ids = []
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith(suffix):
+                try:
+                    ids.append(int(name[len(prefix) : -len(suffix)]))
+                except ValueError:
+                    continue
+        return sorted(ids)
+
+    def _load_checkpoint(self, segment_id: int) -> Optional[List[list]]:
+        records = []
+        with open(self._checkpoint_path(segment_id), "rb") as f:
+            for record, _ in _read_records(f):
+                if record[0] == _END:
+                    return records if record[1] == len(records) else None
+                records.append(record)
+        return None
+
+    def recover(self) -> Iterator[list]:
+        """Yield the checkpointed state followed by the log tail.
+
+        A damaged record at the end of the newest segment (a torn write from
+        a crash) is truncated away. Afterwards the log is open for appends.
+        """
+        segment_start = 0
+        for checkpoint_id in reversed(
+            self._list(_CHECKPOINT_PREFIX, _CHECKPOINT_SUFFIX)
+        ):
+            records = self._load_checkpoint(checkpoint_id)
+            if records is None:
+                self.logger.error(f"Ignoring incomplete checkpoint {checkpoint_id}")
+                continue
+            yield from records
+            segment_start = checkpoint_id
+            break
+
+        segments = [
+            s
+            for s in self._list(_SEGMENT_PREFIX, _SEGMENT_SUFFIX)
+            if s >= segment_start
+        ]
+        for segment_id in segments:
+            path = self._segment_path(segment_id)
+            valid_end = 0
+            with open(path, "rb") as f:
+                for record, valid_end in _read_records(f):
+                    self.records_since_checkpoint += 1
+                    yield record
+            if valid_end < os.path.getsize(path):
+                self.logger.warning(
+                    f"Truncating damaged record at offset {valid_end} of segment {segment_id}"
+                )
+                os.truncate(path, valid_end)
+                if segment_id != segments[-1]:
+                    # Later records depend on the lost ones; drop them too
+                    self.logger.error(
+                        f"Version log segment {segment_id} is damaged; "
+                        f"discarding later segments"
+                    )
+                    for later in segments[segments.index(segment_id) + 1 :]:
+                        os.remove(self._segment_path(later))
+                    segments = segments[: segments.index(segment_id) + 1]
+                    break
+
+        self._segment_id = segments[-1] if segments else segment_start
+        self._segment = open(self._segment_path(self._segment_id), "ab", buffering=0)
+
+    def append(self, record: list) -> None:
+        """Append a record; it reaches the OS before this returns.
+
+        The record is durable only after the next ``sync``.
+        """
+        self._segment.write(encode_record(record))
+        self.records_since_checkpoint += 1
+
+    def rotate(self) -> int:
+        """Start a new segment and return its id.
+
+        A checkpoint of the state as of this call covers every earlier segment.
+        The finished segment is synced first, so records already appended
+        stay durable until that checkpoint is written.
+        """
+        self.sync()
+        self._segment.close()
+        self._segment_id += 1
+        self._segment = open(self._segment_path(self._segment_id), "ab", buffering=0)
+        self.records_since_checkpoint = 0
+        return self._segment_id
+
+    def write_checkpoint(self, records: Iterable[list], segment_id: int) -> None:
+        """Write a checkpoint covering segments below ``segment_id``.
+
+        Blocking; run it off the event loop for large states. The checkpoint
+        is fsync'd and renamed into place before older segments and
+        checkpoints are removed.
+        """
+        path = self._checkpoint_path(segment_id)
+        tmp_path = f"{path}.tmp"
+        count = 0
+        with open(tmp_path, "wb") as f:
+            for record in records:
+                f.write(encode_record(record))
+                count += 1
+            f.write(encode_record([_END, count]))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        _fsync_dir(self.directory)
+
+        for old in self._list(_SEGMENT_PREFIX, _SEGMENT_SUFFIX):
+            if old < segment_id:
+                os.remove(self._segment_path(old))
+        for old in self._list(_CHECKPOINT_PREFIX, _CHECKPOINT_SUFFIX):
+            if old < segment_id:
+                os.remove(self._checkpoint_path(old))
+
+    def sync(self) -> None:
+        """Flush the active segment to stable storage."""
+        if self._segment is not None:
+            os.fsync(self._segment.fileno())
+
+    def close(self) -> None:
+        if self._segment is not None:
+            self.sync()
+            self._segment.close()
+            self._segment = None
@@ -0,0 +1,392 @@
+"""Compact columnar storage for per-replica version metadata.
+
+Each (data_id, node_id) replica occupies one row spread across typed
+``array`` columns instead of a ``VersionedData`` object per replica:
+
+    version     int64
+    timestamp   int64, microseconds since the epoch
+    checksum    32 raw bytes of the SHA-256 digest
+    node        interned node id
+    directory   interned parent directory of the block file
+    flags       how to rebuild the row (timezone, sparse fields)
+
+A data id maps to its first row and the remaining replicas are chained
+through a ``next`` column, so the only per-object Python object is the
+data id itself. Each node keeps an array of its rows for the reverse
+index. Rows are recycled through a free list. ``VersionedData`` objects
+are only built when a row is read.
+"""
+
+import os
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_CHECKSUM_SIZE = 32
+_NO_ROW = -1
+
+# Row flags
+_AWARE = 1  # timestamp was timezone-aware; stored as UTC
+_SPARSE_CHECKSUM = 2  # checksum is not a SHA-256 hex digest
+_SPARSE_NAME = 4  # block file name differs from the data id
+_NO_LOCATION = 8
+
+
+@dataclass
+class VersionedData:
+    """Data with version information."""
+
+    content: bytes
+    version: int
+    timestamp: datetime
+    checksum: str
+    location: Optional[str] = None  # on-disk path when content is not held in memory
+
+
+class _Interner:
+    """Map strings to small integers and back."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        index = self.ids.get(value)
+        if index is None:
+            index = len(self.values)
+            self.values.append(value)
+            self.ids[value] = index
+        return index
+
+
+def _to_micros(timestamp: datetime) -> Tuple[int, bool]:
+    if timestamp.tzinfo is not None:
+        delta = timestamp - _EPOCH_UTC
+        aware = True
+    else:
+        delta = timestamp - _EPOCH
+        aware = False
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds, aware
+
+
+class VersionStore:
+    """Version metadata for every replica a node knows about.
+
+    Args:
+        keep_content: Also hold ``VersionedData.content`` in memory. Off
+            for nodes whose payloads live on disk and are reached through
+            ``location``; on for callers that keep content in the map.
+    """
+
+    def __init__(self, keep_content: bool = False):
+        self.keep_content = keep_content
+        self._versions = array("q")
+        self._timestamps = array("q")
+        self._checksums = bytearray()
+        self._nodes = array("I")
+        self._directories = array("I")
+        self._flags = bytearray()
+        self._next = array("i")
+        self._node_pos = array("i")  # position of the row in its node's row array
+        self._row_data_ids: List[Optional[str]] = []
+
+        self._heads: Dict[str, int] = {}  # data_id -> first replica row
+        self._node_rows: List[array] = []  # node index -> rows on that node
+        self._node_names = _Interner()
+        self._dir_names = _Interner()
+        self._free: List[int] = []
+        self._replicas = 0
+
+        # Rarely used fields, keyed by row
+        self._sparse_checksums: Dict[int, str] = {}
+        self._sparse_names: Dict[int, str] = {}
+        self._content: Dict[int, bytes] = {}
+
+    def __len__(self) -> int:
+        """Number of data ids with at least one replica."""
+        return len(self._heads)
+
+    def __contains__(self, data_id: str) -> bool:
+        return data_id in self._heads
+
+    @property
+    def replica_count(self) -> int:
+        return self._replicas
+
+    def _find(self, data_id: str, node: int) -> int:
+        row = self._heads.get(data_id, _NO_ROW)
+        while row != _NO_ROW and self._nodes[row] != node:
+            row = self._next[row]
+        return row
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        self._versions.append(0)
+        self._timestamps.append(0)
+        self._checksums.extend(bytes(_CHECKSUM_SIZE))
+        self._nodes.append(0)
+        self._directories.append(0)
+        self._flags.append(0)
+        self._next.append(_NO_ROW)
+        self._node_pos.append(_NO_ROW)
+        self._row_data_ids.append(None)
+        return len(self._versions) - 1
+
+    def _clear_sparse(self, row: int) -> None:
+        self._sparse_checksums.pop(row, None)
+        self._sparse_names.pop(row, None)
+        self._content.pop(row, None)
+
+    def put(self, data_id: str, node_id: str, data: VersionedData) -> None:
+        """Insert or replace the version a node holds."""
+        node = self._node_names.intern(node_id)
+        row = self._find(data_id, node)
+        if row == _NO_ROW:
+            row = self._allocate()
+            self._nodes[row] = node
+            self._row_data_ids[row] = data_id
+            self._next[row] = self._heads.get(data_id, _NO_ROW)
+            self._heads[data_id] = row
+            while len(self._node_rows) <= node:
+                self._node_rows.append(array("i"))
+            rows = self._node_rows[node]
+            self._node_pos[row] = len(rows)
+            rows.append(row)
+            self._replicas += 1
+        else:
+            self._clear_sparse(row)
+
+        flags = 0
+        self._versions[row] = data.version
+        self._timestamps[row], aware = _to_micros(data.timestamp)
+        if aware:
+            flags |= _AWARE
+
+        offset = row * _CHECKSUM_SIZE
+        try:
+            digest = bytes.fromhex(data.checksum) if data.checksum else b""
+        except ValueError:
+            digest = b""
+        if len(digest) == _CHECKSUM_SIZE:
+            self._checksums[offset : offset + _CHECKSUM_SIZE] = digest
+        else:
+            self._checksums[offset : offset + _CHECKSUM_SIZE] = bytes(_CHECKSUM_SIZE)
+            flags |= _SPARSE_CHECKSUM
+            if data.checksum:
+                self._sparse_checksums[row] = data.checksum
+
+        if data.location is None:
+            flags |= _NO_LOCATION
+        else:
+            directory, name = os.path.split(data.location)
+            self._directories[row] = self._dir_names.intern(directory)
+            if name != data_id:
+                flags |= _SPARSE_NAME
+                self._sparse_names[row] = name
+
+        if self.keep_content and data.content:
+            self._content[row] = data.content
+        self._flags[row] = flags
+
+    def _build(self, row: int) -> VersionedData:
+        flags = self._flags[row]
+        micros = self._timestamps[row]
+        if flags & _AWARE:
+            timestamp = _EPOCH_UTC + timedelta(microseconds=micros)
+        else:
+            timestamp = _EPOCH + timedelta(microseconds=micros)
+
+        if flags & _SPARSE_CHECKSUM:
+            checksum = self._sparse_checksums.get(row, "")
+        else:
+            offset = row * _CHECKSUM_SIZE
+            checksum = self._checksums[offset : offset + _CHECKSUM_SIZE].hex()
+
+        location = None
+        if not flags & _NO_LOCATION:
+            name = (
+                self._sparse_names[row]
+                if flags & _SPARSE_NAME
+                else self._row_data_ids[row]
+            )
+            location = os.path.join(
+                self._dir_names.values[self._directories[row]], name
+            )
+
+        return VersionedData(
+            content=self._content.get(row, b""),
+            version=self._versions[row],
+            timestamp=timestamp,
+            checksum=checksum,
+            location=location,
+        )
+
+    def get(self, data_id: str, node_id: str) -> Optional[VersionedData]:
+        node = self._node_names.ids.get(node_id)
+        if node is None:
+            return None
+        row = self._find(data_id, node)
+        return None if row == _NO_ROW else self._build(row)
+
+    def digest(self, data_id: str, node_id: str) -> Optional[Tuple[int, str]]:
+        """(version, checksum) a node holds, without building the full row."""
+        node = self._node_names.ids.get(node_id)
+        if node is None:
+            return None
+        row = self._find(data_id, node)
+        if row == _NO_ROW:
+            return None
+        if self._flags[row] & _SPARSE_CHECKSUM:
+            checksum = self._sparse_checksums.get(row, "")
+        else:
+            offset = row * _CHECKSUM_SIZE
+            checksum = self._checksums[offset : offset + _CHECKSUM_SIZE].hex()
+        return self._versions[row], checksum
+
+    def remove(self, data_id: str, node_id: str) -> bool:
+        """Forget the version a node holds; returns False if there was none."""
+        node = self._node_names.ids.get(node_id)
+        if node is None:
+            return False
+
+        previous, row = _NO_ROW, self._heads.get(data_id, _NO_ROW)
+        while row != _NO_ROW and self._nodes[row] != node:
+            previous, row = row, self._next[row]
+        if row == _NO_ROW:
+            return False
+
+        # Unlink from the data id's replica chain
+        if previous == _NO_ROW:
+            if self._next[row] == _NO_ROW:
+                del self._heads[data_id]
+            else:
+                self._heads[data_id] = self._next[row]
+        else:
+            self._next[previous] = self._next[row]
+
+        # Swap-remove from the node's row array
+        rows = self._node_rows[node]
+        pos = self._node_pos[row]
+        last = rows.pop()
+        if last != row:
+            rows[pos] = last
+            self._node_pos[last] = pos
+
+        self._clear_sparse(row)
+        self._next[row] = _NO_ROW
+        self._node_pos[row] = _NO_ROW
+        self._row_data_ids[row] = None
+        self._free.append(row)
+        self._replicas -= 1
+        return True
+
+    def replicas(self, data_id: str) -> Dict[str, VersionedData]:
+        """All replicas of a data id, keyed by node id."""
+        result = {}
+        row = self._heads.get(data_id, _NO_ROW)
+        while row != _NO_ROW:
+            result[self._node_names.values[self._nodes[row]]] = self._build(row)
+            row = self._next[row]
+        return result
+
+    def replica_nodes(self, data_id: str) -> List[str]:
+        """Node ids holding a data id, without building version objects."""
+        nodes = []
+        row = self._heads.get(data_id, _NO_ROW)
+        while row != _NO_ROW:
+            nodes.append(self._node_names.values[self._nodes[row]])
+            row = self._next[row]
+        return nodes
+
+    def max_version(self, data_id: str) -> Optional[int]:
+        """Highest version held by any replica, or None if there are none."""
+        row = self._heads.get(data_id, _NO_ROW)
+        if row == _NO_ROW:
+            return None
+        best = self._versions[row]
+        row = self._next[row]
+        while row != _NO_ROW:
+            best = max(best, self._versions[row])
+            row = self._next[row]
+        return best
+
+    def node_count(self, node_id: str) -> int:
+        node = self._node_names.ids.get(node_id)
+        if node is None or node >= len(self._node_rows):
+            return 0
+        return len(self._node_rows[node])
+
+    def node_data_ids(self, node_id: str) -> List[str]:
+        """Data ids held by a node, in no particular order."""
+        node = self._node_names.ids.get(node_id)
+        if node is None or node >= len(self._node_rows):
+            return []
+        return [self._row_data_ids[row] for row in self._node_rows[node]]
+
+    def node_items(self, node_id: str) -> Iterator[Tuple[str, VersionedData]]:
+        """Yield (data_id, version) for every replica held by a node."""
+        node = self._node_names.ids.get(node_id)
+        if node is None or node >= len(self._node_rows):
+            return
+        for row in list(self._node_rows[node]):
+            yield self._row_data_ids[row], self._build(row)
+
+    def items(self) -> Iterator[Tuple[str, str, VersionedData]]:
+        """Yield (data_id, node_id, version) for every replica."""
+        for data_id, row in list(self._heads.items()):
+            while row != _NO_ROW:
+                yield data_id, self._node_names.values[self._nodes[row]], self._build(
+                    row
+                )
+                row = self._next[row]
+
+    def copy(self) -> "VersionStore":
+        """Independent copy; cheap, as the columns are copied in bulk."""
+        clone = VersionStore.__new__(VersionStore)
+        clone.__dict__.update(self.__dict__)
+        for name in (
+            "_versions",
+            "_timestamps",
+            "_nodes",
+            "_directories",
+            "_next",
+            "_node_pos",
+        ):
+            setattr(
+                clone, name, array(getattr(self, name).typecode, getattr(self, name))
+            )
+        clone._checksums = bytearray(self._checksums)
+        clone._flags = bytearray(self._flags)
+        clone._row_data_ids = list(self._row_data_ids)
+        clone._heads = dict(self._heads)
+        clone._node_rows = [array("i", rows) for rows in self._node_rows]
+        clone._node_names = _Interner()
+        clone._node_names.values = list(self._node_names.values)
+        clone._node_names.ids = dict(self._node_names.ids)
+        clone._dir_names = _Interner()
+        clone._dir_names.values = list(self._dir_names.values)
+        clone._dir_names.ids = dict(self._dir_names.ids)
+        clone._free = list(self._free)
+        clone._sparse_checksums = dict(self._sparse_checksums)
+        clone._sparse_names = dict(self._sparse_names)
+        clone._content = dict(self._content)
+        return clone
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by the columns and row references."""
+        return (
+            self._versions.itemsize * len(self._versions)
+            + self._timestamps.itemsize * len(self._timestamps)
+            + len(self._checksums)
+            + self._nodes.itemsize * len(self._nodes)
+            + self._directories.itemsize * len(self._directories)
+            + len(self._flags)
+            + self._next.itemsize * len(self._next)
+            + self._node_pos.itemsize * len(self._node_pos)
+            + 8 * len(self._row_data_ids)
+            + sum(rows.itemsize * len(rows) for rows in self._node_rows)
+        )
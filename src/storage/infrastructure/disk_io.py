@@ -0,0 +1,323 @@
+"""Bounded thread pools for blocking disk I/O issued from the event loop."""
+
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+
+class IOPool(Enum):
+    """Kind of disk operation, each served by its own pool."""
+
+    READ = "read"
+    WRITE = "write"
+    FSYNC = "fsync"
+
+
+@dataclass
+class DiskIOConfig:
+    """Worker and queue limits for the disk I/O executor."""
+
+    read_workers: int = 8
+    write_workers: int = 4
+    fsync_workers: int = 2
+    max_queue_depth: int = 256  # per pool, operations waiting for a worker
+    lag_interval: float = 0.1  # seconds between event loop lag samples
+
+
+@dataclass
+class DiskIOPoolMetrics:
+    """Snapshot of a single disk I/O pool."""
+
+    pool: str
+    workers: int
+    in_flight: int
+    queued: int
+    blocked: int
+    completed: int
+    failed: int
+    avg_queue_wait_ms: float
+    max_queue_wait_ms: float
+    avg_service_ms: float
+
+
+def read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def write_file(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def fsync_path(path: str) -> None:
+    """Flush a file (or directory) to stable storage."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def open_temp_file(path: str) -> Tuple[BinaryIO, str]:
+    """Create a new, uniquely named file next to ``path`` for writing.
+
+    Returns:
+        Tuple of (file opened for binary writing, its path)
+    """
+    directory, name = os.path.split(path)
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory or ".", prefix=f"{name}.", suffix=".part"
+    )
+    return os.fdopen(fd, "wb"), temp_path
+
+
+def write_temp_file(path: str, data: bytes) -> str:
+    """Write ``data`` to a new file next to ``path`` and return its path.
+
+    Renaming the file onto ``path`` afterwards replaces the old content in
+    one step, so a crash never leaves a half-written file at ``path``.
+    """
+    f, temp_path = open_temp_file(path)
+    try:
+        with f:
+            f.write(data)
+    except BaseException:
+        remove_if_exists(temp_path)
+        raise
+    return temp_path
+
+
+def datasync_file(path: str) -> bool:
+    """Flush a file's data to stable storage; False if it no longer exists."""
+    fdatasync = getattr(os, "fdatasync", os.fsync)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return False  # removed (e.g. rolled back) before the sync ran
+    try:
+        fdatasync(fd)
+    finally:
+        os.close(fd)
+    return True
+
+
+def sync_dirs(paths: List[str]) -> None:
+    """Fsync the parent directory of every path, once per directory.
+
+    This makes newly created or renamed entries durable.
+    """
+    for directory in dict.fromkeys(os.path.dirname(os.path.abspath(p)) for p in paths):
+        fsync_path(directory)
+
+
+def list_files(path: str) -> List[str]:
+    return [f for f in os.listdir(path) if os.path.isfile(os.path.join(path, f))]
+
+
+def remove_if_exists(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+class _Pool:
+    """Thread pool plus the admission limit that provides backpressure."""
+
+    def __init__(self, kind: IOPool, workers: int, max_queue_depth: int):
+        self.kind = kind
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=f"disk-io-{kind.value}"
+        )
+        # Admits at most workers + max_queue_depth operations; callers beyond
+        # that wait on the event loop instead of growing the executor queue
+        self.slots = asyncio.Semaphore(workers + max_queue_depth)
+        self.submitted = 0
+        self.running = 0
+        self.blocked = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.total_service = 0.0
+
+    def snapshot(self) -> DiskIOPoolMetrics:
+        done = self.completed + self.failed
+        return DiskIOPoolMetrics(
+            pool=self.kind.value,
+            workers=self.workers,
+            in_flight=self.running,
+            queued=self.submitted - self.running,
+            blocked=self.blocked,
+            completed=self.completed,
+            failed=self.failed,
+            avg_queue_wait_ms=self.total_queue_wait / done * 1000.0 if done else 0.0,
+            max_queue_wait_ms=self.max_queue_wait * 1000.0,
+            avg_service_ms=self.total_service / done * 1000.0 if done else 0.0,
+        )
+
+
+class EventLoopLagMonitor:
+    """Measure how late the event loop wakes up from a fixed-interval sleep.
+
+    Any blocking call on the loop shows up directly as lag, which makes it
+    the quickest signal that synchronous I/O has crept back in.
+    """
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.samples = 0
+        self._total_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start sampling on the running loop."""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._sample())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self._total_lag += lag
+            self.samples += 1
+
+    def get_metrics(self) -> Dict[str, float]:
+        return {
+            "last_ms": self.last_lag * 1000.0,
+            "max_ms": self.max_lag * 1000.0,
+            "avg_ms": self._total_lag / self.samples * 1000.0 if self.samples else 0.0,
+            "samples": self.samples,
+        }
+
+
+class DiskIOExecutor:
+    """Run blocking file operations off the event loop.
+
+    Reads, writes and fsyncs use separate, fixed-size thread pools so a
+    burst of slow fsyncs cannot starve reads. Each pool admits a bounded
+    number of operations; once it is full, callers wait before submitting,
+    which pushes back on request handlers instead of queueing without limit.
+    """
+
+    def __init__(self, config: Optional[DiskIOConfig] = None):
+        self.config = config or DiskIOConfig()
+        self.logger = logging.getLogger(__name__)
+        self._pools = {
+            IOPool.READ: _Pool(
+                IOPool.READ, self.config.read_workers, self.config.max_queue_depth
+            ),
+            IOPool.WRITE: _Pool(
+                IOPool.WRITE, self.config.write_workers, self.config.max_queue_depth
+            ),
+            IOPool.FSYNC: _Pool(
+                IOPool.FSYNC, self.config.fsync_workers, self.config.max_queue_depth
+            ),
+        }
+        self.lag_monitor = EventLoopLagMonitor(self.config.lag_interval)
+        self._closed = False
+
+    async def run(self, pool: IOPool, fn: Callable[..., Any], *args) -> Any:
+        """Run ``fn(*args)`` on the given pool and return its result.
+
+        Raises:
+            RuntimeError: If the executor has been shut down
+        """
+        if self._closed:
+            raise RuntimeError("Disk I/O executor is closed")
+        if not self.lag_monitor.running:
+            self.lag_monitor.start()
+
+        state = self._pools[pool]
+        if state.slots.locked():
+            state.blocked += 1
+            try:
+                await state.slots.acquire()
+            finally:
+                state.blocked -= 1
+        else:
+            await state.slots.acquire()
+
+        submitted_at = time.monotonic()
+        timings = {}
+
+        def call():
+            started = time.monotonic()
+            timings["wait"] = started - submitted_at
+            state.running += 1
+            try:
+                return fn(*args)
+            finally:
+                state.running -= 1
+                timings["service"] = time.monotonic() - started
+
+        state.submitted += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(state.executor, call)
+            state.completed += 1
+            return result
+        except BaseException:
+            state.failed += 1
+            raise
+        finally:
+            state.submitted -= 1
+            state.slots.release()
+            wait = timings.get("wait", 0.0)
+            state.total_queue_wait += wait
+            state.max_queue_wait = max(state.max_queue_wait, wait)
+            state.total_service += timings.get("service", 0.0)
+
+    async def read(self, fn: Callable[..., Any], *args) -> Any:
+        return await self.run(IOPool.READ, fn, *args)
+
+    async def write(self, fn: Callable[..., Any], *args) -> Any:
+        return await self.run(IOPool.WRITE, fn, *args)
+
+    async def fsync(self, path: str) -> None:
+        await self.run(IOPool.FSYNC, fsync_path, path)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-pool queue metrics and event loop lag."""
+        return {
+            "pools": {
+                kind.value: pool.snapshot() for kind, pool in self._pools.items()
+            },
+            "event_loop_lag": self.lag_monitor.get_metrics(),
+        }
+
+    async def shutdown(self) -> None:
+        """Stop the lag monitor and wait for running operations to finish."""
+        self._closed = True
+        await self.lag_monitor.stop()
+        loop = asyncio.get_running_loop()
+        for pool in self._pools.values():
+            await loop.run_in_executor(None, pool.executor.shutdown, True)
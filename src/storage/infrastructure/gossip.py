@@ -0,0 +1,255 @@
+"""SWIM-style gossip membership and failure detection."""
+
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+PING_PATH = "/gossip/ping"
+PING_REQ_PATH = "/gossip/ping-req"
+
+
+class MemberStatus(Enum):
+    ALIVE = "alive"
+    SUSPECT = "suspect"  # missed a probe; still a member until it times out
+    DEAD = "dead"
+
+
+@dataclass
+class GossipConfig:
+    """Settings for the membership protocol."""
+
+    protocol_period: float = 1.0  # seconds between probes of one member
+    ping_timeout: float = 0.5  # direct probe; indirect probes get the rest
+    indirect_probes: int = 3  # members asked to probe a target for us
+    suspicion_mult: float = 4.0  # suspicion lasts mult * log10(N) periods
+    retransmit_mult: int = 4  # an update rides on mult * log10(N) messages
+    max_piggyback: int = 16  # updates carried by one message
+    dead_retention: float = 60.0  # seconds a dead member is remembered
+
+
+@dataclass
+class Member:
+    """One node as seen by the membership protocol."""
+
+    node_id: str
+    address: str
+    incarnation: int = 0
+    status: MemberStatus = MemberStatus.ALIVE
+    meta: Dict[str, Any] = field(default_factory=dict)  # capacity, zone, ...
+
+    def to_wire(self) -> Dict[str, Any]:
+        return {
+            "node_id": self.node_id,
+            "address": self.address,
+            "incarnation": self.incarnation,
+            "status": self.status.value,
+            "meta": self.meta,
+        }
+
+    @classmethod
+    def from_wire(cls, data: Dict[str, Any]) -> "Member":
+        return cls(
+            node_id=str(data["node_id"]),
+            address=str(data["address"]),
+            incarnation=int(data["incarnation"]),
+            status=MemberStatus(data["status"]),
+            meta=dict(data.get("meta") or {}),
+        )
+
+
+def _supersedes(update: Member, current: Member) -> bool:
+    """SWIM precedence between two claims about the same member."""
+    if update.status == MemberStatus.ALIVE:
+        return update.incarnation > current.incarnation
+    if current.status == MemberStatus.DEAD:
+        return False
+    if update.status == MemberStatus.SUSPECT:
+        return update.incarnation > current.incarnation or (
+            update.incarnation == current.incarnation
+            and current.status == MemberStatus.ALIVE
+        )
+    return update.incarnation >= current.incarnation  # DEAD
+
+
+class Membership:
+    """Cluster membership as agreed by gossip.
+
+    Each protocol period one member is probed, in a shuffled round-robin
+    so every member is probed within a bounded time. A member that misses
+    a direct probe and the indirect probes sent through other members
+    becomes SUSPECT. It is declared DEAD only if nobody hears from it
+    before the suspicion timeout, and it can refute the suspicion by
+    gossiping itself ALIVE with a higher incarnation. One slow response
+    therefore does not fail a node over, and the probing cost per node
+    stays constant however large the cluster is.
+
+    State changes spread by riding on probe messages and their replies,
+    each one retransmitted about log(N) times.
+
+    This class only holds state; the owner sends the messages.
+
+    Args:
+        node_id: Id of the local node
+        address: Address other nodes reach the local node at
+        config: Protocol settings
+        meta: Metadata gossiped with the local node's ALIVE record
+        clock: Monotonic clock, injectable for tests
+    """
+
+    def __init__(
+        self,
+        node_id: str,
+        address: str,
+        config: Optional[GossipConfig] = None,
+        meta: Optional[Dict[str, Any]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ):
+        self.config = config or GossipConfig()
+        self._clock = clock
+        self._rng = rng or random.Random()
+        # Incarnations start from the wall clock so a restarted node
+        # outranks whatever the cluster remembers about its last run
+        self.local = Member(
+            node_id, address, int(time.time() * 1000), meta=dict(meta or {})
+        )
+        self.members: Dict[str, Member] = {}
+        self._changed_at: Dict[str, float] = {}
+        self._broadcasts: Dict[str, List[Any]] = {}  # node_id -> [record, sends]
+        self._probe_order: List[str] = []
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self.members
+
+    def live_members(self) -> List[Member]:
+        """Members other than us that count as up (ALIVE or SUSPECT)."""
+        return [m for m in self.members.values() if m.status != MemberStatus.DEAD]
+
+    @property
+    def suspicion_timeout(self) -> float:
+        scale = max(1.0, math.log10(len(self.members) + 1))
+        return self.config.suspicion_mult * scale * self.config.protocol_period
+
+    def _retransmit_limit(self) -> int:
+        return self.config.retransmit_mult * max(
+            1, math.ceil(math.log10(len(self.members) + 2))
+        )
+
+    def _broadcast(self, member: Member) -> None:
+        self._broadcasts[member.node_id] = [member.to_wire(), 0]
+
+    def _set(self, member: Member) -> None:
+        self.members[member.node_id] = member
+        self._changed_at[member.node_id] = self._clock()
+        self._broadcast(member)
+
+    def apply(self, update: Member) -> bool:
+        """Merge a claim about a member; True if it changed our view."""
+        if update.node_id == self.local.node_id:
+            if (
+                update.status != MemberStatus.ALIVE
+                and update.incarnation >= self.local.incarnation
+            ):
+                # Someone suspects us: refute with a newer incarnation
+                self.local.incarnation = update.incarnation + 1
+                self._broadcast(self.local)
+            return False
+
+        current = self.members.get(update.node_id)
+        if current is None:
+            if update.status == MemberStatus.DEAD:
+                return False
+        elif not _supersedes(update, current):
+            return False
+        self._set(update)
+        return True
+
+    def update_local_meta(self, meta: Dict[str, Any]) -> bool:
+        """Announce changed metadata for the local node."""
+        if meta == self.local.meta:
+            return False
+        self.local.meta = dict(meta)
+        self.local.incarnation += 1
+        self._broadcast(self.local)
+        return True
+
+    def piggyback(self) -> List[Dict[str, Any]]:
+        """Updates to attach to an outgoing message.
+
+        Updates sent the fewest times go first; each is dropped once it
+        has been sent about log(N) times.
+        """
+        limit = self._retransmit_limit()
+        chosen = sorted(self._broadcasts.items(), key=lambda item: item[1][1])
+        chosen = chosen[: self.config.max_piggyback]
+        for node_id, entry in chosen:
+            entry[1] += 1
+            if entry[1] >= limit:
+                del self._broadcasts[node_id]
+        return [entry[0] for _, entry in chosen]
+
+    def next_probe_target(self) -> Optional[Member]:
+        """The next live member to probe, in shuffled round-robin order."""
+        for _ in range(2):
+            while self._probe_order:
+                member = self.members.get(self._probe_order.pop())
+                if member is not None and member.status != MemberStatus.DEAD:
+                    return member
+            self._probe_order = [m.node_id for m in self.live_members()]
+            self._rng.shuffle(self._probe_order)
+        return None
+
+    def indirect_helpers(self, target_id: str) -> List[Member]:
+        """Live members to ask to probe ``target_id`` for us."""
+        candidates = [m for m in self.live_members() if m.node_id != target_id]
+        count = min(self.config.indirect_probes, len(candidates))
+        return self._rng.sample(candidates, count)
+
+    def suspect(self, node_id: str) -> bool:
+        """Mark a member that missed its probes as SUSPECT."""
+        current = self.members.get(node_id)
+        if current is None or current.status != MemberStatus.ALIVE:
+            return False
+        self._set(
+            Member(
+                node_id,
+                current.address,
+                current.incarnation,
+                MemberStatus.SUSPECT,
+                current.meta,
+            )
+        )
+        return True
+
+    def expire(self) -> List[Member]:
+        """Declare suspects past the suspicion timeout DEAD.
+
+        Also forgets members that have been dead for ``dead_retention``.
+
+        Returns:
+            Members that became DEAD in this call
+        """
+        now = self._clock()
+        timeout = self.suspicion_timeout
+        dead = []
+        for node_id, member in list(self.members.items()):
+            age = now - self._changed_at[node_id]
+            if member.status == MemberStatus.SUSPECT and age >= timeout:
+                member = Member(
+                    node_id,
+                    member.address,
+                    member.incarnation,
+                    MemberStatus.DEAD,
+                    member.meta,
+                )
+                self._set(member)
+                dead.append(member)
+            elif (
+                member.status == MemberStatus.DEAD and age >= self.config.dead_retention
+            ):
+                del self.members[node_id]
+                del self._changed_at[node_id]
+        return dead
@@ -0,0 +1,217 @@
+"""Consistent-hash ring with virtual nodes for replica placement."""
+
+import bisect
+import hashlib
+import heapq
+import math
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Capacity that earns a member the base number of virtual nodes when no
+# member's capacity is known
+CAPACITY_UNIT = 1 << 40  # 1 TiB
+
+
+def ring_hash(key: str) -> int:
+    """64-bit position of a key (or virtual node label) on the ring."""
+    return int.from_bytes(
+        hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+def capacity_unit(
+    capacities: Iterable[Optional[float]], current: Optional[float] = None
+) -> float:
+    """Capacity that earns a member the base number of virtual nodes.
+
+    This is the median known capacity rounded to a power of two, so a
+    typical member gets about ``vnodes`` points. ``current`` is kept
+    while the median stays within a factor of two of it: a node joining
+    or leaving then re-weights no other member.
+    """
+    known = sorted(c for c in capacities if c and c > 0)
+    if not known:
+        return current or CAPACITY_UNIT
+    median = known[len(known) // 2]
+    if current and current / 2 <= median <= current * 2:
+        return current
+    return float(2 ** round(math.log2(median)))
+
+
+def capacity_weight(capacity: Optional[float], unit: float = CAPACITY_UNIT) -> float:
+    """Ring weight for a node with ``capacity`` bytes; 1.0 when unknown."""
+    if not capacity or capacity <= 0:
+        return 1.0
+    return capacity / unit
+
+
+@dataclass
+class RingMember:
+    """A node placed on the ring."""
+
+    node_id: str
+    weight: float = 1.0  # relative capacity; scales the number of virtual nodes
+    zone: Optional[str] = None
+    region: Optional[str] = None
+    node: Any = None  # object handed back by lookups, e.g. its NodeState
+
+    @property
+    def failure_domain(self) -> Tuple[Optional[str], Optional[str]]:
+        return (self.region, self.zone)
+
+
+class HashRing:
+    """Map keys to an ordered list of distinct nodes.
+
+    Every member owns ``round(vnodes * weight)`` points on a 64-bit ring
+    (at least one), so nodes with more capacity own proportionally more
+    keys. A key's replicas are the first distinct nodes met walking
+    clockwise from the key's hash, preferring nodes in zones not used yet,
+    so replicas spread across failure domains when there are enough of
+    them. A lookup is a binary search plus a short walk; adding or removing
+    a member only inserts or deletes that member's points, so only about
+    1/N of the keys change owner.
+
+    Args:
+        vnodes: Virtual nodes for a member of weight 1.0
+    """
+
+    def __init__(self, vnodes: int = 128):
+        self.vnodes = vnodes
+        self._members: Dict[str, RingMember] = {}
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        self._domains: Counter = Counter()  # failure domain -> member count
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._members
+
+    @property
+    def members(self) -> Dict[str, RingMember]:
+        return dict(self._members)
+
+    def _vnode_count(self, member: RingMember) -> int:
+        return max(1, round(self.vnodes * member.weight))
+
+    def _place(self, member: RingMember) -> None:
+        points = sorted(
+            (ring_hash(f"{member.node_id}#{i}"), member.node_id)
+            for i in range(self._vnode_count(member))
+        )
+        merged = list(heapq.merge(zip(self._points, self._owners), points))
+        self._points = [point for point, _ in merged]
+        self._owners = [owner for _, owner in merged]
+
+    def _unplace(self, node_id: str) -> None:
+        kept = [(p, o) for p, o in zip(self._points, self._owners) if o != node_id]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def add(self, member: RingMember) -> None:
+        """Add a member, or replace it if its placement changed."""
+        current = self._members.get(member.node_id)
+        if current is not None:
+            if (
+                self._vnode_count(current) == self._vnode_count(member)
+                and current.failure_domain == member.failure_domain
+            ):
+                self._members[member.node_id] = member  # same points
+                return
+            self._unplace(member.node_id)
+            self._domains[current.failure_domain] -= 1
+        self._members[member.node_id] = member
+        self._domains[member.failure_domain] += 1
+        self._place(member)
+
+    def remove(self, node_id: str) -> bool:
+        member = self._members.pop(node_id, None)
+        if member is None:
+            return False
+        self._unplace(node_id)
+        self._domains[member.failure_domain] -= 1
+        return True
+
+    def sync(self, members: Iterable[RingMember]) -> Tuple[List[str], List[str]]:
+        """Make the ring match ``members``, touching only what changed.
+
+        Returns:
+            Tuple of (added or re-placed node ids, removed node ids)
+        """
+        wanted = {member.node_id: member for member in members}
+        removed = [node_id for node_id in self._members if node_id not in wanted]
+        for node_id in removed:
+            self.remove(node_id)
+
+        changed = []
+        for node_id, member in wanted.items():
+            current = self._members.get(node_id)
+            if (
+                current is None
+                or self._vnode_count(current) != self._vnode_count(member)
+                or current.failure_domain != member.failure_domain
+            ):
+                changed.append(node_id)
+            self.add(member)
+        return changed, removed
+
+    def preference_list(
+        self,
+        key: str,
+        count: int,
+        exclude: Optional[Set[str]] = None,
+        accept: Optional[Callable[[RingMember], bool]] = None,
+    ) -> List[RingMember]:
+        """The members that should hold ``key``, in priority order.
+
+        Args:
+            key: Data id
+            count: Number of distinct members wanted
+            exclude: Node ids to skip
+            accept: Optional filter applied to each candidate member
+
+        Returns:
+            Up to ``count`` members; fewer if the ring does not have enough
+        """
+        if not self._points or count <= 0:
+            return []
+
+        exclude = exclude or set()
+        domains = sum(1 for members in self._domains.values() if members)
+        seen: Set[str] = set()
+        chosen: List[RingMember] = []
+        used_domains: Set[Tuple[Optional[str], Optional[str]]] = set()
+        # Same-domain candidates, used only if distinct domains run out
+        backups: List[RingMember] = []
+
+        start = bisect.bisect(self._points, ring_hash(key))
+        total = len(self._points)
+        for step in range(total):
+            node_id = self._owners[(start + step) % total]
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            member = self._members[node_id]
+            if node_id in exclude or (accept is not None and not accept(member)):
+                continue
+            if member.failure_domain in used_domains:
+                backups.append(member)
+            else:
+                chosen.append(member)
+                used_domains.add(member.failure_domain)
+            if len(chosen) >= count:
+                break
+            if len(used_domains) == domains and len(chosen) + len(backups) >= count:
+                break  # every domain is used; the rest come from the backups
+            if len(seen) == len(self._members):
+                break
+
+        chosen.extend(backups[: count - len(chosen)])
+        return chosen[:count]
+
+    def owners(self, key: str, count: int) -> List[str]:
+        """Node ids of the ``count`` preferred members for a key."""
+        return [member.node_id for member in self.preference_list(key, count)]
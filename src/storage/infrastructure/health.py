@@ -0,0 +1,47 @@
+"""Bounded health checking of cluster nodes."""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from src.models.models import NodeState
+
+
+@dataclass
+class HealthCheckConfig:
+    """Settings for the periodic health check."""
+
+    interval: float = 5.0  # seconds between health cycles
+    # Nodes without a fresh gossiped report asked for /metrics per cycle
+    max_probes: int = 8
+    probe_timeout: float = 2.0  # one node's /metrics request
+    concurrency: int = 16  # probes in flight at once
+    cycle_deadline: float = 4.0  # probes still running by then are abandoned
+    max_pending_reports: int = 4  # reports waiting for the handling worker
+
+
+@dataclass
+class HealthReport:
+    """What one health cycle found.
+
+    Nodes whose probe failed or missed the cycle deadline are listed as
+    unreachable only; whether a node has failed is up to gossip. Nodes
+    with no fresh metrics that were left out of this cycle's probes are
+    counted in ``unchecked``.
+    """
+
+    failed: List[NodeState] = field(default_factory=list)
+    degraded: List[Tuple[NodeState, Dict[str, float]]] = field(default_factory=list)
+    unreachable: List[str] = field(default_factory=list)
+    probed: int = 0
+    unchecked: int = 0
+    duration: float = 0.0  # seconds
+
+    @property
+    def needs_action(self) -> bool:
+        return bool(self.failed or self.degraded)
+
+    def node_ids(self) -> List[str]:
+        """Ids of the nodes this report asks to be handled."""
+        return [node.node_id for node in self.failed] + [
+            node.node_id for node, _ in self.degraded
+        ]
@@ -0,0 +1,218 @@
+"""Hedged requests for latency-sensitive replica reads."""
+
+import asyncio
+import bisect
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+)
+
+
+@dataclass
+class HedgingConfig:
+    """Settings controlling when backup requests are sent."""
+
+    enabled: bool = True
+    delay_percentile: float = 0.95
+    default_delay: float = 0.05  # seconds, used until a peer has enough samples
+    min_delay: float = 0.002
+    max_delay: float = 1.0
+    min_samples: int = 20
+    window_size: int = 1000  # samples kept per peer
+    max_extra_load: float = 0.1  # hedges allowed per primary request
+    max_budget: float = 10.0  # burst of hedges the budget may accumulate
+
+
+class LatencyHistogram:
+    """Sliding-window latency histogram with log-spaced buckets.
+
+    Recording is O(1) and percentile lookups are O(buckets), so the
+    histogram can sit on the read path.
+    """
+
+    # 100us .. ~100s, ~12% apart
+    BOUNDS: List[float] = [0.0001 * (1.12**i) for i in range(122)]
+
+    def __init__(self, window_size: int = 1000):
+        self._window: Deque[int] = deque()
+        self._window_size = window_size
+        self._counts = [0] * (len(self.BOUNDS) + 1)
+
+    @property
+    def count(self) -> int:
+        return len(self._window)
+
+    def record(self, seconds: float) -> None:
+        """Record a latency sample, dropping the oldest if the window is full."""
+        bucket = bisect.bisect_left(self.BOUNDS, seconds)
+        self._window.append(bucket)
+        self._counts[bucket] += 1
+        if len(self._window) > self._window_size:
+            self._counts[self._window.popleft()] -= 1
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile."""
+        if not self._window:
+            return None
+        rank = fraction * len(self._window)
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank and count:
+                return self.BOUNDS[min(bucket, len(self.BOUNDS) - 1)]
+        return self.BOUNDS[-1]
+
+
+class RequestHedger:
+    """Issue a request to the best replica and hedge it if it is slow.
+
+    If the first replica has not answered within its recent p95 latency a
+    backup request is sent to the next replica; the first success wins and
+    the other request is cancelled. Backups are paid for from a budget that
+    grows by ``max_extra_load`` per request, capping the extra load hedging
+    can add. Replicas that fail outright are failed over immediately.
+
+    Only successful requests are recorded as latency samples. A cancelled
+    loser is recorded with the time it had been running, a lower bound on
+    its latency, so slow replicas are not dropped from the percentiles.
+    Latencies are tracked per kind of request (full reads, digests), since
+    their costs differ.
+    """
+
+    def __init__(self, config: Optional[HedgingConfig] = None):
+        self.config = config or HedgingConfig()
+        self.logger = logging.getLogger(__name__)
+        # kind -> peer -> histogram
+        self._histograms: Dict[str, Dict[Hashable, LatencyHistogram]] = {}
+        self._budget = 0.0
+        self.requests = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    def record(self, peer: Hashable, latency: float, kind: str = "read") -> None:
+        """Record an observed latency of a ``kind`` request to a peer."""
+        histograms = self._histograms.setdefault(kind, {})
+        histogram = histograms.get(peer)
+        if histogram is None:
+            histogram = LatencyHistogram(self.config.window_size)
+            histograms[peer] = histogram
+        histogram.record(latency)
+
+    def hedge_delay(self, peer: Hashable, kind: str = "read") -> float:
+        """How long to wait on ``peer`` before sending a backup request."""
+        histogram = self._histograms.get(kind, {}).get(peer)
+        if histogram is None or histogram.count < self.config.min_samples:
+            return self.config.default_delay
+        delay = histogram.percentile(self.config.delay_percentile)
+        return min(self.config.max_delay, max(self.config.min_delay, delay))
+
+    def _take_hedge(self) -> bool:
+        if not self.config.enabled or self._budget < 1.0:
+            return False
+        self._budget -= 1.0
+        return True
+
+    async def run(
+        self,
+        candidates: Sequence[Any],
+        request_fn: Callable[[Any], Awaitable[Any]],
+        is_success: Callable[[Any], bool] = lambda result: True,
+        key: Callable[[Any], Hashable] = lambda candidate: candidate,
+    ) -> Optional[Any]:
+        """Run ``request_fn`` against candidates in order with hedging.
+
+        Args:
+            candidates: Replicas in order of preference
+            request_fn: Issues the request to one replica
+            is_success: Predicate applied to each result
+            key: Maps a candidate to the peer id used for latency tracking
+
+        Returns:
+            First successful result, or None if every replica failed
+        """
+        loop = asyncio.get_running_loop()
+        queue = list(candidates)
+        in_flight: Dict[asyncio.Future, tuple] = {}
+        hedged = False
+
+        self.requests += 1
+        self._budget = min(
+            self.config.max_budget, self._budget + self.config.max_extra_load
+        )
+
+        def launch(is_hedge: bool = False) -> Hashable:
+            candidate = queue.pop(0)
+            task = asyncio.ensure_future(request_fn(candidate))
+            in_flight[task] = (key(candidate), loop.time(), is_hedge)
+            return key(candidate)
+
+        try:
+            newest = launch()
+            while in_flight:
+                timeout = None if hedged or not queue else self.hedge_delay(newest)
+                done, _ = await asyncio.wait(
+                    in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # Only one backup per request; after that just wait
+                    hedged = True
+                    if self._take_hedge():
+                        self.hedges_sent += 1
+                        newest = launch(is_hedge=True)
+                    continue
+
+                for task in done:
+                    peer, started, is_hedge = in_flight.pop(task)
+                    if task.cancelled() or task.exception() is not None:
+                        continue
+                    result = task.result()
+                    if is_success(result):
+                        self.record(peer, loop.time() - started)
+                        if is_hedge:
+                            self.hedges_won += 1
+                        return result
+
+                if not in_flight and queue:
+                    newest = launch()
+
+            return None
+
+        finally:
+            # Losers took at least this long
+            for task, (peer, started, _) in in_flight.items():
+                task.cancel()
+                self.record(peer, loop.time() - started)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Hedging counters and per-peer latency percentiles.
+
+        Full reads are under ``peers``, other kinds under ``<kind>_peers``.
+        """
+        metrics = {
+            "requests": self.requests,
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "peers": {},
+        }
+        for kind, histograms in self._histograms.items():
+            metrics["peers" if kind == "read" else f"{kind}_peers"] = {
+                peer: {
+                    "samples": histogram.count,
+                    "p50": histogram.percentile(0.5),
+                    "p95": histogram.percentile(0.95),
+                    "p99": histogram.percentile(0.99),
+                }
+                for peer, histogram in histograms.items()
+            }
+        return metrics
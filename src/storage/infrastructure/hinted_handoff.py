@@ -0,0 +1,414 @@
+"""Durable hinted handoff for writes to unreachable replicas.
+
+A write that cannot reach one of its replicas is kept as a hint in an
+on-disk log for that replica, next to the node's own data. Once the
+replica's heartbeat returns, its hints are replayed to it in batches at a
+bounded byte rate and the log is deleted as batches are acknowledged. A
+short outage therefore costs the replica only the writes it missed,
+instead of a rebuild.
+
+Each target node has a directory of numbered segments holding records::
+
+    record : length(4) crc32(4) frame(length)
+
+where ``frame`` is a single-block write frame from ``block_protocol``, so
+a hint carries the block exactly as it would have been sent.
+"""
+
+import asyncio
+import logging
+import os
+import struct
+import threading
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict, List, Optional, Set, Tuple
+from urllib.parse import quote, unquote
+
+from src.storage.infrastructure.block_protocol import (
+    CONTENT_TYPE,
+    WRITE_PATH,
+    BlockProtocolError,
+    BlockRecord,
+    decode_frame,
+    encode_frame,
+)
+from src.storage.infrastructure.disk_io import DiskIOExecutor, IOPool
+from src.storage.infrastructure.peer_transport import PeerTransport
+from src.storage.infrastructure.rate_limit import TokenBucket
+
+_RECORD = struct.Struct(">II")
+_SEGMENT_PREFIX = "hints-"
+_SEGMENT_SUFFIX = ".log"
+
+
+@dataclass
+class HintedHandoffConfig:
+    """Limits on how many hints are kept and how fast they are replayed."""
+
+    # Beyond this, hints for a node are dropped and anti-entropy repairs it
+    max_pending_bytes: int = 1024 * 1024 * 1024
+    segment_bytes: int = 64 * 1024 * 1024
+    replay_rate: float = 8 * 1024 * 1024  # bytes per second per target node
+    replay_batch_hints: int = 64
+    replay_batch_bytes: int = 4 * 1024 * 1024
+    replay_timeout: float = 30.0
+    sync: bool = True  # fsync hints before the write is acknowledged
+
+
+@dataclass
+class HintBatch:
+    """Hints read from a log and the position just after them."""
+
+    records: List[BlockRecord] = field(default_factory=list)
+    cursor: Tuple[int, int] = (0, 0)  # (segment id, offset)
+    size: int = 0
+
+
+class HintLog:
+    """Append-only queue of hinted writes for one target node.
+
+    Methods block and are meant to run on the disk I/O pools; a lock
+    keeps appends and replay reads from different threads consistent.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.logger = logging.getLogger(__name__)
+        self.pending_hints = 0
+        self._lock = threading.Lock()
+        self._sizes: Dict[int, int] = {}  # segment id -> bytes
+        self._writer: Optional[BinaryIO] = None
+        self._writer_id = -1
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+        self._cursor = (min(self._sizes), 0) if self._sizes else (0, 0)
+
+    def _segment_path(self, segment_id: int) -> str:
+        return os.path.join(
+            self.directory, f"{_SEGMENT_PREFIX}{segment_id:012d}{_SEGMENT_SUFFIX}"
+        )
+
+    def _scan(self) -> None:
+        """Count surviving hints and cut off a record torn by a crash."""
+        for name in os.listdir(self.directory):
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX):
+                try:
+                    segment_id = int(name[len(_SEGMENT_PREFIX) : -len(_SEGMENT_SUFFIX)])
+                except ValueError:
+                    continue
+                self._sizes[segment_id] = 0
+
+        for segment_id in sorted(self._sizes):
+            path = self._segment_path(segment_id)
+            valid_end = 0
+            with open(path, "rb") as f:
+                while True:
+                    header = f.read(_RECORD.size)
+                    if len(header) < _RECORD.size:
+                        break
+                    length, crc = _RECORD.unpack(header)
+                    frame = f.read(length)
+                    if len(frame) < length or zlib.crc32(frame) != crc:
+                        break
+                    valid_end += _RECORD.size + length
+                    self.pending_hints += 1
+            if valid_end < os.path.getsize(path):
+                self.logger.warning(
+                    f"Truncating damaged hint at offset {valid_end} of {path}"
+                )
+                os.truncate(path, valid_end)
+            self._sizes[segment_id] = valid_end
+
+    @property
+    def pending_bytes(self) -> int:
+        with self._lock:
+            segment_id, offset = self._cursor
+            return (
+                sum(s for sid, s in self._sizes.items() if sid >= segment_id) - offset
+            )
+
+    def append(self, record: BlockRecord) -> int:
+        """Queue a hint and return its size on disk."""
+        frame = encode_frame([record])
+        data = _RECORD.pack(len(frame), zlib.crc32(frame)) + frame
+        with self._lock:
+            if (
+                self._writer is None
+                or self._sizes[self._writer_id] >= self.segment_bytes
+            ):
+                self._open_segment()
+            self._writer.write(data)
+            self._sizes[self._writer_id] += len(data)
+            self.pending_hints += 1
+        return len(data)
+
+    def _open_segment(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._writer_id = max(self._sizes, default=self._cursor[0] - 1) + 1
+        self._sizes[self._writer_id] = 0
+        self._writer = open(self._segment_path(self._writer_id), "ab", buffering=0)
+
+    def sync(self) -> None:
+        with self._lock:
+            if self._writer is None:
+                return
+            # Sync a duplicate so appends are not held up behind the fsync
+            fd = os.dup(self._writer.fileno())
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def read_batch(self, max_hints: int, max_bytes: int) -> HintBatch:
+        """Read the oldest undelivered hints without consuming them.
+
+        Segments only grow until they are acknowledged, so reading the
+        part that existed when the call started needs no lock.
+        """
+        with self._lock:
+            cursor = self._cursor
+            sizes = sorted(
+                (sid, s) for sid, s in self._sizes.items() if sid >= cursor[0]
+            )
+
+        batch = HintBatch(cursor=cursor)
+        segment_id, offset = cursor
+        for sid, end in sizes:
+            if sid != segment_id:
+                offset = 0
+            with open(self._segment_path(sid), "rb") as f:
+                f.seek(offset)
+                while (
+                    offset < end
+                    and len(batch.records) < max_hints
+                    and batch.size < max_bytes
+                ):
+                    length, crc = _RECORD.unpack(f.read(_RECORD.size))
+                    frame = f.read(length)
+                    offset += _RECORD.size + length
+                    batch.size += _RECORD.size + length
+                    try:
+                        if zlib.crc32(frame) != crc:
+                            raise BlockProtocolError("checksum mismatch")
+                        batch.records.extend(decode_frame(frame)[1])
+                    except BlockProtocolError as e:
+                        self.logger.error(
+                            f"Skipping damaged hint in segment {sid}: {e}"
+                        )
+            batch.cursor = (sid, offset)
+            if len(batch.records) >= max_hints or batch.size >= max_bytes:
+                break
+        return batch
+
+    def ack(self, batch: HintBatch) -> None:
+        """Mark a batch delivered and delete segments that are fully delivered."""
+        with self._lock:
+            self.pending_hints = max(0, self.pending_hints - len(batch.records))
+            segment_id, offset = batch.cursor
+            self._cursor = batch.cursor
+            for sid in sorted(self._sizes):
+                done = sid < segment_id or (
+                    sid == segment_id and offset >= self._sizes[sid]
+                )
+                if not done:
+                    break
+                if sid == self._writer_id:
+                    self._writer.close()
+                    self._writer, self._writer_id = None, -1
+                os.remove(self._segment_path(sid))
+                del self._sizes[sid]
+                self._cursor = (sid + 1, 0)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+class HintedHandoff:
+    """Hint logs for every unreachable replica and their replay.
+
+    A replica is marked unreachable when a write to it fails. Later writes
+    for it go straight to its hint log instead of waiting for another
+    timeout, until its hints have been replayed.
+
+    Args:
+        directory: Parent directory of the per-node hint logs
+        disk_io: Executor running the blocking log operations
+        transport: Peer transport used for replay
+        config: Size and replay limits
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        disk_io: DiskIOExecutor,
+        transport: PeerTransport,
+        config: Optional[HintedHandoffConfig] = None,
+    ):
+        self.directory = directory
+        self.disk_io = disk_io
+        self.transport = transport
+        self.config = config or HintedHandoffConfig()
+        self.logger = logging.getLogger(__name__)
+        self._logs: Dict[str, HintLog] = {}
+        self._unreachable: Set[str] = set()
+        self._replays: Dict[str, asyncio.Task] = {}
+        self.hinted = 0
+        self.replayed = 0
+        self.dropped = 0
+
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if os.path.isdir(os.path.join(directory, name)):
+                node_id = unquote(name)
+                self._logs[node_id] = self._open_log(node_id)
+                if self._logs[node_id].pending_hints:
+                    self._unreachable.add(node_id)
+
+    def _open_log(self, node_id: str) -> HintLog:
+        return HintLog(
+            os.path.join(self.directory, quote(node_id, safe="")),
+            self.config.segment_bytes,
+        )
+
+    def is_unreachable(self, node_id: str) -> bool:
+        return node_id in self._unreachable
+
+    def pending(self, node_id: str) -> int:
+        """Bytes of hints waiting for a node."""
+        log = self._logs.get(node_id)
+        return log.pending_bytes if log is not None else 0
+
+    async def store(
+        self, node_id: str, record: BlockRecord, unreachable: bool = True
+    ) -> bool:
+        """Keep a write for a replica that did not get it.
+
+        Args:
+            node_id: Replica the write was meant for
+            record: The write
+            unreachable: Whether the write to the node failed or timed out.
+                A replica that was only cut off because a quorum answered
+                first is hinted without being marked unreachable.
+
+        Returns:
+            False if the node already has ``max_pending_bytes`` of hints and
+            the write was dropped; anti-entropy repairs it later
+        """
+        if unreachable:
+            self._unreachable.add(node_id)
+        if self.pending(node_id) >= self.config.max_pending_bytes:
+            self.dropped += 1
+            self.logger.warning(
+                f"Hint limit reached for node {node_id}; dropping hint for {record.data_id}"
+            )
+            return False
+
+        log = self._logs.get(node_id)
+        if log is None:
+            log = await self.disk_io.write(self._open_log, node_id)
+            log = self._logs.setdefault(node_id, log)
+        await self.disk_io.write(log.append, record)
+        if self.config.sync:
+            await self.disk_io.run(IOPool.FSYNC, log.sync)
+        self.hinted += 1
+        return True
+
+    def schedule_replay(self, node: Any) -> Optional[asyncio.Task]:
+        """Start replaying a node's hints unless a replay is already running."""
+        task = self._replays.get(node.node_id)
+        if task is not None and not task.done():
+            return task
+        if not self.pending(node.node_id):
+            self._unreachable.discard(node.node_id)
+            return None
+        task = asyncio.ensure_future(self.replay(node))
+        self._replays[node.node_id] = task
+        return task
+
+    async def replay(self, node: Any) -> int:
+        """Deliver a node's hints, oldest first, at the configured rate.
+
+        Stops at the first batch the node does not accept; the remaining
+        hints are retried on the next call. Returns the number delivered.
+        """
+        log = self._logs.get(node.node_id)
+        if log is None:
+            return 0
+        config = self.config
+        limiter = TokenBucket(config.replay_rate, burst=config.replay_batch_bytes)
+        delivered = 0
+        while True:
+            batch = await self.disk_io.read(
+                log.read_batch, config.replay_batch_hints, config.replay_batch_bytes
+            )
+            if not batch.records:
+                if batch.size:
+                    await self.disk_io.write(log.ack, batch)  # only damaged hints
+                    continue
+                break
+
+            await limiter.acquire(batch.size)
+            try:
+                async with self.transport.request(
+                    node.address,
+                    "POST",
+                    WRITE_PATH,
+                    data=encode_frame(batch.records),
+                    headers={"Content-Type": CONTENT_TYPE},
+                    timeout=config.replay_timeout,
+                ) as response:
+                    status = response.status
+                    reason = await response.text()
+            except Exception as e:
+                self.logger.warning(
+                    f"Hint replay to node {node.node_id} failed: {str(e)}"
+                )
+                return delivered
+
+            if status >= 500:
+                self.logger.warning(
+                    f"Hint replay to node {node.node_id} failed: HTTP {status}"
+                )
+                return delivered
+            if status != 200:
+                # The node will never accept this batch; do not retry it forever
+                self.logger.error(
+                    f"Node {node.node_id} rejected {len(batch.records)} hints: "
+                    f"HTTP {status}: {reason}"
+                )
+                self.dropped += len(batch.records)
+            else:
+                delivered += len(batch.records)
+                self.replayed += len(batch.records)
+            await self.disk_io.write(log.ack, batch)
+
+        self._unreachable.discard(node.node_id)
+        self.logger.info(f"Replayed {delivered} hints to node {node.node_id}")
+        return delivered
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "hinted": self.hinted,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+            "pending": {
+                node_id: {"hints": log.pending_hints, "bytes": log.pending_bytes}
+                for node_id, log in self._logs.items()
+                if log.pending_hints
+            },
+        }
+
+    async def close(self) -> None:
+        """Stop running replays and close the logs."""
+        for task in self._replays.values():
+            task.cancel()
+        await asyncio.gather(*self._replays.values(), return_exceptions=True)
+        self._replays.clear()
+        for log in self._logs.values():
+            log.close()
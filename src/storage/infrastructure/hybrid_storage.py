@@ -7,10 +7,11 @@ from typing import Dict, List, Optional, Tuple, Set
 from pathlib import Path
 import shutil
 import dataclasses
-import asyncio
 import logging
 from enum import Enum
 from src.storage.infrastructure.providers import get_cloud_provider, CloudProviderBase
+from src.storage.infrastructure import disk_io
+from src.storage.infrastructure.disk_io import DiskIOExecutor
 
 from src.models.models import (
     Volume,
@@ -49,16 +50,25 @@ def decode_datetime(obj):
     return obj
 
 
+def _write_file_with_parents(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    disk_io.write_file(path, data)
+
+
 class HybridStorageManager:
     """Manages hybrid storage operations across on-prem and cloud"""
 
-    def __init__(self, root_path: str):
+    def __init__(self, root_path: str, disk_io_executor: Optional[DiskIOExecutor] = None):
         """Initialize the hybrid storage manager.
         
         Args:
             root_path (str): Root path for storage
+            disk_io_executor (DiskIOExecutor, optional): Pools for blocking file
+                I/O; a private executor is created if not given
         """
         self.root_path = Path(root_path)
+        self.disk_io = disk_io_executor or DiskIOExecutor()
+        self._owns_disk_io = disk_io_executor is None
         self.metadata_path = self.root_path / "metadata"
         self.data_path = self.root_path / "data"
         
@@ -96,6 +106,11 @@ class HybridStorageManager:
             logger.error(f"Failed to initialize hybrid storage: {str(e)}")
             return False
 
+    async def shutdown(self) -> None:
+        """Stop the disk I/O pools if this manager created them."""
+        if self._owns_disk_io:
+            await self.disk_io.shutdown()
+
     def _initialize_cloud_provider(self):
         """Initialize cloud storage provider if configured."""
         try:
@@ -235,12 +250,9 @@ class HybridStorageManager:
 
         # Construct full path
         full_path = self.data_path / pool_id / volume_id / path
-        full_path.parent.mkdir(parents=True, exist_ok=True)
 
         # Write locally
-        async with asyncio.Lock():
-            with open(full_path, "wb") as f:
-                f.write(data)
+        await self.disk_io.write(_write_file_with_parents, full_path, data)
 
         # If cloud backup is enabled, write to cloud
         if (
@@ -269,10 +281,10 @@ class HybridStorageManager:
 
         # Try reading from local storage first
         full_path = self.data_path / pool_id / volume_id / path
-        if full_path.exists():
-            async with asyncio.Lock():
-                with open(full_path, "rb") as f:
-                    return f.read()
+        try:
+            return await self.disk_io.read(disk_io.read_file, full_path)
+        except FileNotFoundError:
+            pass
 
         # If not found locally and cloud tiering is enabled, try cloud
         if (
@@ -286,9 +298,7 @@ class HybridStorageManager:
                 )
                 if data:
                     # Cache data locally
-                    async with asyncio.Lock():
-                        with open(full_path, "wb") as f:
-                            f.write(data)
+                    await self.disk_io.write(_write_file_with_parents, full_path, data)
                     return data
             except Exception as e:
                 logger.error(f"Failed to read from cloud: {e}")
@@ -302,19 +312,18 @@ class HybridStorageManager:
             return
 
         full_path = self.data_path / volume.primary_pool_id / volume_id / path
-        if not full_path.exists():
+        try:
+            stats = await self.disk_io.read(full_path.stat)
+        except FileNotFoundError:
             return
 
-        # Get file stats
-        stats = full_path.stat()
         age = datetime.now() - datetime.fromtimestamp(stats.st_mtime)
 
         # Check if file should be tiered
         if age > timedelta(days=7):  # Cold tier after 7 days
             try:
                 # Read file
-                with open(full_path, "rb") as f:
-                    data = f.read()
+                data = await self.disk_io.read(disk_io.read_file, full_path)
 
                 # Upload to cloud
                 await self.cloud_provider.upload_file(
@@ -322,7 +331,7 @@ class HybridStorageManager:
                 )
 
                 # Remove local copy
-                full_path.unlink()
+                await self.disk_io.write(full_path.unlink)
             except Exception as e:
                 logger.error(f"Failed to tier data to cloud: {e}")
 
@@ -450,8 +459,7 @@ class HybridStorageManager:
         source = self.data_path / volume.primary_pool_id / volume_id / path
 
         # Optimize data before upload
-        with open(source, "rb") as f:
-            data = f.read()
+        data = await self.disk_io.read(disk_io.read_file, source)
 
         # Apply compression if enabled
         if volume.compression_enabled:
@@ -483,6 +491,6 @@ class HybridStorageManager:
             "path": path,
             "timestamp": datetime.now().isoformat(),
         }
-        async with asyncio.Lock():
-            with open(source_path, "w") as f:
-                json.dump(stub_data, f)
+        await self.disk_io.write(
+            disk_io.write_file, source_path, json.dumps(stub_data).encode()
+        )
@@ -0,0 +1,45 @@
+"""Broadcast of newly written versions to peers' block caches.
+
+After a write succeeds its coordinator announces ``(data_id, version)``
+to every peer, so their block caches stop serving older versions long
+before the TTL runs out. Announcements made within one tick are
+coalesced, keeping only the newest version of each data id, and go to
+each peer as a single batch. Delivery is best effort: a lost batch is
+not retried, and readers fall back to comparing versions, with the
+cache TTL bounding staleness.
+"""
+
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, List, Tuple
+
+INVALIDATE_PATH = "/cache/invalidate"
+
+
+@dataclass
+class InvalidationConfig:
+    """Batching and delivery settings for cache invalidations."""
+
+    tick: float = 0.05  # seconds announcements are coalesced for
+    max_batch: int = 4096  # data ids per message; the rest wait a tick
+    request_timeout: float = 1.0
+    concurrency: int = 32  # peers sent to at once
+
+
+class InvalidationBatcher:
+    """Newest announced version of each data id, drained once per tick."""
+
+    def __init__(self):
+        self._pending: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, data_id: str, version: int) -> None:
+        if version > self._pending.get(data_id, 0):
+            self._pending[data_id] = version
+
+    def drain(self, max_items: int) -> List[Tuple[str, int]]:
+        """Remove and return up to ``max_items`` announcements, oldest first."""
+        data_ids = list(islice(self._pending, max_items))
+        return [(data_id, self._pending.pop(data_id)) for data_id in data_ids]
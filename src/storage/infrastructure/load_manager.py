@@ -58,6 +58,14 @@ class LoadManager:
         """Record a new request"""
         self.request_timestamps.append(time.time())
 
+    def can_handle_write(self) -> bool:
+        """Check if node can take a write; writes count against request limits"""
+        return self.can_handle_request()
+
+    def record_write(self, size: int) -> None:
+        """Record a completed write of ``size`` bytes"""
+        self.record_request()
+
     def get_current_load(self) -> float:
         """Get normalized load value between 0 and 1"""
         metrics = self.get_current_metrics()
@@ -19,6 +19,7 @@ from prometheus_client import (
     Gauge,
     CollectorRegistry,
 )
+from src.config.infrastructure_config import infrastructure_config
 from src.storage.infrastructure.data.cache_store import CacheStore
 
 # Create a custom registry for DFS metrics
@@ -160,6 +161,20 @@ CACHE_HIT_RATE = Gauge(
     registry=DFS_REGISTRY,
 )
 
+CACHE_EVICTIONS = Counter(
+    "dfs_cache_evictions_total",
+    "Total number of entries evicted to stay within the cache budget",
+    ["node_id"],
+    registry=DFS_REGISTRY,
+)
+
+CACHE_BYTES = Gauge(
+    "dfs_cache_bytes",
+    "Bytes held by the cache",
+    ["node_id"],
+    registry=DFS_REGISTRY,
+)
+
 # Process metrics
 PROCESS_CPU_SECONDS = Counter(
     "process_cpu_seconds_total",
@@ -217,10 +232,11 @@ class StorageNode:
         self._last_net_io = psutil.net_io_counters()
         self._last_net_io_time = time.time()
 
-        # Initialize cache with proper store
-        self.cache = CacheStore(max_size=1000, ttl_seconds=3600)
+        # Initialize cache with proper store, sized by CACHE_MAX_SIZE_MB
+        self.cache = CacheStore.from_config(infrastructure_config.cache)
         self._cache_hits = 0  # Keep counters for metrics
         self._cache_misses = 0
+        self._cache_evictions = 0  # evictions already exported
 
         # Initialize process stats
         self._process = psutil.Process()
@@ -312,6 +328,7 @@ class StorageNode:
         await site.start()
 
         # Start background tasks
+        self.cache.start_reaper()
         asyncio.create_task(self._update_metrics_periodically())
 
         logger.info(
@@ -499,6 +516,12 @@ class StorageNode:
             if total_cache_ops > 0:
                 hit_rate = (self._cache_hits / total_cache_ops) * 100
                 CACHE_HIT_RATE.labels(node_id=self.node_id).set(hit_rate)
+            cache_stats = self.cache.get_stats()
+            CACHE_EVICTIONS.labels(node_id=self.node_id).inc(
+                cache_stats["evictions"] - self._cache_evictions
+            )
+            self._cache_evictions = cache_stats["evictions"]
+            CACHE_BYTES.labels(node_id=self.node_id).set(cache_stats["bytes"])
 
             # Update process metrics
             cpu_times = self._process.cpu_times()
@@ -0,0 +1,191 @@
+"""Pooled HTTP transport for node-to-node traffic."""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional, Union
+
+import aiohttp
+
+
+@dataclass
+class PeerTransportConfig:
+    """Connection pool settings for inter-node traffic."""
+
+    max_connections_per_peer: int = 32
+    max_concurrent_requests_per_peer: int = 64
+    keepalive_timeout: float = 30.0
+    connect_timeout: float = 2.0
+    request_timeout: float = 30.0
+    dns_cache_ttl: int = 300
+
+
+@dataclass
+class PeerPoolMetrics:
+    """Snapshot of the connection pool for a single peer."""
+
+    peer: str
+    open_connections: int
+    connections_created: int
+    connections_reused: int
+    reuse_ratio: float
+    in_flight: int
+    queued: int
+    avg_queue_wait_ms: float
+    max_queue_wait_ms: float
+
+
+class _PeerPool:
+    """Keep-alive session and concurrency limiter for one peer."""
+
+    def __init__(self, peer: str, config: PeerTransportConfig):
+        self.peer = peer
+        self.semaphore = asyncio.Semaphore(config.max_concurrent_requests_per_peer)
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.in_flight = 0
+        self.queued = 0
+        self.requests = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+
+        self.connector = aiohttp.TCPConnector(
+            limit=config.max_connections_per_peer,
+            keepalive_timeout=config.keepalive_timeout,
+            ttl_dns_cache=config.dns_cache_ttl,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=self.connector,
+            timeout=aiohttp.ClientTimeout(
+                total=config.request_timeout, sock_connect=config.connect_timeout
+            ),
+            trace_configs=[trace_config],
+        )
+
+    async def _on_connection_created(self, session, ctx, params) -> None:
+        self.connections_created += 1
+
+    async def _on_connection_reused(self, session, ctx, params) -> None:
+        self.connections_reused += 1
+
+    def open_connections(self) -> int:
+        """Count idle plus acquired connections held by the connector."""
+        idle = sum(
+            len(conns) for conns in getattr(self.connector, "_conns", {}).values()
+        )
+        acquired = len(getattr(self.connector, "_acquired", ()))
+        return idle + acquired
+
+    def record_queue_wait(self, wait: float) -> None:
+        self.requests += 1
+        self.total_queue_wait += wait
+        self.max_queue_wait = max(self.max_queue_wait, wait)
+
+    def snapshot(self) -> PeerPoolMetrics:
+        total = self.connections_created + self.connections_reused
+        return PeerPoolMetrics(
+            peer=self.peer,
+            open_connections=self.open_connections(),
+            connections_created=self.connections_created,
+            connections_reused=self.connections_reused,
+            reuse_ratio=self.connections_reused / total if total else 0.0,
+            in_flight=self.in_flight,
+            queued=self.queued,
+            avg_queue_wait_ms=(
+                self.total_queue_wait / self.requests * 1000.0 if self.requests else 0.0
+            ),
+            max_queue_wait_ms=self.max_queue_wait * 1000.0,
+        )
+
+
+class PeerTransport:
+    """Node-scoped HTTP client with a keep-alive connection pool per peer.
+
+    Every remote call made by a node goes through a single transport so
+    that TCP connections to a peer are reused across requests instead of
+    being re-established for every block.
+    """
+
+    def __init__(self, config: Optional[PeerTransportConfig] = None):
+        self.config = config or PeerTransportConfig()
+        self.logger = logging.getLogger(__name__)
+        self._pools: Dict[str, _PeerPool] = {}
+        self._closed = False
+
+    def _get_pool(self, peer: str) -> _PeerPool:
+        if self._closed:
+            raise RuntimeError("Peer transport is closed")
+        pool = self._pools.get(peer)
+        if pool is None:
+            pool = _PeerPool(peer, self.config)
+            self._pools[peer] = pool
+        return pool
+
+    @asynccontextmanager
+    async def request(
+        self,
+        address: str,
+        method: str,
+        path: str,
+        timeout: Optional[Union[float, aiohttp.ClientTimeout]] = None,
+        **kwargs,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Issue a request to a peer over its pooled session.
+
+        Args:
+            address: Peer address as ``host:port``
+            method: HTTP method
+            path: Request path, starting with ``/``
+            timeout: Optional per-request timeout overriding the default
+            **kwargs: Passed through to ``aiohttp.ClientSession.request``
+
+        Yields:
+            The peer's response
+        """
+        pool = self._get_pool(address)
+        if isinstance(timeout, (int, float)):
+            timeout = aiohttp.ClientTimeout(
+                total=timeout, sock_connect=self.config.connect_timeout
+            )
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        pool.queued += 1
+        wait_start = time.monotonic()
+        try:
+            await pool.semaphore.acquire()
+        finally:
+            pool.queued -= 1
+        pool.record_queue_wait(time.monotonic() - wait_start)
+
+        pool.in_flight += 1
+        try:
+            async with pool.session.request(
+                method, f"http://{address}{path}", **kwargs
+            ) as response:
+                yield response
+        finally:
+            pool.in_flight -= 1
+            pool.semaphore.release()
+
+    def get_pool_metrics(self) -> Dict[str, PeerPoolMetrics]:
+        """Get connection pool metrics keyed by peer address."""
+        return {peer: pool.snapshot() for peer, pool in self._pools.items()}
+
+    async def close(self) -> None:
+        """Close every peer session and release pooled connections."""
+        self._closed = True
+        pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            try:
+                await pool.session.close()
+            except Exception as e:
+                self.logger.warning(
+                    f"Failed to close session for peer {pool.peer}: {str(e)}"
+                )
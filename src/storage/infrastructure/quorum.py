@@ -0,0 +1,118 @@
+"""First-N-of-M waiting for quorum reads and writes."""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence
+
+
+@dataclass
+class ReplicaOutcome:
+    """Outcome of one replica request in a quorum operation."""
+
+    key: Hashable
+    latency: float
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+
+@dataclass
+class QuorumResult:
+    """Result of waiting for a quorum of replica requests."""
+
+    required: int
+    successes: List[ReplicaOutcome] = field(default_factory=list)
+    failures: List[ReplicaOutcome] = field(default_factory=list)
+    cancelled: List[Hashable] = field(default_factory=list)
+    timed_out: bool = False
+
+    @property
+    def achieved(self) -> bool:
+        return len(self.successes) >= self.required
+
+    @property
+    def results(self) -> List[Any]:
+        """Results of the successful requests in completion order."""
+        return [outcome.result for outcome in self.successes]
+
+    @property
+    def latencies(self) -> Dict[Hashable, float]:
+        """Latency in seconds of every replica that completed."""
+        return {o.key: o.latency for o in self.successes + self.failures}
+
+
+async def quorum_gather(
+    aws: Sequence[Awaitable],
+    required: int,
+    timeout: Optional[float] = None,
+    is_success: Callable[[Any], bool] = lambda result: True,
+    keys: Optional[Sequence[Hashable]] = None,
+) -> QuorumResult:
+    """Wait until ``required`` of ``aws`` succeed, then cancel the rest.
+
+    Returns as soon as the quorum is reached, or as soon as enough requests
+    have failed that it can no longer be reached, so the caller waits for
+    the k-th fastest replica rather than the slowest one. A request counts
+    as a success if it returns without raising and ``is_success`` accepts
+    its result.
+
+    Args:
+        aws: Replica requests (coroutines, tasks or futures)
+        required: Number of successes needed
+        timeout: Overall deadline in seconds
+        is_success: Predicate applied to each result
+        keys: Labels for the requests (e.g. node ids); defaults to indexes
+
+    Returns:
+        QuorumResult; check ``achieved`` and ``timed_out``
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    keys = list(keys) if keys is not None else list(range(len(aws)))
+    tasks = {asyncio.ensure_future(aw): key for aw, key in zip(aws, keys)}
+    finished_at: Dict[asyncio.Future, float] = {}
+    for task in tasks:
+        task.add_done_callback(lambda t: finished_at.setdefault(t, loop.time()))
+
+    result = QuorumResult(required=required)
+    pending = set(tasks)
+    deadline = None if timeout is None else started + timeout
+
+    while pending and not result.achieved:
+        if len(result.failures) > len(tasks) - required:
+            break  # quorum is no longer reachable
+        remaining = None if deadline is None else max(0.0, deadline - loop.time())
+        done, pending = await asyncio.wait(
+            pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+        )
+        if not done:
+            result.timed_out = True
+            break
+
+        for task in done:
+            outcome = ReplicaOutcome(
+                key=tasks[task], latency=finished_at.get(task, loop.time()) - started
+            )
+            if task.cancelled():
+                outcome.error = asyncio.CancelledError()
+            elif task.exception() is not None:
+                outcome.error = task.exception()
+            else:
+                outcome.result = task.result()
+                if not is_success(outcome.result):
+                    outcome.error = ValueError("Replica reported failure")
+
+            if outcome.failed:
+                result.failures.append(outcome)
+            else:
+                result.successes.append(outcome)
+
+    # Stragglers are no longer needed either way
+    for task in pending:
+        task.cancel()
+        result.cancelled.append(tasks[task])
+
+    return result
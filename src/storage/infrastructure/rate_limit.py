@@ -0,0 +1,50 @@
+"""Token bucket for pacing background transfers."""
+
+import asyncio
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """Limit a flow of units (usually bytes) to ``rate`` per second.
+
+    Up to ``burst`` units may go out back to back. A request larger than
+    the tokens available is let through at once and paid back by delaying
+    the caller, so one large block cannot stall a transfer forever while
+    the long-run average still stays at ``rate``.
+
+    Args:
+        rate: Units per second; ``None`` or ``0`` disables limiting
+        burst: Bucket size, defaults to one second's worth
+        clock: Monotonic clock, injectable for tests
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float],
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate or 0.0
+        self.burst = burst if burst is not None else self.rate
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay_for(self, amount: float) -> float:
+        """Take ``amount`` tokens and return how long the caller should wait."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        self._tokens -= amount
+        return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self, amount: float) -> None:
+        delay = self.delay_for(amount)
+        if delay:
+            await asyncio.sleep(delay)
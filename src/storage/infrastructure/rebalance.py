@@ -0,0 +1,219 @@
+"""Planning and checkpointing of replica moves after placement changes.
+
+When ring membership changes, each block should end up on its new owners.
+Each node plans moves only for blocks it holds. A block is pushed by one
+holder only: the first holder in its preference order, which lists the
+owners and then the remaining members in ring order. A node learns
+whether the nodes ahead of it hold the block by asking them, so holders
+agree on the pusher without knowing about each other. Owners that
+already hold the current version are left alone. Only blocks whose
+owners changed therefore move, and each one moves once. A former owner
+deletes its copy once every owner holds the block.
+
+Local holdings are planned a page at a time in data id order. The
+checkpoint records the last data id done and the moves that failed, so a
+node that restarts picks up where it left off instead of planning again.
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterable, List, Optional, Sequence, Set, Tuple
+
+from src.storage.infrastructure.data.version_store import VersionedData
+from src.storage.infrastructure.hash_ring import HashRing
+
+
+@dataclass
+class RebalanceConfig:
+    """Settings for moving replicas between nodes."""
+
+    max_rate: float = 64 * 1024 * 1024  # bytes per second from this node
+    per_node_rate: float = 16 * 1024 * 1024  # bytes per second to one target
+    concurrency: int = 8  # moves in flight at once
+    checkpoint_every: int = 64  # local blocks planned between checkpoints
+    load_threshold: float = 0.75  # local load above which moves pause
+    throttle_pause: float = 1.0  # seconds to wait before checking load again
+    request_timeout: float = 30.0
+
+
+@dataclass
+class Move:
+    """Copy of one block from this node to a new owner."""
+
+    data_id: str
+    version: int
+    checksum: str
+    target: str
+
+
+@dataclass
+class RebalanceStats:
+    """Work done by one rebalance run."""
+
+    planned: int = 0
+    moved: int = 0
+    failed: int = 0
+    skipped: int = 0  # target gone or the block changed since planning
+    dropped: int = 0  # local copies deleted because every owner holds them
+    bytes_moved: int = 0
+    throttled: float = 0.0  # seconds spent waiting for local load to drop
+    resumed: bool = False
+
+
+def ring_fingerprint(ring: HashRing) -> str:
+    """Identify a ring layout, so a checkpoint is only resumed on the
+    same placement it was planned for."""
+    return json.dumps(
+        sorted(
+            [node_id, round(member.weight, 6), member.zone, member.region]
+            for node_id, member in ring.members.items()
+        )
+    )
+
+
+def preference(ring: HashRing, data_id: str, count: int, local_id: str) -> List[str]:
+    """Owners of a data id, followed by the other members in ring order.
+
+    The other members are only listed when ``local_id`` is not an owner,
+    since only then can a node ahead of it be a non-owner.
+    """
+    owners = ring.owners(data_id, count)
+    if local_id in owners:
+        return owners
+    rest = ring.owners(data_id, len(ring))
+    return owners + [node_id for node_id in rest if node_id not in owners]
+
+
+def deciding_nodes(local_id: str, order: List[str], count: int) -> List[str]:
+    """Nodes whose copies decide what this node does with a block.
+
+    These are the owners and every node ahead of ``local_id`` in the
+    block's preference ``order``.
+    """
+    end = max(count, order.index(local_id) if local_id in order else 0)
+    return [node_id for node_id in order[:end] if node_id != local_id]
+
+
+def plan_moves(
+    local_id: str,
+    holdings: Iterable[Tuple[str, VersionedData]],
+    order: Callable[[str], List[str]],
+    count: int,
+    holders: Callable[[str, VersionedData], Set[str]],
+    live: Set[str],
+) -> List[Move]:
+    """Moves this node is responsible for.
+
+    Args:
+        local_id: Id of this node
+        holdings: Blocks held locally
+        order: Preference order of a data id (see ``preference``)
+        count: Number of owners per block
+        holders: Nodes holding a block at least as new as the given
+            version; must be known for every node in ``deciding_nodes``
+        live: Nodes that can take part in moves
+
+    Returns:
+        Moves to make from this node, in the order ``holdings`` was given
+    """
+    moves = []
+    for data_id, version_data in holdings:
+        walk = order(data_id)
+        have = {
+            node_id for node_id in holders(data_id, version_data) if node_id in live
+        }
+        have.add(local_id)
+        missing = [
+            node_id
+            for node_id in walk[:count]
+            if node_id not in have and node_id in live
+        ]
+        if not missing:
+            continue
+        pusher = next((node_id for node_id in walk if node_id in have), local_id)
+        if pusher != local_id:
+            continue
+        moves.extend(
+            Move(data_id, version_data.version, version_data.checksum, target)
+            for target in missing
+        )
+    return moves
+
+
+def surplus(
+    local_id: str,
+    holdings: Iterable[Tuple[str, VersionedData]],
+    order: Callable[[str], List[str]],
+    count: int,
+    holders: Callable[[str, VersionedData], Set[str]],
+    live: Set[str],
+) -> List[str]:
+    """Data ids of local copies that can be deleted.
+
+    A copy is surplus when this node is not an owner and every owner is
+    live and holds the block at least as new. Arguments are as for
+    ``plan_moves``.
+    """
+    drops = []
+    for data_id, version_data in holdings:
+        wanted = order(data_id)[:count]
+        if not wanted or local_id in wanted:
+            continue
+        have = holders(data_id, version_data)
+        if all(node_id in have and node_id in live for node_id in wanted):
+            drops.append(data_id)
+    return drops
+
+
+class RebalanceCheckpoint:
+    """Progress of an interrupted rebalance, kept in a JSON file.
+
+    The cursor is the last data id planned, or None once every page has
+    been planned and only failed moves remain.
+
+    Methods block on file I/O and are meant to run on a disk pool.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Optional[Tuple[str, Optional[str], List[Move]]]:
+        """Ring fingerprint, cursor and outstanding moves; None if none."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            return (
+                state["ring"],
+                state["cursor"],
+                [Move(**move) for move in state["moves"]],
+            )
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError):
+            # A damaged checkpoint only costs a fresh plan
+            self.clear()
+            return None
+
+    def save(self, ring: str, cursor: Optional[str], moves: Sequence[Move]) -> None:
+        """Replace the checkpoint atomically."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "ring": ring,
+                    "cursor": cursor,
+                    "moves": [asdict(move) for move in moves],
+                },
+                f,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -183,6 +183,35 @@ class UnifiedMetricsCollector:
             ["instance", "node_id", "error_type"],
         )
 
+        # Disk I/O Executor Metrics
+        self.disk_io_queue_depth = Gauge(
+            "dfs_disk_io_queue_depth",
+            "Disk operations waiting for a worker or for admission",
+            ["instance", "node_id", "pool"],
+        )
+        self.disk_io_in_flight = Gauge(
+            "dfs_disk_io_in_flight",
+            "Disk operations currently running on a worker",
+            ["instance", "node_id", "pool"],
+        )
+        self.event_loop_lag = Gauge(
+            "dfs_event_loop_lag_seconds",
+            "Most recent event loop scheduling delay",
+            ["instance", "node_id"],
+        )
+
+        # Anti-entropy Metrics
+        self.anti_entropy_bytes = Counter(
+            "dfs_anti_entropy_bytes_total",
+            "Bytes exchanged by anti-entropy sync rounds",
+            ["instance", "node_id", "kind"],  # kind: hashes, listings, blocks
+        )
+        self.anti_entropy_repairs = Counter(
+            "dfs_anti_entropy_repairs_total",
+            "Blocks repaired from peers by anti-entropy",
+            ["instance", "node_id"],
+        )
+
         # Policy Metrics
         self.policy_violations = Counter(
             "dfs_policy_violations_total",
@@ -373,6 +402,35 @@ class UnifiedMetricsCollector:
             instance=self.instance_id, node_id=self.node_id, error_type=error_type
         ).inc()
 
+    def update_disk_io_metrics(self, disk_io_metrics: dict):
+        """Update disk I/O queue depths and event loop lag"""
+        for pool, snapshot in disk_io_metrics["pools"].items():
+            self.disk_io_queue_depth.labels(
+                instance=self.instance_id, node_id=self.node_id, pool=pool
+            ).set(snapshot.queued + snapshot.blocked)
+            self.disk_io_in_flight.labels(
+                instance=self.instance_id, node_id=self.node_id, pool=pool
+            ).set(snapshot.in_flight)
+
+        self.event_loop_lag.labels(instance=self.instance_id, node_id=self.node_id).set(
+            disk_io_metrics["event_loop_lag"]["last_ms"] / 1000.0
+        )
+
+    def record_anti_entropy_sync(self, stats):
+        """Record the traffic and repairs of one anti-entropy sync round"""
+        for kind, count in (
+            ("hashes", stats.hash_bytes),
+            ("listings", stats.listing_bytes),
+            ("blocks", stats.block_bytes),
+        ):
+            self.anti_entropy_bytes.labels(
+                instance=self.instance_id, node_id=self.node_id, kind=kind
+            ).inc(count)
+
+        self.anti_entropy_repairs.labels(
+            instance=self.instance_id, node_id=self.node_id
+        ).inc(len(stats.repaired))
+
     def record_policy_violation(self, policy_type: str, severity: str = "warning"):
         """Record a policy violation"""
         self.policy_violations.labels(